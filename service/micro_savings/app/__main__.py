@@ -11,6 +11,7 @@ def main():
         reload=settings.reload,
         workers=settings.workers,
         log_level="info",
+        access_log=not settings.ACCESS_LOG_ENABLED,
         factory=True,
     )
 
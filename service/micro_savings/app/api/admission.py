@@ -0,0 +1,216 @@
+import asyncio
+import math
+import time
+from typing import Any, List, Optional
+
+from service.micro_savings.app.models.periods import KPeriod
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def estimate_cost(
+    payload: Any, registry: Optional[PeriodRegistry] = None, stored: int = 0
+) -> int:
+    """
+    Estimated work for a compute request: transactions × periods.
+
+    ``payload`` is the decoded JSON body — either a bare list of
+    transactions (parse) or an object with a ``transactions`` list and
+    optional inline ``q`` / ``p`` / ``k`` lists or a ``periodSetId``.
+    A body with a ``userId`` instead counts the ``stored`` transactions it
+    will read, which ``admit_compute`` counts in the store's K windows.
+    Requests without periods count one unit per transaction.
+    """
+    if isinstance(payload, list):
+        return max(len(payload), 1)
+    if not isinstance(payload, dict):
+        return 1
+
+    transactions = payload.get("transactions")
+    n_transactions = len(transactions) if isinstance(transactions, list) else stored
+
+    n_periods = 0
+    set_id = payload.get("periodSetId")
+    if isinstance(set_id, str) and registry is not None:
+        try:
+            period_set, _ = registry.get(set_id)
+            n_periods = len(period_set.q) + len(period_set.p) + len(period_set.k)
+        except KeyError:
+            pass  # the endpoint answers 404
+    else:
+        for key in ("q", "p", "k"):
+            periods = payload.get(key)
+            if isinstance(periods, list):
+                n_periods += len(periods)
+
+    return max(n_transactions, 1) * max(n_periods, 1)
+
+
+def k_periods_of(
+    payload: dict, registry: Optional[PeriodRegistry] = None
+) -> List[KPeriod]:
+    """
+    The K periods a decoded body will use — its ``periodSetId``'s or its
+    inline ``k`` list; none if they are unknown or malformed (the endpoint
+    answers 404 / 422).
+    """
+    set_id = payload.get("periodSetId")
+    if isinstance(set_id, str):
+        if registry is None:
+            return []
+        try:
+            return list(registry.get(set_id)[0].k)
+        except KeyError:
+            return []
+    periods = payload.get("k")
+    if not isinstance(periods, list):
+        return []
+    try:
+        return [KPeriod.model_validate(period) for period in periods]
+    except ValueError:
+        return []
+
+
+# Rough size of one "date,amount" CSV record, for costing uploads unread
+CSV_RECORD_BYTES = 32
+
+
+def estimate_upload_cost(content_length: Optional[str]) -> int:
+    """
+    Estimated work for a CSV upload, which is admitted before it is read:
+    one unit per ``CSV_RECORD_BYTES`` of body (1 if Content-Length is
+    malformed; ``admit_compute`` rejects uploads without one).
+
+    Example:
+        "3200000" → 100000
+    """
+    try:
+        return max(int(content_length) // CSV_RECORD_BYTES, 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+class AdmissionController:
+    """
+    Caps the total estimated cost of compute requests in flight.
+
+    A request whose cost fits under ``max_cost`` is admitted at once.
+    Otherwise it waits up to ``queue_timeout`` seconds for capacity, unless
+    ``max_queue`` requests are already waiting.  A request larger than the
+    whole budget is admitted only when nothing else is running, so it
+    cannot be starved.  Rejections raise ``AdmissionRejected`` with a
+    Retry-After estimate derived from the observed seconds per cost unit.
+
+    All methods run on the event loop (from an async dependency), before
+    the sync endpoint is handed to the thread pool — so excess load is
+    turned away instead of piling up in the pool's queue.
+    """
+
+    def __init__(
+        self,
+        max_cost: int,
+        max_queue: int = 64,
+        queue_timeout: float = 0.5,
+        max_retry_after: int = 30,
+    ) -> None:
+        self.max_cost = max_cost
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retry_after = max_retry_after
+
+        self.in_flight = 0
+        self.in_flight_cost = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._seconds_per_unit: Optional[float] = None
+        self._cond = asyncio.Condition()
+
+    def _fits(self, cost: int) -> bool:
+        return self.in_flight == 0 or self.in_flight_cost + cost <= self.max_cost
+
+    def _retry_after(self, cost: int) -> int:
+        if self._seconds_per_unit is None:
+            return 1
+        excess = max(self.in_flight_cost + cost - self.max_cost, 0)
+        seconds = math.ceil(excess * self._seconds_per_unit)
+        return min(max(seconds, 1), self.max_retry_after)
+
+    async def acquire(self, cost: int) -> float:
+        """
+        Admit a request of ``cost`` units.
+
+        Returns:
+            a start timestamp to pass back to ``release``
+
+        Raises:
+            AdmissionRejected: queue full, or no capacity within the timeout
+        """
+        if self.waiting == 0 and self._fits(cost):
+            return self._admit(cost)
+
+        if self.waiting >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("queue full", self._retry_after(cost))
+
+        self.waiting += 1
+        try:
+            async with self._cond:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self._fits(cost)),
+                    timeout=self.queue_timeout,
+                )
+                return self._admit(cost)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected("timed out waiting", self._retry_after(cost))
+        finally:
+            self.waiting -= 1
+
+    def _admit(self, cost: int) -> float:
+        self.in_flight += 1
+        self.in_flight_cost += cost
+        self.admitted += 1
+        return time.perf_counter()
+
+    async def release(self, cost: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        per_unit = elapsed / max(cost, 1)
+        self._seconds_per_unit = (
+            per_unit
+            if self._seconds_per_unit is None
+            else 0.8 * self._seconds_per_unit + 0.2 * per_unit
+        )
+
+        self.in_flight -= 1
+        self.in_flight_cost -= cost
+        async with self._cond:
+            self._cond.notify_all()
+
+    def reset_counters(self) -> None:
+        """Zero the admitted / rejected counters; the cost estimate is kept."""
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def stats(self) -> dict:
+        return {
+            "maxCost": self.max_cost,
+            "inFlight": self.in_flight,
+            "inFlightCost": self.in_flight_cost,
+            "queueDepth": self.waiting,
+            "admitted": self.admitted,
+            "rejectedQueueFull": self.rejected_queue_full,
+            "rejectedTimeout": self.rejected_timeout,
+        }
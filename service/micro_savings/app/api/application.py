@@ -3,20 +3,44 @@ from starlette.middleware.cors import CORSMiddleware
 
 from service.micro_savings.app.api.endpoints.router import router
 from service.micro_savings.app.api.lifespan import lifespan
+from service.micro_savings.app.api.middleware.access_log import AccessLogMiddleware
+from service.micro_savings.app.api.middleware.compression import (
+    CompressionMiddleware,
+)
+from service.micro_savings.app.api.middleware.gc import GCDeferralMiddleware
+from service.micro_savings.app.api.middleware.memory import (
+    MemoryAccountingMiddleware,
+)
+from service.micro_savings.app.api.middleware.profiling import ProfilingMiddleware
+from service.micro_savings.app.api.middleware.tracing import (
+    TracedJSONResponse,
+    TracingMiddleware,
+)
 from service.micro_savings.app.utils.logging import setup_logging
+from service.micro_savings.app.utils.settings import settings
 
 
 def get_app() -> FastAPI:
-    setup_logging()
+    log_sink = setup_logging(
+        level=settings.log_level,
+        json_format=settings.LOG_JSON,
+        queued=settings.LOG_QUEUED,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        batch_size=settings.LOG_BATCH_SIZE,
+        flush_interval=settings.LOG_FLUSH_INTERVAL,
+        uvicorn_access=not settings.ACCESS_LOG_ENABLED,
+    )
 
     app = FastAPI(
         title="micro_savings",
         version="0.1.0",
         lifespan=lifespan,
+        default_response_class=TracedJSONResponse,
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
     )
+    app.state.log_sink = log_sink
 
     app.add_middleware(
         CORSMiddleware,
@@ -26,6 +50,36 @@ def get_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+            gzip_level=settings.GZIP_LEVEL,
+            deflate_level=settings.DEFLATE_LEVEL,
+            offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
+            max_body_size=settings.MAX_DECOMPRESSED_BODY_SIZE,
+        )
+
+    if settings.MEMORY_TRACKING_ENABLED:
+        app.add_middleware(MemoryAccountingMiddleware)
+
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware, top_n=settings.PROFILING_TOP_N)
+
+    if settings.GC_MODE == "deferred":
+        app.add_middleware(GCDeferralMiddleware)
+
+    if settings.ACCESS_LOG_ENABLED:
+        app.add_middleware(
+            AccessLogMiddleware,
+            sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+            slow_ms=settings.ACCESS_LOG_SLOW_MS,
+        )
+
+    if settings.TRACING_ENABLED:
+        # Outermost, so the root span covers every other middleware
+        app.add_middleware(TracingMiddleware)
+
     app.include_router(router=router, prefix="/blackrock/challenge/v1")
 
     return app
@@ -0,0 +1,198 @@
+import hashlib
+from typing import AsyncIterator, List, Optional, Tuple
+
+from anyio import to_thread
+from fastapi import HTTPException, Request
+
+from service.micro_savings.app.api.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    estimate_cost,
+    estimate_upload_cost,
+    k_periods_of,
+)
+from service.micro_savings.app.models.periods import PeriodSet
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.job_processor.job_service import (
+    JobManager,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    CompiledPeriods,
+    PeriodRegistry,
+)
+from service.micro_savings.app.transaction_engine.store_processor.store_service import (
+    TransactionStore,
+)
+from service.micro_savings.app.transaction_engine.whatif_processor.whatif_service import (
+    BaselineRegistry,
+)
+from service.micro_savings.app.utils.tracing import span
+
+
+def get_period_registry(request: Request) -> PeriodRegistry:
+    """The period-set registry created in ``lifespan``."""
+    return request.app.state.period_registry
+
+
+def get_baseline_registry(request: Request) -> BaselineRegistry:
+    """The what-if baseline registry created in ``lifespan``."""
+    return request.app.state.whatif_baselines
+
+
+def get_job_manager(request: Request) -> JobManager:
+    """
+    The job manager started in ``lifespan``.
+
+    Raises:
+        HTTPException: 404 if the job API is disabled.
+    """
+    jobs = getattr(request.app.state, "jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=404, detail="Job API is disabled.")
+    return jobs
+
+
+def resolve_periods(
+    registry: PeriodRegistry, period_set_id, q_periods, p_periods, k_periods
+) -> CompiledPeriods:
+    """
+    Compiled periods for a request — registered by ID or inline.
+
+    Raises:
+        HTTPException: 404 if ``period_set_id`` is unknown or was evicted.
+    """
+    try:
+        with span("periods.resolve", registered=period_set_id is not None):
+            return registry.resolve(period_set_id, q_periods, p_periods, k_periods)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Period set '{period_set_id}' is not registered.",
+        )
+
+
+def registered_periods(
+    registry: PeriodRegistry, period_set_id: str
+) -> Tuple[PeriodSet, CompiledPeriods]:
+    """
+    A registered period set and its compiled periods, from one lookup.
+
+    Raises:
+        HTTPException: 404 if ``period_set_id`` is unknown or was evicted.
+    """
+    try:
+        with span("periods.resolve", registered=True):
+            return registry.get(period_set_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Period set '{period_set_id}' is not registered.",
+        )
+
+
+def get_transaction_store(request: Request) -> TransactionStore:
+    """
+    The transaction store opened in ``lifespan``.
+
+    Raises:
+        HTTPException: 404 if the store is disabled.
+    """
+    store = getattr(request.app.state, "db_connection", None)
+    if store is None:
+        raise HTTPException(status_code=404, detail="Transaction store is disabled.")
+    return store
+
+
+def resolve_transactions(
+    request: Request, user_id: Optional[str], transactions, periods: CompiledPeriods
+) -> List[RawTransaction]:
+    """
+    Transactions for a request — inline, or a stored user's transactions
+    inside the request's K windows (one indexed range scan per window).
+
+    Raises:
+        HTTPException: 404 if ``user_id`` is given and the store is disabled.
+    """
+    if user_id is None:
+        return transactions
+    store = get_transaction_store(request)
+    with span("store.scan", kPeriods=len(periods.k_periods)):
+        return store.scan_k_windows(user_id, periods.k_periods)
+
+
+async def paging_digest(request: Request) -> Optional[str]:
+    """
+    Short hash of the request body when the request is paged (``limit`` or
+    ``cursor`` in the query), to bind its cursors to the body; else None.
+    Registered period sets are content-addressed, so the hash covers the
+    periods of a ``periodSetId`` body too.
+    """
+    query = request.query_params
+    if "limit" not in query and "cursor" not in query:
+        return None
+    body = await request.body()  # already read by FastAPI
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+async def admit_compute(request: Request) -> AsyncIterator[None]:
+    """
+    Admission control for CPU-bound endpoints (``Depends(admit_compute)``).
+
+    Runs on the event loop after the body is decoded but before the sync
+    endpoint is queued on the thread pool, and holds the request's
+    estimated cost (transactions × periods) until it completes.
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when over capacity,
+            411 for a CSV upload without Content-Length.
+    """
+    controller: Optional[AdmissionController] = getattr(
+        request.app.state, "admission", None
+    )
+    if controller is None:
+        yield
+        return
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(("text/csv", "multipart/")):
+        # Streamed uploads are read by the endpoint, not here, so they are
+        # costed by size; a chunked body of unknown size could not be
+        content_length = request.headers.get("content-length")
+        if content_length is None:
+            raise HTTPException(
+                status_code=411, detail="Send uploads with a Content-Length header."
+            )
+        cost = estimate_upload_cost(content_length)
+    else:
+        try:
+            payload = await request.json()  # already parsed and cached by FastAPI
+        except ValueError:
+            payload = None
+        registry = getattr(request.app.state, "period_registry", None)
+        stored = 0
+        store = getattr(request.app.state, "db_connection", None)
+        if (
+            store is not None
+            and isinstance(payload, dict)
+            and isinstance(payload.get("userId"), str)
+        ):
+            # Index range counts, off the event loop
+            stored = await to_thread.run_sync(
+                store.count_k_windows,
+                payload["userId"],
+                k_periods_of(payload, registry),
+            )
+        cost = estimate_cost(payload, registry, stored)
+
+    try:
+        started = await controller.acquire(cost)
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server is at capacity ({exc.reason}). Retry later.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    try:
+        yield
+    finally:
+        await controller.release(cost, started)
@@ -1,16 +1,51 @@
-from fastapi import APIRouter
+from itertools import chain, islice
+from typing import Iterator, Optional, Union
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from service.micro_savings.app.api.dependencies import (
+    admit_compute,
+    get_period_registry,
+    paging_digest,
+    resolve_periods,
+    resolve_transactions,
+)
+from service.micro_savings.app.api.negotiation import (
+    MsgPackRoute,
+    negotiate,
+    wants_msgpack,
+)
 from service.micro_savings.app.models.filter import FilterRequest
-from service.micro_savings.app.models.transaction import FilterResult
+from service.micro_savings.app.models.transaction import FilterResult, FilterPage
 from service.micro_savings.app.transaction_engine.filter_processor.qpk_service import (
-    apply_qpk,
+    apply_qpk_compiled,
+    iter_qpk_compiled,
 )
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+from service.micro_savings.app.utils.settings import settings
+from service.micro_savings.app.utils.tracing import span
+from service.micro_savings.app.utils.utils import decode_cursor, encode_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute)
 
 
-@router.post("/transactions:filter", response_model=FilterResult)
-def filter_transactions(request: FilterRequest):
+@router.post(
+    "/transactions:filter",
+    response_model=Union[FilterResult, FilterPage],
+    dependencies=[Depends(admit_compute)],
+)
+def filter_transactions(
+    request: FilterRequest,
+    http_request: Request,
+    stream: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=settings.FILTER_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    registry: PeriodRegistry = Depends(get_period_registry),
+    digest: Optional[str] = Depends(paging_digest),
+):
     """
     Step 3 — Apply Q, P, K period rules to each transaction.
 
@@ -27,14 +62,121 @@ def filter_transactions(request: FilterRequest):
         A single transaction can appear in MULTIPLE K periods.
         Transactions outside all K periods → moved to invalid.
 
+    Periods:
+        inline q / p / k lists, or {"periodSetId": id} from POST /periods
+
+    roundUp:
+        ceiling granularity in rupees — 10, 50, 100 (default) or 500
+
+    Transactions:
+        inline list, or {"userId": id} to read the user's stored
+        transactions (POST /users/{id}/transactions) — only those inside a
+        K window are read, so none are reported as outside all K periods
+
+    lenient=true:
+        rows with a malformed date or amount are reported first in invalid
+        (with the reason) and the rest are processed, instead of the whole
+        body failing with 422
+
+    Output modes:
+        default              → one FilterResult document
+        ?limit=N[&cursor=c]  → FilterPage with the next N records and a
+                               nextCursor (resend the same body with it;
+                               a cursor from another body → 400)
+        ?stream=true         → application/x-ndjson, one {"valid": ...} or
+                               {"invalid": ...} object per line, emitted as
+                               records are produced
+
+    MessagePack:
+        Content-Type: application/msgpack → the same body, with each
+            transaction as [timestamp, amount] (seconds since 1970-01-01)
+        Accept: application/msgpack → the default and paged documents in
+            MessagePack, dates as timestamps
+
+    Pages are not cached: each one evaluates the batch again up to its
+    offset, so reading all N records in pages of L costs O(N² / L).
+    Prefer ?stream=true, or a large limit, to read a big result through.
+
+    Large batches (FILTER_PARALLEL_WORKERS > 0, at least
+    FILTER_PARALLEL_MIN_TRANSACTIONS) are evaluated and encoded in chunks
+    across worker processes; the document is the same.  MessagePack
+    answers are encoded sequentially.
+
     Returns:
         valid   → transactions with updated remanents and K membership
-        invalid → transactions outside all K periods
+        invalid → transactions outside all K periods, and malformed rows
+                  in lenient mode
     """
-    valid, invalid = apply_qpk(
-        request.transactions,
-        request.q,
-        request.p,
-        request.k,
+    periods = resolve_periods(
+        registry, request.periodSetId, request.q, request.p, request.k
+    )
+    transactions = resolve_transactions(
+        http_request, request.userId, request.transactions, periods
+    )
+
+    if stream or limit is not None or cursor is not None:
+        records = chain(
+            ((False, rejected) for rejected in request.rejected),
+            iter_qpk_compiled(transactions, periods, request.roundUp),
+        )
+        if stream:
+            return StreamingResponse(
+                _ndjson_chunks(records, settings.FILTER_STREAM_BATCH_SIZE),
+                media_type="application/x-ndjson",
+            )
+        with span("qpk.page", limit=limit, cursor=cursor is not None):
+            page = _page(
+                records,
+                limit or settings.FILTER_MAX_PAGE_SIZE,
+                cursor,
+                # Stored transactions can change between pages of a userId body
+                f"{digest}{len(transactions):x}",
+            )
+        return negotiate(http_request, page)
+
+    parallel = getattr(http_request.app.state, "parallel_filter", None)
+    if (
+        parallel is not None
+        and parallel.accepts(len(transactions))
+        and not wants_msgpack(http_request)
+    ):
+        return Response(
+            parallel.filter_json(
+                transactions, periods, request.roundUp, request.rejected
+            ),
+            media_type="application/json",
+        )
+
+    valid, invalid = apply_qpk_compiled(transactions, periods, request.roundUp)
+    return negotiate(
+        http_request, FilterResult(valid=valid, invalid=request.rejected + invalid)
     )
-    return FilterResult(valid=valid, invalid=invalid)
+
+
+def _page(records: Iterator, limit: int, cursor: Optional[str], key: str) -> FilterPage:
+    try:
+        offset = decode_cursor(cursor, key) if cursor else 0
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # Fetch one extra record to learn whether another page exists
+    window = list(islice(records, offset, offset + limit + 1))
+    has_more = len(window) > limit
+
+    page = FilterPage(valid=[], invalid=[])
+    for is_valid, record in window[:limit]:
+        (page.valid if is_valid else page.invalid).append(record)
+    if has_more:
+        page.nextCursor = encode_cursor(offset + limit, key)
+    return page
+
+
+def _ndjson_chunks(records: Iterator, batch_size: int) -> Iterator[bytes]:
+    # Batch lines so each threadpool hop carries many records, not one
+    while batch := list(islice(records, batch_size)):
+        yield b"".join(
+            (b'{"valid":' if is_valid else b'{"invalid":')
+            + record.model_dump_json().encode()
+            + b"}\n"
+            for is_valid, record in batch
+        )
@@ -0,0 +1,3 @@
+from service.micro_savings.app.api.endpoints.jobs.jobs import router
+
+__all__ = ["router"]
@@ -0,0 +1,213 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from service.micro_savings.app.api.dependencies import (
+    admit_compute,
+    get_job_manager,
+    get_period_registry,
+    get_transaction_store,
+    resolve_periods,
+)
+from service.micro_savings.app.models.job import JobStage, JobStatus
+from service.micro_savings.app.models.returns import ReturnRequest, ReturnResponse
+from service.micro_savings.app.transaction_engine.job_processor.job_service import (
+    Job,
+    JobManager,
+    JobQueueFull,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
+    RETURNS_STAGES,
+    compute_index_returns,
+    compute_nps_returns,
+)
+
+router = APIRouter()
+
+
+def _job_status(job: Job) -> JobStatus:
+    return JobStatus(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        stage=job.stage,
+        progress=job.progress(),
+        stages=[JobStage(**state) for state in job.stage_states()],
+        createdAt=job.created_at,
+        startedAt=job.started_at,
+        finishedAt=job.finished_at,
+        expiresInSeconds=(
+            round(max(job.expires - time.monotonic(), 0.0), 3)
+            if job.expires is not None
+            else None
+        ),
+        error=job.error,
+    )
+
+
+def _get_job(jobs: JobManager, job_id: str) -> Job:
+    try:
+        return jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Job '{job_id}' is not registered."
+        )
+
+
+def _submit_returns(
+    scheme: str,
+    request: ReturnRequest,
+    http_request: Request,
+    response: Response,
+    registry: PeriodRegistry,
+    jobs: JobManager,
+) -> JobStatus:
+    # Unknown period sets and a disabled store fail the submission, not the job
+    periods = resolve_periods(
+        registry, request.periodSetId, request.q, request.p, request.k
+    )
+    store = get_transaction_store(http_request) if request.userId else None
+    compute = compute_nps_returns if scheme == "nps" else compute_index_returns
+    extra = (
+        {"tax_table": request.taxTable, "compare_tax_tables": request.compareTaxTables}
+        if scheme == "nps"
+        else {}
+    )
+
+    def run(enter_stage):
+        enter_stage("load")
+        transactions = (
+            store.scan_k_windows(request.userId, periods.k_periods)
+            if store is not None
+            else request.transactions
+        )
+        return compute(
+            transactions=transactions,
+            k_periods=list(periods.k_periods),
+            q_periods=request.q,
+            p_periods=request.p,
+            age=request.age,
+            wage=request.wage,
+            inflation=request.inflation,
+            time_weighted=request.timeWeighted,
+            periods=periods,
+            round_up=request.roundUp,
+            on_stage=enter_stage,
+            **extra,
+        )
+
+    stages = ["load"] + [
+        stage
+        for stage in RETURNS_STAGES
+        if stage != "time_weight" or request.timeWeighted
+    ]
+    try:
+        job = jobs.submit(f"returns:{scheme}", stages, run)
+    except JobQueueFull as exc:
+        raise HTTPException(
+            status_code=429,
+            detail="Job queue is full. Retry later.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    response.headers["Location"] = str(http_request.url_for("get_job", job_id=job.id))
+    return _job_status(job)
+
+
+@router.post(
+    "/jobs/returns:nps",
+    response_model=JobStatus,
+    response_model_exclude_none=True,
+    status_code=202,
+    dependencies=[Depends(admit_compute)],
+)
+def submit_nps_returns(
+    request: ReturnRequest,
+    http_request: Request,
+    response: Response,
+    registry: PeriodRegistry = Depends(get_period_registry),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    """
+    Queue a /returns:nps computation and return its job ID at once.
+
+    Takes the same body as /returns:nps.  The computation runs on the job
+    worker pool, off the request path — poll GET /jobs/{id} for status and
+    per-stage progress, then fetch GET /jobs/{id}/result.
+
+    Stages: load → filter → aggregate → (time_weight) → project
+    429 with Retry-After when the server is over capacity or the job queue
+    is full.
+    """
+    return _submit_returns("nps", request, http_request, response, registry, jobs)
+
+
+@router.post(
+    "/jobs/returns:index",
+    response_model=JobStatus,
+    response_model_exclude_none=True,
+    status_code=202,
+    dependencies=[Depends(admit_compute)],
+)
+def submit_index_returns(
+    request: ReturnRequest,
+    http_request: Request,
+    response: Response,
+    registry: PeriodRegistry = Depends(get_period_registry),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    """Queue a /returns:index computation; see POST /jobs/returns:nps."""
+    return _submit_returns("index", request, http_request, response, registry, jobs)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatus,
+    response_model_exclude_none=True,
+)
+def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Status and progress of a job.
+
+    status: queued → running → succeeded | failed
+    Finished jobs expire after the result TTL (expiresInSeconds), or are
+    evicted sooner once too many have finished → 404.
+    """
+    return _job_status(_get_job(jobs, job_id))
+
+
+@router.get(
+    "/jobs/{job_id}/result",
+    response_model=ReturnResponse,
+    response_model_exclude_none=True,
+)
+def get_job_result(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """
+    The result of a succeeded job — the same body the synchronous endpoint
+    returns.  409 while the job is queued or running, or if it failed.
+    """
+    job = _get_job(jobs, job_id)
+    if job.status == "failed":
+        raise HTTPException(
+            status_code=409, detail=f"Job '{job_id}' failed: {job.error}"
+        )
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job.status}.")
+    return job.result
+
+
+@router.delete("/jobs/{job_id}", status_code=204)
+def cancel_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Cancel a job and discard it.  A queued job never starts; a running job
+    stops before its next stage.  Finished jobs are simply dropped.
+    """
+    try:
+        jobs.cancel(job_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Job '{job_id}' is not registered."
+        )
+    return Response(status_code=204)
@@ -0,0 +1,76 @@
+import tracemalloc
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from service.micro_savings.app.api.middleware.memory import SnapshotStore
+
+router = APIRouter()
+
+
+def _require_tracking(request: Request) -> None:
+    if getattr(request.app.state, "memory_stats", None) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Memory tracking is disabled. Set MEMORY_TRACKING_ENABLED=true.",
+        )
+
+
+def _snapshots(request: Request) -> SnapshotStore:
+    _require_tracking(request)
+    return request.app.state.memory_snapshots
+
+
+@router.get("/memory")
+def memory(request: Request):
+    """
+    Traced allocation per endpoint (requires MEMORY_TRACKING_ENABLED).
+
+    Returns:
+        tracedCurrentBytes → bytes currently held by traced allocations
+        tracedPeakBytes    → process-wide peak since the last reset
+        endpoints          → per "METHOD /route": requests, peakBytesMax,
+                             peakBytesMean, retainedBytesMean, blocksDeltaMean
+                             (exclusiveRequests ran with no overlapping request,
+                             so their peak is attributable to them alone)
+    """
+    _require_tracking(request)
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracedCurrentBytes": current,
+        "tracedPeakBytes": peak,
+        "endpoints": request.app.state.memory_stats.summary(),
+    }
+
+
+@router.post("/memory/snapshots", status_code=201)
+def take_snapshot(request: Request):
+    """
+    Take a tracemalloc snapshot to diff against later.
+
+    Only the most recent MEMORY_SNAPSHOT_HISTORY snapshots are kept.
+    """
+    return _snapshots(request).take()
+
+
+@router.get("/memory/snapshots/{snapshot_id}/diff")
+def diff_snapshot(
+    snapshot_id: str,
+    request: Request,
+    against: Optional[str] = None,
+    top: int = Query(20, ge=1, le=500),
+    groupBy: Literal["lineno", "filename", "traceback"] = "lineno",
+):
+    """
+    Top allocation sites by growth since a snapshot.
+
+    Compares against another snapshot (?against=<id>) or, by default, a
+    fresh one taken now.  Sites with a large positive sizeDiffBytes are
+    where memory went between the two points in time.
+    """
+    try:
+        return _snapshots(request).diff(snapshot_id, against, top, groupBy)
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=404, detail=f"Snapshot {exc} not found or evicted."
+        )
@@ -1,8 +1,32 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
 
 @router.get("/health")
-def health():
-    return {"status": "ok"}
+def health(request: Request):
+    """
+    Liveness — answers as soon as the server accepts requests.
+
+    Readiness is reported alongside (``ready`` plus the warm-up's progress
+    and its first vs last latency per route) but does not affect the
+    status code; probe /health/ready for that.
+    """
+    warmup = getattr(request.app.state, "warmup", None)
+    return {
+        "status": "ok",
+        "ready": warmup is None or warmup.ready.is_set(),
+        "warmup": warmup.summary() if warmup is not None else None,
+    }
+
+
+@router.get("/health/ready")
+def ready(request: Request):
+    """
+    Readiness — 200 once the startup warm-up has finished, 503 before.
+    """
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is not None and not warmup.ready.is_set():
+        return JSONResponse({"status": "warming up"}, status_code=503)
+    return {"status": "ready"}
@@ -1,7 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 
+from service.micro_savings.app.api.dependencies import admit_compute
+
+from service.micro_savings.app.models.roundup import check_round_up
 from service.micro_savings.app.models.transaction import (
     RawTransaction,
     ParsedTransaction,
@@ -9,12 +12,19 @@ from service.micro_savings.app.models.transaction import (
 from service.micro_savings.app.transaction_engine.ceiling_processor.ceiling_service import (
     parse_all,
 )
+from service.micro_savings.app.utils.money import DEFAULT_ROUND_UP
 
 router = APIRouter()
 
 
-@router.post("/transactions:parse", response_model=List[ParsedTransaction])
-def parse_transactions(transactions: List[RawTransaction]):
+@router.post(
+    "/transactions:parse",
+    response_model=List[ParsedTransaction],
+    dependencies=[Depends(admit_compute)],
+)
+def parse_transactions(
+    transactions: List[RawTransaction], roundUp: int = DEFAULT_ROUND_UP
+):
     """
     Step 1 — Enrich raw transactions with ceiling and remanent.
 
@@ -26,5 +36,12 @@ def parse_transactions(transactions: List[RawTransaction]):
         amount=250  →  ceiling=300,  remanent=50
         amount=300  →  ceiling=300,  remanent=0   (exact multiple)
         amount=847  →  ceiling=900,  remanent=53
+
+    ?roundUp= sets the granularity (10, 50, 100 or 500; default 100):
+        amount=847, roundUp=50  →  ceiling=850,  remanent=3
     """
-    return parse_all(transactions)
+    try:
+        check_round_up(roundUp)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return parse_all(transactions, roundUp)
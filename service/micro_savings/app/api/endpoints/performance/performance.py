@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
 
 from service.tests.micro_savings.performance_utils import get_performance_metrics
 
@@ -6,15 +8,74 @@ router = APIRouter()
 
 
 @router.get("/performance")
-def performance():
+def performance(
+    request: Request,
+    window: Optional[float] = Query(
+        None, gt=0, description="Seconds of sampled history to include"
+    ),
+):
     """
     System health check — returns live server metrics.
 
-    No input required.
+    No input required.  ?window=<seconds> adds the runtime sampler's history.
 
     Returns:
         time    → uptime since server started  (HH:MM:SS.mmm)
         memory  → current RAM usage            (e.g. "25.11 MB")
         threads → number of active threads     (int)
+        admission → in-flight cost, queue depth and rejection counters
+                    (when admission control is enabled)
+        logging   → access records logged / sampled out, mean and max time
+                    spent emitting one, and the queued writer's counters
+        jobs      → job worker pool: jobs by status, submitted / rejected /
+                    expired counters and mean run time (when jobs are enabled)
+        parallelFilter → worker processes, chunk size and the requests /
+                    chunks filtered in parallel (when enabled)
+        sharedCache → cross-worker cache geometry and entries, this worker's
+                    hits / misses / stale local copies / stores / evictions,
+                    and the same counters for every live worker (when enabled)
+        tracing   → sample rate, buffered traces, spans dropped over the
+                    per-trace cap and forced traces throttled (when enabled)
+        gc        → GC mode, thresholds, frozen objects, collections and pause
+                    times per generation since startup, and deferral counters
+        history   → with ?window=: per-interval samples (CPU %, RSS, threads,
+                    GC counts and pauses, event-loop lag, thread-pool use)
+                    and their peaks (when the runtime sampler is enabled)
     """
-    return get_performance_metrics()
+    metrics = get_performance_metrics()
+    admission = getattr(request.app.state, "admission", None)
+    if admission is not None:
+        metrics["admission"] = admission.stats()
+
+    access_log = getattr(request.app.state, "access_log", None)
+    log_sink = getattr(request.app.state, "log_sink", None)
+    if access_log is not None or log_sink is not None:
+        metrics["logging"] = {
+            "access": access_log.stats() if access_log is not None else None,
+            "writer": log_sink.stats() if log_sink is not None else None,
+        }
+
+    jobs = getattr(request.app.state, "jobs", None)
+    if jobs is not None:
+        metrics["jobs"] = jobs.stats()
+
+    parallel = getattr(request.app.state, "parallel_filter", None)
+    if parallel is not None:
+        metrics["parallelFilter"] = parallel.stats()
+
+    shared_cache = getattr(request.app.state, "shared_cache", None)
+    if shared_cache is not None:
+        metrics["sharedCache"] = shared_cache.stats()
+
+    tracer = getattr(request.app.state, "tracer", None)
+    if tracer is not None:
+        metrics["tracing"] = tracer.stats()
+
+    gc_tuner = getattr(request.app.state, "gc_tuner", None)
+    if gc_tuner is not None:
+        metrics["gc"] = gc_tuner.stats()
+
+    sampler = getattr(request.app.state, "runtime_sampler", None)
+    if window is not None and sampler is not None:
+        metrics["history"] = sampler.history(window)
+    return metrics
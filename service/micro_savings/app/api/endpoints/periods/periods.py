@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from service.micro_savings.app.api.dependencies import get_period_registry
+from service.micro_savings.app.models.periods import PeriodSet, RegisteredPeriodSet
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+    PeriodSetTooLarge,
+)
+
+router = APIRouter()
+
+
+@router.post("/periods", response_model=RegisteredPeriodSet, status_code=201)
+def register_periods(
+    period_set: PeriodSet,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
+    """
+    Register a Q / P / K period set once and reference it by ID.
+
+    The set is validated (every start must be <= its end), compiled into
+    segment lookups and cached in memory.  Filter and returns requests can
+    then send {"periodSetId": id} instead of inline q / p / k lists.
+
+    The ID is derived from the content, so registering the same periods
+    again returns the same ID.  Least-recently-used sets are evicted once
+    the cache is full — a 404 on use means: register again.  With several
+    server workers and the shared cache on, the ID resolves on every worker;
+    a set too large for a shared slot (SHARED_CACHE_SLOT_SIZE) → 413.
+    """
+    try:
+        set_id = registry.register(period_set)
+    except PeriodSetTooLarge as exc:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Period set is {exc.size} bytes serialized; the shared cache "
+            f"holds sets of at most {exc.limit} bytes. Send the periods inline.",
+        )
+    return RegisteredPeriodSet(
+        id=set_id, q=len(period_set.q), p=len(period_set.p), k=len(period_set.k)
+    )
+
+
+@router.get("/periods/{period_set_id}", response_model=PeriodSet)
+def get_periods(
+    period_set_id: str,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
+    """Return the periods registered under an ID."""
+    try:
+        return registry.get(period_set_id)[0]
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Period set '{period_set_id}' is not registered."
+        )
+
+
+@router.delete("/periods/{period_set_id}", status_code=204)
+def delete_periods(
+    period_set_id: str,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
+    """
+    Drop a registered period set.
+
+    IDs are content hashes, so every client that registered the same
+    periods holds this ID; with the shared cache on, removal applies to
+    every worker on the host.  Only delete sets no one else may be using.
+    """
+    try:
+        registry.remove(period_set_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Period set '{period_set_id}' is not registered."
+        )
+    return Response(status_code=204)
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from service.micro_savings.app.api.middleware.profiling import ProfileStore
+
+router = APIRouter()
+
+
+def _store(request: Request) -> ProfileStore:
+    store = getattr(request.app.state, "profile_store", None)
+    if store is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Profiling is disabled. Set PROFILING_ENABLED=true to enable it.",
+        )
+    return store
+
+
+@router.get("/profiles")
+def list_profiles(request: Request):
+    """
+    Recent request profiles, newest first.
+
+    Profile any request by sending the header "X-Profile: 1" or the query
+    flag "?profile=true" (requires PROFILING_ENABLED).  The response carries
+    an X-Profile-Id header pointing at its report.
+    """
+    return _store(request).list()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, request: Request):
+    """
+    Full profile report for one request.
+
+    Returns:
+        wallMs / cpuMs        → wall-clock and process CPU time
+        peakTracedBytes       → peak traced allocation during the request
+        allocatedBlocksDelta  → net memory blocks still allocated afterwards
+        hotFunctions          → top functions by self time, tagged by layer
+        selfMsByLayer         → self time per layer (engine, serialization, ...)
+    """
+    try:
+        return _store(request).get(profile_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Profile '{profile_id}' not found."
+        )
@@ -1,69 +1,149 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
 
+from service.micro_savings.app.api.dependencies import (
+    admit_compute,
+    get_period_registry,
+    resolve_periods,
+    resolve_transactions,
+)
+from service.micro_savings.app.api.negotiation import MsgPackRoute, negotiate
 from service.micro_savings.app.models.returns import ReturnResponse, ReturnRequest
 from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
     compute_nps_returns,
     compute_index_returns,
 )
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
 
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute)
 
 
-@router.post("/returns:nps", response_model=ReturnResponse)
-def nps_returns(request: ReturnRequest):
+@router.post(
+    "/returns:nps",
+    response_model=ReturnResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(admit_compute)],
+)
+def nps_returns(
+    request: ReturnRequest,
+    http_request: Request,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
     """
     Calculate retirement corpus via NPS (National Pension Scheme).
 
     Full pipeline (no pre-processing required from the caller):
         parse → validate → Q/P/K rules → compound interest → inflation adjustment
 
+    Periods: inline q / p / k lists, or {"periodSetId": id} from POST /periods
+    roundUp: ceiling granularity in rupees — 10, 50, 100 (default) or 500
+    Transactions: inline list, or {"userId": id} to read only the user's stored
+                  transactions inside the K windows
+
     Rate of return : 7.11% annually
     Investment horizon : max(60 - age, 5) years
 
     NPS tax benefit (Section 80CCD):
         deduction  = min(invested, 10% of annual_wage, ₹2,00,000)
         taxBenefit = tax(annual_wage) − tax(annual_wage − deduction)
+    taxTable: regime / fiscal year from GET /tax/tables (default "new-2023-24")
+    compareTaxTables: more tables; each window then also carries
+                      taxBenefits {table: benefit} for taxTable and these
+
+    timeWeighted=true:
+        each remanent compounds from its own transaction date; retirement
+        is anchored max(60 - age, 5) years after the latest transaction
 
     Per K period output:
         amount     → total remanent (savings) within this window
         profit     → inflation-adjusted profit at retirement (real_fv - principal)
-        taxBenefit → INR saved in taxes via NPS deduction
+        taxBenefit  → INR saved in taxes via NPS deduction
+        taxBenefits → per-table benefits, only when compareTaxTables is given
+
+    MessagePack:
+        Content-Type: application/msgpack → the same body, with each
+            transaction as [timestamp, amount] (seconds since 1970-01-01)
+        Accept: application/msgpack → the response in MessagePack, window
+            start / end as timestamps
     """
-    return compute_nps_returns(
-        transactions=request.transactions,
-        k_periods=request.k,
+    periods = resolve_periods(
+        registry, request.periodSetId, request.q, request.p, request.k
+    )
+    transactions = resolve_transactions(
+        http_request, request.userId, request.transactions, periods
+    )
+    result = compute_nps_returns(
+        transactions=transactions,
+        k_periods=list(periods.k_periods),
         q_periods=request.q,
         p_periods=request.p,
         age=request.age,
         wage=request.wage,
         inflation=request.inflation,
+        time_weighted=request.timeWeighted,
+        periods=periods,
+        round_up=request.roundUp,
+        tax_table=request.taxTable,
+        compare_tax_tables=request.compareTaxTables,
     )
+    return negotiate(http_request, result, exclude_none=True)
 
 
-@router.post("/returns:index", response_model=ReturnResponse)
-def index_returns(request: ReturnRequest):
+@router.post(
+    "/returns:index",
+    response_model=ReturnResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(admit_compute)],
+)
+def index_returns(
+    request: ReturnRequest,
+    http_request: Request,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
     """
     Calculate retirement corpus via Index Fund (e.g. NIFTY 50).
 
     Full pipeline (no pre-processing required from the caller):
         parse → validate → Q/P/K rules → compound interest → inflation adjustment
 
+    Periods: inline q / p / k lists, or {"periodSetId": id} from POST /periods
+    roundUp: ceiling granularity in rupees — 10, 50, 100 (default) or 500
+    Transactions: inline list, or {"userId": id} to read only the user's stored
+                  transactions inside the K windows
+
     Rate of return : 14.49% annually
     Investment horizon : max(60 - age, 5) years
 
     No tax benefit for index fund investments.
 
+    timeWeighted=true:
+        each remanent compounds from its own transaction date; retirement
+        is anchored max(60 - age, 5) years after the latest transaction
+
     Per K period output:
         amount     → total remanent (savings) within this window
         profit     → inflation-adjusted profit at retirement (real_fv - principal)
         taxBenefit → always 0.0
+
+    MessagePack bodies and responses: see POST /returns:nps.
     """
-    return compute_index_returns(
-        transactions=request.transactions,
-        k_periods=request.k,
+    periods = resolve_periods(
+        registry, request.periodSetId, request.q, request.p, request.k
+    )
+    transactions = resolve_transactions(
+        http_request, request.userId, request.transactions, periods
+    )
+    result = compute_index_returns(
+        transactions=transactions,
+        k_periods=list(periods.k_periods),
         q_periods=request.q,
         p_periods=request.p,
         age=request.age,
         wage=request.wage,
         inflation=request.inflation,
+        time_weighted=request.timeWeighted,
+        periods=periods,
+        round_up=request.roundUp,
     )
+    return negotiate(http_request, result, exclude_none=True)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+
+from service.micro_savings.app.api.dependencies import (
+    admit_compute,
+    get_period_registry,
+    resolve_periods,
+)
+from service.micro_savings.app.models.roundup import RoundUpRequest, RoundUpResponse
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+from service.micro_savings.app.transaction_engine.roundup_processor.roundup_service import (
+    compare_round_ups,
+)
+from service.micro_savings.app.utils.tracing import span
+
+router = APIRouter()
+
+
+@router.post(
+    "/transactions:roundups",
+    response_model=RoundUpResponse,
+    dependencies=[Depends(admit_compute)],
+)
+def round_up_options(
+    request: RoundUpRequest,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
+    """
+    Compare round-up granularities (₹10, ₹50, ₹100, ₹500) in one call.
+
+    Each transaction is validated and matched against Q / P / K once; only
+    the ceiling and remanent are recomputed per granularity.  Use the
+    "roundUp" field of the filter and returns requests to run the full
+    pipeline at the chosen granularity.
+
+    Periods: inline q / p / k lists, or {"periodSetId": id} from POST /periods
+
+    Per option output:
+        roundUp        → granularity in rupees
+        totalCeiling   → sum of amounts rounded up to that granularity
+        savingsByDates → total remanent per K window
+    """
+    periods = resolve_periods(
+        registry, request.periodSetId, request.q, request.p, request.k
+    )
+    with span("roundup.compare", options=len(request.roundUps)):
+        return compare_round_ups(request.transactions, periods, request.roundUps)
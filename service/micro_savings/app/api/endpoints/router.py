@@ -4,15 +4,35 @@ from service.micro_savings.app.api.endpoints import (
     monitoring,
     parse,
     filter,
+    jobs,
+    memory,
+    periods,
     returns,
+    roundup,
+    store,
+    tax,
     performance,
+    profiling,
+    tracing,
+    upload,
     validation,
+    whatif,
 )
 
 router = APIRouter()
 router.include_router(monitoring.router, tags=["monitoring"])
 router.include_router(parse.router, tags=["parse"])
 router.include_router(filter.router, tags=["filter"])
+router.include_router(periods.router, tags=["periods"])
 router.include_router(returns.router, tags=["returns"])
+router.include_router(jobs.router, tags=["jobs"])
+router.include_router(upload.router, tags=["upload"])
+router.include_router(roundup.router, tags=["roundup"])
+router.include_router(store.router, tags=["store"])
+router.include_router(tax.router, tags=["tax"])
 router.include_router(performance.router, tags=["performance"])
+router.include_router(memory.router, tags=["memory"])
+router.include_router(profiling.router, tags=["profiling"])
+router.include_router(tracing.router, tags=["tracing"])
 router.include_router(validation.router, tags=["validation"])
+router.include_router(whatif.router, tags=["whatif"])
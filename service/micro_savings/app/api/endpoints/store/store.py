@@ -0,0 +1,72 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from service.micro_savings.app.api.dependencies import get_transaction_store
+from service.micro_savings.app.models.store import StoredTransactions
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.store_processor.store_service import (
+    TransactionStore,
+)
+from service.micro_savings.app.utils.date_utils import to_epoch
+
+router = APIRouter()
+
+
+@router.post(
+    "/users/{user_id}/transactions",
+    response_model=StoredTransactions,
+    status_code=201,
+)
+def store_transactions(
+    user_id: str,
+    transactions: List[RawTransaction],
+    store: TransactionStore = Depends(get_transaction_store),
+):
+    """
+    Append transactions to a user's stored history.
+
+    Rows are written in batches.  A transaction whose timestamp is already
+    stored for the user is kept as a duplicate, so a {"userId": id} body is
+    handled like the same transactions inline: filter rejects every copy,
+    returns keep the first.  Only the K windows are read back.
+    """
+    inserted = store.add(user_id, transactions)
+    return StoredTransactions(
+        userId=user_id,
+        inserted=inserted,
+        duplicates=len(transactions) - inserted,
+        total=store.count(user_id),
+    )
+
+
+@router.get("/users/{user_id}/transactions", response_model=List[RawTransaction])
+def list_transactions(
+    user_id: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    store: TransactionStore = Depends(get_transaction_store),
+):
+    """
+    A user's stored transactions, oldest first.
+
+    ?start= / ?end= ("YYYY-MM-DD HH:MM:SS", inclusive) limit the range.
+    """
+    try:
+        lo = to_epoch(start) if start is not None else None
+        hi = to_epoch(end) if end is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail="start / end must be in format YYYY-MM-DD HH:MM:SS"
+        )
+    return store.scan(user_id, lo, hi)
+
+
+@router.delete("/users/{user_id}/transactions", status_code=204)
+def delete_transactions(
+    user_id: str,
+    store: TransactionStore = Depends(get_transaction_store),
+):
+    """Drop a user's stored transactions."""
+    store.delete(user_id)
+    return Response(status_code=204)
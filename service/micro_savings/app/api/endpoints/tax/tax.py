@@ -0,0 +1,77 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from service.micro_savings.app.api.dependencies import admit_compute
+from service.micro_savings.app.models.tax import (
+    InvestorTaxBenefits,
+    TaxBenefitRequest,
+    TaxBenefitResponse,
+    TaxSlab,
+    TaxTableInfo,
+)
+from service.micro_savings.app.transaction_engine.tax_processor.tax_service import (
+    TAX_TABLES,
+    nps_tax_benefits,
+)
+from service.micro_savings.app.utils.tracing import span
+
+router = APIRouter()
+
+
+@router.get("/tax/tables", response_model=List[TaxTableInfo])
+def list_tax_tables():
+    """
+    Every tax table a request can select via "taxTable" / "taxTables".
+
+    Names are "<regime>-<fiscal year>", e.g. "new-2023-24" (the default)
+    or "old-2024-25".
+    """
+    return [
+        TaxTableInfo(
+            name=table.name,
+            regime=table.regime,
+            fiscalYear=table.fiscal_year,
+            rebateLimit=table.rebate_limit,
+            npsWageFraction=table.nps_wage_fraction,
+            npsCap=table.nps_cap,
+            slabs=[
+                TaxSlab(upTo=None if limit == float("inf") else limit, rate=rate)
+                for limit, rate in table.slabs()
+            ],
+        )
+        for table in TAX_TABLES.values()
+    ]
+
+
+@router.post(
+    "/tax:benefits",
+    response_model=TaxBenefitResponse,
+    dependencies=[Depends(admit_compute)],
+)
+def tax_benefits(request: TaxBenefitRequest):
+    """
+    NPS tax benefit for many investors under several regimes in one call.
+
+    Input:  {"investors": [{"invested": …, "wage": monthly}], "taxTables": [...]}
+            taxTables defaults to every registered table
+
+    Per investor output:
+        benefits     → {table: INR saved via the 80CCD(1B) deduction}
+        bestTaxTable → the table with the largest benefit
+    """
+    names = request.taxTables or list(TAX_TABLES)
+    with span("tax.benefits", investors=len(request.investors), taxTables=len(names)):
+        benefits = nps_tax_benefits(
+            [investor.invested for investor in request.investors],
+            [investor.wage for investor in request.investors],
+            [TAX_TABLES[name] for name in names],
+        )
+
+    investors = []
+    for i in range(len(request.investors)):
+        row = {name: benefits[name][i] for name in names}
+        investors.append(
+            InvestorTaxBenefits(benefits=row, bestTaxTable=max(names, key=row.get))
+        )
+    return TaxBenefitResponse(taxTables=names, investors=investors)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from service.micro_savings.app.utils.tracing import Tracer
+
+router = APIRouter()
+
+
+def _tracer(request: Request) -> Tracer:
+    tracer = getattr(request.app.state, "tracer", None)
+    if tracer is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Tracing is disabled. Set TRACING_ENABLED=true to enable it.",
+        )
+    return tracer
+
+
+@router.get("/traces")
+def list_traces(request: Request, limit: int = Query(50, ge=1, le=1000)):
+    """
+    Most recent sampled traces, newest first.
+
+    A request is traced when its W3C "traceparent" header carries the
+    sampled flag, or otherwise with probability TRACING_SAMPLE_RATE.
+    Traced responses echo a "traceparent" header naming their trace.
+    """
+    return _tracer(request).recent(limit)
+
+
+@router.get("/traces/{trace_id}")
+def get_trace(trace_id: str, request: Request):
+    """
+    Every span recorded for one trace.
+
+    Each span has spanId / parentId, name, startUnixMs, durationMs and
+    attributes.  Typical names: http.request (root), http.read_body,
+    periods.resolve, qpk.validate, qpk.rules, returns.filter,
+    returns.aggregate, http.serialize, http.write.
+    """
+    try:
+        return _tracer(request).get_trace(trace_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Trace '{trace_id}' not found.")
@@ -0,0 +1,193 @@
+from typing import List
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
+
+from service.micro_savings.app.api.dependencies import (
+    admit_compute,
+    get_period_registry,
+    resolve_periods,
+)
+from service.micro_savings.app.api.uploads import read_csv_upload
+from service.micro_savings.app.models.filter import FilterRequest
+from service.micro_savings.app.models.returns import ReturnRequest, ReturnResponse
+from service.micro_savings.app.models.roundup import check_round_up
+from service.micro_savings.app.models.transaction import (
+    FilterResult,
+    ParsedTransaction,
+)
+from service.micro_savings.app.transaction_engine.ceiling_processor.ceiling_service import (
+    parse_all,
+)
+from service.micro_savings.app.transaction_engine.csv_processor.csv_service import (
+    CsvTransactionReader,
+)
+from service.micro_savings.app.transaction_engine.filter_processor.qpk_service import (
+    apply_qpk_compiled,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
+    compute_index_returns,
+    compute_nps_returns,
+)
+from service.micro_savings.app.utils.money import DEFAULT_ROUND_UP
+
+router = APIRouter()
+
+_PARSED = TypeAdapter(List[ParsedTransaction])
+
+
+def _json(body: bytes) -> Response:
+    return Response(body, media_type="application/json")
+
+
+@router.post(
+    "/csv/transactions:parse",
+    response_model=List[ParsedTransaction],
+    dependencies=[Depends(admit_compute)],
+)
+async def parse_csv(http_request: Request, roundUp: int = DEFAULT_ROUND_UP):
+    """
+    /transactions:parse for a CSV upload.
+
+    Body: text/csv, or multipart/form-data with a CSV part named
+    "transactions".  The CSV needs a header naming date and amount
+    columns; other columns are ignored.
+
+        date,amount
+        2023-02-28 15:49:20,375
+
+    Rows are parsed and enriched chunk by chunk while the upload is still
+    arriving.  A malformed row → 422 with its line number.
+    """
+    try:
+        check_round_up(roundUp)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    reader = CsvTransactionReader()
+    parsed: List[ParsedTransaction] = []
+
+    def parse_new_rows() -> None:
+        parsed.extend(parse_all(reader.transactions, roundUp))
+        reader.transactions.clear()
+
+    await read_csv_upload(http_request, reader, on_rows=parse_new_rows)
+    return _json(await to_thread.run_sync(_PARSED.dump_json, parsed))
+
+
+@router.post(
+    "/csv/transactions:filter",
+    response_model=FilterResult,
+    dependencies=[Depends(admit_compute)],
+)
+async def filter_csv(
+    http_request: Request,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
+    """
+    /transactions:filter for a CSV upload.
+
+    Body: multipart/form-data with two parts, in this order —
+        "request"       → JSON: the /transactions:filter body without
+                          transactions (wage, q / p / k or periodSetId,
+                          roundUp, lenient)
+        "transactions"  → CSV with date and amount columns
+
+    Rows are converted as they arrive; the rules run once the upload is
+    complete (the duplicate check spans the whole batch).  With
+    "lenient": true, malformed rows are reported first in invalid.
+    """
+    reader = CsvTransactionReader()
+    request = await read_csv_upload(http_request, reader, FilterRequest)
+
+    def run() -> bytes:
+        periods = resolve_periods(
+            registry, request.periodSetId, request.q, request.p, request.k
+        )
+        parallel = getattr(http_request.app.state, "parallel_filter", None)
+        if parallel is not None and parallel.accepts(len(reader.transactions)):
+            return parallel.filter_json(
+                reader.transactions, periods, request.roundUp, reader.rejected
+            )
+        valid, invalid = apply_qpk_compiled(
+            reader.transactions, periods, request.roundUp
+        )
+        result = FilterResult(valid=valid, invalid=reader.rejected + invalid)
+        return result.model_dump_json().encode()
+
+    return _json(await to_thread.run_sync(run))
+
+
+async def _returns_csv(
+    scheme: str, http_request: Request, registry: PeriodRegistry
+) -> Response:
+    reader = CsvTransactionReader()
+    request = await read_csv_upload(http_request, reader, ReturnRequest)
+
+    def run() -> bytes:
+        periods = resolve_periods(
+            registry, request.periodSetId, request.q, request.p, request.k
+        )
+        compute = compute_nps_returns if scheme == "nps" else compute_index_returns
+        extra = (
+            {
+                "tax_table": request.taxTable,
+                "compare_tax_tables": request.compareTaxTables,
+            }
+            if scheme == "nps"
+            else {}
+        )
+        result = compute(
+            transactions=reader.transactions,
+            k_periods=list(periods.k_periods),
+            q_periods=request.q,
+            p_periods=request.p,
+            age=request.age,
+            wage=request.wage,
+            inflation=request.inflation,
+            time_weighted=request.timeWeighted,
+            periods=periods,
+            round_up=request.roundUp,
+            **extra,
+        )
+        return result.model_dump_json(exclude_none=True).encode()
+
+    return _json(await to_thread.run_sync(run))
+
+
+@router.post(
+    "/csv/returns:nps",
+    response_model=ReturnResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(admit_compute)],
+)
+async def nps_returns_csv(
+    http_request: Request,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
+    """
+    /returns:nps for a CSV upload.
+
+    Body: multipart/form-data with a JSON part "request" (the /returns:nps
+    body without transactions), then a CSV part "transactions" with date
+    and amount columns.  Rows are converted as they arrive.
+    """
+    return await _returns_csv("nps", http_request, registry)
+
+
+@router.post(
+    "/csv/returns:index",
+    response_model=ReturnResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(admit_compute)],
+)
+async def index_returns_csv(
+    http_request: Request,
+    registry: PeriodRegistry = Depends(get_period_registry),
+):
+    """/returns:index for a CSV upload; see POST /csv/returns:nps."""
+    return await _returns_csv("index", http_request, registry)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from service.micro_savings.app.api.dependencies import admit_compute
 
 from service.micro_savings.app.models.transaction import (
     ValidationResult,
@@ -11,7 +13,11 @@ from service.micro_savings.app.transaction_engine.validation_processor.validatio
 router = APIRouter()
 
 
-@router.post("/transactions:validator", response_model=ValidationResult)
+@router.post(
+    "/transactions:validator",
+    response_model=ValidationResult,
+    dependencies=[Depends(admit_compute)],
+)
 def validate(request: ValidatorRequest):
     """
     Step 2 — Remove bad transactions before they enter the savings calculation.
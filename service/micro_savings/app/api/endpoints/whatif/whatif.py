@@ -0,0 +1,170 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from service.micro_savings.app.api.dependencies import (
+    admit_compute,
+    get_baseline_registry,
+    get_period_registry,
+    registered_periods,
+    resolve_periods,
+    resolve_transactions,
+)
+from service.micro_savings.app.models.whatif import (
+    WhatIfBaseline,
+    WhatIfBaselineRequest,
+    WhatIfRequest,
+    WhatIfResponse,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+from service.micro_savings.app.transaction_engine.whatif_processor.whatif_service import (
+    BaselineRegistry,
+    ReturnsBaseline,
+)
+from service.micro_savings.app.utils.tracing import span
+
+router = APIRouter()
+
+
+def _get_baseline(registry: BaselineRegistry, baseline_id: str) -> ReturnsBaseline:
+    try:
+        return registry.get(baseline_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"What-if baseline '{baseline_id}' is not registered.",
+        )
+
+
+@router.post(
+    "/whatif/baselines",
+    response_model=WhatIfBaseline,
+    response_model_exclude_none=True,
+    status_code=201,
+    dependencies=[Depends(admit_compute)],
+)
+def create_baseline(
+    request: WhatIfBaselineRequest,
+    http_request: Request,
+    periods_registry: PeriodRegistry = Depends(get_period_registry),
+    registry: BaselineRegistry = Depends(get_baseline_registry),
+):
+    """
+    Compute a returns:nps / returns:index result and keep it for what-ifs.
+
+    The body is a returns request plus "scheme": "nps" | "index".  The
+    response carries the baseline ID and the same result the returns
+    endpoint would give.
+    """
+    # One lookup: a set evicted between two would otherwise escape as a 500
+    if request.periodSetId is not None:
+        period_set, periods = registered_periods(periods_registry, request.periodSetId)
+        q, p = period_set.q, period_set.p
+    else:
+        periods = resolve_periods(
+            periods_registry, None, request.q, request.p, request.k
+        )
+        q, p = request.q, request.p
+    transactions = resolve_transactions(
+        http_request, request.userId, request.transactions, periods
+    )
+
+    with span("whatif.baseline", transactions=len(transactions)):
+        baseline = ReturnsBaseline(
+            transactions,
+            q,
+            p,
+            periods.k_periods,
+            age=request.age,
+            wage=request.wage,
+            inflation=request.inflation,
+            scheme=request.scheme,
+            time_weighted=request.timeWeighted,
+            round_up=request.roundUp,
+            tax_table=request.taxTable,
+            compare_tax_tables=request.compareTaxTables,
+        )
+    return WhatIfBaseline(
+        id=registry.add(baseline),
+        transactions=len(baseline.timestamps),
+        result=baseline.result(),
+    )
+
+
+@router.get(
+    "/whatif/baselines/{baseline_id}",
+    response_model=WhatIfBaseline,
+    response_model_exclude_none=True,
+)
+def get_baseline(
+    baseline_id: str,
+    registry: BaselineRegistry = Depends(get_baseline_registry),
+):
+    """The current result of a baseline (including committed edits)."""
+    baseline = _get_baseline(registry, baseline_id)
+    return WhatIfBaseline(
+        id=baseline_id,
+        transactions=len(baseline.timestamps),
+        result=baseline.result(),
+    )
+
+
+@router.post(
+    "/whatif/baselines/{baseline_id}/edits",
+    response_model=WhatIfResponse,
+    response_model_exclude_none=True,
+)
+def what_if(
+    baseline_id: str,
+    request: WhatIfRequest,
+    registry: BaselineRegistry = Depends(get_baseline_registry),
+):
+    """
+    Re-evaluate a baseline with one Q or P period changed.
+
+    Edit:
+        {"q": {"index": i, "period": {...}}}  → replace Q period i
+        {"q": {"period": {...}}}              → add a Q period
+        {"q": {"index": i}}                   → remove Q period i
+        (same shapes under "p")
+
+    Only transactions between the old and new bounds of the edited period
+    are recomputed; their remanent deltas are applied to the K totals and
+    the projections rebuilt.  "commit": true keeps the edit as the new
+    baseline so edits can be chained.
+
+    Output:
+        affectedTransactions → transactions re-evaluated
+        result               → the returns result with the edit applied
+    """
+    baseline = _get_baseline(registry, baseline_id)
+    kind, edit = ("q", request.q) if request.q is not None else ("p", request.p)
+    try:
+        with span("whatif.edit", kind=kind):
+            result, affected = baseline.what_if(
+                kind, edit.index, edit.period, commit=request.commit
+            )
+    except IndexError:
+        raise HTTPException(
+            status_code=422,
+            detail=f"The baseline has no {kind.upper()} period at index {edit.index}.",
+        )
+    return WhatIfResponse(
+        affectedTransactions=affected, committed=request.commit, result=result
+    )
+
+
+@router.delete("/whatif/baselines/{baseline_id}", status_code=204)
+def delete_baseline(
+    baseline_id: str,
+    registry: BaselineRegistry = Depends(get_baseline_registry),
+):
+    """Drop a baseline."""
+    try:
+        registry.remove(baseline_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"What-if baseline '{baseline_id}' is not registered.",
+        )
+    return Response(status_code=204)
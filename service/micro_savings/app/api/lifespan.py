@@ -1,8 +1,41 @@
+import asyncio
+import tracemalloc
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from loguru import logger
 
+from service.micro_savings.app.api.admission import AdmissionController
+from service.micro_savings.app.api.middleware.access_log import AccessLogStats
+from service.micro_savings.app.api.middleware.memory import (
+    MemoryStats,
+    SnapshotStore,
+)
+from service.micro_savings.app.api.middleware.profiling import ProfileStore
+from service.micro_savings.app.api.warmup import WarmUp
+from service.micro_savings.app.transaction_engine.filter_processor.parallel_service import (
+    ParallelFilter,
+)
+from service.micro_savings.app.transaction_engine.job_processor.job_service import (
+    JobManager,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+from service.micro_savings.app.transaction_engine.store_processor.store_service import (
+    TransactionStore,
+)
+from service.micro_savings.app.transaction_engine.whatif_processor.whatif_service import (
+    BaselineRegistry,
+)
+from service.micro_savings.app.utils.runtime import GCTuner, RuntimeSampler
+from service.micro_savings.app.utils.settings import settings
+from service.micro_savings.app.utils.shared_cache import (
+    SharedCache,
+    default_cache_path,
+)
+from service.micro_savings.app.utils.tracing import Tracer
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -37,8 +70,147 @@ async def lifespan(app: FastAPI):
 
     logger.info("Starting lifespan")
 
-    app.state.db_connection = None
+    app.state.db_connection = (
+        TransactionStore(
+            settings.STORE_PATH,
+            pool_size=settings.STORE_POOL_SIZE,
+            batch_size=settings.STORE_BATCH_SIZE,
+        )
+        if settings.STORE_ENABLED
+        else None
+    )
+    shared_enabled = settings.SHARED_CACHE_ENABLED
+    if shared_enabled is None:
+        shared_enabled = settings.workers > 1
+    app.state.shared_cache = (
+        SharedCache(
+            settings.SHARED_CACHE_PATH or default_cache_path(settings.port),
+            slots=settings.SHARED_CACHE_SLOTS,
+            slot_size=settings.SHARED_CACHE_SLOT_SIZE,
+            ways=settings.SHARED_CACHE_WAYS,
+        )
+        if shared_enabled
+        else None
+    )
+    app.state.period_registry = PeriodRegistry(
+        max_size=settings.PERIOD_SET_CACHE_SIZE, shared=app.state.shared_cache
+    )
+    app.state.whatif_baselines = BaselineRegistry(
+        max_size=settings.WHATIF_BASELINE_CACHE_SIZE
+    )
+    jobs_enabled = settings.JOBS_ENABLED
+    if jobs_enabled is None:
+        jobs_enabled = settings.workers == 1
+    elif jobs_enabled and settings.workers > 1:
+        logger.warning(
+            "Jobs are kept per worker: with {} workers, polls for a job reach "
+            "the worker that accepted it only by chance",
+            settings.workers,
+        )
+    app.state.jobs = (
+        JobManager(
+            workers=settings.JOB_WORKERS,
+            max_queued=settings.JOB_MAX_QUEUED,
+            ttl=settings.JOB_RESULT_TTL,
+            max_finished=settings.JOB_MAX_FINISHED,
+        )
+        if jobs_enabled
+        else None
+    )
+    app.state.parallel_filter = None
+    if settings.FILTER_PARALLEL_WORKERS > 0:
+        app.state.parallel_filter = ParallelFilter(
+            workers=settings.FILTER_PARALLEL_WORKERS,
+            chunk_size=settings.FILTER_PARALLEL_CHUNK_SIZE,
+            min_transactions=settings.FILTER_PARALLEL_MIN_TRANSACTIONS,
+        )
+        app.state.parallel_filter.start()
+    app.state.profile_store = (
+        ProfileStore(max_size=settings.PROFILING_HISTORY)
+        if settings.PROFILING_ENABLED
+        else None
+    )
+    app.state.admission = (
+        AdmissionController(
+            max_cost=settings.ADMISSION_MAX_COST,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+            max_retry_after=settings.ADMISSION_MAX_RETRY_AFTER,
+        )
+        if settings.ADMISSION_ENABLED
+        else None
+    )
+    app.state.access_log = AccessLogStats() if settings.ACCESS_LOG_ENABLED else None
+    app.state.memory_stats = None
+    app.state.memory_snapshots = None
+    started_tracemalloc = False
+    if settings.MEMORY_TRACKING_ENABLED:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+            started_tracemalloc = True
+        app.state.memory_stats = MemoryStats()
+        app.state.memory_snapshots = SnapshotStore(
+            max_size=settings.MEMORY_SNAPSHOT_HISTORY
+        )
+    app.state.tracer = (
+        Tracer(
+            sample_rate=settings.TRACING_SAMPLE_RATE,
+            buffer_size=settings.TRACING_BUFFER_SIZE,
+            export_path=settings.TRACING_EXPORT_PATH,
+            export_batch_size=settings.TRACING_EXPORT_BATCH_SIZE,
+            max_spans=settings.TRACING_MAX_SPANS,
+            forced_per_second=settings.TRACING_FORCED_PER_SECOND,
+        )
+        if settings.TRACING_ENABLED
+        else None
+    )
+    app.state.runtime_sampler = None
+    if settings.RUNTIME_SAMPLER_ENABLED:
+        app.state.runtime_sampler = RuntimeSampler(
+            interval=settings.RUNTIME_SAMPLE_INTERVAL,
+            capacity=settings.RUNTIME_SAMPLE_HISTORY,
+        )
+        app.state.runtime_sampler.start()
+
+    # Last, so everything created above is frozen as long-lived
+    app.state.gc_tuner = GCTuner(
+        mode=settings.GC_MODE,
+        thresholds=settings.GC_THRESHOLDS,
+        max_deferred=settings.GC_MAX_DEFERRED,
+    )
+    app.state.gc_tuner.apply()
+
+    # Served while it runs: /health stays live, /health/ready waits for it
+    app.state.warmup = None
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        app.state.warmup = WarmUp(
+            rounds=settings.WARMUP_ROUNDS, transactions=settings.WARMUP_TRANSACTIONS
+        )
+        warmup_task = asyncio.get_running_loop().create_task(app.state.warmup.run(app))
 
     yield
 
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    if app.state.jobs is not None:
+        app.state.jobs.shutdown()
+    if app.state.parallel_filter is not None:
+        app.state.parallel_filter.shutdown()
+    app.state.gc_tuner.restore()
+    if app.state.runtime_sampler is not None:
+        await app.state.runtime_sampler.stop()
+    if app.state.tracer is not None:
+        app.state.tracer.flush()
+    if app.state.db_connection is not None:
+        app.state.db_connection.close()
+    if app.state.shared_cache is not None:
+        app.state.shared_cache.close()
+    if started_tracemalloc:
+        tracemalloc.stop()
+
     logger.info("Ending lifespan")
+    log_sink = getattr(app.state, "log_sink", None)
+    if log_sink is not None:
+        log_sink.flush()
@@ -0,0 +1,272 @@
+import zlib
+from typing import Optional
+
+from anyio import to_thread
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# zlib window bits per content-coding: gzip container vs zlib-wrapped deflate
+_WBITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+# Already-compressed or incremental event streams are passed through untouched
+_EXCLUDED_CONTENT_TYPES = ("text/event-stream", "application/gzip", "image/")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response content-coding from an Accept-Encoding header.
+
+    Honours q-values (q=0 disables a coding) and prefers gzip over deflate
+    when both are equally acceptable.
+
+    Examples:
+        "gzip, deflate"          → "gzip"
+        "deflate;q=1, gzip;q=.5" → "deflate"
+        "gzip;q=0"               → None
+    """
+    best: Optional[str] = None
+    best_q = 0.0
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        candidates = _WBITS if coding == "*" else (coding,)
+        for candidate in candidates:
+            if candidate not in _WBITS or q <= 0:
+                continue
+            if q > best_q or (q == best_q and candidate == "gzip"):
+                best, best_q = candidate, q
+    return best
+
+
+async def _run(func, data: bytes, offload_size: int, *args) -> bytes:
+    """Run a (de)compression call inline, or in a worker thread for large inputs."""
+    if len(data) >= offload_size:
+        return await to_thread.run_sync(func, data, *args)
+    return func(data, *args)
+
+
+class _DecompressingReceive:
+    """
+    Wraps the ASGI ``receive`` callable and inflates request body chunks as
+    they arrive, so the compressed body is never buffered in full.
+
+    Raises HTTPException (re-raised as-is by FastAPI's body reader):
+        400 — malformed or truncated compressed stream
+        413 — decompressed body exceeds ``max_size`` (zip-bomb guard)
+    """
+
+    def __init__(
+        self, receive: Receive, encoding: str, max_size: int, offload_size: int
+    ) -> None:
+        self.receive = receive
+        self.encoding = encoding
+        self.max_size = max_size
+        self.offload_size = offload_size
+        self.decompressor = zlib.decompressobj(_WBITS[encoding])
+        self.total = 0
+
+    async def __call__(self) -> Message:
+        message = await self.receive()
+        if message["type"] != "http.request":
+            return message
+
+        chunk = message.get("body", b"")
+        remaining = self.max_size - self.total
+        try:
+            body = await _run(
+                self.decompressor.decompress, chunk, self.offload_size, remaining + 1
+            )
+            # Input left over means the output already reached remaining + 1
+            # bytes; flush() would inflate all of it without a bound
+            if self.decompressor.unconsumed_tail:
+                self._too_large()
+            if not message.get("more_body", False):
+                body += self.decompressor.flush()
+                if not self.decompressor.eof:
+                    raise zlib.error("unexpected end of compressed stream")
+        except zlib.error as exc:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Request body is not valid {self.encoding} data. Detail: {exc}",
+            )
+
+        self.total += len(body)
+        if self.total > self.max_size:
+            self._too_large()
+
+        return {**message, "body": body}
+
+    def _too_large(self) -> None:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Decompressed request body exceeds {self.max_size} bytes.",
+        )
+
+
+class _CompressingSend:
+    """
+    Wraps the ASGI ``send`` callable and compresses the response body.
+
+    Single-message responses below ``minimum_size`` are sent unchanged.
+    Streaming responses are compressed chunk by chunk with a sync flush, so
+    clients can decode each chunk as soon as it arrives.
+    """
+
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        level: int,
+        minimum_size: int,
+        offload_size: int,
+    ) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.started = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith(_EXCLUDED_CONTENT_TYPES)
+                or message["status"] in (204, 304)
+            )
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self._start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                await self._start()
+                await self.send(message)
+                self.passthrough = True
+                return
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+
+        if more_body:
+            body = await _run(self._compress_chunk, body, self.offload_size)
+        else:
+            body = await _run(self._compress_last, body, self.offload_size)
+            if not self.started:
+                headers["Content-Length"] = str(len(body))
+
+        await self._start()
+        await self.send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+
+    async def _start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self.send(self.start_message)
+
+    def _compress_chunk(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def _compress_last(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    Transparent gzip / deflate transport for bulk payloads.
+
+    Request side:
+        Bodies sent with ``Content-Encoding: gzip|deflate`` are inflated
+        incrementally while the endpoint reads them.  Unknown codings → 415.
+
+    Response side:
+        The coding is negotiated from ``Accept-Encoding``; bodies of at least
+        ``minimum_size`` bytes are compressed at the configured level.
+
+    Chunks of ``offload_size`` bytes or more are (de)compressed in a worker
+    thread so large bodies never block the event loop.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        deflate_level: int = 6,
+        offload_size: int = 256 * 1024,
+        max_body_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "deflate": deflate_level}
+        self.offload_size = offload_size
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+
+        content_encoding = headers.get("content-encoding", "identity").strip().lower()
+        if content_encoding in _WBITS:
+            scope = dict(scope)
+            scope["headers"] = [
+                (key, value)
+                for key, value in scope["headers"]
+                if key not in (b"content-encoding", b"content-length")
+            ]
+            receive = _DecompressingReceive(
+                receive, content_encoding, self.max_body_size, self.offload_size
+            )
+        elif content_encoding != "identity":
+            response = JSONResponse(
+                status_code=415,
+                content={
+                    "detail": f"Unsupported Content-Encoding '{content_encoding}'."
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        accept = negotiate_encoding(headers.get("accept-encoding", ""))
+        if accept is not None:
+            send = _CompressingSend(
+                send,
+                accept,
+                self.levels[accept],
+                self.minimum_size,
+                self.offload_size,
+            )
+
+        await self.app(scope, receive, send)
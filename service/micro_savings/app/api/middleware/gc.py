@@ -0,0 +1,31 @@
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from service.micro_savings.app.utils.runtime import GCTuner
+
+
+class GCDeferralMiddleware:
+    """
+    Holds automatic garbage collection off while requests are in flight.
+
+    Every HTTP request is bracketed by ``GCTuner.request_started`` and
+    ``request_finished``; the collection that becomes due runs after the
+    last in-flight response has been sent.  A no-op unless the app's
+    ``gc_tuner`` is in "deferred" mode.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tuner: Optional[GCTuner] = getattr(scope["app"].state, "gc_tuner", None)
+        if scope["type"] != "http" or tuner is None or not tuner.defer:
+            await self.app(scope, receive, send)
+            return
+
+        tuner.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            tuner.request_finished()
@@ -0,0 +1,214 @@
+import sys
+import threading
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Allocation sites inside these modules are noise in a snapshot diff
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+# Stats key for requests that matched no route
+UNMATCHED = "unmatched"
+
+
+class MemoryStats:
+    """
+    Per-endpoint allocation figures collected by ``MemoryAccountingMiddleware``.
+
+    For each ``"METHOD /route"`` it keeps the request count, the peak traced
+    allocation above the starting level (max and mean), the traced bytes
+    still held afterwards and the net change in allocated memory blocks.
+    A steadily positive ``retainedBytes`` mean across many requests points
+    at a leak.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, dict] = {}
+
+    def record(
+        self, endpoint: str, peak: int, retained: int, blocks: int, exclusive: bool
+    ) -> None:
+        with self._lock:
+            s = self._endpoints.setdefault(
+                endpoint,
+                {
+                    "requests": 0,
+                    "exclusiveRequests": 0,
+                    "peakBytesMax": 0,
+                    "peakBytesTotal": 0,
+                    "retainedBytesTotal": 0,
+                    "blocksDeltaTotal": 0,
+                    "lastPeakBytes": 0,
+                },
+            )
+            s["requests"] += 1
+            s["exclusiveRequests"] += exclusive
+            s["peakBytesMax"] = max(s["peakBytesMax"], peak)
+            s["peakBytesTotal"] += peak
+            s["retainedBytesTotal"] += retained
+            s["blocksDeltaTotal"] += blocks
+            s["lastPeakBytes"] = peak
+
+    def summary(self) -> dict:
+        with self._lock:
+            endpoints = {k: dict(v) for k, v in self._endpoints.items()}
+        return {
+            endpoint: {
+                "requests": s["requests"],
+                "exclusiveRequests": s["exclusiveRequests"],
+                "peakBytesMax": s["peakBytesMax"],
+                "peakBytesMean": round(s["peakBytesTotal"] / s["requests"]),
+                "lastPeakBytes": s["lastPeakBytes"],
+                "retainedBytesMean": round(s["retainedBytesTotal"] / s["requests"]),
+                "blocksDeltaMean": round(s["blocksDeltaTotal"] / s["requests"], 1),
+            }
+            for endpoint, s in sorted(endpoints.items())
+        }
+
+
+class SnapshotStore:
+    """The last ``max_size`` tracemalloc snapshots, keyed by ID."""
+
+    def __init__(self, max_size: int = 4) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[str, tuple[str, tracemalloc.Snapshot]]" = (
+            OrderedDict()
+        )
+
+    def take(self) -> dict:
+        """
+        Take a snapshot of every traced allocation.
+
+        Raises:
+            RuntimeError: if tracemalloc is not tracing
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        snapshot_id = uuid.uuid4().hex[:12]
+        taken_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        with self._lock:
+            self._snapshots[snapshot_id] = (taken_at, snapshot)
+            while len(self._snapshots) > self.max_size:
+                self._snapshots.popitem(last=False)
+        return {
+            "id": snapshot_id,
+            "takenAt": taken_at,
+            "tracedBytes": sum(stat.size for stat in snapshot.statistics("filename")),
+        }
+
+    def diff(
+        self,
+        from_id: str,
+        to_id: Optional[str] = None,
+        top_n: int = 20,
+        group_by: str = "lineno",
+    ) -> dict:
+        """
+        Top allocation sites by size growth between two snapshots, or between
+        ``from_id`` and a fresh snapshot when ``to_id`` is None.
+
+        Raises:
+            KeyError: if a snapshot ID is unknown or was evicted
+        """
+        with self._lock:
+            taken_from, old = self._snapshots[from_id]
+            if to_id is not None:
+                taken_to, new = self._snapshots[to_id]
+        if to_id is None:
+            taken_to = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+            new = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+        stats = new.compare_to(old, group_by)
+        return {
+            "from": {"id": from_id, "takenAt": taken_from},
+            "to": {"id": to_id, "takenAt": taken_to},
+            "sizeDiffBytes": sum(stat.size_diff for stat in stats),
+            "countDiff": sum(stat.count_diff for stat in stats),
+            "top": [
+                {
+                    "site": str(stat.traceback[0]) if stat.traceback else "?",
+                    "traceback": (
+                        [str(frame) for frame in stat.traceback]
+                        if group_by == "traceback"
+                        else None
+                    ),
+                    "sizeDiffBytes": stat.size_diff,
+                    "sizeBytes": stat.size,
+                    "countDiff": stat.count_diff,
+                    "count": stat.count,
+                }
+                for stat in stats[:top_n]
+            ],
+        }
+
+
+class MemoryAccountingMiddleware:
+    """
+    Records traced allocation for every request while tracemalloc is on.
+
+    Per request it measures, relative to the traced size when it started:
+
+        peak      → highest traced size reached during the request
+        retained  → traced bytes still held once the response is sent
+        blocks    → net change in allocated blocks (sys.getallocatedblocks)
+
+    tracemalloc only has one process-wide peak, so it is reset only when no
+    other measured request is in flight.  A request that overlapped others
+    is still recorded but not counted as exclusive: its peak is an upper
+    bound that may include their allocations.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._lock = threading.Lock()
+        self._active = 0
+        self._started = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        stats: Optional[MemoryStats] = getattr(scope["app"].state, "memory_stats", None)
+        if scope["type"] != "http" or stats is None or not tracemalloc.is_tracing():
+            await self.app(scope, receive, send)
+            return
+
+        with self._lock:
+            alone = self._active == 0
+            self._active += 1
+            self._started += 1
+            started_before = self._started
+            if alone:
+                tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        blocks_before = sys.getallocatedblocks()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            blocks = sys.getallocatedblocks() - blocks_before
+            with self._lock:
+                self._active -= 1
+                exclusive = alone and self._started == started_before
+
+            # Unmatched requests share one key, so random 404 paths (or
+            # methods) cannot grow the stats without bound
+            path = getattr(scope.get("route"), "path", None)
+            stats.record(
+                f"{scope['method']} {path}" if path else UNMATCHED,
+                peak=max(peak - baseline, 0),
+                retained=current - baseline,
+                blocks=blocks,
+                exclusive=exclusive,
+            )
@@ -0,0 +1,223 @@
+import asyncio
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "profile"
+
+# Ordered: first matching fragment decides the layer of a profiled function
+_LAYERS = (
+    ("transaction_engine", "engine"),
+    ("micro_savings/app/models", "models"),
+    ("pydantic", "serialization"),
+    ("fastapi/encoders", "serialization"),
+    ("fastapi/_compat", "serialization"),
+    ("json/", "serialization"),
+    ("micro_savings", "app"),
+    ("starlette", "framework"),
+    ("fastapi", "framework"),
+    ("anyio", "framework"),
+    ("uvicorn", "framework"),
+)
+
+
+def _layer(filename: str) -> str:
+    if filename == "~":
+        return "builtin"
+    path = filename.replace("\\", "/")
+    for fragment, layer in _LAYERS:
+        if fragment in path:
+            return layer
+    return "other"
+
+
+def summarize_stats(stats: pstats.Stats, top_n: int) -> dict:
+    """
+    Reduce raw profiler stats to the ``top_n`` functions by self time, each
+    tagged with its layer, plus self time totals per layer.
+    """
+    rows = []
+    by_layer: dict[str, float] = {}
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        layer = _layer(filename)
+        by_layer[layer] = by_layer.get(layer, 0.0) + tottime
+        rows.append((tottime, cumtime, ncalls, filename, line, name, layer))
+
+    rows.sort(reverse=True)
+    return {
+        "totalCalls": stats.total_calls,
+        "hotFunctions": [
+            {
+                "function": name,
+                "file": filename,
+                "line": line,
+                "layer": layer,
+                "calls": ncalls,
+                "selfMs": round(tottime * 1000, 3),
+                "cumulativeMs": round(cumtime * 1000, 3),
+            }
+            for tottime, cumtime, ncalls, filename, line, name, layer in rows[:top_n]
+        ],
+        "selfMsByLayer": {
+            layer: round(seconds * 1000, 3)
+            for layer, seconds in sorted(by_layer.items(), key=lambda kv: -kv[1])
+        },
+    }
+
+
+class ProfileStore:
+    """Bounded, newest-last store of profile reports keyed by ID."""
+
+    def __init__(self, max_size: int = 50) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._reports: "OrderedDict[str, dict]" = OrderedDict()
+
+    def add(self, report: dict) -> None:
+        with self._lock:
+            self._reports[report["id"]] = report
+            while len(self._reports) > self.max_size:
+                self._reports.popitem(last=False)
+
+    def get(self, profile_id: str) -> dict:
+        """Raises KeyError if the report is unknown or has been evicted."""
+        with self._lock:
+            return self._reports[profile_id]
+
+    def list(self) -> list[dict]:
+        """Report summaries, newest first (hot function lists omitted)."""
+        with self._lock:
+            reports = list(self._reports.values())
+        return [
+            {k: v for k, v in r.items() if k not in ("hotFunctions", "selfMsByLayer")}
+            for r in reversed(reports)
+        ]
+
+
+def wants_profile(scope: Scope) -> bool:
+    """True if the request opted in via ``X-Profile: 1`` or ``?profile=true``."""
+    header = Headers(scope=scope).get(PROFILE_HEADER, "")
+    if header.lower() in ("1", "true", "yes"):
+        return True
+    query = QueryParams(scope.get("query_string", b"")).get(PROFILE_QUERY, "")
+    return query.lower() in ("1", "true", "yes")
+
+
+class ProfilingMiddleware:
+    """
+    Runs opted-in requests under cProfile and tracemalloc.
+
+    Only installed when ``settings.PROFILING_ENABLED`` is set, so there is no
+    overhead at all otherwise.  A profiled request gets:
+
+        X-Profile-Id   → fetch the report from GET /profiles/{id}
+        Server-Timing  → wall and CPU time, readable by browser dev tools
+
+    The report holds wall time, process CPU time, traced allocation peak
+    and net allocated blocks, and the hottest functions tagged by layer
+    (engine, models, serialization, framework, ...).
+
+    On Python 3.12+ one profiler covers every thread, so the sync endpoint
+    running on the thread pool is included.  Only one profiler can be
+    active per process, so profiled requests are serialised; concurrent
+    unprofiled requests may still show up in a report.
+    """
+
+    def __init__(self, app: ASGIApp, top_n: int = 25) -> None:
+        self.app = app
+        self.top_n = top_n
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        store: Optional[ProfileStore] = getattr(
+            scope["app"].state, "profile_store", None
+        )
+        if store is None:
+            await self.app(scope, receive, send)
+            return
+
+        async with self._lock:
+            await self._profile(scope, receive, send, store)
+
+    async def _profile(
+        self, scope: Scope, receive: Receive, send: Send, store: ProfileStore
+    ) -> None:
+        profile_id = uuid.uuid4().hex[:16]
+        profiler = cProfile.Profile()
+        status = {"code": 0}
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        blocks_before = sys.getallocatedblocks()
+        started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        def timings() -> tuple[float, float]:
+            return (
+                (time.perf_counter() - wall_start) * 1000,
+                (time.process_time() - cpu_start) * 1000,
+            )
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                wall_ms, cpu_ms = timings()
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Id"] = profile_id
+                headers.append(
+                    "Server-Timing", f"app;dur={wall_ms:.1f}, cpu;dur={cpu_ms:.1f}"
+                )
+            await send(message)
+
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (debugger, coverage tool) owns the hook
+            if started_tracing:
+                tracemalloc.stop()
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            profiler.disable()
+            wall_ms, cpu_ms = timings()
+            peak = tracemalloc.get_traced_memory()[1] - traced_before
+            blocks = sys.getallocatedblocks() - blocks_before
+            if started_tracing:
+                tracemalloc.stop()
+
+            store.add(
+                {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status["code"],
+                    "startedAt": started_at,
+                    "wallMs": round(wall_ms, 3),
+                    "cpuMs": round(cpu_ms, 3),
+                    "peakTracedBytes": max(peak, 0),
+                    "allocatedBlocksDelta": blocks,
+                    **summarize_stats(pstats.Stats(profiler), self.top_n),
+                }
+            )
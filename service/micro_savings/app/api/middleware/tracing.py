@@ -0,0 +1,103 @@
+import time
+from typing import Any, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from service.micro_savings.app.utils.tracing import (
+    Span,
+    Tracer,
+    format_traceparent,
+    span,
+)
+
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse whose body rendering is recorded as an ``http.serialize`` span."""
+
+    def render(self, content: Any) -> bytes:
+        with span("http.serialize"):
+            return super().render(content)
+
+
+class TracingMiddleware:
+    """
+    Opens a root ``http.request`` span for every sampled request.
+
+    The sampling decision and trace ID come from an incoming W3C
+    ``traceparent`` header when present; sampled responses echo a
+    ``traceparent`` naming this request's root span.  Besides the engine
+    stages instrumented with ``span(...)``, the middleware records:
+
+        http.read_body → first receive() until the last request body chunk
+        http.write     → response start until the last body chunk is sent
+
+    Finished traces go to the tracer's ring buffer (GET /traces); file
+    export batches are written from a worker thread.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracer: Optional[Tracer] = getattr(scope["app"].state, "tracer", None)
+        root = None
+        if tracer is not None:
+            root = tracer.start_trace(
+                "http.request",
+                Headers(scope=scope).get("traceparent"),
+                method=scope["method"],
+                path=scope["path"],
+            )
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        read_start: Optional[int] = None
+        read_done = False
+        write_span: Optional[Span] = None
+
+        async def traced_receive() -> Message:
+            nonlocal read_start, read_done
+            if read_start is None:
+                read_start = time.time_ns()
+            message = await receive()
+            if (
+                not read_done
+                and message["type"] == "http.request"
+                and not message.get("more_body")
+            ):
+                read_done = True
+                Span(root.trace, "http.read_body", root.span_id, {}, read_start).end()
+            return message
+
+        async def traced_send(message: Message) -> None:
+            nonlocal write_span
+            if message["type"] == "http.response.start":
+                root.set("status", message["status"])
+                headers = MutableHeaders(scope=message)
+                headers["traceparent"] = format_traceparent(
+                    root.trace.trace_id, root.span_id
+                )
+                write_span = Span(root.trace, "http.write", root.span_id, {})
+            await send(message)
+            if (
+                message["type"] == "http.response.body"
+                and not message.get("more_body")
+                and write_span is not None
+            ):
+                write_span.end()
+
+        try:
+            with root:
+                await self.app(scope, traced_receive, traced_send)
+        finally:
+            batch = tracer.finish(root)
+            if batch:
+                await anyio.to_thread.run_sync(tracer.write_batch, batch)
@@ -0,0 +1,268 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from anyio import to_thread
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from service.micro_savings.app.api.uploads import parse_content_type
+from service.micro_savings.app.models.transaction import (
+    CheckedRows,
+    FilteredInvalidTransaction,
+    TransactionRow,
+)
+from service.micro_savings.app.utils.date_utils import (
+    from_epoch,
+    is_valid_date,
+    to_epoch,
+)
+from service.micro_savings.app.utils.settings import settings
+
+try:
+    import msgpack
+except ImportError:  # optional: bodies stay JSON-only without it
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+# Media types clients send for MessagePack; all are accepted
+_MSGPACK_TYPES = {MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+_JSON_TYPES = {"application/json", "application/*", "*/*"}
+
+# Date fields sent as integer timestamps (seconds since 1970-01-01, naive)
+_DATE_FIELDS = ("date", "start", "end")
+_PERIOD_KEYS = ("q", "p", "k")
+
+
+def msgpack_enabled() -> bool:
+    return msgpack is not None and settings.MSGPACK_ENABLED
+
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    True if the Accept header prefers MessagePack to JSON.
+
+    Example:
+        Accept: application/msgpack, application/json;q=0.5  → True
+        Accept: */*                                          → False
+    """
+    if not msgpack_enabled():
+        return False
+    header = request.headers.get("accept")
+    if not header:
+        return False
+    best_msgpack = best_json = 0.0
+    for entry in header.split(","):
+        media_type, params = parse_content_type(entry)
+        try:
+            q = float(params.get("q", 1))
+        except ValueError:
+            q = 0.0
+        if media_type in _MSGPACK_TYPES:
+            best_msgpack = max(best_msgpack, q)
+        elif media_type in _JSON_TYPES:
+            best_json = max(best_json, q)
+    return best_msgpack > 0 and best_msgpack >= best_json
+
+
+# ── Responses ─────────────────────────────────────────────────────────────────
+
+
+def encode_msgpack(content: Any, exclude_none: bool = False) -> bytes:
+    """
+    MessagePack body for a response model, with date fields as timestamps.
+
+    Models are packed from their field values directly (no ``model_dump``);
+    a date that is not a valid date string — e.g. a rejected row's — is
+    kept as sent.  ``exclude_none`` drops None fields, like the route's
+    ``response_model_exclude_none``.
+    """
+    date_fields: Dict[type, Tuple[str, ...]] = {}
+
+    def fields(model: BaseModel) -> Dict[str, Any]:
+        cls = type(model)
+        dates = date_fields.get(cls)
+        if dates is None:
+            dates = date_fields[cls] = tuple(
+                name for name in _DATE_FIELDS if name in cls.model_fields
+            )
+        values = model.__dict__
+        if exclude_none:
+            values = {key: value for key, value in values.items() if value is not None}
+        elif dates:
+            values = dict(values)
+        for name in dates:
+            try:
+                values[name] = to_epoch(values[name])
+            except (KeyError, ValueError):
+                pass
+        return values
+
+    return msgpack.packb(content, default=fields)
+
+
+def negotiate(request: Request, content: Any, exclude_none: bool = False) -> Any:
+    """
+    ``content`` as a MessagePack ``Response`` if the client asked for one
+    (see ``wants_msgpack``), otherwise unchanged for the usual JSON
+    serialization.  Call it from a sync endpoint: encoding runs in place.
+    """
+    if not wants_msgpack(request):
+        return content
+    return Response(
+        encode_msgpack(content, exclude_none),
+        media_type=MSGPACK,
+        headers={"Vary": "Accept"},
+    )
+
+
+# ── Requests ──────────────────────────────────────────────────────────────────
+
+
+def _invalid(loc: Tuple[Any, ...], message: str, value: Any) -> RequestValidationError:
+    return RequestValidationError(
+        [{"type": "value_error", "loc": ("body", *loc), "msg": message, "input": value}]
+    )
+
+
+def _date(value: Any) -> Optional[str]:
+    """A timestamp or date string as the engines' date string, else None."""
+    if type(value) is int:
+        try:
+            return from_epoch(value)
+        except ValueError:
+            return None
+    return value if is_valid_date(value) else None
+
+
+def read_rows(items: List[Any], lenient: bool = False) -> CheckedRows:
+    """
+    Check decoded transactions and convert them straight to
+    ``TransactionRow``s, without building a model per row.
+
+    Each transaction is ``[timestamp, amount]`` or ``{"date": timestamp,
+    "amount": amount}``; a date may also be a "YYYY-MM-DD HH:MM:SS" string.
+    A malformed row → ``RequestValidationError`` (loc as for a JSON body),
+    or, when ``lenient``, a reject with the reason.
+    """
+    rows: List[TransactionRow] = []
+    rejected: List[FilteredInvalidTransaction] = []
+    for index, item in enumerate(items):
+        if type(item) in (list, tuple) and len(item) == 2:
+            raw_date, amount = item
+        elif isinstance(item, dict):
+            raw_date, amount = item.get("date"), item.get("amount")
+        else:
+            raw_date = amount = None
+        date = _date(raw_date)
+        if date is not None and type(amount) in (int, float):
+            rows.append(TransactionRow(date, float(amount)))
+            continue
+
+        if raw_date is None and amount is None:
+            field, message = (), "Transaction must be [timestamp, amount]"
+        elif date is None:
+            field = ("date",)
+            message = f"Date '{raw_date}' must be a timestamp or YYYY-MM-DD HH:MM:SS"
+        else:
+            field, message = ("amount",), f"Amount '{amount}' must be a number"
+        if not lenient:
+            raise _invalid(("transactions", index, *field), message, item)
+        rejected.append(
+            FilteredInvalidTransaction(
+                date=date or (raw_date if isinstance(raw_date, str) else ""),
+                amount=amount if type(amount) in (int, float) else None,
+                message=message,
+            )
+        )
+    return CheckedRows(rows, rejected)
+
+
+def decode_msgpack(body: bytes, model: Optional[Type[BaseModel]] = None) -> Any:
+    """
+    Decode a MessagePack request body for validation by ``model``.
+
+    Period ``start`` / ``end`` timestamps become date strings, and
+    ``transactions`` becomes ``CheckedRows`` (see ``read_rows``) that the
+    request model takes without validating each row again.  Lenient mode
+    applies only if ``model`` has a ``lenient`` field.
+
+    Raises:
+        RequestValidationError: undecodable body or malformed transaction.
+    """
+    try:
+        document = msgpack.unpackb(body)
+    except (ValueError, TypeError, msgpack.UnpackException):
+        raise _invalid((), "MessagePack decode error", {})
+    if not isinstance(document, dict):
+        return document
+
+    for key in _PERIOD_KEYS:
+        periods = document.get(key)
+        if isinstance(periods, list):
+            for period in periods:
+                if isinstance(period, dict):
+                    for name in ("start", "end"):
+                        if type(period.get(name)) is int:
+                            period[name] = _date(period[name]) or period[name]
+    transactions = document.get("transactions")
+    if isinstance(transactions, list):
+        lenient = (
+            model is not None
+            and "lenient" in model.model_fields
+            and document.get("lenient") is True
+        )
+        document["transactions"] = read_rows(transactions, lenient)
+    return document
+
+
+class _DecodedRequest(Request):
+    """
+    A request whose MessagePack body is already decoded.  FastAPI reads a
+    body with ``json()`` only when it is labelled JSON, so the copy is.
+    """
+
+    def __init__(self, request: Request, body: bytes, document: Any) -> None:
+        headers = [
+            (name, value)
+            for name, value in request.scope["headers"]
+            if name != b"content-type"
+        ]
+        headers.append((b"content-type", b"application/json"))
+        super().__init__({**request.scope, "headers": headers}, request.receive)
+        self._raw_body = body
+        self._document = document
+
+    async def body(self) -> bytes:
+        return self._raw_body
+
+    async def json(self) -> Any:
+        return self._document
+
+
+class MsgPackRoute(APIRoute):
+    """
+    Route class (``APIRouter(route_class=MsgPackRoute)``) that also accepts
+    ``application/msgpack`` request bodies.  They are decoded on a worker
+    thread, then validated by the endpoint's body model like a JSON body.
+    JSON requests are untouched; responses are negotiated per endpoint with
+    ``negotiate``.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        model = self.body_field.field_info.annotation if self.body_field else None
+
+        async def route_handler(request: Request) -> Response:
+            media_type, _ = parse_content_type(request.headers.get("content-type", ""))
+            if media_type in _MSGPACK_TYPES:
+                if not msgpack_enabled():
+                    raise HTTPException(
+                        status_code=415, detail="MessagePack bodies are not enabled."
+                    )
+                body = await request.body()
+                document = await to_thread.run_sync(decode_msgpack, body, model)
+                request = _DecodedRequest(request, body, document)
+            return await handler(request)
+
+        return route_handler
@@ -0,0 +1,285 @@
+import json
+import re
+from typing import Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from anyio import to_thread
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from service.micro_savings.app.transaction_engine.csv_processor.csv_service import (
+    CsvTransactionReader,
+)
+from service.micro_savings.app.utils.settings import settings
+
+Model = TypeVar("Model", bound=BaseModel)
+
+# Part names of a multipart upload: the JSON options, then the CSV rows
+OPTIONS_PART = "request"
+CSV_PART = "transactions"
+
+_PART_NAME = re.compile(r'\bname\s*=\s*(?:"([^"]*)"|([^;\s]+))', re.IGNORECASE)
+
+
+def parse_content_type(header: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Media type and parameters of a Content-Type header.
+
+    Example:
+        'multipart/form-data; boundary="x-1"' → ("multipart/form-data",
+                                                 {"boundary": "x-1"})
+    """
+    media_type, *params = header.split(";")
+    parsed = {}
+    for param in params:
+        key, _, value = param.strip().partition("=")
+        parsed[key.strip().lower()] = value.strip().strip('"')
+    return media_type.strip().lower(), parsed
+
+
+# ── multipart/form-data ───────────────────────────────────────────────────────
+
+
+class MultipartParser:
+    """
+    Push parser for ``multipart/form-data`` bodies.
+
+    ``feed`` takes the body in any chunking and returns events as soon as
+    they can be told apart from a boundary:
+
+        ("part", name)   a part starts (from its Content-Disposition)
+        ("data", bytes)  a piece of the current part's content
+        ("end", None)    the current part ended
+
+    At most one delimiter's length of content is held back between calls,
+    so a large part flows through in the chunks it arrived in.
+
+    Raises:
+        ValueError: malformed body — see ``feed`` and ``close``.
+    """
+
+    def __init__(self, boundary: str, max_header_size: int = 16 * 1024) -> None:
+        self.max_header_size = max_header_size
+        self.done = False
+        self._delimiter = b"\r\n--" + boundary.encode("latin-1")
+        # A CRLF in front lets the first boundary match the same delimiter
+        self._buffer = b"\r\n"
+        self._state = "preamble"
+
+    def feed(self, data: bytes) -> List[Tuple[str, object]]:
+        events: List[Tuple[str, object]] = []
+        buffer = self._buffer + data
+        while True:
+            if self._state in ("preamble", "body"):
+                at = buffer.find(self._delimiter)
+                if at < 0:
+                    keep = len(self._delimiter) - 1
+                    if self._state == "body" and len(buffer) > keep:
+                        events.append(("data", buffer[:-keep]))
+                    buffer = buffer[-keep:] if len(buffer) > keep else buffer
+                    break
+                if self._state == "body":
+                    if at:
+                        events.append(("data", buffer[:at]))
+                    events.append(("end", None))
+                buffer = buffer[at + len(self._delimiter) :]
+                self._state = "delimiter"
+            elif self._state == "delimiter":
+                if len(buffer) < 2:
+                    break
+                if buffer[:2] == b"--":
+                    self._state, self.done = "epilogue", True
+                elif buffer[:2] == b"\r\n":
+                    buffer = buffer[2:]
+                    self._state = "headers"
+                else:
+                    raise ValueError("Malformed multipart boundary")
+            elif self._state == "headers":
+                at = 0 if buffer.startswith(b"\r\n") else buffer.find(b"\r\n\r\n")
+                if at < 0:
+                    if len(buffer) > self.max_header_size:
+                        raise ValueError("Multipart part headers are too large")
+                    break
+                events.append(("part", self._part_name(buffer[:at])))
+                buffer = buffer[at + (2 if at == 0 else 4) :]
+                self._state = "body"
+            else:  # epilogue
+                buffer = b""
+                break
+        self._buffer = buffer
+        return events
+
+    def close(self) -> None:
+        """
+        Raises:
+            ValueError: the body ended before the closing boundary.
+        """
+        if not self.done:
+            raise ValueError("Multipart body ended before the closing boundary")
+
+    @staticmethod
+    def _part_name(block: bytes) -> str:
+        for line in block.decode("latin-1").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-disposition":
+                match = _PART_NAME.search(value)
+                if match:
+                    return (
+                        match.group(1) if match.group(1) is not None else match.group(2)
+                    )
+        raise ValueError("Multipart part without a Content-Disposition name")
+
+
+# ── CSV uploads ───────────────────────────────────────────────────────────────
+
+
+def _parse_options(raw: bytes, model: Type[Model]) -> Model:
+    try:
+        options = json.loads(raw)
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail=f"Part '{OPTIONS_PART}' must be a JSON object."
+        )
+    if not isinstance(options, dict):
+        raise HTTPException(
+            status_code=422, detail=f"Part '{OPTIONS_PART}' must be a JSON object."
+        )
+    for key in ("transactions", "userId"):
+        if key in options:
+            raise HTTPException(
+                status_code=422,
+                detail=f"'{key}' is not allowed: transactions come from the "
+                f"'{CSV_PART}' part.",
+            )
+    try:
+        return model.model_validate({**options, "transactions": []})
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", OPTIONS_PART, *error["loc"])}
+                for error in exc.errors(include_url=False, include_context=False)
+            ]
+        )
+
+
+async def read_csv_upload(
+    request: Request,
+    reader: CsvTransactionReader,
+    options_model: Optional[Type[Model]] = None,
+    on_rows: Optional[Callable[[], None]] = None,
+) -> Optional[Model]:
+    """
+    Stream a CSV upload into ``reader`` as the body arrives.
+
+    Accepted bodies:
+        text/csv             → the CSV itself (only without ``options_model``)
+        multipart/form-data  → a JSON part named "request" with the
+                               endpoint's usual body minus transactions,
+                               then a CSV part named "transactions"
+
+    The body is read chunk by chunk; each ``CSV_UPLOAD_CHUNK_SIZE`` of CSV
+    is converted on a worker thread (then ``on_rows`` is called there), so
+    the event loop only moves bytes.  The options come first so that, e.g.,
+    lenient mode applies while the rows are read.
+
+    Returns:
+        The validated options (None without ``options_model``).
+
+    Raises:
+        HTTPException: 415 wrong Content-Type, 413 options too large,
+            422 malformed body or CSV row.
+        RequestValidationError: the options failed model validation.
+    """
+    media_type, params = parse_content_type(request.headers.get("content-type", ""))
+    if media_type == "text/csv" and options_model is None:
+        parser = None
+        part: Optional[str] = CSV_PART
+    elif media_type == "multipart/form-data" and params.get("boundary"):
+        parser = MultipartParser(params["boundary"])
+        part = None
+    else:
+        expected = (
+            "multipart/form-data"
+            if options_model is not None
+            else "text/csv or multipart/form-data"
+        )
+        raise HTTPException(status_code=415, detail=f"Send the upload as {expected}.")
+
+    options: Optional[Model] = None
+    options_raw = b""
+    pending: List[bytes] = []
+    pending_size = 0
+    seen_csv = False
+
+    def read(chunks: List[bytes], final: bool) -> None:
+        reader.feed(b"".join(chunks))
+        if final:
+            reader.close()
+        if on_rows is not None:
+            on_rows()
+
+    async def flush(final: bool = False) -> None:
+        nonlocal pending, pending_size
+        chunks, pending, pending_size = pending, [], 0
+        try:
+            await to_thread.run_sync(read, chunks, final)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+
+    async def on_data(data: bytes) -> None:
+        nonlocal options_raw, pending_size
+        if part == OPTIONS_PART:
+            options_raw += data
+            if len(options_raw) > settings.CSV_UPLOAD_MAX_OPTIONS_SIZE:
+                raise HTTPException(
+                    status_code=413, detail=f"Part '{OPTIONS_PART}' is too large."
+                )
+        elif part == CSV_PART:
+            pending.append(data)
+            pending_size += len(data)
+            if pending_size >= settings.CSV_UPLOAD_CHUNK_SIZE:
+                await flush()
+
+    async for chunk in request.stream():
+        if parser is None:
+            await on_data(chunk)
+            continue
+        try:
+            events = parser.feed(chunk)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        for event, value in events:
+            if event == "data":
+                await on_data(value)
+            elif event == "part":
+                part = value
+                if part == CSV_PART and not seen_csv:
+                    if options_model is not None and options is None:
+                        raise HTTPException(
+                            status_code=422,
+                            detail=f"Part '{OPTIONS_PART}' must come before "
+                            f"part '{CSV_PART}'.",
+                        )
+                    reader.lenient = bool(getattr(options, "lenient", False))
+                    seen_csv = True
+                elif part != OPTIONS_PART or options_model is None or options_raw:
+                    raise HTTPException(
+                        status_code=422, detail=f"Unexpected part '{part}'."
+                    )
+            elif part == OPTIONS_PART:  # end of the options part
+                options = _parse_options(options_raw, options_model)
+            else:  # end of the CSV part
+                await flush(final=True)
+
+    if parser is None:
+        await flush(final=True)
+    else:
+        try:
+            parser.close()
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        if not seen_csv:
+            raise HTTPException(
+                status_code=422, detail=f"Part '{CSV_PART}' is required."
+            )
+    return options
@@ -0,0 +1,352 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from starlette.types import ASGIApp
+
+from service.micro_savings.app.api.middleware.access_log import AccessLogStats
+from service.micro_savings.app.api.middleware.memory import MemoryStats
+from service.micro_savings.app.api.negotiation import (
+    MSGPACK,
+    encode_msgpack,
+    msgpack_enabled,
+)
+from service.micro_savings.app.utils.date_utils import to_epoch
+from service.micro_savings.app.utils.tracing import format_traceparent
+
+PREFIX = "/blackrock/challenge/v1"
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def synthetic_transactions(count: int) -> List[dict]:
+    """Deterministic transactions spread over 2023, with cents and a duplicate."""
+    start = datetime(2023, 1, 1, 9, 30)
+    txns = [
+        {
+            "date": (start + timedelta(minutes=2111 * i)).strftime(DATE_FMT),
+            "amount": round(37.5 + (i * 7919) % 4800 + (i % 100) / 100, 2),
+        }
+        for i in range(max(count, 2))
+    ]
+    txns.append(dict(txns[0]))
+    return txns
+
+
+_PERIODS = {
+    "q": [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}],
+    "p": [{"extra": 25, "start": "2023-10-01 00:00:00", "end": "2023-12-31 23:59:59"}],
+    "k": [
+        {"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"},
+        {"start": "2023-03-01 00:00:00", "end": "2023-11-30 23:59:59"},
+    ],
+}
+
+
+def _owned_periods() -> dict:
+    """``_PERIODS`` plus a K window with a random end, so the set's ID is ours alone.
+
+    Period-set IDs are content hashes shared by every worker and client, so the
+    warm-up may only delete a set nobody else can have registered.
+    """
+    end = datetime(2030, 1, 1) + timedelta(seconds=int.from_bytes(os.urandom(4), "big"))
+    window = {"start": "2030-01-01 00:00:00", "end": end.strftime(DATE_FMT)}
+    return {**_PERIODS, "k": [*_PERIODS["k"], window]}
+
+
+_BOUNDARY = "warmup-boundary"
+
+
+def _multipart(*parts: Tuple[str, str]) -> bytes:
+    body = "".join(
+        f"--{_BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{name}"\r\n\r\n{content}\r\n'
+        for name, content in parts
+    )
+    return f"{body}--{_BOUNDARY}--\r\n".encode()
+
+
+class WarmUp:
+    """
+    Drives synthetic requests through the app in-process until the first
+    request to every route no longer pays for cold paths — lazily built
+    validators and serializers, first-use imports, the worker thread pool,
+    zlib, compiled period sets and tax tables.
+
+    Requests go through the full middleware stack as ASGI calls (no
+    sockets).  They are sent unsampled for tracing, and the counters they
+    touched (admission, access log, memory accounting) are reset when the
+    warm-up ends so metrics only describe real traffic.  ``ready`` is set
+    when it ends, also if a step failed — failures are reported, not fatal.
+    """
+
+    def __init__(self, rounds: int = 2, transactions: int = 200) -> None:
+        self.rounds = rounds
+        self.transactions = transactions
+        self.status = "pending"
+        self.ready = asyncio.Event()
+        self.requests = 0
+        self.failures: List[str] = []
+        self.duration_seconds: Optional[float] = None
+        self._route_ms: Dict[str, List[float]] = {}
+
+    async def _call(
+        self,
+        app: ASGIApp,
+        name: str,
+        method: str,
+        path: str,
+        payload=None,
+        query_string: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        content: bytes = b"",
+    ) -> Tuple[int, Optional[dict]]:
+        body = json.dumps(payload).encode() if payload is not None else content
+        request_headers = {
+            "traceparent": format_traceparent(
+                os.urandom(16).hex(), os.urandom(8).hex(), sampled=False
+            ),
+            **({"content-type": "application/json"} if payload is not None else {}),
+            **({"content-length": str(len(body))} if body else {}),
+            **(headers or {}),
+        }
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": PREFIX + path,
+            "raw_path": (PREFIX + path).encode(),
+            "root_path": "",
+            "query_string": query_string.encode(),
+            "headers": [(k.encode(), v.encode()) for k, v in request_headers.items()],
+            "client": ("127.0.0.1", 0),
+            "server": ("warmup", 80),
+            "app": app,
+        }
+        incoming = [{"type": "http.request", "body": body, "more_body": False}]
+        sent: List[dict] = []
+
+        async def receive():
+            if incoming:
+                return incoming.pop(0)
+            await asyncio.Event().wait()  # stays connected until cancelled
+
+        async def send(message):
+            sent.append(message)
+
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        self._route_ms.setdefault(name, []).append(
+            (time.perf_counter() - started) * 1000
+        )
+        self.requests += 1
+
+        status = sent[0]["status"]
+        if status >= 400:
+            self.failures.append(f"{name}: HTTP {status}")
+        response_headers = dict(sent[0]["headers"])
+        raw = b"".join(m.get("body", b"") for m in sent[1:])
+        plain_json = (
+            response_headers.get(b"content-type") == b"application/json"
+            and b"content-encoding" not in response_headers
+        )
+        return status, json.loads(raw) if raw and plain_json else None
+
+    async def _round(self, app: ASGIApp) -> None:
+        txns = synthetic_transactions(self.transactions)
+        parsed = [
+            {**tx, "ceiling": -(-tx["amount"] // 100) * 100}
+            for tx in txns
+            if tx["amount"] > 0
+        ]
+        for tx in parsed:
+            tx["remanent"] = round(tx["ceiling"] - tx["amount"], 2)
+        filter_body = {"wage": 50_000, **_PERIODS, "transactions": txns}
+        returns_body = {"age": 29, "wage": 120_000, **_PERIODS, "transactions": txns}
+        call = self._call
+
+        await call(app, "health", "GET", "/health")
+        await call(app, "performance", "GET", "/performance", query_string="window=60")
+        await call(app, "parse", "POST", "/transactions:parse", txns)
+        await call(
+            app,
+            "validator",
+            "POST",
+            "/transactions:validator",
+            {"wage": 50_000, "transactions": parsed},
+        )
+        await call(
+            app,
+            "filter",
+            "POST",
+            "/transactions:filter",
+            filter_body,
+            headers={"accept-encoding": "gzip"},
+        )
+        await call(
+            app,
+            "filter_lenient",
+            "POST",
+            "/transactions:filter",
+            {**filter_body, "lenient": True, "transactions": [*txns, {"date": 1}]},
+        )
+        await call(
+            app, "filter_page", "POST", "/transactions:filter", filter_body, "limit=50"
+        )
+        await call(
+            app,
+            "filter_stream",
+            "POST",
+            "/transactions:filter",
+            filter_body,
+            "stream=true",
+        )
+        await call(app, "nps", "POST", "/returns:nps", returns_body)
+        await call(
+            app,
+            "nps_compare",
+            "POST",
+            "/returns:nps",
+            {**returns_body, "timeWeighted": True, "compareTaxTables": ["old-2023-24"]},
+        )
+        await call(app, "index", "POST", "/returns:index", returns_body)
+        await call(
+            app,
+            "roundups",
+            "POST",
+            "/transactions:roundups",
+            {**_PERIODS, "transactions": txns},
+        )
+        await call(app, "tax_tables", "GET", "/tax/tables")
+        await call(
+            app,
+            "tax_benefits",
+            "POST",
+            "/tax:benefits",
+            {"investors": [{"invested": 40_000, "wage": 120_000}]},
+        )
+
+        csv = "date,amount\n" + "".join(f"{tx['date']},{tx['amount']}\n" for tx in txns)
+        await call(
+            app,
+            "csv_parse",
+            "POST",
+            "/csv/transactions:parse",
+            headers={"content-type": "text/csv"},
+            content=csv.encode(),
+        )
+        options = {k: v for k, v in returns_body.items() if k != "transactions"}
+        await call(
+            app,
+            "csv_nps",
+            "POST",
+            "/csv/returns:nps",
+            headers={"content-type": f"multipart/form-data; boundary={_BOUNDARY}"},
+            content=_multipart(("request", json.dumps(options)), ("transactions", csv)),
+        )
+
+        if msgpack_enabled():
+            rows = [[to_epoch(tx["date"]), tx["amount"]] for tx in txns]
+            await call(
+                app,
+                "filter_msgpack",
+                "POST",
+                "/transactions:filter",
+                headers={"content-type": MSGPACK, "accept": MSGPACK},
+                content=encode_msgpack({**filter_body, "transactions": rows}),
+            )
+
+        status, registered = await call(
+            app, "periods", "POST", "/periods", _owned_periods()
+        )
+        if status == 201:
+            set_id = registered["id"]
+            await call(
+                app,
+                "filter_period_set",
+                "POST",
+                "/transactions:filter",
+                {"wage": 50_000, "periodSetId": set_id, "transactions": txns},
+            )
+            await call(app, "periods_delete", "DELETE", f"/periods/{set_id}")
+
+        status, baseline = await call(
+            app,
+            "whatif",
+            "POST",
+            "/whatif/baselines",
+            {**returns_body, "scheme": "nps"},
+        )
+        if status == 201:
+            path = f"/whatif/baselines/{baseline['id']}"
+            await call(
+                app,
+                "whatif_edit",
+                "POST",
+                path + "/edits",
+                {"q": {"index": 0, "period": {**_PERIODS["q"][0], "fixed": 10}}},
+            )
+            await call(app, "whatif_delete", "DELETE", path)
+
+        status, job = await call(app, "jobs", "POST", "/jobs/returns:nps", returns_body)
+        if status == 202:
+            path = f"/jobs/{job['id']}"
+            await call(app, "job_status", "GET", path)
+            await call(app, "job_cancel", "DELETE", path)
+
+    async def run(self, app: ASGIApp) -> None:
+        self.status = "running"
+        started = time.perf_counter()
+        try:
+            for _ in range(self.rounds):
+                await self._round(app)
+        except Exception as exc:
+            self.failures.append(f"{type(exc).__name__}: {exc}")
+            logger.exception("Warm-up failed")
+        finally:
+            self.duration_seconds = time.perf_counter() - started
+            _reset_counters(app)
+            self.status = "failed" if self.failures else "ready"
+            self.ready.set()
+            logger.bind(
+                requests=self.requests,
+                durationMs=round(self.duration_seconds * 1000, 1),
+                failures=len(self.failures),
+            ).info("Warm-up finished")
+
+    def summary(self) -> dict:
+        return {
+            "status": self.status,
+            "rounds": self.rounds,
+            "requests": self.requests,
+            "failures": self.failures,
+            "durationMs": (
+                round(self.duration_seconds * 1000, 1)
+                if self.duration_seconds is not None
+                else None
+            ),
+            # first (cold) vs last (warm) call per route
+            "routes": {
+                name: {"firstMs": round(ms[0], 3), "lastMs": round(ms[-1], 3)}
+                for name, ms in self._route_ms.items()
+            },
+        }
+
+
+def _reset_counters(app: ASGIApp) -> None:
+    state = app.state
+    if getattr(state, "admission", None) is not None:
+        state.admission.reset_counters()
+    if getattr(state, "jobs", None) is not None:
+        state.jobs.reset_counters()
+    if getattr(state, "shared_cache", None) is not None:
+        state.shared_cache.reset_counters()
+    if getattr(state, "access_log", None) is not None:
+        state.access_log = AccessLogStats()
+    if getattr(state, "memory_stats", None) is not None:
+        state.memory_stats = MemoryStats()
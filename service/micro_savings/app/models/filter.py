@@ -1,9 +1,23 @@
-from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, model_validator, validator
+from pydantic.json_schema import SkipJsonSchema
 
-from service.micro_savings.app.models.periods import QPeriod, PPeriod, KPeriod
+from service.micro_savings.app.models.periods import (
+    QPeriod,
+    PPeriod,
+    KPeriod,
+    check_period_source,
+)
+from service.micro_savings.app.models.roundup import check_round_up
+from service.micro_savings.app.models.store import check_transaction_source
+from service.micro_savings.app.models.transaction import (
+    FilteredInvalidTransaction,
+    checked_rows,
+    screen_rows,
+)
+from service.micro_savings.app.utils.date_utils import is_valid_date
+from service.micro_savings.app.utils.money import DEFAULT_ROUND_UP
 
 
 class FilterInputTransaction(BaseModel):
@@ -18,9 +32,7 @@ class FilterInputTransaction(BaseModel):
 
     @validator("date")
     def validate_date_format(cls, v):
-        try:
-            datetime.strptime(v, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
+        if not is_valid_date(v):
             raise ValueError(f"Date '{v}' must be in format YYYY-MM-DD HH:MM:SS")
         return v
 
@@ -29,5 +41,48 @@ class FilterRequest(BaseModel):
     wage: float
     q: List[QPeriod] = []
     p: List[PPeriod] = []
-    k: List[KPeriod]  # required — no default
-    transactions: List[FilterInputTransaction]
+    k: Optional[List[KPeriod]] = None  # required unless periodSetId is given
+    periodSetId: Optional[str] = None  # registered via POST /periods
+    roundUp: int = DEFAULT_ROUND_UP  # ceiling granularity: 10, 50, 100 or 500
+    # required unless userId is given
+    transactions: Optional[List[FilterInputTransaction]] = None
+    userId: Optional[str] = None  # transactions held in the transaction store
+    lenient: bool = False  # report malformed rows in "invalid" instead of a 422
+    # Malformed rows found in lenient mode; filled in by screen_transactions
+    rejected: SkipJsonSchema[List[FilteredInvalidTransaction]] = Field(
+        default_factory=list, exclude=True
+    )
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def take_checked_rows(cls, data, handler):
+        rows = checked_rows(data)
+        if rows is None:
+            return handler(data)
+        request = handler({**data, "transactions": []})
+        request.transactions, request.rejected = rows, rows.rejected
+        return request
+
+    @model_validator(mode="before")
+    @classmethod
+    def screen_transactions(cls, data):
+        if not isinstance(data, dict):
+            return data
+        data = {**data, "rejected": []}  # never taken from the client
+        if data.get("lenient") is True and isinstance(data.get("transactions"), list):
+            data["transactions"], data["rejected"] = screen_rows(data["transactions"])
+        return data
+
+    @validator("roundUp")
+    def validate_round_up(cls, v):
+        return check_round_up(v)
+
+    @model_validator(mode="after")
+    def validate_period_source(self):
+        check_period_source(self.periodSetId, self.q, self.p, self.k)
+        return self
+
+    @model_validator(mode="after")
+    def validate_transaction_source(self):
+        check_transaction_source(self.userId, self.transactions)
+        return self
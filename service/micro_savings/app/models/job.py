@@ -0,0 +1,23 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class JobStage(BaseModel):
+    name: str
+    status: Literal["pending", "running", "done", "skipped", "failed"]
+    seconds: Optional[float] = None  # wall time, once the stage is done
+
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str  # "returns:nps" | "returns:index"
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    stage: Optional[str] = None  # the stage running or last run
+    progress: float  # fraction of stages done, 0.0 – 1.0
+    stages: List[JobStage]
+    createdAt: str
+    startedAt: Optional[str] = None
+    finishedAt: Optional[str] = None
+    expiresInSeconds: Optional[float] = None  # result TTL, once finished
+    error: Optional[str] = None  # set when status is "failed"
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, validator
 from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, validator
 
 DATE_FMT = "%Y-%m-%d %H:%M:%S"
 
@@ -57,3 +59,45 @@ class KPeriod(BaseModel):
     @validator("start", "end")
     def validate_dates(cls, v):
         return _parse_dt(v)
+
+
+class PeriodSet(BaseModel):
+    """
+    A reusable bundle of Q / P / K periods, registered once and referenced
+    by ID from filter and returns requests.
+    """
+
+    q: List[QPeriod] = []
+    p: List[PPeriod] = []
+    k: List[KPeriod]
+
+    @validator("q", "p", "k")
+    def validate_ranges(cls, v):
+        for period in v:
+            if datetime.strptime(period.start, DATE_FMT) > datetime.strptime(
+                period.end, DATE_FMT
+            ):
+                raise ValueError(
+                    f"Period start '{period.start}' is after its end '{period.end}'"
+                )
+        return v
+
+
+class RegisteredPeriodSet(BaseModel):
+    id: str
+    q: int  # number of periods of each kind
+    p: int
+    k: int
+
+
+def check_period_source(period_set_id, q, p, k) -> None:
+    """
+    Requests carry either a registered ``periodSetId`` or inline periods.
+
+    Raises:
+        ValueError: both or neither were supplied.
+    """
+    if period_set_id is None and k is None:
+        raise ValueError("Either inline 'k' periods or a 'periodSetId' is required")
+    if period_set_id is not None and (q or p or k is not None):
+        raise ValueError("Use either 'periodSetId' or inline q/p/k periods, not both")
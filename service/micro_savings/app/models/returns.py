@@ -1,9 +1,24 @@
-from typing import List
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, model_validator, validator
 
-from service.micro_savings.app.models.periods import QPeriod, PPeriod, KPeriod
-from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.models.periods import (
+    QPeriod,
+    PPeriod,
+    KPeriod,
+    check_period_source,
+)
+from service.micro_savings.app.models.roundup import check_round_up
+from service.micro_savings.app.models.store import check_transaction_source
+from service.micro_savings.app.models.tax import check_tax_table
+from service.micro_savings.app.models.transaction import (
+    RawTransaction,
+    checked_rows,
+)
+from service.micro_savings.app.transaction_engine.tax_processor.tax_service import (
+    DEFAULT_TAX_TABLE,
+)
+from service.micro_savings.app.utils.money import DEFAULT_ROUND_UP
 
 
 class ReturnRequest(BaseModel):
@@ -12,8 +27,28 @@ class ReturnRequest(BaseModel):
     inflation: float = 5.5
     q: List[QPeriod] = []
     p: List[PPeriod] = []
-    k: List[KPeriod]
-    transactions: List[RawTransaction]
+    k: Optional[List[KPeriod]] = None  # required unless periodSetId is given
+    periodSetId: Optional[str] = None  # registered via POST /periods
+    roundUp: int = DEFAULT_ROUND_UP  # ceiling granularity: 10, 50, 100 or 500
+    # required unless userId is given
+    transactions: Optional[List[RawTransaction]] = None
+    userId: Optional[str] = None  # transactions held in the transaction store
+    # Compound each remanent from its own transaction date instead of
+    # projecting every K window's total over the same fixed horizon.
+    timeWeighted: bool = False
+    taxTable: str = DEFAULT_TAX_TABLE  # regime / fiscal year for taxBenefit
+    # Extra tables to report in taxBenefits alongside taxTable
+    compareTaxTables: List[str] = []
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def take_checked_rows(cls, data, handler):
+        rows = checked_rows(data)
+        if rows is None:
+            return handler(data)
+        request = handler({**data, "transactions": []})
+        request.transactions = rows
+        return request
 
     @validator("age")
     def validate_age(cls, v):
@@ -29,6 +64,28 @@ class ReturnRequest(BaseModel):
             raise ValueError("Wage must be > 0")
         return v
 
+    @validator("roundUp")
+    def validate_round_up(cls, v):
+        return check_round_up(v)
+
+    @validator("taxTable")
+    def validate_tax_table(cls, v):
+        return check_tax_table(v)
+
+    @validator("compareTaxTables")
+    def validate_compare_tax_tables(cls, v):
+        return list(dict.fromkeys(check_tax_table(name) for name in v))
+
+    @model_validator(mode="after")
+    def validate_period_source(self):
+        check_period_source(self.periodSetId, self.q, self.p, self.k)
+        return self
+
+    @model_validator(mode="after")
+    def validate_transaction_source(self):
+        check_transaction_source(self.userId, self.transactions)
+        return self
+
 
 class SavingsByDate(BaseModel):
     start: str
@@ -36,6 +93,8 @@ class SavingsByDate(BaseModel):
     amount: float
     profit: float
     taxBenefit: float  # explicitly required, 0.0 for index
+    # taxTable and every compareTaxTables entry → benefit; only when compared
+    taxBenefits: Optional[Dict[str, float]] = None
 
 
 class ReturnResponse(BaseModel):
@@ -0,0 +1,61 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, model_validator, validator
+
+from service.micro_savings.app.models.periods import (
+    QPeriod,
+    PPeriod,
+    KPeriod,
+    check_period_source,
+)
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.utils.money import ROUND_UP_STEPS
+
+
+def check_round_up(v: int) -> int:
+    """
+    Round-up granularity must be one of the offered steps.
+
+    Raises:
+        ValueError: for any other value.
+    """
+    if v not in ROUND_UP_STEPS:
+        raise ValueError(f"roundUp must be one of {list(ROUND_UP_STEPS)}")
+    return v
+
+
+class RoundUpRequest(BaseModel):
+    q: List[QPeriod] = []
+    p: List[PPeriod] = []
+    k: Optional[List[KPeriod]] = None  # required unless periodSetId is given
+    periodSetId: Optional[str] = None  # registered via POST /periods
+    transactions: List[RawTransaction]
+    roundUps: List[int] = list(ROUND_UP_STEPS)  # granularities to compare
+
+    @validator("roundUps")
+    def validate_round_ups(cls, v):
+        if not v:
+            raise ValueError("roundUps must not be empty")
+        return sorted({check_round_up(step) for step in v})
+
+    @model_validator(mode="after")
+    def validate_period_source(self):
+        check_period_source(self.periodSetId, self.q, self.p, self.k)
+        return self
+
+
+class KWindowSavings(BaseModel):
+    start: str
+    end: str
+    amount: float  # total remanent within this K window
+
+
+class RoundUpOption(BaseModel):
+    roundUp: int
+    totalCeiling: float
+    savingsByDates: List[KWindowSavings]
+
+
+class RoundUpResponse(BaseModel):
+    totalTransactionAmount: float
+    options: List[RoundUpOption]
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class StoredTransactions(BaseModel):
+    userId: str
+    inserted: int  # rows at a new timestamp
+    duplicates: int  # kept as duplicates: a stored row already has that timestamp
+    total: int  # transactions now stored for the user, duplicates included
+
+
+def check_transaction_source(user_id: Optional[str], transactions) -> None:
+    """
+    Requests carry either inline ``transactions`` or a ``userId`` whose
+    stored transactions are read from the transaction store.
+
+    Raises:
+        ValueError: both or neither were supplied.
+    """
+    if user_id is None and transactions is None:
+        raise ValueError("Either inline 'transactions' or a 'userId' is required")
+    if user_id is not None and transactions is not None:
+        raise ValueError("Use either 'userId' or inline 'transactions', not both")
@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, validator
+
+from service.micro_savings.app.transaction_engine.tax_processor.tax_service import (
+    TAX_TABLES,
+)
+
+
+def check_tax_table(v: str) -> str:
+    """
+    Tax table names must be registered in ``TAX_TABLES``.
+
+    Raises:
+        ValueError: for an unknown name.
+    """
+    if v not in TAX_TABLES:
+        raise ValueError(f"taxTable must be one of {sorted(TAX_TABLES)}")
+    return v
+
+
+class TaxSlab(BaseModel):
+    upTo: Optional[float]  # None for the open-ended top slab
+    rate: float
+
+
+class TaxTableInfo(BaseModel):
+    name: str
+    regime: str  # "new" or "old"
+    fiscalYear: str
+    rebateLimit: float  # incomes up to this owe no tax (Section 87A)
+    npsWageFraction: float  # 80CCD(1B) cap as a fraction of annual wage
+    npsCap: float  # 80CCD(1B) cap in rupees
+    slabs: List[TaxSlab]
+
+
+class TaxInvestor(BaseModel):
+    invested: float  # total put into NPS
+    wage: float  # monthly wage
+
+    @validator("wage")
+    def validate_wage(cls, v):
+        if v <= 0:
+            raise ValueError("Wage must be > 0")
+        return v
+
+
+class TaxBenefitRequest(BaseModel):
+    investors: List[TaxInvestor]
+    taxTables: List[str] = []  # empty → every registered table
+
+    @validator("taxTables")
+    def validate_tax_tables(cls, v):
+        return list(dict.fromkeys(check_tax_table(name) for name in v))
+
+
+class InvestorTaxBenefits(BaseModel):
+    benefits: Dict[str, float]  # tax table → benefit
+    bestTaxTable: str  # table with the largest benefit (first on ties)
+
+
+class TaxBenefitResponse(BaseModel):
+    taxTables: List[str]
+    investors: List[InvestorTaxBenefits]
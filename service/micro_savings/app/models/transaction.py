@@ -1,8 +1,10 @@
-from datetime import datetime
-from typing import Optional, List
+from collections import namedtuple
+from typing import Any, Iterable, Optional, List, Tuple
 
 from pydantic import BaseModel, validator
 
+from service.micro_savings.app.utils.date_utils import is_valid_date
+
 # ── Raw input ─────────────────────────────────────────────────────────────────
 
 
@@ -14,13 +16,43 @@ class RawTransaction(BaseModel):
 
     @validator("date")
     def validate_date_format(cls, v):
-        try:
-            datetime.strptime(v, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
+        if not is_valid_date(v):
             raise ValueError(f"Date '{v}' must be in format YYYY-MM-DD HH:MM:SS")
         return v
 
 
+# What the engines read from a RawTransaction, for rows that were checked
+# without model validation (CSV uploads, parallel filter workers)
+TransactionRow = namedtuple("TransactionRow", "date amount")
+
+
+class CheckedRows(list):
+    """
+    ``TransactionRow``s a request decoder has already checked (binary
+    bodies; see ``api/negotiation.py``), with the rows it rejected in
+    lenient mode.
+
+    Request models take them as their transactions as they are instead of
+    validating every row again (see ``checked_rows``).  JSON decoding
+    never produces this type, so a client cannot skip validation.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[TransactionRow] = (),
+        rejected: Iterable["FilteredInvalidTransaction"] = (),
+    ) -> None:
+        super().__init__(rows)
+        self.rejected = list(rejected)
+
+
+def checked_rows(data: Any) -> Optional[CheckedRows]:
+    """The pre-checked transactions of a request body, if it carries any."""
+    if isinstance(data, dict) and isinstance(data.get("transactions"), CheckedRows):
+        return data["transactions"]
+    return None
+
+
 # ── Parsed (ceiling + remanent added) ─────────────────────────────────────────
 
 
@@ -92,3 +124,70 @@ class FilteredInvalidTransaction(BaseModel):
 class FilterResult(BaseModel):
     valid: List[FilteredTransaction]
     invalid: List[FilteredInvalidTransaction]
+
+
+class FilterPage(BaseModel):
+    """One page of a paginated filter result."""
+
+    valid: List[FilteredTransaction]
+    invalid: List[FilteredInvalidTransaction]
+    nextCursor: Optional[str] = None  # None → no more records
+
+
+# ── Lenient ingestion ─────────────────────────────────────────────────────────
+
+
+def screen_rows(rows: List[Any]) -> Tuple[List[Any], List[FilteredInvalidTransaction]]:
+    """
+    Split raw JSON rows into well-formed ones and rejects with a reason.
+
+    Used in lenient mode before model validation, so one malformed row is
+    reported in ``invalid`` instead of failing the whole batch with a 422.
+    Checks are plain type / shape tests (see ``is_valid_date``); no
+    exception is raised for a well-formed row.
+
+    Example:
+        [{"date": "2023-13-01 00:00:00", "amount": 10}]
+        → [], [{"date": "2023-13-01 00:00:00", "amount": 10.0,
+                "message": "Date '2023-13-01 00:00:00' must be in format ..."}]
+    """
+    good: List[Any] = []
+    rejected: List[FilteredInvalidTransaction] = []
+    for row in rows:
+        if not isinstance(row, dict):
+            rejected.append(
+                FilteredInvalidTransaction(
+                    date="",
+                    message="Transaction must be an object with date and amount",
+                )
+            )
+            continue
+
+        date, amount = row.get("date"), row.get("amount")
+        number = (
+            amount
+            if type(amount) in (int, float)
+            else _to_number(amount) if isinstance(amount, str) else None
+        )
+        if not is_valid_date(date):
+            message = f"Date '{date}' must be in format YYYY-MM-DD HH:MM:SS"
+        elif number is None:
+            message = f"Amount '{amount}' must be a number"
+        else:
+            good.append(row)
+            continue
+        rejected.append(
+            FilteredInvalidTransaction(
+                date=date if isinstance(date, str) else "",
+                amount=number,
+                message=message,
+            )
+        )
+    return good, rejected
+
+
+def _to_number(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,65 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from service.micro_savings.app.models.periods import PPeriod, QPeriod
+from service.micro_savings.app.models.returns import ReturnRequest, ReturnResponse
+
+
+class WhatIfBaselineRequest(ReturnRequest):
+    scheme: Literal["nps", "index"]
+
+
+class WhatIfBaseline(BaseModel):
+    id: str
+    transactions: int  # valid transactions held by the baseline
+    result: ReturnResponse
+
+
+def check_edit(index: Optional[int], period) -> None:
+    """
+    Raises:
+        ValueError: neither an index nor a period was given.
+    """
+    if index is None and period is None:
+        raise ValueError("Give 'index' to remove, 'period' to add, or both to replace")
+
+
+class QPeriodEdit(BaseModel):
+    # Q period to replace or remove; None → add
+    index: Optional[int] = Field(None, ge=0)
+    period: Optional[QPeriod] = None  # new period; None → remove ``index``
+
+    @model_validator(mode="after")
+    def validate_edit(self):
+        check_edit(self.index, self.period)
+        return self
+
+
+class PPeriodEdit(BaseModel):
+    # P period to replace or remove; None → add
+    index: Optional[int] = Field(None, ge=0)
+    period: Optional[PPeriod] = None  # new period; None → remove ``index``
+
+    @model_validator(mode="after")
+    def validate_edit(self):
+        check_edit(self.index, self.period)
+        return self
+
+
+class WhatIfRequest(BaseModel):
+    q: Optional[QPeriodEdit] = None
+    p: Optional[PPeriodEdit] = None
+    commit: bool = False  # keep the edit as the new baseline
+
+    @model_validator(mode="after")
+    def validate_single_edit(self):
+        if (self.q is None) == (self.p is None):
+            raise ValueError("Exactly one of 'q' or 'p' must be edited")
+        return self
+
+
+class WhatIfResponse(BaseModel):
+    affectedTransactions: int  # transactions re-evaluated for this edit
+    committed: bool
+    result: ReturnResponse
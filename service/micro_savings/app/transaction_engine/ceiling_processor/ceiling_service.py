@@ -1,22 +1,27 @@
-import math
-
 from service.micro_savings.app.models.transaction import (
     RawTransaction,
     ParsedTransaction,
 )
+from service.micro_savings.app.utils.money import (
+    DEFAULT_ROUND_UP,
+    ceiling_paise,
+    from_paise,
+    to_paise,
+)
 
 
-def compute_ceiling(amount: float) -> float:
+def compute_ceiling(amount: float, round_up: int = DEFAULT_ROUND_UP) -> float:
     """
-    Round amount UP to the nearest 100.
+    Round amount UP to the nearest multiple of ``round_up`` (default 100).
 
     Examples:
         250   → 300
         300   → 300  (exact multiple, no change)
         847   → 900
         100.5 → 200
+        847, round_up=50 → 850
     """
-    return math.ceil(amount / 100) * 100
+    return from_paise(ceiling_paise(to_paise(amount), round_up))
 
 
 def compute_remanent(amount: float, ceiling: float) -> float:
@@ -28,26 +33,32 @@ def compute_remanent(amount: float, ceiling: float) -> float:
         amount=250, ceiling=300 → remanent=50
         amount=300, ceiling=300 → remanent=0  (nothing to invest)
     """
-    return round(ceiling - amount, 2)
+    return from_paise(to_paise(ceiling) - to_paise(amount))
 
 
-def parse_single(tx: RawTransaction) -> ParsedTransaction:
+def parse_single(
+    tx: RawTransaction, round_up: int = DEFAULT_ROUND_UP
+) -> ParsedTransaction:
     """
     Enrich a single raw transaction with ceiling + remanent.
+
+    Computed in whole paise, so the amount is taken to the nearest paisa.
     """
-    ceiling = compute_ceiling(tx.amount)
-    remanent = compute_remanent(tx.amount, ceiling)
+    amount = to_paise(tx.amount)
+    ceiling = ceiling_paise(amount, round_up)
     return ParsedTransaction(
         date=tx.date,
         amount=tx.amount,
-        ceiling=ceiling,
-        remanent=remanent,
+        ceiling=from_paise(ceiling),
+        remanent=from_paise(ceiling - amount),
     )
 
 
-def parse_all(transactions: list[RawTransaction]) -> list[ParsedTransaction]:
+def parse_all(
+    transactions: list[RawTransaction], round_up: int = DEFAULT_ROUND_UP
+) -> list[ParsedTransaction]:
     """
     Enrich a list of raw transactions. Processes each independently.
     Order is preserved.
     """
-    return [parse_single(tx) for tx in transactions]
+    return [parse_single(tx, round_up) for tx in transactions]
@@ -0,0 +1,188 @@
+import csv
+import io
+import math
+from typing import List, Optional, Tuple
+
+from service.micro_savings.app.models.transaction import (
+    FilteredInvalidTransaction,
+    TransactionRow,
+)
+from service.micro_savings.app.utils.date_utils import is_valid_date
+
+# Longest record carried over between chunks; longer means a stray quote
+MAX_RECORD_BYTES = 64 * 1024
+
+
+def _records_end(
+    data: bytes, start: int = 0, quoted: bool = False
+) -> Tuple[int, int, bool]:
+    """
+    Find the end of the leading run of complete CSV records in ``data`` —
+    the last newline that is not inside a quoted field — scanning only
+    from ``start``, where a quoted field is open if ``quoted``.
+
+    ``data`` must begin at a record boundary, and ``start`` must follow a
+    newline (or be 0).
+
+    Returns:
+        (end, scanned, quoted): the end of the complete records, where the
+        scan stopped (after the last newline), and whether a quoted field
+        is open there
+    """
+    limit = data.rfind(b"\n", start) + 1
+    if not limit:
+        return 0, start, quoted
+    if not quoted and not data.count(b'"', start, limit):
+        return limit, limit, False
+    last = 0
+    pos = start
+    while (newline := data.find(b"\n", pos, limit)) >= 0:
+        if data.count(b'"', pos, newline) % 2:
+            quoted = not quoted
+        pos = newline + 1
+        if not quoted:
+            last = pos
+    return last, pos, quoted
+
+
+def _header_columns(row: List[str]) -> Optional[Tuple[int, int]]:
+    names = [name.strip().lower() for name in row]
+    if "date" not in names or "amount" not in names:
+        return None
+    return names.index("date"), names.index("amount")
+
+
+class CsvTransactionReader:
+    """
+    Incremental reader for CSV uploads of transactions.
+
+    Bytes are fed in whatever chunks they arrive in; every complete record
+    is checked (date format, finite amount) and converted right away into
+    a ``TransactionRow`` — the date and amount the engines read from a
+    ``RawTransaction`` — so no per-row dict, JSON document or model
+    validation is involved.  Only an incomplete trailing record is carried
+    over to the next chunk; the bytes already scanned for quotes are not
+    scanned again, and a record longer than ``max_record`` bytes (e.g. an
+    unbalanced quote swallowing the rest of the upload) is an error.
+
+    The first non-blank record is the header; it must name a ``date`` and
+    an ``amount`` column (any order, any case, other columns ignored).  A
+    malformed row raises ``ValueError`` with its line number, unless
+    ``lenient`` — then it is kept in ``rejected`` with the reason, as the
+    lenient filter mode reports malformed JSON rows.
+
+    Example:
+        reader = CsvTransactionReader()
+        reader.feed(b"date,amount\\n2023-02-28 15:49:20,37")
+        reader.feed(b"5\\n2023-07-01 21:59:00,620\\n")
+        reader.close()
+        reader.transactions → [TransactionRow(date="2023-02-28 15:49:20",
+                                              amount=375.0), ...]
+    """
+
+    def __init__(
+        self, lenient: bool = False, max_record: int = MAX_RECORD_BYTES
+    ) -> None:
+        self.lenient = lenient
+        self.max_record = max_record
+        self.transactions: List[TransactionRow] = []
+        self.rejected: List[FilteredInvalidTransaction] = []
+        self.lines = 0  # lines read so far, header included
+        self.rows = 0  # data rows read so far, rejected included
+        self._columns: Optional[Tuple[int, int]] = None
+        self._pending = b""
+        self._scanned = 0  # bytes of _pending already scanned for quotes
+        self._quoted = False  # a quoted field is open after them
+
+    def feed(self, data: bytes) -> None:
+        """
+        Read every complete record in ``data`` (plus any carried over).
+
+        Raises:
+            ValueError: malformed header, encoding or (unless lenient) row,
+                or a record longer than ``max_record``.
+        """
+        data = self._pending + data
+        end, scanned, self._quoted = _records_end(data, self._scanned, self._quoted)
+        self._pending = data[end:]
+        self._scanned = scanned - end
+        if end:
+            self._read(data[:end])
+        if len(self._pending) > self.max_record:
+            raise ValueError(
+                f"Line {self.lines + 1}: record is longer than {self.max_record} "
+                "bytes (unbalanced quote?)"
+            )
+
+    def close(self) -> None:
+        """
+        Read the final record if the upload does not end with a newline.
+
+        Raises:
+            ValueError: as for ``feed``, or if there was no header row.
+        """
+        data, self._pending = self._pending, b""
+        self._scanned, self._quoted = 0, False
+        if data.strip():
+            self._read(data)
+        if self._columns is None:
+            raise ValueError("CSV needs a header row naming date and amount columns")
+
+    def _read(self, block: bytes) -> None:
+        try:
+            text = block.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ValueError(f"Line {self.lines + 1}: CSV must be UTF-8 encoded")
+        if self._columns is None and text.startswith("\ufeff"):
+            text = text[1:]  # byte order mark from spreadsheet exports
+
+        reader = csv.reader(io.StringIO(text))
+        try:
+            for row in reader:
+                if not row or (len(row) == 1 and not row[0].strip()):
+                    continue
+                if self._columns is None:
+                    self._columns = _header_columns(row)
+                    if self._columns is None:
+                        raise ValueError(
+                            f"Line {self.lines + reader.line_num}: CSV header "
+                            "must name date and amount columns"
+                        )
+                    continue
+                self._row(row, self.lines + reader.line_num)
+        except csv.Error as exc:
+            raise ValueError(f"Line {self.lines + reader.line_num}: {exc}")
+        self.lines += reader.line_num
+
+    def _row(self, row: List[str], line: int) -> None:
+        self.rows += 1
+        date_at, amount_at = self._columns
+        if len(row) <= max(date_at, amount_at):
+            self._reject(line, "", None, f"Row has {len(row)} fields")
+            return
+
+        date, amount = row[date_at].strip(), row[amount_at].strip()
+        try:
+            number = float(amount)
+        except ValueError:
+            number = None
+        if number is not None and not math.isfinite(number):
+            number = None
+
+        if not is_valid_date(date):
+            message = f"Date '{date}' must be in format YYYY-MM-DD HH:MM:SS"
+        elif number is None:
+            message = f"Amount '{amount}' must be a number"
+        else:
+            self.transactions.append(TransactionRow(date, number))
+            return
+        self._reject(line, date, number, message)
+
+    def _reject(
+        self, line: int, date: str, amount: Optional[float], message: str
+    ) -> None:
+        if not self.lenient:
+            raise ValueError(f"Line {line}: {message}")
+        self.rejected.append(
+            FilteredInvalidTransaction(date=date, amount=amount, message=message)
+        )
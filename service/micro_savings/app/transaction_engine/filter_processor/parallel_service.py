@@ -0,0 +1,191 @@
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from service.micro_savings.app.models.transaction import (
+    FilteredInvalidTransaction,
+    RawTransaction,
+    TransactionRow,
+)
+from service.micro_savings.app.transaction_engine.filter_processor.qpk_service import (
+    _iter_rules,
+    _validate_transactions,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    CompiledPeriods,
+    SharedPeriods,
+    share_periods,
+)
+from service.micro_savings.app.utils.money import DEFAULT_ROUND_UP
+from service.micro_savings.app.utils.tracing import span
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+
+# Period blocks this worker process has attached, most recently used last
+_attached: "OrderedDict[str, SharedPeriods]" = OrderedDict()
+_MAX_ATTACHED = 8
+
+
+def _shared_periods(name: str) -> SharedPeriods:
+    periods = _attached.get(name)
+    if periods is None:
+        periods = _attached[name] = SharedPeriods(name)
+        while len(_attached) > _MAX_ATTACHED:
+            _attached.popitem(last=False)[1].close()
+    _attached.move_to_end(name)
+    return periods
+
+
+def _filter_chunk(
+    block_name: str, rows: Sequence[Tuple[str, float]], round_up: int
+) -> Tuple[bytes, bytes]:
+    """
+    Steps 2–5 of the filter pipeline for one chunk, in a worker process.
+
+    Returns:
+        (valid records, invalid records) as comma-joined JSON objects
+    """
+    periods = _shared_periods(block_name)
+    valid: List[bytes] = []
+    invalid: List[bytes] = []
+    for is_valid, record in _iter_rules(
+        [TransactionRow(date, amount) for date, amount in rows], periods, round_up
+    ):
+        (valid if is_valid else invalid).append(record.model_dump_json().encode())
+    return b",".join(valid), b",".join(invalid)
+
+
+def _ready() -> None:
+    """Submitted once per worker at start so processes boot before traffic."""
+
+
+# ── Parent side ───────────────────────────────────────────────────────────────
+
+
+class ParallelFilter:
+    """
+    Runs the filter pipeline for large batches across ``workers`` processes
+    and returns the encoded ``FilterResult`` body.
+
+    Validation (its duplicate check spans the whole batch) stays in the
+    calling thread.  The surviving transactions are split into chunks of
+    ``chunk_size``; each worker runs the same per-transaction rules as the
+    sequential pipeline — date parsing, ceiling, Q / P lookups, K
+    membership — and serializes its records, so building and encoding the
+    response models happens in parallel too.  The compiled periods are
+    copied once per request into a shared memory block that every worker
+    reads in place; only the chunk's (date, amount) pairs and the encoded
+    records cross process boundaries.  Chunks are joined in input order,
+    so the body matches the sequential endpoint's.
+
+    Batches under ``min_transactions`` should run sequentially (see
+    ``accepts``) — for them, the inter-process round trip costs more than
+    it saves.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        chunk_size: int = 25_000,
+        min_transactions: int = 50_000,
+    ) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.min_transactions = min_transactions
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.chunks = 0
+
+    def start(self) -> None:
+        """Start the worker processes (the forkserver preloads the engine)."""
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload([__name__])
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_ready)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def accepts(self, transactions: int) -> bool:
+        return self._executor is not None and transactions >= self.min_transactions
+
+    def filter_json(
+        self,
+        raw_transactions: List[RawTransaction],
+        periods: CompiledPeriods,
+        round_up: int = DEFAULT_ROUND_UP,
+        rejected: Sequence[FilteredInvalidTransaction] = (),
+    ) -> bytes:
+        """
+        The JSON ``FilterResult`` for a batch: ``rejected`` (malformed rows
+        from lenient mode) and validation failures first in ``invalid``,
+        then every transaction's record in input order.
+        """
+        with span("qpk.validate", transactions=len(raw_transactions)):
+            valid_raw, invalid_out = _validate_transactions(raw_transactions)
+
+        size = self.chunk_size
+        starts = range(0, len(valid_raw), size)
+        block = share_periods(periods)
+        try:
+            with span(
+                "qpk.rules",
+                transactions=len(valid_raw),
+                chunks=len(starts),
+                workers=self.workers,
+            ):
+                futures = [
+                    self._executor.submit(
+                        _filter_chunk,
+                        block.name,
+                        [(tx.date, tx.amount) for tx in valid_raw[i : i + size]],
+                        round_up,
+                    )
+                    for i in starts
+                ]
+                valid_parts: List[bytes] = []
+                invalid_parts = [
+                    record.model_dump_json().encode()
+                    for record in (*rejected, *invalid_out)
+                ]
+                for future in futures:
+                    valid, invalid = future.result()
+                    if valid:
+                        valid_parts.append(valid)
+                    if invalid:
+                        invalid_parts.append(invalid)
+        finally:
+            block.close()
+            block.unlink()
+
+        with self._lock:
+            self.requests += 1
+            self.chunks += len(starts)
+        return (
+            b'{"valid":['
+            + b",".join(valid_parts)
+            + b'],"invalid":['
+            + b",".join(invalid_parts)
+            + b"]}"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "chunkSize": self.chunk_size,
+            "minTransactions": self.min_transactions,
+            "requests": self.requests,
+            "chunks": self.chunks,
+        }
@@ -1,5 +1,4 @@
-import math
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Optional, Tuple, Union
 
 from service.micro_savings.app.models.periods import QPeriod, PPeriod, KPeriod
 from service.micro_savings.app.models.transaction import (
@@ -9,19 +8,18 @@ from service.micro_savings.app.models.transaction import (
     AppliedQ,
     AppliedP,
 )
-from service.micro_savings.app.utils.date_utils import is_in_period, parse_dt
-
-# ── Step 1: Parse ─────────────────────────────────────────────────────────────
-
-
-def _compute_ceiling(amount: float) -> float:
-    """Round amount UP to the nearest multiple of 100."""
-    return math.ceil(amount / 100) * 100
-
-
-def _compute_remanent(amount: float, ceiling: float) -> float:
-    return round(ceiling - amount, 2)
-
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    CompiledPeriods,
+    compile_periods,
+)
+from service.micro_savings.app.utils.date_utils import is_in_period, to_epoch
+from service.micro_savings.app.utils.money import (
+    DEFAULT_ROUND_UP,
+    ceiling_paise,
+    from_paise,
+    to_paise,
+)
+from service.micro_savings.app.utils.tracing import span
 
 # ── Step 2: Validate ──────────────────────────────────────────────────────────
 
@@ -83,69 +81,144 @@ def _validate_transactions(
 
 
 def _apply_q_rule(
-    date: str,
-    base_remanent: float,
-    q_periods: List[QPeriod],
-) -> Tuple[float, Optional[AppliedQ]]:
+    ts: int,
+    base_remanent: int,
+    periods: CompiledPeriods,
+) -> Tuple[int, Optional[AppliedQ]]:
     """
     Hard override: if ANY Q period contains this date, replace remanent
     with that Q period's fixed amount.
 
     Conflict resolution: when multiple Q periods match, the one whose
     start date is LATEST wins.  Ties (same start) → first in the list wins.
+    The winner for every date range is precomputed in ``compile_periods``.
 
     Returns:
-        (updated_remanent, AppliedQ | None)
+        (updated_remanent in paise, AppliedQ | None)
     """
-    matching = [q for q in q_periods if is_in_period(date, q.start, q.end)]
-    if not matching:
+    fixed = periods.q_fixed_paise(ts)
+    if fixed is None:
         return base_remanent, None
-
-    # Sort: primary = latest start (desc), secondary = original list order (preserved
-    # because Python sort is stable — we reverse only on the datetime key).
-    winning = max(matching, key=lambda q: parse_dt(q.start))
-    return winning.fixed, AppliedQ(fixed=winning.fixed)
+    return fixed, AppliedQ(fixed=from_paise(fixed))
 
 
 # ── Step 3b: P rule ───────────────────────────────────────────────────────────
 
 
 def _apply_p_rule(
-    date: str,
-    base_remanent: float,
-    p_periods: List[PPeriod],
-) -> Tuple[float, List[AppliedP]]:
+    ts: int,
+    base_remanent: int,
+    periods: CompiledPeriods,
+) -> Tuple[int, List[AppliedP]]:
     """
     Stacking bonus: ALL P periods that contain this date add their extra
     to the remanent.  Applied AFTER Q so even a Q=0 remanent receives P.
 
     Returns:
-        (updated_remanent, [AppliedP, ...])
+        (updated_remanent in paise, [AppliedP, ...])
     """
     applied: List[AppliedP] = []
-    for p in p_periods:
-        if is_in_period(date, p.start, p.end):
-            base_remanent += p.extra
-            applied.append(AppliedP(extra=p.extra))
+    for extra in periods.p_extras_paise(ts):
+        base_remanent += extra
+        applied.append(AppliedP(extra=from_paise(extra)))
     return base_remanent, applied
 
 
 # ── Step 3c: K membership ─────────────────────────────────────────────────────
 
 
-def _in_any_k_period(date: str, k_periods: List[KPeriod]) -> bool:
+def _in_any_k_period(ts: int, periods: CompiledPeriods) -> bool:
     """True if the date falls within at least one K reporting window."""
-    return any(is_in_period(date, k.start, k.end) for k in k_periods)
+    return bool(periods.k_indices(ts))
 
 
 # ── Orchestrator ──────────────────────────────────────────────────────────────
 
 
+def iter_qpk(
+    raw_transactions: List[RawTransaction],
+    q_periods: List[QPeriod],
+    p_periods: List[PPeriod],
+    k_periods: List[KPeriod],
+    round_up: int = DEFAULT_ROUND_UP,
+) -> Iterator[Tuple[bool, Union[FilteredTransaction, FilteredInvalidTransaction]]]:
+    """
+    Lazily run the filter pipeline, yielding one record at a time.
+
+    Yields ``(True, FilteredTransaction)`` for valid records and
+    ``(False, FilteredInvalidTransaction)`` for invalid ones.  Validation
+    failures are yielded first, followed by every surviving transaction in
+    input order — the same order ``apply_qpk`` collects them in.
+
+    Only the output records are lazy.  Validation runs up front on the first
+    ``next()``: the duplicate-timestamp counts, the surviving transactions and
+    every validation failure are materialised as lists, so memory still grows
+    with the input.  What callers avoid is building the filtered models for
+    records they never consume (a page, or a stream the client abandons).
+    """
+    return iter_qpk_compiled(
+        raw_transactions, compile_periods(q_periods, p_periods, k_periods), round_up
+    )
+
+
+def iter_qpk_compiled(
+    raw_transactions: List[RawTransaction],
+    periods: CompiledPeriods,
+    round_up: int = DEFAULT_ROUND_UP,
+) -> Iterator[Tuple[bool, Union[FilteredTransaction, FilteredInvalidTransaction]]]:
+    """``iter_qpk`` against an already compiled (e.g. registered) period set."""
+    # ── 1. Validate ───────────────────────────────────────────────────────────
+    valid_raw, validation_invalids = _validate_transactions(raw_transactions)
+    for invalid in validation_invalids:
+        yield False, invalid
+
+    # ── 2–5. Parse + Q/P/K per surviving transaction ──────────────────────────
+    yield from _iter_rules(valid_raw, periods, round_up)
+
+
+def _iter_rules(
+    valid_raw: List[RawTransaction],
+    periods: CompiledPeriods,
+    round_up: int,
+) -> Iterator[Tuple[bool, Union[FilteredTransaction, FilteredInvalidTransaction]]]:
+    # Money stays in integer paise until the response models are built
+    for tx in valid_raw:
+        ts = to_epoch(tx.date)
+        amount = to_paise(tx.amount)
+        ceiling = ceiling_paise(amount, round_up)
+
+        # 3. Q rule
+        remanent, applied_q = _apply_q_rule(ts, ceiling - amount, periods)
+
+        # 4. P rule
+        remanent, applied_p = _apply_p_rule(ts, remanent, periods)
+
+        # 5. K check
+        if not _in_any_k_period(ts, periods):
+            yield False, FilteredInvalidTransaction(
+                date=tx.date,
+                amount=tx.amount,
+                message="Transaction date is not within any K period",
+            )
+            continue
+
+        yield True, FilteredTransaction(
+            date=tx.date,
+            amount=tx.amount,
+            ceiling=from_paise(ceiling),
+            remanent=from_paise(remanent),
+            appliedQ=applied_q,
+            appliedP=applied_p,
+            inKPeriod=True,
+        )
+
+
 def apply_qpk(
     raw_transactions: List[RawTransaction],
     q_periods: List[QPeriod],
     p_periods: List[PPeriod],
     k_periods: List[KPeriod],
+    round_up: int = DEFAULT_ROUND_UP,
 ) -> Tuple[List[FilteredTransaction], List[FilteredInvalidTransaction]]:
     """
     Full filter pipeline for a list of raw transactions.
@@ -162,52 +235,30 @@ def apply_qpk(
         q_periods        : fixed-override periods
         p_periods        : extra-bonus periods
         k_periods        : reporting windows
+        round_up         : ceiling granularity in rupees (10, 50, 100, 500)
 
     Returns:
         (valid_filtered, invalid_list)
     """
-    valid_out: List[FilteredTransaction] = []
-    invalid_out: List[FilteredInvalidTransaction] = []
-
-    # ── 1. Validate ───────────────────────────────────────────────────────────
-    valid_raw, validation_invalids = _validate_transactions(raw_transactions)
-    invalid_out.extend(validation_invalids)
-
-    # ── 2–5. Parse + Q/P/K per surviving transaction ──────────────────────────
-    for tx in valid_raw:
-        ceiling = _compute_ceiling(tx.amount)
-        remanent = _compute_remanent(tx.amount, ceiling)
-
-        # 3. Q rule
-        remanent, applied_q = _apply_q_rule(tx.date, remanent, q_periods)
+    return apply_qpk_compiled(
+        raw_transactions, compile_periods(q_periods, p_periods, k_periods), round_up
+    )
 
-        # 4. P rule
-        remanent, applied_p = _apply_p_rule(tx.date, remanent, p_periods)
 
-        remanent = round(remanent, 2)
+def apply_qpk_compiled(
+    raw_transactions: List[RawTransaction],
+    periods: CompiledPeriods,
+    round_up: int = DEFAULT_ROUND_UP,
+) -> Tuple[List[FilteredTransaction], List[FilteredInvalidTransaction]]:
+    """``apply_qpk`` against an already compiled (e.g. registered) period set."""
+    valid_out: List[FilteredTransaction] = []
 
-        # 5. K check
-        if not _in_any_k_period(tx.date, k_periods):
-            invalid_out.append(
-                FilteredInvalidTransaction(
-                    date=tx.date,
-                    amount=tx.amount,
-                    message="Transaction date is not within any K period",
-                )
-            )
-            continue
+    with span("qpk.validate", transactions=len(raw_transactions)):
+        valid_raw, invalid_out = _validate_transactions(raw_transactions)
 
-        valid_out.append(
-            FilteredTransaction(
-                date=tx.date,
-                amount=tx.amount,
-                ceiling=ceiling,
-                remanent=remanent,
-                appliedQ=applied_q,
-                appliedP=applied_p,
-                inKPeriod=True,
-            )
-        )
+    with span("qpk.rules", transactions=len(valid_raw)):
+        for is_valid, record in _iter_rules(valid_raw, periods, round_up):
+            (valid_out if is_valid else invalid_out).append(record)
 
     return valid_out, invalid_out
 
@@ -226,6 +277,8 @@ def sum_remanents_for_k_period(
     calculates its own independent sum.
     """
     total = sum(
-        tx.remanent for tx in transactions if is_in_period(tx.date, k.start, k.end)
+        to_paise(tx.remanent)
+        for tx in transactions
+        if is_in_period(tx.date, k.start, k.end)
     )
-    return round(total, 2)
+    return from_paise(total)
@@ -0,0 +1,289 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job at its next stage once it has been cancelled."""
+
+
+class JobQueueFull(Exception):
+    """Raised when ``max_queued`` jobs are already waiting for a worker."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("job queue is full")
+        self.retry_after = retry_after
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+class Job:
+    """
+    One submitted computation and its progress.
+
+    ``stages`` are the names the computation reports through
+    ``enter_stage`` in order; stages it skips (e.g. "time_weight" for a
+    fixed-horizon projection) are reported as "skipped" once it finishes.
+    """
+
+    def __init__(self, kind: str, stages: Sequence[str]) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.stages = list(stages)
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.stage_seconds: Dict[str, float] = {}
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.expires: Optional[float] = None  # monotonic, once finished
+        self._cancelled = threading.Event()
+        self._stage_started: Optional[float] = None
+        self._future: Optional[Future] = None
+
+    def enter_stage(self, name: str) -> None:
+        """
+        Called by the computation before each stage.
+
+        Raises:
+            JobCancelled: the job was cancelled since the previous stage.
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled()
+        self._close_stage()
+        self.stage = name
+        self._stage_started = time.perf_counter()
+
+    def _close_stage(self) -> None:
+        if self.stage is not None and self._stage_started is not None:
+            self.stage_seconds[self.stage] = time.perf_counter() - self._stage_started
+        self._stage_started = None
+
+    def progress(self) -> float:
+        """Fraction of stages finished (skipped stages count once done)."""
+        if self.status == "succeeded":
+            return 1.0
+        return round(len(self.stage_seconds) / max(len(self.stages), 1), 3)
+
+    def stage_states(self) -> List[dict]:
+        states = []
+        for name in self.stages:
+            if name in self.stage_seconds:
+                state = "done"
+            elif name == self.stage and self.status in ("running", "failed"):
+                state = self.status
+            elif self.status == "succeeded":
+                state = "skipped"
+            else:
+                state = "pending"
+            seconds = self.stage_seconds.get(name)
+            states.append(
+                {
+                    "name": name,
+                    "status": state,
+                    "seconds": round(seconds, 6) if seconds is not None else None,
+                }
+            )
+        return states
+
+
+class JobManager:
+    """
+    Runs long computations on a bounded pool of ``workers`` threads of its
+    own, so they hold neither an HTTP connection nor a slot in the server's
+    request thread pool.
+
+    At most ``max_queued`` jobs wait for a worker; beyond that ``submit``
+    raises ``JobQueueFull`` with a Retry-After estimate from the mean job
+    duration.  Cancelling a queued job drops it before it starts; a running
+    job stops at its next stage.  Finished jobs (and their results) are
+    kept for ``ttl`` seconds, then expire — checked lazily on every call,
+    so no timer thread is needed.  At most ``max_finished`` are kept at
+    once; beyond that the longest-finished are evicted early.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queued: int = 16,
+        ttl: float = 900.0,
+        max_retry_after: int = 60,
+        max_finished: int = 64,
+    ) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.max_retry_after = max_retry_after
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="job-worker"
+        )
+        self.submitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.evicted = 0
+        self.finished = {"succeeded": 0, "failed": 0, "cancelled": 0}
+        self._run_seconds = 0.0
+
+    def submit(
+        self,
+        kind: str,
+        stages: Sequence[str],
+        fn: Callable[[Callable[[str], None]], Any],
+    ) -> Job:
+        """
+        Queue ``fn(enter_stage)``; its return value becomes the job result.
+
+        Raises:
+            JobQueueFull: ``max_queued`` jobs are already waiting.
+        """
+        job = Job(kind, stages)
+        with self._lock:
+            self._expire()
+            queued = sum(1 for j in self._jobs.values() if j.status == "queued")
+            if queued >= self.max_queued:
+                self.rejected += 1
+                raise JobQueueFull(self._retry_after(queued))
+            self._jobs[job.id] = job
+            self.submitted += 1
+        job._future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _retry_after(self, queued: int) -> int:
+        done = sum(self.finished.values())
+        mean = self._run_seconds / done if done else 1.0
+        estimate = math.ceil(mean * (queued + 1) / self.workers)
+        return min(max(estimate, 1), self.max_retry_after)
+
+    def _run(self, job: Job, fn: Callable[[Callable[[str], None]], Any]) -> None:
+        if job._cancelled.is_set():
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        job.started_at = _now()
+        started = time.perf_counter()
+        try:
+            result = fn(job.enter_stage)
+        except JobCancelled:
+            self._finish(job, "cancelled", started)
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            logger.bind(jobId=job.id, kind=job.kind).exception("Job failed")
+            self._finish(job, "failed", started)
+        else:
+            job.result = result
+            self._finish(job, "succeeded", started)
+
+    def _finish(self, job: Job, status: str, started: Optional[float] = None) -> None:
+        if status == "succeeded":
+            job._close_stage()
+        else:
+            job.result = None
+        job.status = status
+        job.finished_at = _now()
+        job.expires = time.monotonic() + self.ttl
+        with self._lock:
+            self.finished[status] += 1
+            if started is not None:
+                self._run_seconds += time.perf_counter() - started
+            self._evict()
+
+    def _expire(self) -> None:
+        """Drop finished jobs past their TTL.  Caller holds the lock."""
+        now = time.monotonic()
+        for job_id in [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.expires is not None and job.expires <= now
+        ]:
+            del self._jobs[job_id]
+            self.expired += 1
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs over ``max_finished``; caller holds the lock."""
+        finished = [job for job in self._jobs.values() if job.expires is not None]
+        excess = len(finished) - self.max_finished
+        if excess <= 0:
+            return
+        finished.sort(key=lambda job: job.expires)
+        for job in finished[:excess]:
+            del self._jobs[job.id]
+            self.evicted += 1
+
+    def get(self, job_id: str) -> Job:
+        """
+        Raises:
+            KeyError: unknown, cancelled, expired or evicted ID
+        """
+        with self._lock:
+            self._expire()
+            return self._jobs[job_id]
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a job that has not finished and discard it with its result.
+
+        Raises:
+            KeyError: unknown, cancelled or expired ID
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.pop(job_id)
+        job._cancelled.set()
+        if job._future is not None and job._future.cancel():
+            self._finish(job, "cancelled")  # never started
+        return job
+
+    def reset_counters(self) -> None:
+        """Zero the submitted / rejected / expired / evicted / finished counters."""
+        with self._lock:
+            self.submitted = self.rejected = self.expired = self.evicted = 0
+            self.finished = {status: 0 for status in self.finished}
+            self._run_seconds = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire()
+            by_status = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                by_status[job.status] += 1
+            done = sum(self.finished.values())
+            return {
+                "workers": self.workers,
+                "maxQueued": self.max_queued,
+                "ttlSeconds": self.ttl,
+                "maxFinished": self.max_finished,
+                "jobs": by_status,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "finished": dict(self.finished),
+                "meanRunSeconds": (
+                    round(self._run_seconds / done, 6) if done else None
+                ),
+            }
+
+    def shutdown(self) -> None:
+        """Cancel every job and stop the workers without waiting for them."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            job._cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,386 @@
+import hashlib
+import json
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from service.micro_savings.app.models.periods import (
+    QPeriod,
+    PPeriod,
+    KPeriod,
+    PeriodSet,
+)
+from service.micro_savings.app.utils.date_utils import to_epoch
+from service.micro_savings.app.utils.money import from_paise, to_paise
+from service.micro_savings.app.utils.shared_cache import Handle, SharedCache
+
+# ── Segment index ─────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class SegmentIndex:
+    """
+    A set of (possibly overlapping) periods flattened into disjoint segments.
+
+    ``bounds[i]`` is the first second of segment i, which runs up to (not
+    including) ``bounds[i + 1]``.  ``values[i]`` is the precomputed rule
+    result for any timestamp inside that segment, so a lookup is a single
+    binary search regardless of how many periods overlap.
+    """
+
+    bounds: Tuple[int, ...]
+    values: Tuple[Any, ...]
+    default: Any
+
+    def lookup(self, ts: int) -> Any:
+        i = bisect_right(self.bounds, ts) - 1
+        return self.values[i] if i >= 0 else self.default
+
+
+def _build_segments(
+    intervals: Sequence[Tuple[int, int]],
+    summarize: Callable[[List[int]], Any],
+    default: Any,
+) -> SegmentIndex:
+    """
+    Sweep over inclusive [start, end] intervals and precompute
+    ``summarize(active_indices)`` for every elementary segment.
+
+    ``active_indices`` is sorted, i.e. in the periods' original list order.
+    Adjacent segments with equal values are merged.
+    """
+    events: dict[int, List[Tuple[bool, int]]] = {}
+    for idx, (start, end) in enumerate(intervals):
+        if start > end:
+            continue  # empty period never matches
+        events.setdefault(start, []).append((True, idx))
+        events.setdefault(end + 1, []).append((False, idx))
+
+    bounds: List[int] = []
+    values: List[Any] = []
+    active: set[int] = set()
+    for point in sorted(events):
+        for is_start, idx in events[point]:
+            if is_start:
+                active.add(idx)
+            else:
+                active.discard(idx)
+        value = summarize(sorted(active)) if active else default
+        if values and values[-1] == value:
+            continue
+        bounds.append(point)
+        values.append(value)
+
+    return SegmentIndex(bounds=tuple(bounds), values=tuple(values), default=default)
+
+
+# ── Compiled period set ───────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class CompiledPeriods:
+    """
+    Q / P / K periods compiled into segment lookups keyed by epoch seconds.
+
+    q → winning Q fixed value in paise (latest start wins, ties → first
+        listed) or None
+    p → tuple of matching P extras in paise, in list order
+    k → tuple of indices into ``k_periods`` of the windows containing the date
+
+    The engines work on the ``*_paise`` lookups; ``q_fixed`` / ``p_extras``
+    return the same values in rupees.
+    """
+
+    q: SegmentIndex
+    p: SegmentIndex
+    k: SegmentIndex
+    k_periods: Tuple[KPeriod, ...]
+
+    def q_fixed_paise(self, ts: int) -> Optional[int]:
+        return self.q.lookup(ts)
+
+    def p_extras_paise(self, ts: int) -> Tuple[int, ...]:
+        return self.p.lookup(ts)
+
+    def q_fixed(self, ts: int) -> Optional[float]:
+        fixed = self.q.lookup(ts)
+        return None if fixed is None else from_paise(fixed)
+
+    def p_extras(self, ts: int) -> Tuple[float, ...]:
+        return tuple(from_paise(extra) for extra in self.p.lookup(ts))
+
+    def k_indices(self, ts: int) -> Tuple[int, ...]:
+        return self.k.lookup(ts)
+
+
+def compile_periods(
+    q_periods: Sequence[QPeriod],
+    p_periods: Sequence[PPeriod],
+    k_periods: Sequence[KPeriod],
+) -> CompiledPeriods:
+    """
+    Parse every period boundary once and flatten each rule into a
+    ``SegmentIndex``.  Per-transaction evaluation then costs one binary
+    search per rule instead of re-parsing every period's dates.
+    """
+    q_bounds = [(to_epoch(q.start), to_epoch(q.end)) for q in q_periods]
+    p_bounds = [(to_epoch(p.start), to_epoch(p.end)) for p in p_periods]
+    k_bounds = [(to_epoch(k.start), to_epoch(k.end)) for k in k_periods]
+    q_fixed = [to_paise(q.fixed) for q in q_periods]
+    p_extra = [to_paise(p.extra) for p in p_periods]
+
+    def q_winner(active: List[int]) -> int:
+        # Latest start wins; max() keeps the first of equal keys → list order
+        return q_fixed[max(active, key=lambda i: q_bounds[i][0])]
+
+    return CompiledPeriods(
+        q=_build_segments(q_bounds, q_winner, None),
+        p=_build_segments(
+            p_bounds, lambda active: tuple(p_extra[i] for i in active), ()
+        ),
+        k=_build_segments(k_bounds, tuple, ()),
+        k_periods=tuple(k_periods),
+    )
+
+
+# ── Shared memory ─────────────────────────────────────────────────────────────
+#
+# Layout (native int64): a header of (segments, flat values) per index for q,
+# p and k, then per index its bounds, n + 1 value offsets and the flat values.
+# Every segment value is a run of ints: q → () or (fixed,), p → extras,
+# k → window indices.
+
+
+def _segment_runs(index: SegmentIndex, as_run: Callable[[Any], Tuple[int, ...]]):
+    offsets = [0]
+    flat: List[int] = []
+    for value in index.values:
+        flat.extend(as_run(value))
+        offsets.append(len(flat))
+    return list(index.bounds), offsets, flat
+
+
+def share_periods(periods: CompiledPeriods) -> SharedMemory:
+    """
+    Copy the q / p / k lookups into a new shared memory block that other
+    processes can read with ``SharedPeriods``.  The caller owns the block
+    and must ``close()`` and ``unlink()`` it.
+    """
+    runs = [
+        _segment_runs(periods.q, lambda fixed: () if fixed is None else (fixed,)),
+        _segment_runs(periods.p, tuple),
+        _segment_runs(periods.k, tuple),
+    ]
+    words = array("q")
+    for bounds, _, flat in runs:
+        words.extend((len(bounds), len(flat)))
+    for bounds, offsets, flat in runs:
+        words.extend(bounds)
+        words.extend(offsets)
+        words.extend(flat)
+    block = SharedMemory(create=True, size=max(len(words) * words.itemsize, 1))
+    block.buf[: len(words) * words.itemsize] = words.tobytes()
+    return block
+
+
+class _SharedSegments:
+    """One ``SegmentIndex`` read in place from a shared int64 view."""
+
+    def __init__(self, words: memoryview, at: int, segments: int, values: int):
+        self.bounds = words[at : at + segments]
+        self.offsets = words[at + segments : at + 2 * segments + 1]
+        self.flat = words[at + 2 * segments + 1 : at + 2 * segments + 1 + values]
+
+    def lookup(self, ts: int) -> Tuple[int, ...]:
+        i = bisect_right(self.bounds, ts) - 1
+        if i < 0:
+            return ()
+        return tuple(self.flat[self.offsets[i] : self.offsets[i + 1]])
+
+
+class SharedPeriods:
+    """
+    Read-only ``CompiledPeriods`` lookups over a block from
+    ``share_periods``, attached by name — the period data is mapped, not
+    copied or pickled, into every process that reads it.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.block = SharedMemory(name=name)
+        words = self.block.buf.cast("q")
+        self._words = words
+        at = 6
+        indexes = []
+        for i in range(3):
+            segments, values = words[2 * i], words[2 * i + 1]
+            indexes.append(_SharedSegments(words, at, segments, values))
+            at += 2 * segments + 1 + values
+        self.q, self.p, self.k = indexes
+
+    def q_fixed_paise(self, ts: int) -> Optional[int]:
+        run = self.q.lookup(ts)
+        return run[0] if run else None
+
+    def p_extras_paise(self, ts: int) -> Tuple[int, ...]:
+        return self.p.lookup(ts)
+
+    def k_indices(self, ts: int) -> Tuple[int, ...]:
+        return self.k.lookup(ts)
+
+    def close(self) -> None:
+        # Views into the block must be released before it can be unmapped
+        for index in (self.q, self.p, self.k):
+            for view in (index.bounds, index.offsets, index.flat):
+                view.release()
+        self._words.release()
+        self.block.close()
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+
+def period_set_id(period_set: PeriodSet) -> str:
+    """
+    Content-addressed ID: registering the same periods twice returns the
+    same ID, on any worker.
+    """
+    canonical = json.dumps(period_set.model_dump(), sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:24]
+
+
+class PeriodSetTooLarge(Exception):
+    """Raised when a period set does not fit a slot of the shared cache."""
+
+    def __init__(self, size: int, limit: int) -> None:
+        super().__init__(f"period set is {size} bytes serialized, over {limit}")
+        self.size = size
+        self.limit = limit
+
+
+class PeriodRegistry:
+    """
+    In-memory LRU cache of registered, precompiled period sets.
+
+    Created once in ``lifespan`` and stored on ``app.state.period_registry``.
+    Thread-safe: sync endpoints run on the thread pool.
+
+    With a ``shared`` cache (several server workers on one host), every set
+    is also stored there and the shared cache decides which sets exist: a
+    set registered through one worker resolves on all of them, and a set
+    removed or evicted there is gone on all of them.  The local LRU then
+    only keeps compiled copies of hot sets, each checked against its shared
+    slot (a lock-free read) before use.
+    """
+
+    def __init__(
+        self, max_size: int = 256, shared: Optional[SharedCache] = None
+    ) -> None:
+        self.max_size = max_size
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[PeriodSet, CompiledPeriods]]" = (
+            OrderedDict()
+        )
+        self._handles: Dict[str, Handle] = {}
+
+    def _store(
+        self,
+        set_id: str,
+        entry: Tuple[PeriodSet, CompiledPeriods],
+        handle: Optional[Handle],
+    ) -> None:
+        with self._lock:
+            self._entries[set_id] = entry
+            self._entries.move_to_end(set_id)
+            if handle is not None:
+                self._handles[set_id] = handle
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                self._handles.pop(evicted, None)
+
+    def register(self, period_set: PeriodSet) -> str:
+        """
+        Raises:
+            PeriodSetTooLarge: the set does not fit a shared cache slot, so
+                it could not be resolved on the other workers.
+        """
+        set_id = period_set_id(period_set)
+        handle = None
+        if self.shared is not None:
+            value = period_set.model_dump_json().encode()
+            handle = self.shared.put(set_id, value)
+            if handle is None:
+                raise PeriodSetTooLarge(len(value), self.shared.slot_size)
+        with self._lock:
+            entry = self._entries.get(set_id)
+        if entry is None:
+            entry = (
+                period_set,
+                compile_periods(period_set.q, period_set.p, period_set.k),
+            )
+        self._store(set_id, entry, handle)
+        return set_id
+
+    def get(self, set_id: str) -> Tuple[PeriodSet, CompiledPeriods]:
+        """
+        Raises:
+            KeyError: if the ID was never registered or has been evicted.
+        """
+        with self._lock:
+            entry = self._entries.get(set_id)
+            handle = self._handles.get(set_id)
+            if entry is not None and (handle is None or self.shared.is_current(handle)):
+                self._entries.move_to_end(set_id)
+                return entry
+        if self.shared is None:
+            raise KeyError(set_id)
+        found = self.shared.get(set_id)
+        if found is None:
+            with self._lock:
+                self._entries.pop(set_id, None)
+                self._handles.pop(set_id, None)
+            raise KeyError(set_id)
+        value, handle = found
+        if entry is None:  # IDs are content hashes: a local copy stays valid
+            period_set = PeriodSet.model_validate_json(value)
+            entry = (
+                period_set,
+                compile_periods(period_set.q, period_set.p, period_set.k),
+            )
+        self._store(set_id, entry, handle)
+        return entry
+
+    def remove(self, set_id: str) -> None:
+        """
+        Raises:
+            KeyError: if the ID is not registered (on any worker).
+        """
+        with self._lock:
+            removed = self._entries.pop(set_id, None) is not None
+            self._handles.pop(set_id, None)
+        if self.shared is not None:
+            removed = self.shared.remove(set_id) or removed
+        if not removed:
+            raise KeyError(set_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def resolve(
+        self,
+        set_id: Optional[str],
+        q_periods: Sequence[QPeriod],
+        p_periods: Sequence[PPeriod],
+        k_periods: Sequence[KPeriod],
+    ) -> CompiledPeriods:
+        """
+        Periods for one request: the registered set when an ID is given,
+        otherwise the inline lists compiled on the spot.
+        """
+        if set_id is not None:
+            return self.get(set_id)[1]
+        return compile_periods(q_periods, p_periods, k_periods)
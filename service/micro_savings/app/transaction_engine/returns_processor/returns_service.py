@@ -1,18 +1,32 @@
-import math
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from service.micro_savings.app.models.periods import QPeriod, PPeriod, KPeriod
 from service.micro_savings.app.models.returns import ReturnResponse, SavingsByDate
-from service.micro_savings.app.models.transaction import (
-    RawTransaction,
-    FilteredTransaction,
-    AppliedQ,
-    AppliedP,
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    CompiledPeriods,
+    compile_periods,
+)
+from service.micro_savings.app.transaction_engine.rollup_processor.rollup_service import (
+    RemanentRollup,
 )
 from service.micro_savings.app.transaction_engine.tax_processor.tax_service import (
-    compute_nps_tax_benefit,
+    DEFAULT_TAX_TABLE,
+    get_tax_table,
+    nps_tax_benefits,
+)
+from service.micro_savings.app.utils.date_utils import (
+    parse_dt,
+    to_epoch,
+    years_between,
 )
-from service.micro_savings.app.utils.date_utils import is_in_period, parse_dt
+from service.micro_savings.app.utils.money import (
+    DEFAULT_ROUND_UP,
+    ceiling_paise,
+    from_paise,
+    to_paise,
+)
+from service.micro_savings.app.utils.tracing import span
 
 # Using explicit constants directly based on the PDF
 NPS_RATE = 0.0711
@@ -21,36 +35,27 @@ RETIREMENT_AGE = 60
 MIN_YEARS_TO_RETIREMENT = 5
 
 
-def _apply_q(
-    date: str, remanent: float, q_periods: List[QPeriod]
-) -> Tuple[float, Optional[AppliedQ]]:
-    matching = [q for q in q_periods if is_in_period(date, q.start, q.end)]
-    if not matching:
-        return remanent, None
-    winner = max(matching, key=lambda q: parse_dt(q.start))
-    return winner.fixed, AppliedQ(fixed=winner.fixed)
-
-
-def _apply_p(
-    date: str, remanent: float, p_periods: List[PPeriod]
-) -> Tuple[float, List[AppliedP]]:
-    applied: List[AppliedP] = []
-    for p in p_periods:
-        if is_in_period(date, p.start, p.end):
-            remanent += p.extra
-            applied.append(AppliedP(extra=p.extra))
-    return remanent, applied
-
-
-def _build_filtered_transactions(
+def _build_remanents(
     raw: List[RawTransaction],
-    q_periods: List[QPeriod],
-    p_periods: List[PPeriod],
-) -> Tuple[List[FilteredTransaction], float, float]:
+    periods: CompiledPeriods,
+    round_up: int = DEFAULT_ROUND_UP,
+) -> Tuple[List[str], List[int], List[int], int, int]:
+    """
+    Run parse → validate → Q/P for the returns pipeline, in integer paise.
+
+    Only what the projection needs is kept — no per-transaction models are
+    built, and nothing is rounded until amounts leave the engine.
+
+    Returns:
+        (dates, epoch timestamps, remanents, total amount, total ceiling),
+        money in paise
+    """
     seen_dates = set()
-    filtered: List[FilteredTransaction] = []
-    total_amount = 0.0
-    total_ceiling = 0.0
+    dates: List[str] = []
+    timestamps: List[int] = []
+    remanents: List[int] = []
+    total_amount = 0
+    total_ceiling = 0
 
     for tx in raw:
         # 1. Reject constraint violations
@@ -62,32 +67,26 @@ def _build_filtered_transactions(
             continue
         seen_dates.add(tx.date)
 
-        ceil_val = math.ceil(tx.amount / 100) * 100
-        rem = round(ceil_val - tx.amount, 2)
-
-        rem, applied_q = _apply_q(tx.date, rem, q_periods)
-        rem, applied_p = _apply_p(tx.date, rem, p_periods)
-        rem = round(rem, 2)
-
-        filtered.append(
-            FilteredTransaction(
-                date=tx.date,
-                amount=tx.amount,
-                ceiling=ceil_val,
-                remanent=rem,
-                appliedQ=applied_q,
-                appliedP=applied_p,
-                inKPeriod=True,
-            )
-        )
+        ts = to_epoch(tx.date)
+        amount = to_paise(tx.amount)
+        ceiling = ceiling_paise(amount, round_up)
+
+        rem = periods.q_fixed_paise(ts)
+        if rem is None:
+            rem = ceiling - amount
+        rem += sum(periods.p_extras_paise(ts))
+
+        dates.append(tx.date)
+        timestamps.append(ts)
+        remanents.append(rem)
 
-        total_amount += tx.amount
-        total_ceiling += ceil_val
+        total_amount += amount
+        total_ceiling += ceiling
 
-    return filtered, round(total_amount, 2), round(total_ceiling, 2)
+    return dates, timestamps, remanents, total_amount, total_ceiling
 
 
-def _years_to_retirement(age: int) -> int:
+def years_to_retirement(age: int) -> int:
     return max(RETIREMENT_AGE - age, MIN_YEARS_TO_RETIREMENT)
 
 
@@ -102,55 +101,226 @@ def adjust_for_inflation(nominal: float, inflation_pct: float, years: int) -> fl
     return nominal / ((1 + rate) ** years)
 
 
-def _sum_remanents_for_k(transactions: List[FilteredTransaction], k: KPeriod) -> float:
-    total = sum(
-        tx.remanent for tx in transactions if is_in_period(tx.date, k.start, k.end)
-    )
-    return round(total, 2)
+def _sum_remanents_by_k(
+    remanents: List[int],
+    timestamps: List[int],
+    periods: CompiledPeriods,
+) -> List[int]:
+    """
+    Total remanent (paise) per K window.
 
+    The remanents are rolled up per day and per month once; each K window is
+    then answered from whole-month and whole-day buckets plus the rows of
+    the partial edge days, so long or numerous windows do not
+    revisit every transaction.  A transaction inside several K periods is
+    counted in each of them.
+    """
+    rollup = RemanentRollup.from_rows(timestamps, remanents)
+    windows = [(to_epoch(k.start), to_epoch(k.end)) for k in periods.k_periods]
+    return [total for _, total in rollup.window_totals(windows)]
 
-def _compute_returns_with_periods(
-    raw_transactions: List[RawTransaction],
-    q_periods: List[QPeriod],
-    p_periods: List[PPeriod],
-    k_periods: List[KPeriod],
-    age: int,
-    wage: float,
+
+# ── Time-weighted projection ──────────────────────────────────────────────────
+
+
+def real_growth_by_day(
+    dates: List[str],
+    rate: float,
     inflation: float,
+    years: int,
+) -> Dict[str, float]:
+    """
+    Precompute the inflation-adjusted growth factor for every calendar day
+    that has at least one transaction.
+
+    The retirement date is anchored ``years`` after the latest transaction
+    day, so the newest remanents compound for exactly ``years`` (matching
+    the fixed-horizon mode) and older ones compound for longer.
+
+    Factors are built with two ``pow`` calls in total: one for the latest
+    day, then one daily multiplier applied cumulatively while walking back
+    through the history — cost is O(days spanned), never one ``pow`` per
+    transaction.
+
+    Returns:
+        {"YYYY-MM-DD": real growth factor from that day to retirement}
+    """
+    days = sorted({date[:10] for date in dates})
+    if not days:
+        return {}
+
+    first, last = days[0], days[-1]
+    real_rate = (1 + rate) / (1 + inflation / 100)
+    daily = real_rate ** (1 / 365.25)
+
+    # factors[i] = growth from (last - i days) to retirement
+    span = round(years_between(f"{first} 00:00:00", f"{last} 00:00:00") * 365.25)
+    factors = [real_rate**years] * (span + 1)
+    for i in range(1, span + 1):
+        factors[i] = factors[i - 1] * daily
+
+    last_dt = parse_dt(f"{last} 00:00:00")
+    return {day: factors[(last_dt - parse_dt(f"{day} 00:00:00")).days] for day in days}
+
+
+def _time_weighted_real_fv_by_k(
+    dates: List[str],
+    remanents: List[int],
+    timestamps: List[int],
+    periods: CompiledPeriods,
+    growth_by_day: Dict[str, float],
+) -> List[float]:
+    """
+    Inflation-adjusted value at retirement of the remanents inside each K
+    window, where each remanent compounds from its own transaction date.
+
+    Remanents are first summed exactly (paise) per (K window, day) bucket,
+    then each bucket is scaled by its precomputed factor.
+    """
+    buckets: List[Dict[str, int]] = [{} for _ in periods.k_periods]
+    for date, rem, ts in zip(dates, remanents, timestamps):
+        day = date[:10]
+        for k_idx in periods.k_indices(ts):
+            bucket = buckets[k_idx]
+            bucket[day] = bucket.get(day, 0) + rem
+    return [
+        from_paise(sum(paise * growth_by_day[day] for day, paise in bucket.items()))
+        for bucket in buckets
+    ]
+
+
+def project_k_windows(
+    k_periods: Sequence[KPeriod],
+    principals: List[int],
     rate: float,
+    inflation: float,
+    years: int,
+    wage: float,
     include_tax: bool,
-) -> ReturnResponse:
-    years = _years_to_retirement(age)
-
-    filtered, total_amount, total_ceiling = _build_filtered_transactions(
-        raw_transactions, q_periods, p_periods
+    weighted_fvs: Optional[List[float]] = None,
+    tax_table: str = DEFAULT_TAX_TABLE,
+    compare_tax_tables: Sequence[str] = (),
+) -> List[SavingsByDate]:
+    """
+    Amount, inflation-adjusted profit and tax benefit per K window.
+
+    ``principals`` are the K totals in paise.  ``weighted_fvs`` (rupees),
+    when given, are time-weighted real values at retirement and replace
+    the fixed-horizon projection.  Tax benefits for ``tax_table`` and every
+    ``compare_tax_tables`` entry are evaluated for all windows in one batch.
+    """
+    amounts = [from_paise(principal) for principal in principals]
+    table_names = list(dict.fromkeys([tax_table, *compare_tax_tables]))
+    benefits = (
+        nps_tax_benefits(
+            amounts,
+            [wage] * len(amounts),
+            [get_tax_table(name) for name in table_names],
+        )
+        if include_tax
+        else {}
     )
 
     savings_by_dates: List[SavingsByDate] = []
-    for k in k_periods:
-        principal = _sum_remanents_for_k(filtered, k)
+    for k_idx, k in enumerate(k_periods):
+        principal = amounts[k_idx]
 
-        nominal_fv = compute_future_value(principal, rate, years)
-        real_fv = adjust_for_inflation(nominal_fv, inflation, years)
+        if principal <= 0:
+            real_fv = 0.0
+        elif weighted_fvs is not None:
+            real_fv = weighted_fvs[k_idx]
+        else:
+            nominal_fv = compute_future_value(principal, rate, years)
+            real_fv = adjust_for_inflation(nominal_fv, inflation, years)
 
         profit = round(real_fv - principal, 2)
 
-        tax_benefit = compute_nps_tax_benefit(principal, wage) if include_tax else 0.0
-
         savings_by_dates.append(
             SavingsByDate(
                 start=k.start,
                 end=k.end,
                 amount=principal,
                 profit=profit,
-                taxBenefit=tax_benefit,
+                taxBenefit=benefits[tax_table][k_idx] if include_tax else 0.0,
+                taxBenefits=(
+                    {name: benefits[name][k_idx] for name in table_names}
+                    if include_tax and compare_tax_tables
+                    else None
+                ),
             )
         )
+    return savings_by_dates
+
+
+# Stage names passed to ``on_stage``; "time_weight" only runs when time-weighted
+RETURNS_STAGES = ("filter", "aggregate", "time_weight", "project")
+
+
+def _no_stage(name: str) -> None:
+    pass
+
+
+def _compute_returns_with_periods(
+    raw_transactions: List[RawTransaction],
+    q_periods: List[QPeriod],
+    p_periods: List[PPeriod],
+    k_periods: List[KPeriod],
+    age: int,
+    wage: float,
+    inflation: float,
+    rate: float,
+    include_tax: bool,
+    time_weighted: bool = False,
+    periods: Optional[CompiledPeriods] = None,
+    round_up: int = DEFAULT_ROUND_UP,
+    tax_table: str = DEFAULT_TAX_TABLE,
+    compare_tax_tables: Sequence[str] = (),
+    on_stage: Optional[Callable[[str], None]] = None,
+) -> ReturnResponse:
+    """
+    ``on_stage``, when given, is called with each stage's name (one of
+    ``RETURNS_STAGES``) before the stage runs — asynchronous jobs use it to
+    report progress and to stop a cancelled computation between stages.
+    """
+    years = years_to_retirement(age)
+    if periods is None:
+        periods = compile_periods(q_periods, p_periods, k_periods)
+    if on_stage is None:
+        on_stage = _no_stage
+
+    on_stage("filter")
+    with span("returns.filter", transactions=len(raw_transactions)):
+        dates, timestamps, remanents, total_amount, total_ceiling = _build_remanents(
+            raw_transactions, periods, round_up
+        )
+    on_stage("aggregate")
+    with span("returns.aggregate", kPeriods=len(periods.k_periods)):
+        principals = _sum_remanents_by_k(remanents, timestamps, periods)
+
+    if time_weighted:
+        on_stage("time_weight")
+        with span("returns.time_weight"):
+            growth_by_day = real_growth_by_day(dates, rate, inflation, years)
+            weighted_fvs = _time_weighted_real_fv_by_k(
+                dates, remanents, timestamps, periods, growth_by_day
+            )
 
+    on_stage("project")
     return ReturnResponse(
-        totalTransactionAmount=total_amount,
-        totalCeiling=total_ceiling,
-        savingsByDates=savings_by_dates,
+        totalTransactionAmount=from_paise(total_amount),
+        totalCeiling=from_paise(total_ceiling),
+        savingsByDates=project_k_windows(
+            periods.k_periods,
+            principals,
+            rate,
+            inflation,
+            years,
+            wage,
+            include_tax,
+            weighted_fvs if time_weighted else None,
+            tax_table,
+            compare_tax_tables,
+        ),
     )
 
 
@@ -162,6 +332,12 @@ def compute_nps_returns(
     age: int,
     wage: float,
     inflation: float,
+    time_weighted: bool = False,
+    periods: Optional[CompiledPeriods] = None,
+    round_up: int = DEFAULT_ROUND_UP,
+    tax_table: str = DEFAULT_TAX_TABLE,
+    compare_tax_tables: Sequence[str] = (),
+    on_stage: Optional[Callable[[str], None]] = None,
 ) -> ReturnResponse:
     return _compute_returns_with_periods(
         transactions,
@@ -173,6 +349,12 @@ def compute_nps_returns(
         inflation,
         rate=NPS_RATE,
         include_tax=True,
+        time_weighted=time_weighted,
+        periods=periods,
+        round_up=round_up,
+        tax_table=tax_table,
+        compare_tax_tables=compare_tax_tables,
+        on_stage=on_stage,
     )
 
 
@@ -184,6 +366,10 @@ def compute_index_returns(
     age: int,
     wage: float,
     inflation: float,
+    time_weighted: bool = False,
+    periods: Optional[CompiledPeriods] = None,
+    round_up: int = DEFAULT_ROUND_UP,
+    on_stage: Optional[Callable[[str], None]] = None,
 ) -> ReturnResponse:
     return _compute_returns_with_periods(
         transactions,
@@ -195,4 +381,8 @@ def compute_index_returns(
         inflation,
         rate=INDEX_RATE,
         include_tax=False,
+        time_weighted=time_weighted,
+        periods=periods,
+        round_up=round_up,
+        on_stage=on_stage,
     )
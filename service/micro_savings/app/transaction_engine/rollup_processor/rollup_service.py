@@ -0,0 +1,204 @@
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SECONDS_PER_DAY = 86_400
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _month_of(day: int) -> int:
+    """Month index (year * 12 + month - 1) of an epoch day."""
+    d = date.fromordinal(_EPOCH_ORDINAL + day)
+    return d.year * 12 + d.month - 1
+
+
+def _first_day(month: int) -> int:
+    """Epoch day on which a month index starts."""
+    return date(month // 12, month % 12 + 1, 1).toordinal() - _EPOCH_ORDINAL
+
+
+def _last_day(month: int) -> int:
+    """Epoch day on which a month index ends."""
+    return _first_day(month) + monthrange(month // 12, month % 12 + 1)[1] - 1
+
+
+def _edge_days(start: int, end: int) -> List[int]:
+    """Days on which an inclusive [start, end] window begins or ends mid-day."""
+    days = []
+    if start % SECONDS_PER_DAY != 0:
+        days.append(start // SECONDS_PER_DAY)
+    if end % SECONDS_PER_DAY != SECONDS_PER_DAY - 1:
+        days.append(end // SECONDS_PER_DAY)
+    return days
+
+
+class RemanentRollup:
+    """
+    Remanent totals and counts per calendar day and per month.
+
+    Rows are added once; a K window is then answered from the rollups
+    instead of by visiting its transactions:
+
+        whole months inside the window  → one month bucket each
+        whole days at either end        → one day bucket each
+        partial days at the boundaries  → the rows of those days only
+
+    Buckets are found by bisecting the sorted keys of the populated months
+    and days, so a window costs O(log n) plus the populated buckets inside
+    it, however long it is or many transactions it contains.  Totals are
+    integer paise, so the result is exactly the sum over the individual rows.
+
+    Adding a row updates its day bucket; month buckets and the sorted keys
+    are derived from the days on the next query, and rows are indexed only
+    for the edge days a query actually needs.
+    """
+
+    def __init__(self) -> None:
+        self._days: Dict[int, List[int]] = {}  # day → [count, total]
+        self._months: Optional[Dict[int, List[int]]] = None  # month → [count, total]
+        self._month_keys: List[int] = []  # sorted populated months
+        self._day_keys: List[int] = []  # sorted populated days
+        self._timestamps: List[int] = []
+        self._remanents: List[int] = []
+        self._rows: Dict[int, List[Tuple[int, int]]] = {}  # indexed edge days only
+
+    @classmethod
+    def from_rows(
+        cls, timestamps: Iterable[int], remanents: Iterable[int]
+    ) -> "RemanentRollup":
+        rollup = cls()
+        rollup._timestamps = list(timestamps)
+        rollup._remanents = list(remanents)
+        days = rollup._days
+        for ts, remanent in zip(rollup._timestamps, rollup._remanents):
+            bucket = days.get(ts // SECONDS_PER_DAY)
+            if bucket is None:
+                days[ts // SECONDS_PER_DAY] = [1, remanent]
+            else:
+                bucket[0] += 1
+                bucket[1] += remanent
+        return rollup
+
+    def add(self, ts: int, remanent: int) -> None:
+        day = ts // SECONDS_PER_DAY
+        bucket = self._days.setdefault(day, [0, 0])
+        bucket[0] += 1
+        bucket[1] += remanent
+        self._timestamps.append(ts)
+        self._remanents.append(remanent)
+        if day in self._rows:
+            self._rows[day].append((ts, remanent))
+        self._months = None
+
+    def window_total(self, start: int, end: int) -> Tuple[int, int]:
+        """(count, total remanent) of the rows with ``start <= ts <= end``."""
+        return self.window_totals([(start, end)])[0]
+
+    def window_totals(
+        self, windows: Sequence[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """
+        (count, total remanent) for each inclusive (start, end) window.
+
+        The rows of every mid-day window edge are indexed in a single pass
+        over the rows before the windows are answered.
+        """
+        self._index_rows(
+            {
+                day
+                for start, end in windows
+                if start <= end
+                for day in _edge_days(start, end)
+            }
+        )
+        return [self._window_total(start, end) for start, end in windows]
+
+    def _window_total(self, start: int, end: int) -> Tuple[int, int]:
+        if start > end:
+            return 0, 0
+
+        first_day, last_day = start // SECONDS_PER_DAY, end // SECONDS_PER_DAY
+        starts_mid_day = start % SECONDS_PER_DAY != 0
+        ends_mid_day = end % SECONDS_PER_DAY != SECONDS_PER_DAY - 1
+        if first_day == last_day and (starts_mid_day or ends_mid_day):
+            return self._partial_day(first_day, start, end)
+
+        count = total = 0
+        if starts_mid_day:
+            count, total = self._partial_day(first_day, start, end)
+            first_day += 1
+        if ends_mid_day:
+            c, t = self._partial_day(last_day, start, end)
+            count, total = count + c, total + t
+            last_day -= 1
+        c, t = self._whole_days(first_day, last_day)
+        return count + c, total + t
+
+    def _index_rows(self, days: set) -> None:
+        missing = days - self._rows.keys()
+        if not missing:
+            return
+        for day in missing:
+            self._rows[day] = []
+        for ts, remanent in zip(self._timestamps, self._remanents):
+            day = ts // SECONDS_PER_DAY
+            if day in missing:
+                self._rows[day].append((ts, remanent))
+
+    def _partial_day(self, day: int, start: int, end: int) -> Tuple[int, int]:
+        count = total = 0
+        for ts, remanent in self._rows[day]:
+            if start <= ts <= end:
+                count += 1
+                total += remanent
+        return count, total
+
+    def _build_months(self) -> None:
+        months: Dict[int, List[int]] = {}
+        for day, (c, t) in self._days.items():
+            bucket = months.setdefault(_month_of(day), [0, 0])
+            bucket[0] += c
+            bucket[1] += t
+        self._months = months
+        self._month_keys = sorted(months)
+        self._day_keys = sorted(self._days)
+
+    @staticmethod
+    def _sum_range(
+        keys: List[int], buckets: Dict[int, List[int]], first: int, last: int
+    ) -> Tuple[int, int]:
+        """(count, total) of the buckets whose key is in [first, last]."""
+        count = total = 0
+        for i in range(bisect_left(keys, first), bisect_right(keys, last)):
+            c, t = buckets[keys[i]]
+            count += c
+            total += t
+        return count, total
+
+    def _whole_days(self, first_day: int, last_day: int) -> Tuple[int, int]:
+        if first_day > last_day:
+            return 0, 0
+        if self._months is None:
+            self._build_months()
+
+        # Whole months [first_month, last_month] inside the days, if any
+        first_month = _month_of(first_day)
+        if _first_day(first_month) != first_day:
+            first_month += 1
+        last_month = _month_of(last_day)
+        if _last_day(last_month) != last_day:
+            last_month -= 1
+        if first_month > last_month:
+            return self._sum_range(self._day_keys, self._days, first_day, last_day)
+
+        count, total = self._sum_range(
+            self._month_keys, self._months, first_month, last_month
+        )
+        for first, last in (
+            (first_day, _first_day(first_month) - 1),
+            (_last_day(last_month) + 1, last_day),
+        ):
+            c, t = self._sum_range(self._day_keys, self._days, first, last)
+            count, total = count + c, total + t
+        return count, total
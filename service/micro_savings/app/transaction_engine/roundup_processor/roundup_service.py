@@ -0,0 +1,84 @@
+from typing import List, Sequence
+
+from service.micro_savings.app.models.roundup import (
+    KWindowSavings,
+    RoundUpOption,
+    RoundUpResponse,
+)
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    CompiledPeriods,
+)
+from service.micro_savings.app.utils.date_utils import to_epoch
+from service.micro_savings.app.utils.money import (
+    PAISE_PER_RUPEE,
+    from_paise,
+    to_paise,
+)
+
+
+def compare_round_ups(
+    raw_transactions: List[RawTransaction],
+    periods: CompiledPeriods,
+    round_ups: Sequence[int],
+) -> RoundUpResponse:
+    """
+    K-window savings for several round-up granularities in one pass.
+
+    Everything that does not depend on the granularity — validation, date
+    parsing and the Q / P / K lookups — is done once per transaction; only
+    the ceiling and remanent are then computed per granularity, as integer
+    paise.  Rules match the returns pipeline:
+
+        1. amounts < 0 or ≥ 500,000 are skipped
+        2. duplicate timestamps keep the first occurrence
+        3. Q replaces the remanent (same for every granularity), P adds on top
+        4. remanents are summed into every K window containing the date
+
+    Per option output:
+        totalCeiling    → sum of rounded-up amounts at that granularity
+        savingsByDates  → total remanent per K window
+    """
+    steps = [step * PAISE_PER_RUPEE for step in round_ups]
+    n_k = len(periods.k_periods)
+    ceilings = [0] * len(steps)
+    k_totals = [[0] * n_k for _ in steps]
+    total_amount = 0
+    seen_dates = set()
+
+    for tx in raw_transactions:
+        if tx.amount < 0 or tx.amount >= 500_000:
+            continue
+        if tx.date in seen_dates:
+            continue
+        seen_dates.add(tx.date)
+
+        ts = to_epoch(tx.date)
+        amount = to_paise(tx.amount)
+        fixed = periods.q_fixed_paise(ts)
+        extra = sum(periods.p_extras_paise(ts))
+        windows = periods.k_indices(ts)
+        total_amount += amount
+
+        for i, step in enumerate(steps):
+            ceiling = -(-amount // step) * step
+            ceilings[i] += ceiling
+            rem = (ceiling - amount if fixed is None else fixed) + extra
+            totals = k_totals[i]
+            for k_idx in windows:
+                totals[k_idx] += rem
+
+    return RoundUpResponse(
+        totalTransactionAmount=from_paise(total_amount),
+        options=[
+            RoundUpOption(
+                roundUp=round_up,
+                totalCeiling=from_paise(ceilings[i]),
+                savingsByDates=[
+                    KWindowSavings(start=k.start, end=k.end, amount=from_paise(total))
+                    for k, total in zip(periods.k_periods, k_totals[i])
+                ],
+            )
+            for i, round_up in enumerate(round_ups)
+        ],
+    )
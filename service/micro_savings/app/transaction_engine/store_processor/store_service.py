@@ -0,0 +1,218 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from service.micro_savings.app.models.periods import KPeriod
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.utils.date_utils import to_epoch
+from service.micro_savings.app.utils.money import from_paise, to_paise
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    user_id      TEXT    NOT NULL,
+    ts           INTEGER NOT NULL,
+    date         TEXT    NOT NULL,
+    amount_paise INTEGER NOT NULL,
+    PRIMARY KEY (user_id, ts)
+) WITHOUT ROWID;
+
+-- Later copies of a stored timestamp, in insertion (rowid) order
+CREATE TABLE IF NOT EXISTS duplicates (
+    user_id      TEXT    NOT NULL,
+    ts           INTEGER NOT NULL,
+    date         TEXT    NOT NULL,
+    amount_paise INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS duplicates_by_time ON duplicates (user_id, ts);
+
+CREATE TRIGGER IF NOT EXISTS record_duplicate BEFORE INSERT ON transactions
+WHEN EXISTS (
+    SELECT 1 FROM transactions WHERE user_id = NEW.user_id AND ts = NEW.ts
+)
+BEGIN
+    INSERT INTO duplicates VALUES (NEW.user_id, NEW.ts, NEW.date, NEW.amount_paise);
+    SELECT RAISE(IGNORE);
+END;
+"""
+
+
+def merge_windows(k_periods: Sequence[KPeriod]) -> List[Tuple[int, int]]:
+    """
+    K windows as sorted, disjoint inclusive epoch ranges.
+
+    Overlapping or touching windows are merged, so each stored transaction
+    is read at most once however many K periods contain it.
+
+    Example:
+        K = [2023-03 … 2023-11, 2023-01 … 2023-12, 2025-01 … 2025-12]
+        → [(2023-01 … 2023-12), (2025-01 … 2025-12)]
+    """
+    ranges = sorted(
+        (start, end)
+        for start, end in ((to_epoch(k.start), to_epoch(k.end)) for k in k_periods)
+        if start <= end
+    )
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _with_copies(
+    rows: Iterable[Tuple[int, str, int]], copies: Dict[int, List[Tuple[str, int]]]
+) -> Iterator[Tuple[int, str, int]]:
+    """``rows`` with the recorded duplicates of each timestamp after it."""
+    for row in rows:
+        yield row
+        for date, paise in copies.get(row[0], ()):
+            yield row[0], date, paise
+
+
+class TransactionStore:
+    """
+    Users' transactions in a local SQLite file, indexed by (user, time).
+
+    The primary key ``(user_id, ts)`` is the time-range index: a K window is
+    one B-tree range scan.  A second transaction at the same second is
+    recorded on insert in a ``duplicates`` table, by a trigger, and scans
+    return it right after the first copy — so the pipelines apply their own
+    duplicate rules (filter rejects every copy, returns keep the first)
+    exactly as for an inline body.  Amounts are stored as integer paise.
+
+    A fixed pool of connections is opened up front and shared by the worker
+    threads; WAL mode lets readers proceed while a batch is being written.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, batch_size: int = 1000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._pool.put(conn)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def add(self, user_id: str, transactions: Sequence[RawTransaction]) -> int:
+        """
+        Insert transactions in batches of ``batch_size`` rows.
+
+        Returns:
+            number of new timestamps; the rest were recorded as duplicates
+        """
+        inserted = 0
+        for i in range(0, len(transactions), self.batch_size):
+            rows = [
+                (user_id, to_epoch(tx.date), tx.date, to_paise(tx.amount))
+                for tx in transactions[i : i + self.batch_size]
+            ]
+            with self._connection() as conn:
+                # rowcount leaves out the copies the trigger diverts
+                inserted += conn.executemany(
+                    "INSERT INTO transactions VALUES (?, ?, ?, ?)", rows
+                ).rowcount
+        return inserted
+
+    def count(self, user_id: str) -> int:
+        """Every stored transaction of a user, duplicates included."""
+        return self.count_ranges(user_id, [(-(2**63), 2**63 - 1)])
+
+    def count_ranges(self, user_id: str, ranges: Sequence[Tuple[int, int]]) -> int:
+        """How many transactions ``scan_ranges`` would return, without reading them."""
+        n = 0
+        with self._connection() as conn:
+            for table in ("transactions", "duplicates"):
+                for start, end in ranges:
+                    (found,) = conn.execute(
+                        f"SELECT COUNT(*) FROM {table}"
+                        " WHERE user_id = ? AND ts BETWEEN ? AND ?",
+                        (user_id, start, end),
+                    ).fetchone()
+                    n += found
+        return n
+
+    def count_k_windows(self, user_id: str, k_periods: Sequence[KPeriod]) -> int:
+        """How many transactions ``scan_k_windows`` would return."""
+        return self.count_ranges(user_id, merge_windows(k_periods))
+
+    def delete(self, user_id: str) -> int:
+        """Drop every transaction of a user; returns how many were removed."""
+        with self._connection() as conn:
+            return sum(
+                conn.execute(
+                    f"DELETE FROM {table} WHERE user_id = ?", (user_id,)
+                ).rowcount
+                for table in ("transactions", "duplicates")
+            )
+
+    def scan(
+        self, user_id: str, start: Optional[int] = None, end: Optional[int] = None
+    ) -> List[RawTransaction]:
+        """A user's transactions with ``start <= ts <= end``, oldest first."""
+        lo = -(2**63) if start is None else start
+        hi = 2**63 - 1 if end is None else end
+        return self.scan_ranges(user_id, [(lo, hi)])
+
+    def scan_ranges(
+        self, user_id: str, ranges: Sequence[Tuple[int, int]]
+    ) -> List[RawTransaction]:
+        """
+        One indexed range scan per (start, end) pair, concatenated.
+
+        Pass sorted, disjoint ranges (see ``merge_windows``) to get each
+        transaction once, oldest first.  Duplicates of a timestamp follow
+        its first copy, in the order they were added.
+        """
+        transactions: List[RawTransaction] = []
+        with self._connection() as conn:
+            for start, end in ranges:
+                args = (user_id, start, end)
+                copies: Dict[int, List[Tuple[str, int]]] = {}
+                for ts, date, paise in conn.execute(
+                    "SELECT ts, date, amount_paise FROM duplicates"
+                    " WHERE user_id = ? AND ts BETWEEN ? AND ? ORDER BY ts, rowid",
+                    args,
+                ):
+                    copies.setdefault(ts, []).append((date, paise))
+                rows = conn.execute(
+                    "SELECT ts, date, amount_paise FROM transactions"
+                    " WHERE user_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                    args,
+                )
+                if copies:
+                    rows = _with_copies(rows, copies)
+                transactions.extend(
+                    RawTransaction.model_construct(date=date, amount=from_paise(paise))
+                    for _, date, paise in rows
+                )
+        return transactions
+
+    def scan_k_windows(
+        self, user_id: str, k_periods: Sequence[KPeriod]
+    ) -> List[RawTransaction]:
+        """
+        The transactions of a user that fall inside at least one K window.
+
+        Anything outside every K window contributes to no K total, so it is
+        never read.
+        """
+        return self.scan_ranges(user_id, merge_windows(k_periods))
@@ -1,6 +1,175 @@
-def compute_tax(annual_income: float) -> float:
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+# ── Compiled tax tables ───────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class TaxTable:
+    """
+    One regime / fiscal year's slabs, compiled for constant-time lookups.
+
+    ``lowers[i]`` is where slab i starts and ``rates[i]`` its marginal
+    rate; ``base_tax[i]`` is the tax already owed on everything below
+    ``lowers[i]``, so tax on an income is one binary search plus one
+    multiply instead of a walk over every lower slab.  Incomes up to
+    ``rebate_limit`` owe nothing (Section 87A).  The NPS 80CCD(1B)
+    deduction is capped at ``nps_wage_fraction`` of annual wage and at
+    ``nps_cap``.
+    """
+
+    name: str
+    regime: str
+    fiscal_year: str
+    lowers: Tuple[float, ...]
+    rates: Tuple[float, ...]
+    base_tax: Tuple[float, ...]
+    rebate_limit: float = 0.0
+    nps_wage_fraction: float = 0.10
+    nps_cap: float = 200_000
+
+    def tax(self, annual_income: float) -> float:
+        if annual_income <= 0 or annual_income <= self.rebate_limit:
+            return 0.0
+        i = bisect_right(self.lowers, annual_income) - 1
+        return round(
+            self.base_tax[i] + (annual_income - self.lowers[i]) * self.rates[i], 2
+        )
+
+    def nps_deduction(self, total_invested: float, annual_wage: float) -> float:
+        return min(total_invested, annual_wage * self.nps_wage_fraction, self.nps_cap)
+
+    def slabs(self) -> List[Tuple[float, float]]:
+        """(upper limit, rate) pairs, the same shape the table was built from."""
+        uppers = list(self.lowers[1:]) + [float("inf")]
+        return list(zip(uppers, self.rates))
+
+
+def compile_tax_table(
+    name: str,
+    regime: str,
+    fiscal_year: str,
+    slabs: Sequence[Tuple[float, float]],
+    rebate_limit: float = 0.0,
+    nps_wage_fraction: float = 0.10,
+    nps_cap: float = 200_000,
+) -> TaxTable:
+    """
+    Build a ``TaxTable`` from ``(upper limit, rate)`` slabs in ascending
+    order; the last limit must be ``float("inf")``.
+
+    Raises:
+        ValueError: if the limits are not ascending or the last is finite
+    """
+    limits = [limit for limit, _ in slabs]
+    if limits != sorted(set(limits)) or limits[-1] != float("inf"):
+        raise ValueError(f"slabs of tax table '{name}' are not ascending to inf")
+
+    lowers: List[float] = []
+    base_tax: List[float] = []
+    owed = 0.0
+    prev_limit = 0.0
+    for limit, rate in slabs:
+        lowers.append(prev_limit)
+        base_tax.append(owed)
+        owed += (limit - prev_limit) * rate
+        prev_limit = limit
+
+    return TaxTable(
+        name=name,
+        regime=regime,
+        fiscal_year=fiscal_year,
+        lowers=tuple(lowers),
+        rates=tuple(rate for _, rate in slabs),
+        base_tax=tuple(base_tax),
+        rebate_limit=rebate_limit,
+        nps_wage_fraction=nps_wage_fraction,
+        nps_cap=nps_cap,
+    )
+
+
+_INF = float("inf")
+
+_OLD_REGIME_SLABS = [
+    (250_000, 0.00),
+    (500_000, 0.05),
+    (1_000_000, 0.20),
+    (_INF, 0.30),
+]
+
+# Registry of every table a request can select, keyed by name
+TAX_TABLES: Dict[str, TaxTable] = {
+    table.name: table
+    for table in (
+        # The original engine's table: the ₹7L rebate folded into a 0% slab
+        compile_tax_table(
+            "new-2023-24",
+            "new",
+            "2023-24",
+            [
+                (700_000, 0.00),
+                (1_000_000, 0.10),
+                (1_200_000, 0.15),
+                (1_500_000, 0.20),
+                (_INF, 0.30),
+            ],
+        ),
+        compile_tax_table(
+            "new-2024-25",
+            "new",
+            "2024-25",
+            [
+                (300_000, 0.00),
+                (700_000, 0.05),
+                (1_000_000, 0.10),
+                (1_200_000, 0.15),
+                (1_500_000, 0.20),
+                (_INF, 0.30),
+            ],
+            rebate_limit=700_000,
+        ),
+        compile_tax_table(
+            "new-2025-26",
+            "new",
+            "2025-26",
+            [
+                (400_000, 0.00),
+                (800_000, 0.05),
+                (1_200_000, 0.10),
+                (1_600_000, 0.15),
+                (2_000_000, 0.20),
+                (2_400_000, 0.25),
+                (_INF, 0.30),
+            ],
+            rebate_limit=1_200_000,
+        ),
+        compile_tax_table(
+            "old-2023-24", "old", "2023-24", _OLD_REGIME_SLABS, rebate_limit=500_000
+        ),
+        compile_tax_table(
+            "old-2024-25", "old", "2024-25", _OLD_REGIME_SLABS, rebate_limit=500_000
+        ),
+        compile_tax_table(
+            "old-2025-26", "old", "2025-26", _OLD_REGIME_SLABS, rebate_limit=500_000
+        ),
+    )
+}
+DEFAULT_TAX_TABLE = "new-2023-24"
+
+
+def get_tax_table(name: str = DEFAULT_TAX_TABLE) -> TaxTable:
+    """
+    Raises:
+        KeyError: if no table is registered under ``name``
     """
-    Calculate Indian income tax based on new tax regime slabs (FY 2023-24).
+    return TAX_TABLES[name]
+
+
+def compute_tax(annual_income: float, table: str = DEFAULT_TAX_TABLE) -> float:
+    """
+    Calculate Indian income tax based on new tax regime slabs (FY 2023-24),
+    or on another registered table.
 
     Slabs:
         ₹0          – ₹7,00,000   →  0%
@@ -11,6 +180,7 @@ def compute_tax(annual_income: float) -> float:
 
     Args:
         annual_income: Gross annual income in INR
+        table:         Name of a table in ``TAX_TABLES``
 
     Returns:
         Tax amount in INR (float)
@@ -20,28 +190,12 @@ def compute_tax(annual_income: float) -> float:
         compute_tax(800_000)   → 10_000.0   (10% of 1L above 7L)
         compute_tax(1_200_000) → 65_000.0
     """
-    tax = 0.0
-
-    slabs = [
-        (700_000, 0.00),
-        (1_000_000, 0.10),
-        (1_200_000, 0.15),
-        (1_500_000, 0.20),
-        (float("inf"), 0.30),
-    ]
-
-    prev_limit = 0
-    for limit, rate in slabs:
-        if annual_income <= prev_limit:
-            break
-        taxable = min(annual_income, limit) - prev_limit
-        tax += taxable * rate
-        prev_limit = limit
+    return get_tax_table(table).tax(annual_income)
 
-    return round(tax, 2)
 
-
-def compute_nps_tax_benefit(total_invested: float, monthly_wage: float) -> float:
+def compute_nps_tax_benefit(
+    total_invested: float, monthly_wage: float, table: str = DEFAULT_TAX_TABLE
+) -> float:
     """
     Calculate tax saved by investing via NPS under Section 80CCD(1B).
 
@@ -53,6 +207,7 @@ def compute_nps_tax_benefit(total_invested: float, monthly_wage: float) -> float
     Args:
         total_invested: Total remanent amount put into NPS
         monthly_wage:   Monthly salary in INR
+        table:          Name of a table in ``TAX_TABLES``
 
     Returns:
         Tax benefit in INR
@@ -63,11 +218,38 @@ def compute_nps_tax_benefit(total_invested: float, monthly_wage: float) -> float
         max_deduction = min(10000, 60000, 200000) = 10000
         benefit = tax(600000) - tax(590000) = 0 - 0 = 0  (below 7L slab)
     """
-    annual_wage = monthly_wage * 12
-    max_deduction = min(total_invested, annual_wage * 0.10, 200_000)
+    benefits = nps_tax_benefits(
+        [total_invested], [monthly_wage], [get_tax_table(table)]
+    )
+    return benefits[table][0]
+
+
+def nps_tax_benefits(
+    invested: Sequence[float],
+    monthly_wages: Sequence[float],
+    tables: Sequence[TaxTable],
+) -> Dict[str, List[float]]:
+    """
+    NPS tax benefit for many (invested, monthly wage) pairs under every
+    table at once.
 
-    tax_before = compute_tax(annual_wage)
-    tax_after = compute_tax(annual_wage - max_deduction)
+    Wages are annualised once for all tables, and the tax on each distinct
+    full income is looked up once per table — K windows of one user share
+    a wage, so each extra regime costs one lookup per window.
 
-    benefit = tax_before - tax_after
-    return round(max(benefit, 0.0), 2)  # Never negative
+    Returns:
+        {table name: benefit per pair, in input order}
+    """
+    annual = [wage * 12 for wage in monthly_wages]
+    benefits: Dict[str, List[float]] = {}
+    for table in tables:
+        tax_before: Dict[float, float] = {}
+        row: List[float] = []
+        for amount, income in zip(invested, annual):
+            before = tax_before.get(income)
+            if before is None:
+                before = tax_before[income] = table.tax(income)
+            after = table.tax(income - table.nps_deduction(amount, income))
+            row.append(round(max(before - after, 0.0), 2))  # Never negative
+        benefits[table.name] = row
+    return benefits
@@ -0,0 +1,252 @@
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple, Union
+
+from service.micro_savings.app.models.periods import KPeriod, PPeriod, QPeriod
+from service.micro_savings.app.models.returns import ReturnResponse
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    CompiledPeriods,
+    compile_periods,
+)
+from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
+    INDEX_RATE,
+    NPS_RATE,
+    real_growth_by_day,
+    years_to_retirement,
+    project_k_windows,
+)
+from service.micro_savings.app.transaction_engine.tax_processor.tax_service import (
+    DEFAULT_TAX_TABLE,
+)
+from service.micro_savings.app.utils.date_utils import to_epoch
+from service.micro_savings.app.utils.money import (
+    DEFAULT_ROUND_UP,
+    ceiling_paise,
+    from_paise,
+    to_paise,
+)
+
+
+def _remanent(periods: CompiledPeriods, ts: int, base: int) -> int:
+    """Q replaces the base remanent, then every matching P adds on top (paise)."""
+    fixed = periods.q_fixed_paise(ts)
+    return (base if fixed is None else fixed) + sum(periods.p_extras_paise(ts))
+
+
+class ReturnsBaseline:
+    """
+    A returns computation kept in memory so single period edits can be
+    re-evaluated incrementally.
+
+    Valid transactions are held sorted by timestamp with their pre-Q/P
+    remanent ("base") and current remanent, alongside the per-K principals
+    (and, in time-weighted mode, the per-K growth-weighted sums).
+
+    A Q or P edit can only change remanents between the old and the new
+    bounds of that period, so ``what_if`` binary-searches those ranges,
+    recomputes just the rows inside them and applies each row's delta to
+    the K windows containing it — cost scales with the affected rows, not
+    the history.
+    """
+
+    def __init__(
+        self,
+        raw_transactions: List[RawTransaction],
+        q_periods: Sequence[QPeriod],
+        p_periods: Sequence[PPeriod],
+        k_periods: Sequence[KPeriod],
+        age: int,
+        wage: float,
+        inflation: float,
+        scheme: str,
+        time_weighted: bool = False,
+        round_up: int = DEFAULT_ROUND_UP,
+        tax_table: str = DEFAULT_TAX_TABLE,
+        compare_tax_tables: Sequence[str] = (),
+    ) -> None:
+        self.q = list(q_periods)
+        self.p = list(p_periods)
+        self.k = list(k_periods)
+        self.periods = compile_periods(self.q, self.p, self.k)
+        self.wage = wage
+        self.inflation = inflation
+        self.rate = NPS_RATE if scheme == "nps" else INDEX_RATE
+        self.include_tax = scheme == "nps"
+        self.tax_table = tax_table
+        self.compare_tax_tables = list(compare_tax_tables)
+        self.years = years_to_retirement(age)
+        self._lock = threading.Lock()
+
+        # Same rules as the returns pipeline: skip out-of-range amounts,
+        # keep the first of duplicate dates
+        seen_dates = set()
+        rows: List[Tuple[int, str, int]] = []
+        self.total_amount = self.total_ceiling = 0
+        for tx in raw_transactions:
+            if tx.amount < 0 or tx.amount >= 500_000 or tx.date in seen_dates:
+                continue
+            seen_dates.add(tx.date)
+            amount = to_paise(tx.amount)
+            ceiling = ceiling_paise(amount, round_up)
+            rows.append((to_epoch(tx.date), tx.date, ceiling - amount))
+            self.total_amount += amount
+            self.total_ceiling += ceiling
+        rows.sort()
+
+        self.timestamps = [ts for ts, _, _ in rows]
+        self.days = [date[:10] for _, date, _ in rows]
+        self.base = [base for _, _, base in rows]
+        self.remanents = [
+            _remanent(self.periods, ts, base)
+            for ts, base in zip(self.timestamps, self.base)
+        ]
+
+        self.growth_by_day = (
+            real_growth_by_day(
+                [date for _, date, _ in rows], self.rate, inflation, self.years
+            )
+            if time_weighted
+            else None
+        )
+        self.principals = [0] * len(self.k)
+        self.weighted = [0.0] * len(self.k)
+        for ts, day, rem in zip(self.timestamps, self.days, self.remanents):
+            for k_idx in self.periods.k_indices(ts):
+                self.principals[k_idx] += rem
+                if time_weighted:
+                    self.weighted[k_idx] += rem * self.growth_by_day[day]
+
+    def result(self) -> ReturnResponse:
+        with self._lock:
+            return self._response(self.principals, self.weighted)
+
+    def _response(self, principals: List[int], weighted: List[float]) -> ReturnResponse:
+        return ReturnResponse(
+            totalTransactionAmount=from_paise(self.total_amount),
+            totalCeiling=from_paise(self.total_ceiling),
+            savingsByDates=project_k_windows(
+                self.k,
+                principals,
+                self.rate,
+                self.inflation,
+                self.years,
+                self.wage,
+                self.include_tax,
+                (
+                    [from_paise(w) for w in weighted]
+                    if self.growth_by_day is not None
+                    else None
+                ),
+                self.tax_table,
+                self.compare_tax_tables,
+            ),
+        )
+
+    def _rows_in(self, ranges: List[Tuple[int, int]]) -> List[int]:
+        """Indices of the rows inside any of the inclusive epoch ranges."""
+        spans = sorted(
+            (bisect_left(self.timestamps, start), bisect_right(self.timestamps, end))
+            for start, end in ranges
+        )
+        rows: List[int] = []
+        covered = 0
+        for lo, hi in spans:
+            lo = max(lo, covered)
+            if lo < hi:
+                rows.extend(range(lo, hi))
+                covered = hi
+        return rows
+
+    def what_if(
+        self,
+        kind: str,
+        index: Optional[int],
+        period: Optional[Union[QPeriod, PPeriod]],
+        commit: bool = False,
+    ) -> Tuple[ReturnResponse, int]:
+        """
+        Result after replacing (``index`` and ``period``), adding (``period``
+        only) or removing (``index`` only) one Q or P period.
+
+        With ``commit`` the edit becomes the new baseline, so edits can be
+        chained; otherwise the baseline is left unchanged.
+
+        Returns:
+            (result, number of transactions re-evaluated)
+
+        Raises:
+            IndexError: ``index`` does not name a period of that kind
+        """
+        with self._lock:
+            q, p = list(self.q), list(self.p)
+            edited = q if kind == "q" else p
+
+            ranges = []
+            if index is not None:
+                old = edited[index]
+                ranges.append((to_epoch(old.start), to_epoch(old.end)))
+            if period is not None:
+                ranges.append((to_epoch(period.start), to_epoch(period.end)))
+                if index is None:
+                    edited.append(period)
+                else:
+                    edited[index] = period
+            else:
+                del edited[index]
+
+            periods = compile_periods(q, p, self.k)
+            principals = list(self.principals)
+            weighted = list(self.weighted)
+            changes = []
+            affected = self._rows_in(ranges)
+            for i in affected:
+                ts = self.timestamps[i]
+                new = _remanent(periods, ts, self.base[i])
+                delta = new - self.remanents[i]
+                if not delta:
+                    continue
+                changes.append((i, new))
+                for k_idx in periods.k_indices(ts):
+                    principals[k_idx] += delta
+                    if self.growth_by_day is not None:
+                        weighted[k_idx] += delta * self.growth_by_day[self.days[i]]
+
+            if commit:
+                self.q, self.p, self.periods = q, p, periods
+                self.principals, self.weighted = principals, weighted
+                for i, new in changes:
+                    self.remanents[i] = new
+            return self._response(principals, weighted), len(affected)
+
+
+class BaselineRegistry:
+    """The most recently used ``max_size`` what-if baselines, keyed by ID."""
+
+    def __init__(self, max_size: int = 32) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._baselines: "OrderedDict[str, ReturnsBaseline]" = OrderedDict()
+
+    def add(self, baseline: ReturnsBaseline) -> str:
+        baseline_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._baselines[baseline_id] = baseline
+            while len(self._baselines) > self.max_size:
+                self._baselines.popitem(last=False)
+        return baseline_id
+
+    def get(self, baseline_id: str) -> ReturnsBaseline:
+        """
+        Raises:
+            KeyError: unknown or evicted ID
+        """
+        with self._lock:
+            self._baselines.move_to_end(baseline_id)
+            return self._baselines[baseline_id]
+
+    def remove(self, baseline_id: str) -> None:
+        with self._lock:
+            del self._baselines[baseline_id]
@@ -1,7 +1,11 @@
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
 DATE_FMT = "%Y-%m-%d %H:%M:%S"
+EPOCH = datetime(1970, 1, 1)
+_CANONICAL_DATE = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d", re.ASCII)
 
 
 def parse_dt(date_str: str) -> datetime:
@@ -14,6 +18,95 @@ def format_dt(dt: datetime) -> str:
     return dt.strftime(DATE_FMT)
 
 
+def to_epoch(date_str: str) -> int:
+    """
+    Convert a date string into whole seconds since 1970-01-01 (naive, no tz).
+
+    Canonical "YYYY-MM-DD HH:MM:SS" strings take a fast slicing path;
+    anything else falls back to strptime, so the result always matches
+    ``parse_dt``.
+
+    Example:
+        to_epoch("1970-01-02 00:00:01") → 86401
+    """
+    if _CANONICAL_DATE.fullmatch(date_str):
+        try:
+            dt = datetime(
+                int(date_str[0:4]),
+                int(date_str[5:7]),
+                int(date_str[8:10]),
+                int(date_str[11:13]),
+                int(date_str[14:16]),
+                int(date_str[17:19]),
+            )
+        except ValueError:
+            dt = parse_dt(date_str)
+    else:
+        dt = parse_dt(date_str)
+    delta = dt - EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def from_epoch(ts: int) -> str:
+    """
+    Inverse of ``to_epoch``: whole seconds since 1970-01-01 → date string.
+
+    The "YYYY-MM-DD " prefix is cached per day, so a batch of timestamps
+    costs a few integer divisions each rather than a datetime + strftime.
+
+    Example:
+        from_epoch(86401) → "1970-01-02 00:00:01"
+
+    Raises:
+        ValueError: the timestamp falls outside years 1000–9999.
+    """
+    day, seconds = divmod(ts, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{_day_prefix(day)}{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+@lru_cache(maxsize=4096)
+def _day_prefix(day: int) -> str:
+    try:
+        dt = EPOCH + timedelta(days=day)
+    except OverflowError:
+        dt = None
+    if dt is None or dt.year < 1000:
+        raise ValueError(f"Timestamp day {day} is outside years 1000-9999")
+    return dt.strftime("%Y-%m-%d ")
+
+
+def is_valid_date(date_str) -> bool:
+    """
+    True if ``date_str`` is accepted by ``parse_dt``.
+
+    Canonical "YYYY-MM-DD HH:MM:SS" strings are checked with a regex and a
+    direct ``datetime`` constructor (about 3x faster than strptime); only
+    other shapes, and impossible calendar dates, take an exception path.
+
+    Example:
+        is_valid_date("2023-02-30 10:00:00") → False
+    """
+    if type(date_str) is not str:
+        return False
+    try:
+        if _CANONICAL_DATE.fullmatch(date_str):
+            datetime(
+                int(date_str[0:4]),
+                int(date_str[5:7]),
+                int(date_str[8:10]),
+                int(date_str[11:13]),
+                int(date_str[14:16]),
+                int(date_str[17:19]),
+            )
+        else:
+            parse_dt(date_str)
+    except ValueError:
+        return False
+    return True
+
+
 def is_in_period(date_str: str, start_str: str, end_str: str) -> bool:
     """
     Check if a date falls within a period (inclusive on both ends).
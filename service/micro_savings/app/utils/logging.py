@@ -1,5 +1,11 @@
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Optional, TextIO
 
 from loguru import logger
 
@@ -23,15 +29,161 @@ class InterceptHandler(logging.Handler):
         )
 
 
+def format_json(record: dict) -> str:
+    """
+    One loguru record as a JSON line.
+
+    Fields bound with ``logger.bind(...)`` / ``logger.info(..., key=value)``
+    are merged into the top level.
+
+    Example:
+        {"time": "2026-01-05T10:00:00.123+00:00", "level": "INFO",
+         "logger": "service...lifespan", "message": "Starting lifespan"}
+    """
+    line: dict[str, Any] = {
+        "time": record["time"].isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "message": record["message"],
+    }
+    line.update(record["extra"])
+    exception = record["exception"]
+    if exception is not None:
+        line["exception"] = "".join(
+            traceback.format_exception(
+                exception.type, exception.value, exception.traceback
+            )
+        )
+    return json.dumps(line, default=str) + "\n"
+
+
+class BatchedSink:
+    """
+    Loguru sink that hands records to a background writer thread.
+
+    Logging a record is a non-blocking put on a bounded queue; when the
+    queue is full the record is dropped and counted instead of stalling
+    the request.  The writer formats records (``format_json`` in JSON
+    mode) and writes up to ``batch_size`` of them with a single write +
+    flush, at least every ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        formatter: Optional[Callable[[dict], str]] = None,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self.stream = stream
+        self.formatter = formatter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._idle = threading.Condition()
+        self._closed = False
+
+        self.queued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.max_depth = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        item = message.record if self.formatter is not None else str(message)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.queued += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        lines = map(self.formatter, batch) if self.formatter is not None else batch
+        try:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+        except Exception:  # a broken stream must not kill the writer
+            pass
+        with self._idle:
+            self.written += len(batch)
+            self.batches += 1
+            self._idle.notify_all()
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Wait until every record queued so far has been written."""
+        target = self.queued
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self.written < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._idle.wait(remaining)
+
+    def close(self) -> None:
+        self.flush()
+        self._closed = True
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+            "queueDepth": self._queue.qsize(),
+            "maxQueueDepth": self.max_depth,
+        }
+
+
+_active_sink: Optional[BatchedSink] = None
+
+
 def setup_logging(
     level: str = "INFO",
-) -> None:
+    json_format: bool = False,
+    queued: bool = False,
+    queue_size: int = 10_000,
+    batch_size: int = 256,
+    flush_interval: float = 0.5,
+    uvicorn_access: bool = True,
+) -> Optional[BatchedSink]:
     """
     Configure Loguru sinks and route only Uvicorn loggers into Loguru by default.
 
     - If you want *all* stdlib loggers to go through Loguru, set only_uvicorn=False.
     - Pass `log_config=None` to uvicorn.run(...) to avoid duplicate handlers.
+    - json_format writes one JSON object per line (see ``format_json``).
+    - queued moves formatting and writing to a ``BatchedSink`` thread, which
+      is returned so its counters can be reported.
+    - uvicorn_access=False silences uvicorn's own access log, for when
+      ``AccessLogMiddleware`` writes (sampled) access records instead.
     """
+    global _active_sink
 
     intercept_handler = InterceptHandler()
 
@@ -43,6 +195,31 @@ def setup_logging(
 
     logging.getLogger("uvicorn").handlers = [intercept_handler]
     logging.getLogger("uvicorn.access").handlers = [intercept_handler]
+    logging.getLogger("uvicorn.access").disabled = not uvicorn_access
 
     logger.remove()
-    logger.add(sys.stdout, level="INFO")
+    if _active_sink is not None:
+        _active_sink.close()
+        _active_sink = None
+
+    if queued:
+        _active_sink = BatchedSink(
+            sys.stdout,
+            formatter=format_json if json_format else None,
+            queue_size=queue_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+        if json_format:
+            # The writer formats the raw record; loguru renders only the message
+            logger.add(_active_sink, level=level, format="{message}")
+        else:
+            logger.add(_active_sink, level=level)
+    elif json_format:
+        logger.add(
+            lambda message: sys.stdout.write(format_json(message.record)),
+            level=level,
+        )
+    else:
+        logger.add(sys.stdout, level=level)
+    return _active_sink
@@ -0,0 +1,43 @@
+PAISE_PER_RUPEE = 100
+
+# Round-up granularities offered to users (rupees); ₹100 is the default
+ROUND_UP_STEPS = (10, 50, 100, 500)
+DEFAULT_ROUND_UP = 100
+
+
+def to_paise(rupees: float) -> int:
+    """
+    Convert a rupee amount into whole paise (nearest paisa).
+
+    The engines add and compare money as integers from here on, so sums
+    are exact and independent of order; only the response edge converts
+    back with ``from_paise``.
+
+    Example:
+        to_paise(847.35) → 84735
+    """
+    return round(rupees * PAISE_PER_RUPEE)
+
+
+def from_paise(paise: int) -> float:
+    """
+    Convert whole paise back to rupees for a response.
+
+    Example:
+        from_paise(5265) → 52.65
+    """
+    return paise / PAISE_PER_RUPEE
+
+
+def ceiling_paise(amount_paise: int, step: int = DEFAULT_ROUND_UP) -> int:
+    """
+    Round a paise amount UP to the next multiple of ``step`` rupees.
+
+    Examples:
+        ceiling_paise(25000)        → 30000
+        ceiling_paise(30000)        → 30000  (exact multiple, no change)
+        ceiling_paise(25000, 500)   → 50000
+        ceiling_paise(84735, 10)    → 85000
+    """
+    step_paise = step * PAISE_PER_RUPEE
+    return -(-amount_paise // step_paise) * step_paise
@@ -0,0 +1,299 @@
+import asyncio
+import gc
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import psutil
+from anyio import to_thread
+from loguru import logger
+
+
+class GCPauseMonitor:
+    """
+    Times every garbage collection through ``gc.callbacks``.
+
+    ``drain()`` returns the collections, total pause and longest pause per
+    generation since the previous call; ``totals()`` the same since install.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._reset()
+        self._all_collections = [0, 0, 0]
+        self._all_pause_total = [0.0, 0.0, 0.0]
+        self._all_pause_max = [0.0, 0.0, 0.0]
+
+    def _reset(self) -> None:
+        self._collections = [0, 0, 0]
+        self._pause_total = [0.0, 0.0, 0.0]
+        self._pause_max = [0.0, 0.0, 0.0]
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        if self._started is None:
+            return
+        pause = time.perf_counter() - self._started
+        self._started = None
+        generation = info.get("generation", 2)
+        with self._lock:
+            self._collections[generation] += 1
+            self._pause_total[generation] += pause
+            self._pause_max[generation] = max(self._pause_max[generation], pause)
+            self._all_collections[generation] += 1
+            self._all_pause_total[generation] += pause
+            self._all_pause_max[generation] = max(
+                self._all_pause_max[generation], pause
+            )
+
+    def install(self) -> None:
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def uninstall(self) -> None:
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def drain(self) -> dict:
+        with self._lock:
+            drained = {
+                "collections": list(self._collections),
+                "pauseMsTotal": [round(s * 1000, 3) for s in self._pause_total],
+                "pauseMsMax": [round(s * 1000, 3) for s in self._pause_max],
+            }
+            self._reset()
+        return drained
+
+    def totals(self) -> dict:
+        with self._lock:
+            return {
+                "collections": list(self._all_collections),
+                "pauseMsTotal": [round(s * 1000, 3) for s in self._all_pause_total],
+                "pauseMsMax": [round(s * 1000, 3) for s in self._all_pause_max],
+            }
+
+
+GC_MODES = ("default", "tuned", "deferred")
+
+
+def _due_generation(counts: Tuple[int, int, int], thresholds: Tuple[int, ...]) -> int:
+    """The oldest generation over its threshold, as the automatic GC picks."""
+    return max((g for g in range(3) if counts[g] > thresholds[g]), default=0)
+
+
+class GCTuner:
+    """
+    Applies the configured garbage-collector mode for the app's lifetime.
+
+        default  → interpreter settings; pauses are still timed
+        tuned    → after startup, collect once and ``gc.freeze()`` every
+                   surviving object (registries, compiled tables, modules)
+                   so later collections never traverse them, then raise
+                   the generation thresholds so the short-lived objects of
+                   a large batch die by refcount before gen 0 fills up
+        deferred → tuned, plus automatic collection is disabled while any
+                   request is in flight; once none are, the generations
+                   that are due are collected, outside request latency
+
+    Under deferral, a request that starts with more than ``max_deferred``
+    pending gen-0 allocations collects first, so uninterrupted load cannot
+    postpone collection forever.
+    """
+
+    def __init__(
+        self,
+        mode: str = "default",
+        thresholds: Tuple[int, int, int] = (50_000, 20, 20),
+        max_deferred: int = 1_000_000,
+    ) -> None:
+        if mode not in GC_MODES:
+            raise ValueError(f"GC mode must be one of {list(GC_MODES)}")
+        self.mode = mode
+        self.thresholds = tuple(thresholds)
+        self.max_deferred = max_deferred
+        self.defer = mode == "deferred"
+        self.pauses = GCPauseMonitor()
+        self._lock = threading.Lock()
+        self._saved_thresholds: Optional[Tuple[int, int, int]] = None
+        self._in_flight = 0
+        self.deferred_requests = 0
+        self.idle_collections = 0
+        self.idle_collection_seconds = 0.0
+        self.forced_collections = 0
+
+    def apply(self) -> None:
+        """Call once startup has created its long-lived objects."""
+        self.pauses.install()
+        if self.mode == "default":
+            return
+        self._saved_thresholds = gc.get_threshold()
+        gc.collect()
+        gc.freeze()
+        gc.set_threshold(*self.thresholds)
+
+    def restore(self) -> None:
+        self.pauses.uninstall()
+        if self._saved_thresholds is None:
+            return
+        gc.enable()
+        gc.unfreeze()
+        gc.set_threshold(*self._saved_thresholds)
+        self._saved_thresholds = None
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+            self.deferred_requests += 1
+            gc.disable()
+            counts, thresholds = gc.get_count(), gc.get_threshold()
+        if counts[0] > self.max_deferred:
+            # Under continuous load the server is never idle, so older
+            # generations must be collected here too or their garbage stays
+            gc.collect(_due_generation(counts, thresholds))
+            self.forced_collections += 1
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight > 0:
+                return
+            gc.enable()
+            counts, thresholds = gc.get_count(), gc.get_threshold()
+        if counts[0] <= thresholds[0]:
+            return
+        started = time.perf_counter()
+        gc.collect(_due_generation(counts, thresholds))
+        self.idle_collections += 1
+        self.idle_collection_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "enabled": gc.isenabled(),
+            "thresholds": list(gc.get_threshold()),
+            "frozenObjects": gc.get_freeze_count(),
+            "deferredRequests": self.deferred_requests,
+            "idleCollections": self.idle_collections,
+            "idleCollectionMsTotal": round(self.idle_collection_seconds * 1000, 3),
+            "forcedCollections": self.forced_collections,
+            "pauses": self.pauses.totals(),
+        }
+
+
+class RuntimeSampler:
+    """
+    Records process and event-loop health every ``interval`` seconds into a
+    ring buffer of the last ``capacity`` samples.
+
+    Each sample holds CPU %, RSS, thread count, GC object counts plus the
+    collections and pause times since the previous sample, the event loop's
+    lag (how late the sampler's own sleep woke up) and how many of the
+    worker thread pool's tokens were in use.  Sampling runs as one task on
+    the event loop; a sample costs a few system calls.
+    """
+
+    def __init__(self, interval: float = 1.0, capacity: int = 3600) -> None:
+        self.interval = interval
+        self.capacity = capacity
+        self.gc_monitor = GCPauseMonitor()
+        self._process = psutil.Process(os.getpid())
+        self._process.cpu_percent(None)  # prime: the first reading is 0.0
+        self._lock = threading.Lock()
+        self._samples: "deque[Tuple[float, dict]]" = deque(maxlen=capacity)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        if self._task is not None:
+            return
+        self.gc_monitor.install()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.gc_monitor.uninstall()
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started - self.interval, 0.0)
+            try:
+                self.record(self.sample(lag))
+            except Exception:
+                logger.exception("Runtime sample failed")
+
+    def sample(self, loop_lag: float = 0.0) -> dict:
+        """
+        Take one sample now.  Must be called on the event loop, where the
+        default thread pool limiter lives.
+        """
+        limiter = to_thread.current_default_thread_limiter()
+        gc_stats = self.gc_monitor.drain()
+        return {
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "cpuPercent": self._process.cpu_percent(None),
+            "rssBytes": self._process.memory_info().rss,
+            "threads": threading.active_count(),
+            "gcCounts": list(gc.get_count()),
+            "gcCollections": gc_stats["collections"],
+            "gcPauseMsTotal": gc_stats["pauseMsTotal"],
+            "gcPauseMsMax": gc_stats["pauseMsMax"],
+            "loopLagMs": round(loop_lag * 1000, 3),
+            "threadPoolBusy": limiter.borrowed_tokens,
+            "threadPoolSize": limiter.total_tokens,
+            "threadPoolWaiting": limiter.statistics().tasks_waiting,
+        }
+
+    def record(self, sample: dict) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), sample))
+
+    def samples(self, window: Optional[float] = None) -> List[dict]:
+        """Samples from the last ``window`` seconds (all when None), oldest first."""
+        with self._lock:
+            items = list(self._samples)
+        if window is not None:
+            cutoff = time.monotonic() - window
+            items = [item for item in items if item[0] >= cutoff]
+        return [sample for _, sample in items]
+
+    def history(self, window: Optional[float] = None) -> dict:
+        """Samples in the window plus the peaks a capacity review starts from."""
+        samples = self.samples(window)
+        return {
+            "intervalSeconds": self.interval,
+            "windowSeconds": window,
+            "summary": {
+                "samples": len(samples),
+                "cpuPercentMax": max((s["cpuPercent"] for s in samples), default=None),
+                "rssBytesMax": max((s["rssBytes"] for s in samples), default=None),
+                "loopLagMsMax": max((s["loopLagMs"] for s in samples), default=None),
+                "gcPauseMsTotal": round(
+                    sum(sum(s["gcPauseMsTotal"]) for s in samples), 3
+                ),
+                "gcPauseMsMax": max(
+                    (max(s["gcPauseMsMax"]) for s in samples), default=None
+                ),
+                "threadPoolBusyMax": max(
+                    (s["threadPoolBusy"] for s in samples), default=None
+                ),
+                "threadPoolWaitingMax": max(
+                    (s["threadPoolWaiting"] for s in samples), default=None
+                ),
+            },
+            "samples": samples,
+        }
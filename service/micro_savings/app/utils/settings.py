@@ -1,3 +1,5 @@
+from typing import Literal, Optional, Tuple
+
 from pydantic_settings import BaseSettings
 
 
@@ -12,6 +14,48 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     workers: int = 1
 
+    # ── Logging ────────────────────────────────────────────────────────────────────
+    # LOG_QUEUED hands records to a background writer that emits them in batches; a
+    # full queue drops records instead of blocking a request. Access records come
+    # from middleware: ACCESS_LOG_SAMPLE_RATE of requests, plus every request taking
+    # at least ACCESS_LOG_SLOW_MS and every 5xx.
+
+    LOG_JSON: bool = False
+    LOG_QUEUED: bool = False
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_BATCH_SIZE: int = 256
+    LOG_FLUSH_INTERVAL: float = 0.5
+    ACCESS_LOG_ENABLED: bool = True
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_MS: Optional[float] = None
+
+    # ── Warm-up ────────────────────────────────────────────────────────────────────
+    # After startup, WARMUP_ROUNDS passes of synthetic requests (WARMUP_TRANSACTIONS
+    # each) hit every route in-process; /health/ready answers 503 until they finish.
+
+    WARMUP_ENABLED: bool = True
+    WARMUP_ROUNDS: int = 2
+    WARMUP_TRANSACTIONS: int = 200
+
+    # ── Runtime Sampler ────────────────────────────────────────────────────────────
+    # Every RUNTIME_SAMPLE_INTERVAL seconds records CPU, RSS, threads, GC pauses,
+    # event-loop lag and thread-pool use; the last RUNTIME_SAMPLE_HISTORY samples
+    # are served by /performance?window=<seconds>.
+
+    RUNTIME_SAMPLER_ENABLED: bool = True
+    RUNTIME_SAMPLE_INTERVAL: float = 1.0
+    RUNTIME_SAMPLE_HISTORY: int = 3600
+
+    # ── Garbage Collection ─────────────────────────────────────────────────────────
+    # "tuned" freezes the objects alive after startup out of the collector's reach
+    # and applies GC_THRESHOLDS; "deferred" also holds automatic collection off
+    # while requests are in flight and collects once the server is idle (or once
+    # GC_MAX_DEFERRED gen-0 allocations are pending).
+
+    GC_MODE: Literal["default", "tuned", "deferred"] = "default"
+    GC_THRESHOLDS: Tuple[int, int, int] = (50_000, 20, 20)
+    GC_MAX_DEFERRED: int = 1_000_000
+
     # ── Interest Rates ─────────────────────────────────────────────────────────────
     # 7.11% annual return for NPS
     # 14.49% annual return for Index Fund
@@ -21,5 +65,133 @@ class Settings(BaseSettings):
     MIN_YEARS_TO_RETIREMENT: int = 5
     RETIREMENT_AGE: int = 60
 
+    # ── Compression ────────────────────────────────────────────────────────────────
+    # gzip / deflate for request and response bodies. Chunks at or above the
+    # offload size are (de)compressed in a worker thread, off the event loop.
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    DEFLATE_LEVEL: int = 6
+    COMPRESSION_OFFLOAD_SIZE: int = 256 * 1024
+    MAX_DECOMPRESSED_BODY_SIZE: int = 256 * 1024 * 1024
+
+    # ── CSV Upload ─────────────────────────────────────────────────────────────────
+    # /csv/* endpoints read the CSV part as it arrives and convert it on a worker
+    # thread every CSV_UPLOAD_CHUNK_SIZE bytes. The JSON "request" part holding the
+    # periods and other options may be at most CSV_UPLOAD_MAX_OPTIONS_SIZE bytes.
+
+    CSV_UPLOAD_CHUNK_SIZE: int = 256 * 1024
+    CSV_UPLOAD_MAX_OPTIONS_SIZE: int = 1024 * 1024
+
+    # ── MessagePack ────────────────────────────────────────────────────────────────
+    # /transactions:filter and /returns:* accept application/msgpack bodies and,
+    # with "Accept: application/msgpack", answer in it. Needs the optional msgpack
+    # package; without it (or when disabled) such bodies get 415, answers are JSON.
+
+    MSGPACK_ENABLED: bool = True
+
+    # ── Filter Output ──────────────────────────────────────────────────────────────
+    # Page size cap for ?limit= and records per chunk for ?stream=true
+
+    FILTER_MAX_PAGE_SIZE: int = 10_000
+    FILTER_STREAM_BATCH_SIZE: int = 500
+
+    # ── Parallel Filter ────────────────────────────────────────────────────────────
+    # With FILTER_PARALLEL_WORKERS > 0, full /transactions:filter responses for at
+    # least FILTER_PARALLEL_MIN_TRANSACTIONS are evaluated and encoded in chunks of
+    # FILTER_PARALLEL_CHUNK_SIZE across that many worker processes.
+
+    FILTER_PARALLEL_WORKERS: int = 0
+    FILTER_PARALLEL_MIN_TRANSACTIONS: int = 50_000
+    FILTER_PARALLEL_CHUNK_SIZE: int = 25_000
+
+    # ── Period Sets ────────────────────────────────────────────────────────────────
+    # Registered Q/P/K sets kept compiled in memory (least recently used evicted)
+
+    PERIOD_SET_CACHE_SIZE: int = 256
+
+    # ── Shared Cache ───────────────────────────────────────────────────────────────
+    # One memory-mapped file per host shared by all server workers: a period set
+    # registered through any worker resolves on every worker, and eviction applies
+    # to all of them. SHARED_CACHE_ENABLED=None turns it on when workers > 1;
+    # SHARED_CACHE_PATH defaults to /dev/shm/micro-savings-<port>.cache.
+
+    SHARED_CACHE_ENABLED: Optional[bool] = None
+    SHARED_CACHE_PATH: Optional[str] = None
+    SHARED_CACHE_SLOTS: int = 256
+    SHARED_CACHE_SLOT_SIZE: int = 64 * 1024
+    SHARED_CACHE_WAYS: int = 8
+
+    # ── What-if ────────────────────────────────────────────────────────────────────
+    # Returns baselines kept in memory for incremental Q/P what-ifs (LRU evicted)
+
+    WHATIF_BASELINE_CACHE_SIZE: int = 32
+
+    # ── Jobs ───────────────────────────────────────────────────────────────────────
+    # /jobs/returns:* run on JOB_WORKERS threads of their own; at most JOB_MAX_QUEUED
+    # wait for one (then 429), and finished results expire after JOB_RESULT_TTL s;
+    # at most JOB_MAX_FINISHED are kept, the longest-finished evicted first.
+    # Jobs live in the memory of the worker that accepted them, so a poll routed to
+    # another worker gets 404: JOBS_ENABLED=None turns them on only when workers == 1.
+
+    JOBS_ENABLED: Optional[bool] = None
+    JOB_WORKERS: int = 2
+    JOB_MAX_QUEUED: int = 16
+    JOB_RESULT_TTL: float = 900.0
+    JOB_MAX_FINISHED: int = 64
+
+    # ── Transaction Store ──────────────────────────────────────────────────────────
+    # Optional SQLite file of users' transactions indexed by (user, time). Filter
+    # and returns requests with "userId" read only their K windows from it.
+
+    STORE_ENABLED: bool = False
+    STORE_PATH: str = "micro_savings.db"
+    STORE_POOL_SIZE: int = 4
+    STORE_BATCH_SIZE: int = 1000
+
+    # ── Admission Control ──────────────────────────────────────────────────────────
+    # Compute endpoints cost transactions × periods. Work beyond ADMISSION_MAX_COST
+    # in flight waits up to ADMISSION_QUEUE_TIMEOUT seconds (at most
+    # ADMISSION_MAX_QUEUE waiters), then gets 429 with Retry-After.
+
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_COST: int = 5_000_000
+    ADMISSION_MAX_QUEUE: int = 64
+    ADMISSION_QUEUE_TIMEOUT: float = 0.5
+    ADMISSION_MAX_RETRY_AFTER: int = 30
+
+    # ── Memory Accounting ──────────────────────────────────────────────────────────
+    # Runs tracemalloc for the whole process (roughly doubles allocation cost) and
+    # records peak / retained traced bytes per endpoint. Frames > 1 make snapshot
+    # diffs show deeper tracebacks at extra cost.
+
+    MEMORY_TRACKING_ENABLED: bool = False
+    MEMORY_TRACE_FRAMES: int = 1
+    MEMORY_SNAPSHOT_HISTORY: int = 4
+
+    # ── Profiling ──────────────────────────────────────────────────────────────────
+    # Opt-in per request via "X-Profile: 1" or "?profile=true". When disabled the
+    # middleware is not installed at all.
+
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOP_N: int = 25
+    PROFILING_HISTORY: int = 50
+
+    # ── Tracing ────────────────────────────────────────────────────────────────────
+    # Share of requests traced when no "traceparent" header decides. A propagated
+    # sampled flag forces a trace at most TRACING_FORCED_PER_SECOND times a second,
+    # then counts as unflagged. Spans are kept in a ring buffer of whole traces, at
+    # most TRACING_MAX_SPANS each, and, if TRACING_EXPORT_PATH is set, appended
+    # there as JSON lines.
+
+    TRACING_ENABLED: bool = True
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_BUFFER_SIZE: int = 1000
+    TRACING_EXPORT_PATH: Optional[str] = None
+    TRACING_EXPORT_BATCH_SIZE: int = 256
+    TRACING_MAX_SPANS: int = 500
+    TRACING_FORCED_PER_SECOND: float = 10.0
+
 
 settings = Settings()
@@ -0,0 +1,331 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# ── File layout ───────────────────────────────────────────────────────────────
+#
+#   header   magic, slots, ways, slot size, worker rows
+#   workers  one row of counters per attached process
+#   slots    seq, tick, key digest, length, crc32, then up to slot_size bytes
+#
+# ``seq`` is a seqlock: odd while a writer is rewriting the slot.  ``tick``
+# is the last use (CLOCK_MONOTONIC, the same in every process); an empty
+# slot has an all-zero key digest.
+
+_MAGIC = b"MSCACHE1"
+_HEADER = struct.Struct("<8sIIII")
+_HEADER_SIZE = 64
+_SLOT = struct.Struct("<QQ16sII")
+_SLOT_HEADER_SIZE = 48
+_SEQ = struct.Struct("<Q")
+_TICK_AT = 8
+_DIGEST_AT = 16
+_EMPTY = bytes(16)
+
+WORKER_FIELDS = (
+    "hits",
+    "misses",
+    "current",
+    "stale",
+    "stores",
+    "evictions",
+    "oversized",
+)
+_ROW = struct.Struct("<Q" + "Q" * len(WORKER_FIELDS))
+_ROW_SIZE = 64
+_FIELD_AT = {name: 8 * (1 + i) for i, name in enumerate(WORKER_FIELDS)}
+_READ_ATTEMPTS = 4
+
+# A slot as seen by ``get``: (offset, seq).  Unchanged seq ⇒ unchanged value.
+Handle = Tuple[int, int]
+
+
+def default_cache_path(port: int) -> str:
+    """A per-port file in /dev/shm (RAM-backed) when available."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"micro-savings-{port}.cache")
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedCache:
+    """
+    A host-wide key → bytes cache in a memory-mapped file, shared by every
+    process that opens the same ``path`` (e.g. the uvicorn workers).
+
+    Set-associative: a key hashes to one set of ``ways`` slots and evicts
+    the least recently used slot of that set, so every process agrees on
+    what is cached and what was evicted.  Reads take no lock — each slot
+    carries a sequence number that writers make odd while rewriting it, and
+    a reader retries when it changes underneath it (the CRC catches torn
+    copies too).  Writers serialize on an ``flock`` of the file.
+
+    Each process claims a row of counters in the file, so ``workers()``
+    reports the hit / miss statistics of every live process.  Values larger
+    than ``slot_size`` are not cached.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 256,
+        slot_size: int = 64 * 1024,
+        ways: int = 8,
+        worker_rows: int = 32,
+    ) -> None:
+        if slots <= 0 or ways <= 0 or slots % ways:
+            raise ValueError("slots must be a positive multiple of ways")
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ways = ways
+        self.worker_rows = worker_rows
+        self._sets = slots // ways
+        self._stride = _SLOT_HEADER_SIZE + slot_size
+        self._slots_at = _HEADER_SIZE + worker_rows * _ROW_SIZE
+        size = self._slots_at + slots * self._stride
+
+        self._lock = threading.Lock()  # counters
+        self._write_lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._init_file(size)
+                self._map = mmap.mmap(self._fd, size)
+                self._row = self._claim_row()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._counters = {name: 0 for name in WORKER_FIELDS}
+
+    def _init_file(self, size: int) -> None:
+        """(Re)create the file unless it already has this geometry."""
+        header = _HEADER.pack(
+            _MAGIC, self.slots, self.ways, self.slot_size, self.worker_rows
+        )
+        if os.fstat(self._fd).st_size == size:
+            if os.pread(self._fd, _HEADER.size, 0) == header:
+                return
+        os.ftruncate(self._fd, 0)
+        os.ftruncate(self._fd, size)
+        os.pwrite(self._fd, header, 0)
+
+    def _claim_row(self) -> Optional[int]:
+        """A free counter row (or one left by a dead process).  Holds flock."""
+        for row in range(self.worker_rows):
+            at = _HEADER_SIZE + row * _ROW_SIZE
+            pid = _SEQ.unpack_from(self._map, at)[0]
+            if pid == 0 or not _alive(pid):
+                _ROW.pack_into(self._map, at, os.getpid(), *([0] * len(WORKER_FIELDS)))
+                return row
+        return None
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+            if self._row is not None:
+                at = _HEADER_SIZE + self._row * _ROW_SIZE
+                _SEQ.pack_into(self._map, at + _FIELD_AT[name], self._counters[name])
+
+    def _set_offsets(self, digest: bytes) -> range:
+        first = int.from_bytes(digest[:8], "little") % self._sets * self.ways
+        start = self._slots_at + first * self._stride
+        return range(start, start + self.ways * self._stride, self._stride)
+
+    # ── Lock-free reads ───────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Handle]]:
+        """The cached value and a handle to check it later, or None."""
+        digest = _digest(key)
+        for _ in range(_READ_ATTEMPTS):
+            retry = False
+            for at in self._set_offsets(digest):
+                seq, _, slot_digest, length, crc = _SLOT.unpack_from(self._map, at)
+                if seq & 1:
+                    retry = True
+                    continue
+                if slot_digest != digest:
+                    continue
+                start = at + _SLOT_HEADER_SIZE
+                value = self._map[start : start + length]
+                if (
+                    _SEQ.unpack_from(self._map, at)[0] != seq
+                    or zlib.crc32(value) != crc
+                ):
+                    retry = True
+                    continue
+                self._touch(at)
+                self._count("hits")
+                return value, (at, seq)
+            if not retry:
+                break
+        self._count("misses")
+        return None
+
+    def is_current(self, handle: Handle) -> bool:
+        """
+        Whether the slot behind ``handle`` still holds the value ``get`` or
+        ``put`` returned it for — i.e. it was not rewritten, evicted or
+        removed since, by any process.
+        """
+        at, seq = handle
+        if _SEQ.unpack_from(self._map, at)[0] == seq:
+            self._touch(at)
+            self._count("current")
+            return True
+        self._count("stale")
+        return False
+
+    def _touch(self, at: int) -> None:
+        # Unlocked: a lost update only makes the LRU choice approximate
+        _SEQ.pack_into(self._map, at + _TICK_AT, time.monotonic_ns())
+
+    def __len__(self) -> int:
+        end = self._slots_at + self.slots * self._stride
+        digests = range(self._slots_at + _DIGEST_AT, end, self._stride)
+        return sum(1 for at in digests if self._map[at : at + 16] != _EMPTY)
+
+    # ── Locked writes ─────────────────────────────────────────────────────────
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._write_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _write(self, at: int, tick: int, digest: bytes, value: bytes) -> int:
+        """Rewrite one slot under the seqlock.  Caller holds the locks."""
+        seq = _SEQ.unpack_from(self._map, at)[0] + 1
+        _SEQ.pack_into(self._map, at, seq)
+        start = at + _SLOT_HEADER_SIZE
+        self._map[start : start + len(value)] = value
+        _SLOT.pack_into(self._map, at, seq, tick, digest, len(value), zlib.crc32(value))
+        _SEQ.pack_into(self._map, at, seq + 1)
+        return seq + 1
+
+    def put(self, key: str, value: bytes) -> Optional[Handle]:
+        """
+        Cache ``value`` under ``key``, evicting the set's least recently
+        used slot if it is full.  An unchanged value is not rewritten.
+
+        Returns:
+            A handle for ``is_current``, or None if the value is too large.
+        """
+        if len(value) > self.slot_size:
+            self._count("oversized")
+            return None
+        digest = _digest(key)
+        crc = zlib.crc32(value)
+        evicted = False
+        with self._locked():
+            victim, victim_tick = 0, None
+            for at in self._set_offsets(digest):
+                seq, tick, slot_digest, length, slot_crc = _SLOT.unpack_from(
+                    self._map, at
+                )
+                if slot_digest == digest:
+                    if length == len(value) and slot_crc == crc:
+                        self._touch(at)
+                        return at, seq
+                    victim, victim_tick = at, -1
+                    break
+                if slot_digest == _EMPTY:
+                    tick = -1
+                if victim_tick is None or tick < victim_tick:
+                    victim, victim_tick = at, tick
+            evicted = victim_tick != -1
+            seq = self._write(victim, time.monotonic_ns(), digest, value)
+        if evicted:
+            self._count("evictions")
+        self._count("stores")
+        return victim, seq
+
+    def remove(self, key: str) -> bool:
+        """Drop ``key`` for every process.  Returns whether it was cached."""
+        digest = _digest(key)
+        with self._locked():
+            for at in self._set_offsets(digest):
+                if _SLOT.unpack_from(self._map, at)[2] == digest:
+                    self._write(at, 0, _EMPTY, b"")
+                    return True
+        return False
+
+    # ── Statistics ────────────────────────────────────────────────────────────
+
+    def reset_counters(self) -> None:
+        """Zero this process's counters."""
+        with self._lock:
+            self._counters = {name: 0 for name in WORKER_FIELDS}
+            if self._row is not None:
+                _ROW.pack_into(
+                    self._map,
+                    _HEADER_SIZE + self._row * _ROW_SIZE,
+                    os.getpid(),
+                    *([0] * len(WORKER_FIELDS)),
+                )
+
+    def workers(self) -> List[Dict[str, int]]:
+        """The counters of every live process attached to the file."""
+        rows = []
+        for row in range(self.worker_rows):
+            pid, *counts = _ROW.unpack_from(self._map, _HEADER_SIZE + row * _ROW_SIZE)
+            if pid and _alive(pid):
+                rows.append({"pid": pid, **dict(zip(WORKER_FIELDS, counts))})
+        return rows
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "path": self.path,
+            "slots": self.slots,
+            "ways": self.ways,
+            "slotSize": self.slot_size,
+            "entries": len(self),
+            "worker": {
+                "pid": os.getpid(),
+                **counters,
+                "hitRate": round(counters["hits"] / lookups, 4) if lookups else None,
+            },
+            "workers": self.workers(),
+        }
+
+    def close(self) -> None:
+        """Release this process's counter row and unmap the file."""
+        if self._map.closed:
+            return
+        if self._row is not None:
+            _ROW.pack_into(
+                self._map,
+                _HEADER_SIZE + self._row * _ROW_SIZE,
+                *([0] * (1 + len(WORKER_FIELDS))),
+            )
+        self._map.close()
+        os.close(self._fd)
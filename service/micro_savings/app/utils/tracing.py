@@ -0,0 +1,338 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+_TRACEPARENT = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+# ── W3C trace context ─────────────────────────────────────────────────────────
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C ``traceparent`` header.
+
+    Returns:
+        (trace_id, parent_span_id, sampled), or None if absent / malformed
+    """
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def format_traceparent(trace_id: str, span_id: str, sampled: bool = True) -> str:
+    return f"00-{trace_id}-{span_id}-{'01' if sampled else '00'}"
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+# ── Spans ─────────────────────────────────────────────────────────────────────
+
+
+class Span:
+    """
+    One timed operation inside a sampled trace.
+
+    Used as a context manager: entering makes it the parent of spans opened
+    below it (including in thread-pool threads, which copy the context);
+    exiting records its duration.
+    """
+
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        trace: "Trace",
+        name: str,
+        parent_id: Optional[str],
+        attributes: dict,
+        start_ns: Optional[int] = None,
+    ) -> None:
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns: Optional[int] = None
+        self._token = None
+        trace.spans.append(self)
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns() if end_ns is None else end_ns
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+        self.end()
+
+    def to_dict(self) -> dict:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "name": self.name,
+            "startUnixMs": round(self.start_ns / 1e6, 3),
+            "durationMs": round((end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned by ``span`` outside a sampled trace — costs one context lookup."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """All spans recorded for one sampled request."""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+
+
+def span(name: str, **attributes):
+    """
+    Open a child of the current span.
+
+        with span("qpk.rules", transactions=len(raw)):
+            ...
+
+    Outside a sampled trace this returns a shared no-op, so instrumented
+    engine code pays almost nothing when the request is not traced.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+# ── Tracer ────────────────────────────────────────────────────────────────────
+
+
+class Tracer:
+    """
+    Samples requests, keeps finished traces in a ring buffer and optionally
+    exports them as JSON lines to a local file in batches.
+
+    Sampling is parent-based: an incoming ``traceparent`` decides for the
+    request; without one, a request is traced with probability
+    ``sample_rate``.  An unsampled flag is always honoured, but a sampled
+    one forces a trace only while a token bucket refilled at
+    ``forced_per_second`` has a token; past that, the request is sampled
+    at ``sample_rate`` like any other, so callers cannot trace every
+    request.  A trace keeps at most ``max_spans`` spans, however many
+    requests contribute to it; the extras are counted, not stored.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        buffer_size: int = 1000,
+        export_path: Optional[str] = None,
+        export_batch_size: int = 256,
+        max_spans: int = 500,
+        forced_per_second: float = 10.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.export_path = export_path
+        self.export_batch_size = export_batch_size
+        self.max_spans = max_spans
+        self.forced_per_second = forced_per_second
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._traces: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._dropped: Dict[str, int] = {}  # trace ID → spans over max_spans
+        self._pending: List[dict] = []
+        # Up to a second's worth of forced traces at once (none if rate is 0)
+        self._forced_burst = (
+            max(forced_per_second, 1.0) if forced_per_second > 0 else 0.0
+        )
+        self._forced_tokens = self._forced_burst
+        self._forced_refilled = time.monotonic()
+        self.dropped_spans = 0
+        self.forced_throttled = 0
+
+    def start_trace(
+        self, name: str, traceparent: Optional[str] = None, **attributes
+    ) -> Optional[Span]:
+        """Root span for a new request, or None if it is not sampled."""
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+            if not sampled:
+                return None
+            if self._take_forced_token() or self._sampled():
+                return Span(Trace(trace_id), name, parent_id, attributes)
+            return None
+        if self._sampled():
+            return Span(Trace(_new_id(16)), name, None, attributes)
+        return None
+
+    def _sampled(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _take_forced_token(self) -> bool:
+        """
+        Take a token for a trace forced by a caller's sampled flag; once
+        they run out, forced requests are sampled like any other.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._forced_tokens = min(
+                self._forced_tokens
+                + (now - self._forced_refilled) * self.forced_per_second,
+                self._forced_burst,
+            )
+            self._forced_refilled = now
+            if self._forced_tokens < 1.0:
+                self.forced_throttled += 1
+                return False
+            self._forced_tokens -= 1.0
+            return True
+
+    def finish(self, root: Span) -> Optional[List[dict]]:
+        """
+        End ``root``, store its trace in the ring buffer and queue it for
+        export.
+
+        Returns:
+            a batch of spans ready for ``write_batch`` once the export
+            batch size is reached, else None
+        """
+        root.end()
+        trace_id = root.trace.trace_id
+        recorded = root.trace.spans
+        spans = [s.to_dict() for s in recorded[: self.max_spans]]
+        with self._lock:
+            # Spans of a propagated trace may arrive over several requests
+            stored = self._traces.setdefault(trace_id, [])
+            room = max(self.max_spans - len(stored), 0)
+            dropped = len(recorded) - min(len(spans), room)
+            if dropped:
+                spans = spans[:room]
+                self._dropped[trace_id] = self._dropped.get(trace_id, 0) + dropped
+                self.dropped_spans += dropped
+            stored.extend(spans)
+            self._traces.move_to_end(trace_id)
+            while len(self._traces) > self.buffer_size:
+                evicted, _ = self._traces.popitem(last=False)
+                self._dropped.pop(evicted, None)
+
+            if self.export_path is None:
+                return None
+            self._pending.extend(spans)
+            if len(self._pending) < self.export_batch_size:
+                return None
+            batch, self._pending = self._pending, []
+        return batch
+
+    def write_batch(self, batch: List[dict]) -> None:
+        """Append spans to the export file, one JSON object per line."""
+        if not batch or self.export_path is None:
+            return
+        lines = "".join(json.dumps(s, separators=(",", ":")) + "\n" for s in batch)
+        with self._write_lock, open(self.export_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def flush(self) -> None:
+        """Write any spans still waiting for a full batch."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        self.write_batch(batch)
+
+    def get_trace(self, trace_id: str) -> List[dict]:
+        """Raises KeyError if the trace was never sampled or has been evicted."""
+        with self._lock:
+            return list(self._traces[trace_id])
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        """Summaries of the most recent traces, newest first."""
+        with self._lock:
+            items = list(self._traces.items())[-limit:]
+            dropped = dict(self._dropped)
+        summaries = []
+        for trace_id, spans in reversed(items):
+            ids = {s["spanId"] for s in spans}
+            roots = [s for s in spans if s["parentId"] not in ids]
+            root = roots[0] if roots else spans[0]
+            summaries.append(
+                {
+                    "traceId": trace_id,
+                    "name": root["name"],
+                    "startUnixMs": root["startUnixMs"],
+                    "durationMs": root["durationMs"],
+                    "spanCount": len(spans),
+                    "droppedSpans": dropped.get(trace_id, 0),
+                    "attributes": root["attributes"],
+                }
+            )
+        return summaries
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sampleRate": self.sample_rate,
+                "traces": len(self._traces),
+                "maxSpans": self.max_spans,
+                "droppedSpans": self.dropped_spans,
+                "forcedPerSecond": self.forced_per_second,
+                "forcedThrottled": self.forced_throttled,
+            }
@@ -0,0 +1,37 @@
+import base64
+import binascii
+
+
+def encode_cursor(offset: int, key: str = "") -> str:
+    """
+    Encode a record offset as an opaque, URL-safe pagination cursor, bound
+    to the ``key`` of the request it pages through.
+
+    Example:
+        encode_cursor(500)         → "NTAw"
+        encode_cursor(500, "3f2a") → "NTAwLjNmMmE"
+    """
+    token = f"{offset}.{key}" if key else str(offset)
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str = "") -> int:
+    """
+    Decode a cursor produced by ``encode_cursor`` back into its offset.
+
+    Raises:
+        ValueError: if the cursor is malformed or negative, or was issued
+            for a request with another ``key``.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        token = base64.urlsafe_b64decode(padded.encode()).decode()
+        offset_part, _, cursor_key = token.partition(".")
+        offset = int(offset_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Cursor '{cursor}' is not a valid pagination cursor")
+    if offset < 0:
+        raise ValueError(f"Cursor '{cursor}' is not a valid pagination cursor")
+    if cursor_key != key:
+        raise ValueError(f"Cursor '{cursor}' was issued for a different request")
+    return offset
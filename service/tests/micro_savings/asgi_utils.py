@@ -0,0 +1,127 @@
+import asyncio
+import json
+from typing import Iterable, Optional
+
+
+async def call_asgi(
+    app,
+    method: str,
+    path: str,
+    headers: Optional[dict] = None,
+    chunks: Iterable[bytes] = (b"",),
+    query_string: str = "",
+) -> tuple[int, dict, bytes]:
+    """
+    Drive an ASGI app directly — no network, no HTTP client dependency.
+
+    The request body is delivered as the given chunks; after the last one
+    the client stays connected until the response completes.
+
+    Returns:
+        (status_code, response_headers, response_body)
+    """
+    chunks = list(chunks) or [b""]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string.encode(),
+        "headers": [
+            (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+        "app": app,
+    }
+    incoming = [
+        {"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+        for i, c in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await asyncio.Event().wait()  # client stays connected
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = sent[0]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    return start["status"], response_headers, body
+
+
+def call_app(app, method, path, headers=None, chunks=(b"",), query_string=""):
+    """Synchronous wrapper around ``call_asgi``."""
+    return asyncio.run(call_asgi(app, method, path, headers, chunks, query_string))
+
+
+def post_json(app, path, payload, headers=None, query_string=""):
+    """POST a JSON payload and decode the JSON response."""
+    status, _, body = call_app(
+        app,
+        "POST",
+        path,
+        {"content-type": "application/json", **(headers or {})},
+        (json.dumps(payload).encode(),),
+        query_string,
+    )
+    return status, json.loads(body) if body else None
+
+
+class AppClient:
+    """
+    Synchronous in-process client that runs the app's lifespan, so
+    ``app.state`` resources created at startup are available.  Like a
+    readiness probe, it waits for the startup warm-up to finish.
+
+    Usage::
+
+        with AppClient(get_app()) as client:
+            status, body = client.post_json("/blackrock/challenge/v1/...", {...})
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._runner = None
+        self._lifespan = None
+
+    def __enter__(self) -> "AppClient":
+        self._runner = asyncio.Runner()
+        self._lifespan = self.app.router.lifespan_context(self.app)
+        self._runner.run(self._lifespan.__aenter__())
+        warmup = getattr(self.app.state, "warmup", None)
+        if warmup is not None:
+            self._runner.run(warmup.ready.wait())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._runner.run(self._lifespan.__aexit__(None, None, None))
+        self._runner.close()
+
+    def request(self, method, path, headers=None, chunks=(b"",), query_string=""):
+        return self._runner.run(
+            call_asgi(self.app, method, path, headers, chunks, query_string)
+        )
+
+    def get_json(self, path, headers=None, query_string=""):
+        status, _, body = self.request("GET", path, headers, query_string=query_string)
+        return status, json.loads(body) if body else None
+
+    def post_json(self, path, payload, headers=None, query_string=""):
+        status, _, body = self.request(
+            "POST",
+            path,
+            {"content-type": "application/json", **(headers or {})},
+            (json.dumps(payload).encode(),),
+            query_string,
+        )
+        return status, json.loads(body) if body else None
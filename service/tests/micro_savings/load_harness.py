@@ -0,0 +1,596 @@
+"""
+In-process load generator for the micro_savings API.
+
+Drives the app built by ``application.get_app`` either in-process over ASGI
+(no sockets — measures the app itself) or over HTTP against a running
+uvicorn, with a weighted mix of synthetic or recorded requests.
+
+Usage:
+    python -m service.tests.micro_savings.load_harness -n 2000 -c 16 \\
+        --mix filter=4,nps=2,index=1,parse=1 --transactions 500 \\
+        --output bench.json
+
+    # against a local server, tracking the server's RSS
+    python -m service.tests.micro_savings.load_harness \\
+        --url http://127.0.0.1:5477 --pid $(pgrep -f micro_savings) -n 2000
+
+    # replay recorded requests ({"method", "path", "body"} per line)
+    python -m service.tests.micro_savings.load_harness --recorded recorded.jsonl
+
+    # compare against an earlier run
+    python -m service.tests.micro_savings.load_harness --baseline bench.json
+
+    # same load under another garbage-collector mode (in-process only)
+    python -m service.tests.micro_savings.load_harness --gc-mode deferred \\
+        --baseline bench.json
+
+The JSON report is written with sorted keys so two runs diff cleanly.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import psutil
+
+from service.micro_savings.app.utils.runtime import GC_MODES, GCPauseMonitor
+from service.tests.micro_savings.asgi_utils import call_asgi
+
+PREFIX = "/blackrock/challenge/v1"
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+# ── Payloads ──────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class RequestSpec:
+    name: str
+    method: str
+    path: str
+    body: Optional[bytes] = None
+    query_string: str = ""
+
+
+def _synthetic_transactions(rng: random.Random, count: int) -> list[dict]:
+    start = datetime(2023, 1, 1)
+    return [
+        {
+            "date": (start + timedelta(minutes=37 * i)).strftime(DATE_FMT),
+            "amount": round(rng.uniform(1, 5000), 2),
+        }
+        for i in range(count)
+    ]
+
+
+def _synthetic_periods() -> dict:
+    return {
+        "q": [
+            {"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}
+        ],
+        "p": [
+            {"extra": 25, "start": "2023-10-01 00:00:00", "end": "2023-12-31 23:59:59"}
+        ],
+        "k": [
+            {"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"},
+            {"start": "2023-03-01 00:00:00", "end": "2023-11-30 23:59:59"},
+        ],
+    }
+
+
+def _parsed(transactions: list[dict]) -> list[dict]:
+    out = []
+    for tx in transactions:
+        ceiling = -(-tx["amount"] // 100) * 100
+        out.append(
+            {**tx, "ceiling": ceiling, "remanent": round(ceiling - tx["amount"], 2)}
+        )
+    return out
+
+
+def synthetic_scenarios(transactions: int, seed: int = 7) -> dict[str, RequestSpec]:
+    """One representative request per public route."""
+    rng = random.Random(seed)
+    txns = _synthetic_transactions(rng, transactions)
+    periods = _synthetic_periods()
+
+    def post(name, path, payload, query_string=""):
+        return RequestSpec(
+            name, "POST", PREFIX + path, json.dumps(payload).encode(), query_string
+        )
+
+    returns_body = {
+        "age": 29,
+        "wage": 50000,
+        "inflation": 5.5,
+        **periods,
+        "transactions": txns,
+    }
+    return {
+        "health": RequestSpec("health", "GET", PREFIX + "/health"),
+        "performance": RequestSpec("performance", "GET", PREFIX + "/performance"),
+        "parse": post("parse", "/transactions:parse", txns),
+        "validator": post(
+            "validator",
+            "/transactions:validator",
+            {"wage": 50000, "transactions": _parsed(txns)},
+        ),
+        "filter": post(
+            "filter",
+            "/transactions:filter",
+            {"wage": 50000, **periods, "transactions": txns},
+        ),
+        "filter_stream": post(
+            "filter_stream",
+            "/transactions:filter",
+            {"wage": 50000, **periods, "transactions": txns},
+            "stream=true",
+        ),
+        "nps": post("nps", "/returns:nps", returns_body),
+        "index": post("index", "/returns:index", returns_body),
+    }
+
+
+def recorded_scenarios(path: str) -> list[RequestSpec]:
+    """
+    Load recorded requests, one JSON object per line:
+        {"method": "POST", "path": "/transactions:filter", "body": {...}, "name": "opt"}
+    Paths without the API prefix get it prepended.
+    """
+    specs = []
+    with open(path) as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            req_path, _, query_string = rec["path"].partition("?")
+            if not req_path.startswith(PREFIX):
+                req_path = PREFIX + req_path
+            body = rec.get("body")
+            specs.append(
+                RequestSpec(
+                    name=rec.get("name") or req_path.rsplit("/", 1)[-1],
+                    method=rec.get(
+                        "method", "POST" if body is not None else "GET"
+                    ).upper(),
+                    path=req_path,
+                    body=json.dumps(body).encode() if body is not None else None,
+                    query_string=query_string,
+                )
+            )
+    if not specs:
+        raise ValueError(f"No requests recorded in {path}")
+    return specs
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    """'filter=3,nps=1' → {'filter': 3, 'nps': 1}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+# ── Transports ────────────────────────────────────────────────────────────────
+
+
+class AsgiTarget:
+    """Runs the app in-process, including its lifespan startup/shutdown."""
+
+    label = "asgi"
+
+    def __init__(self, app):
+        self.app = app
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._replies: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        async def receive():
+            return await self._events.get()
+
+        async def send(message):
+            await self._replies.put(message)
+
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._task = asyncio.create_task(self.app(scope, receive, send))
+        await self._events.put({"type": "lifespan.startup"})
+        reply = await self._replies.get()
+        if reply["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Lifespan startup failed: {reply.get('message')}")
+        warmup = getattr(self.app.state, "warmup", None)
+        if warmup is not None:
+            await warmup.ready.wait()  # measure the app as it serves once ready
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._events.put({"type": "lifespan.shutdown"})
+        await self._replies.get()
+        await self._task
+
+    async def request(self, spec: RequestSpec) -> tuple[int, int]:
+        headers = {"content-type": "application/json"} if spec.body is not None else {}
+        status, _, body = await call_asgi(
+            self.app,
+            spec.method,
+            spec.path,
+            headers,
+            (spec.body or b"",),
+            spec.query_string,
+        )
+        return status, len(body)
+
+
+class HttpTarget:
+    """Minimal keep-alive HTTP/1.1 client — one connection per worker."""
+
+    label = "http"
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.base = parts.path.rstrip("/")
+        self._pool: asyncio.Queue = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        while not self._pool.empty():
+            _, writer = self._pool.get_nowait()
+            writer.close()
+
+    async def request(self, spec: RequestSpec) -> tuple[int, int]:
+        if self._pool.empty():
+            conn = await asyncio.open_connection(self.host, self.port)
+        else:
+            conn = self._pool.get_nowait()
+        reader, writer = conn
+
+        target = (
+            self.base
+            + spec.path
+            + (f"?{spec.query_string}" if spec.query_string else "")
+        )
+        body = spec.body or b""
+        head = (
+            f"{spec.method} {target} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            + ("Content-Type: application/json\r\n" if spec.body is not None else "")
+            + "\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            key, _, value = line.decode().partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding") == "chunked":
+            size = 0
+            while (chunk_len := int((await reader.readline()).strip(), 16)) > 0:
+                size += len(await reader.readexactly(chunk_len + 2)) - 2
+            await reader.readline()
+        else:
+            size = len(await reader.readexactly(int(headers.get("content-length", 0))))
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._pool.put_nowait(conn)
+        return status, size
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: dict[str, int] = field(default_factory=dict)
+    bytes: int = 0
+
+    def record(self, latency_ms: float, status: int, size: int) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        self.bytes += size
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already-sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+def summarise(stats: RouteStats, elapsed_s: float) -> dict:
+    values = sorted(stats.latencies_ms)
+    count = len(values)
+    errors = sum(n for code, n in stats.statuses.items() if not code.startswith("2"))
+    return {
+        "requests": count,
+        "errors": errors,
+        "statuses": dict(sorted(stats.statuses.items())),
+        "throughput_rps": round(count / elapsed_s, 2) if elapsed_s else 0.0,
+        "bytes_received": stats.bytes,
+        "latency_ms": {
+            "min": round(values[0], 3) if values else 0.0,
+            "mean": round(sum(values) / count, 3) if count else 0.0,
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "max": round(values[-1], 3) if values else 0.0,
+        },
+    }
+
+
+async def _sample_rss(
+    process: psutil.Process, peak: list[int], stop: asyncio.Event
+) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], process.memory_info().rss)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.1)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(
+    target,
+    choose: Callable[[], RequestSpec],
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    duration_s: Optional[float] = None,
+    pid: Optional[int] = None,
+) -> dict:
+    """
+    Issue ``requests`` requests (or run for ``duration_s`` seconds) from
+    ``concurrency`` workers and return the report dict.
+    """
+    process = psutil.Process(pid or os.getpid())
+    mb = 1024 * 1024
+
+    async with target:
+        for _ in range(warmup):
+            await target.request(choose())
+
+        # GC pauses are only the server's own when it runs in this process
+        gc_monitor = GCPauseMonitor() if target.label == "asgi" else None
+        if gc_monitor is not None:
+            gc_monitor.install()
+
+        rss_start = process.memory_info().rss
+        peak = [rss_start]
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(_sample_rss(process, peak, stop))
+
+        per_route: dict[str, RouteStats] = {}
+        overall = RouteStats()
+        issued = 0
+        started = time.perf_counter()
+        deadline = started + duration_s if duration_s else None
+
+        async def worker():
+            nonlocal issued
+            while True:
+                if deadline is None:
+                    if issued >= requests:
+                        return
+                elif time.perf_counter() >= deadline:
+                    return
+                issued += 1
+                spec = choose()
+                t0 = time.perf_counter()
+                try:
+                    status, size = await target.request(spec)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    status, size = 599, 0
+                latency = (time.perf_counter() - t0) * 1000
+                per_route.setdefault(spec.name, RouteStats()).record(
+                    latency, status, size
+                )
+                overall.record(latency, status, size)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await sampler
+        rss_end = process.memory_info().rss
+        peak[0] = max(peak[0], rss_end)
+
+        gc_report = None
+        if gc_monitor is not None:
+            gc_monitor.uninstall()
+            tuner = getattr(target.app.state, "gc_tuner", None)
+            gc_report = {
+                "mode": tuner.mode if tuner is not None else "default",
+                **gc_monitor.totals(),
+            }
+
+    return {
+        "meta": {
+            "target": target.label,
+            "concurrency": concurrency,
+            "warmup_requests": warmup,
+            "elapsed_s": round(elapsed, 3),
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "overall": summarise(overall, elapsed),
+        "routes": {
+            name: summarise(s, elapsed) for name, s in sorted(per_route.items())
+        },
+        "memory": {
+            "rss_start_mb": round(rss_start / mb, 2),
+            "rss_end_mb": round(rss_end / mb, 2),
+            "rss_peak_mb": round(peak[0] / mb, 2),
+            "rss_growth_mb": round((rss_end - rss_start) / mb, 2),
+        },
+        "gc": gc_report,
+    }
+
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    """Human-readable deltas of the headline numbers against a baseline report."""
+    lines = []
+    for name in ["overall", *sorted(report["routes"])]:
+        now = report["overall"] if name == "overall" else report["routes"][name]
+        then = (
+            baseline["overall"] if name == "overall" else baseline["routes"].get(name)
+        )
+        if not then:
+            continue
+        parts = [f"{name:>14}"]
+        for key in ("p50", "p95", "p99"):
+            a, b = then["latency_ms"][key], now["latency_ms"][key]
+            parts.append(f"{key} {b:9.2f}ms ({(b - a) / a * 100 if a else 0:+6.1f}%)")
+        a, b = then["throughput_rps"], now["throughput_rps"]
+        parts.append(f"rps {b:8.1f} ({(b - a) / a * 100 if a else 0:+6.1f}%)")
+        lines.append("  ".join(parts))
+
+    now, then = report.get("gc"), baseline.get("gc")
+    if now and then:
+        a, b = sum(then["pauseMsTotal"]), sum(now["pauseMsTotal"])
+        lines.append(
+            f"{'gc':>14}  {then['mode']} → {now['mode']}  "
+            f"collections {sum(then['collections'])} → {sum(now['collections'])}  "
+            f"pause {a:.1f}ms → {b:.1f}ms  "
+            f"max {max(then['pauseMsMax']):.2f}ms → {max(now['pauseMsMax']):.2f}ms"
+        )
+    return lines
+
+
+def print_summary(report: dict) -> None:
+    print(
+        f"target={report['meta']['target']} concurrency={report['meta']['concurrency']} "
+        f"elapsed={report['meta']['elapsed_s']}s"
+    )
+    rows = [("overall", report["overall"]), *report["routes"].items()]
+    for name, s in rows:
+        lat = s["latency_ms"]
+        print(
+            f"{name:>14}  n={s['requests']:<6} err={s['errors']:<4} "
+            f"rps={s['throughput_rps']:<9} p50={lat['p50']:.2f}ms "
+            f"p95={lat['p95']:.2f}ms p99={lat['p99']:.2f}ms"
+        )
+    mem = report["memory"]
+    print(
+        f"{'rss':>14}  start={mem['rss_start_mb']}MB end={mem['rss_end_mb']}MB "
+        f"peak={mem['rss_peak_mb']}MB growth={mem['rss_growth_mb']}MB"
+    )
+    gc_report = report.get("gc")
+    if gc_report:
+        print(
+            f"{'gc':>14}  mode={gc_report['mode']} "
+            f"collections={gc_report['collections']} "
+            f"pause_total={sum(gc_report['pauseMsTotal']):.2f}ms "
+            f"pause_max={max(gc_report['pauseMsMax']):.2f}ms"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--duration", type=float, help="run for N seconds instead of -n"
+    )
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--mix",
+        default="filter=3,nps=2,index=2,parse=1,validator=1,health=1",
+        help="weighted synthetic routes, e.g. filter=3,nps=1",
+    )
+    parser.add_argument(
+        "--transactions", type=int, default=200, help="per synthetic request"
+    )
+    parser.add_argument("--recorded", help="JSONL file of recorded requests to replay")
+    parser.add_argument(
+        "--url", help="base URL of a running server (default: in-process)"
+    )
+    parser.add_argument(
+        "--pid", type=int, help="server PID whose RSS to track in --url mode"
+    )
+    parser.add_argument(
+        "--gc-mode",
+        choices=GC_MODES,
+        help="override GC_MODE for the in-process app",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    if args.recorded:
+        specs = recorded_scenarios(args.recorded)
+        choose = lambda: rng.choice(specs)  # noqa: E731
+    else:
+        scenarios = synthetic_scenarios(args.transactions, args.seed)
+        weights = parse_mix(args.mix)
+        unknown = set(weights) - set(scenarios)
+        if unknown:
+            parser.error(f"unknown route(s) in --mix: {', '.join(sorted(unknown))}")
+        names = list(weights)
+        choose = lambda: scenarios[
+            rng.choices(names, [weights[n] for n in names])[0]
+        ]  # noqa: E731
+
+    if args.url:
+        target = HttpTarget(args.url)
+    else:
+        from service.micro_savings.app.api.application import get_app
+        from service.micro_savings.app.utils.settings import settings
+
+        if args.gc_mode:
+            settings.GC_MODE = args.gc_mode
+        target = AsgiTarget(get_app())
+
+    report = asyncio.run(
+        run_load(
+            target,
+            choose,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            duration_s=args.duration,
+            pid=args.pid if args.url else None,
+        )
+    )
+
+    print_summary(report)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            print("\nvs baseline:")
+            print("\n".join(compare(report, json.load(fh))))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
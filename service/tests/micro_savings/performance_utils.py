@@ -6,6 +6,7 @@ from datetime import timedelta
 import psutil
 
 _start_time = time.time()
+_process = psutil.Process(os.getpid())
 
 
 def get_uptime_str() -> str:
@@ -21,8 +22,7 @@ def get_uptime_str() -> str:
 
 def get_memory_usage_mb() -> str:
     """Returns current process memory usage in MB as a string."""
-    process = psutil.Process(os.getpid())
-    mem_bytes = process.memory_info().rss
+    mem_bytes = _process.memory_info().rss
     mem_mb = mem_bytes / (1024 * 1024)
     return f"{mem_mb:.2f} MB"
 
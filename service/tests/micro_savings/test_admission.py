@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from service.micro_savings.app.api.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    estimate_cost,
+)
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.models.periods import KPeriod, PeriodSet, QPeriod
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+TX = {"date": "2023-02-05 10:00:00", "amount": 250}
+K = {"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"}
+
+
+class TestEstimateCost:
+    def test_bare_list_costs_one_per_transaction(self):
+        assert estimate_cost([TX] * 7) == 7
+
+    def test_transactions_times_periods(self):
+        payload = {"transactions": [TX] * 10, "q": [], "p": [K, K], "k": [K]}
+        assert estimate_cost(payload) == 30
+
+    def test_registered_period_set(self):
+        registry = PeriodRegistry(max_size=4)
+        set_id = registry.register(
+            PeriodSet(q=[QPeriod(fixed=0, **K)], p=[], k=[KPeriod(**K)] * 3)
+        )
+        payload = {"transactions": [TX] * 5, "periodSetId": set_id}
+        assert estimate_cost(payload, registry) == 20
+        assert estimate_cost({**payload, "periodSetId": "missing"}, registry) == 5
+
+    def test_malformed_payload_costs_one(self):
+        assert estimate_cost(None) == 1
+        assert estimate_cost({"transactions": "nope"}) == 1
+
+
+class TestAdmissionController:
+    def test_admits_within_budget_then_times_out(self):
+        async def scenario():
+            controller = AdmissionController(max_cost=10, queue_timeout=0.01)
+            await controller.acquire(6)
+            await controller.acquire(4)
+            with pytest.raises(AdmissionRejected) as exc:
+                await controller.acquire(1)
+            assert exc.value.retry_after >= 1
+            return controller.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["admitted"] == 2
+        assert stats["rejectedTimeout"] == 1
+        assert stats["inFlightCost"] == 10
+
+    def test_waiter_admitted_after_release(self):
+        async def scenario():
+            controller = AdmissionController(max_cost=10, queue_timeout=1.0)
+            started = await controller.acquire(10)
+            waiter = asyncio.create_task(controller.acquire(5))
+            await asyncio.sleep(0)
+            assert controller.stats()["queueDepth"] == 1
+            await controller.release(10, started)
+            await waiter
+            return controller.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["inFlightCost"] == 5
+        assert stats["queueDepth"] == 0
+
+    def test_full_queue_rejects_immediately(self):
+        async def scenario():
+            controller = AdmissionController(max_cost=1, max_queue=0)
+            await controller.acquire(1)
+            with pytest.raises(AdmissionRejected, match="queue full"):
+                await controller.acquire(1)
+
+        asyncio.run(scenario())
+
+    def test_oversized_request_runs_when_idle(self):
+        async def scenario():
+            controller = AdmissionController(max_cost=10)
+            await controller.acquire(1_000)
+            return controller.stats()["inFlight"]
+
+        assert asyncio.run(scenario()) == 1
+
+
+class TestAdmissionEndpoints:
+    def test_429_with_retry_after_and_counters(self):
+        payload = {"wage": 50000, "k": [K], "transactions": [TX]}
+        with AppClient(get_app()) as client:
+            controller = client.app.state.admission = AdmissionController(
+                max_cost=1, max_queue=0
+            )
+            status, _ = client.post_json(
+                "/blackrock/challenge/v1/transactions:filter", payload
+            )
+            assert status == 200
+            assert controller.stats()["inFlight"] == 0  # released
+
+            controller.in_flight, controller.in_flight_cost = 1, 1
+            status, headers, _ = client.request(
+                "POST",
+                "/blackrock/challenge/v1/returns:nps",
+                {"content-type": "application/json"},
+                (json.dumps({**payload, "age": 30, "inflation": 5}).encode(),),
+            )
+            assert status == 429
+            assert int(headers["retry-after"]) >= 1
+
+            status, metrics = client.get_json("/blackrock/challenge/v1/performance")
+            assert metrics["admission"]["admitted"] == 1
+            assert metrics["admission"]["rejectedQueueFull"] == 1
@@ -0,0 +1,166 @@
+import gzip
+import json
+import tracemalloc
+import zlib
+
+from fastapi import FastAPI, Request
+from starlette.responses import StreamingResponse
+
+from service.micro_savings.app.api.middleware.compression import (
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+from service.tests.micro_savings.asgi_utils import call_app as call
+
+
+def make_app(**kwargs):
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        payload = await request.json()
+        return {"items": payload, "padding": "x" * 2048}
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (f"line-{i}\n" * 200 for i in range(3)), media_type="text/plain"
+        )
+
+    app.add_middleware(CompressionMiddleware, **kwargs)
+    return app
+
+
+class TestNegotiateEncoding:
+    def test_prefers_gzip(self):
+        assert negotiate_encoding("deflate, gzip") == "gzip"
+
+    def test_honours_q_values(self):
+        assert negotiate_encoding("gzip;q=0.5, deflate;q=1") == "deflate"
+
+    def test_q_zero_disables(self):
+        assert negotiate_encoding("gzip;q=0") is None
+
+    def test_unknown_only(self):
+        assert negotiate_encoding("br") is None
+
+
+class TestRequestDecompression:
+    def test_gzip_body_streamed_in_chunks(self):
+        raw = gzip.compress(json.dumps([1, 2, 3]).encode())
+        chunks = (raw[:5], raw[5:12], raw[12:])
+        status, _, body = call(
+            make_app(),
+            "POST",
+            "/echo",
+            {"content-type": "application/json", "content-encoding": "gzip"},
+            chunks,
+        )
+        assert status == 200
+        assert json.loads(body)["items"] == [1, 2, 3]
+
+    def test_deflate_body(self):
+        raw = zlib.compress(json.dumps({"a": 1}).encode())
+        status, _, body = call(
+            make_app(),
+            "POST",
+            "/echo",
+            {"content-type": "application/json", "content-encoding": "deflate"},
+            (raw,),
+        )
+        assert status == 200
+        assert json.loads(body)["items"] == {"a": 1}
+
+    def test_corrupt_body_is_400(self):
+        status, _, _ = call(
+            make_app(),
+            "POST",
+            "/echo",
+            {"content-type": "application/json", "content-encoding": "gzip"},
+            (b"not gzip at all",),
+        )
+        assert status == 400
+
+    def test_decompression_bomb_is_413(self):
+        raw = gzip.compress(b"[" + b"0," * 10_000 + b"0]")
+        status, _, _ = call(
+            make_app(max_body_size=1000),
+            "POST",
+            "/echo",
+            {"content-type": "application/json", "content-encoding": "gzip"},
+            (raw,),
+        )
+        assert status == 413
+
+    def test_high_ratio_bomb_in_final_chunk_is_not_inflated(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        raw = compressor.compress(b"\0" * 50_000_000) + compressor.flush()
+        tracemalloc.start()
+        try:
+            status, _, _ = call(
+                make_app(max_body_size=1_000_000),
+                "POST",
+                "/echo",
+                {"content-type": "application/json", "content-encoding": "gzip"},
+                (raw,),  # one final chunk
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert status == 413
+        assert peak < 10_000_000
+
+    def test_unsupported_encoding_is_415(self):
+        status, _, _ = call(
+            make_app(), "POST", "/echo", {"content-encoding": "br"}, (b"{}",)
+        )
+        assert status == 415
+
+
+class TestResponseCompression:
+    def test_large_response_is_gzipped(self):
+        status, headers, body = call(
+            make_app(),
+            "POST",
+            "/echo",
+            {"content-type": "application/json", "accept-encoding": "gzip"},
+            (b"[]",),
+        )
+        assert status == 200
+        assert headers["content-encoding"] == "gzip"
+        assert int(headers["content-length"]) == len(body)
+        assert json.loads(gzip.decompress(body))["items"] == []
+
+    def test_small_response_left_alone(self):
+        _, headers, body = call(
+            make_app(), "GET", "/small", {"accept-encoding": "gzip"}
+        )
+        assert "content-encoding" not in headers
+        assert json.loads(body) == {"ok": True}
+
+    def test_no_accept_encoding_left_alone(self):
+        _, headers, _ = call(
+            make_app(),
+            "POST",
+            "/echo",
+            {"content-type": "application/json"},
+            (b"[]",),
+        )
+        assert "content-encoding" not in headers
+
+    def test_streaming_response_deflated(self):
+        _, headers, body = call(
+            make_app(), "GET", "/stream", {"accept-encoding": "deflate"}
+        )
+        assert headers["content-encoding"] == "deflate"
+        assert zlib.decompress(body).decode().count("line-") == 600
+
+    def test_offloaded_compression_matches_inline(self):
+        headers = {"content-type": "application/json", "accept-encoding": "gzip"}
+        inline = call(make_app(), "POST", "/echo", headers, (b"[]",))[2]
+        offloaded = call(make_app(offload_size=1), "POST", "/echo", headers, (b"[]",))
+        assert gzip.decompress(offloaded[2]) == gzip.decompress(inline)
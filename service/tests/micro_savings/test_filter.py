@@ -1,13 +1,30 @@
+import json
+
+from service.micro_savings.app.api.application import get_app
 from service.micro_savings.app.models.periods import (
     QPeriod,
     PPeriod,
     KPeriod,
 )
-from service.micro_savings.app.models.transaction import ValidatedTransaction
+from service.micro_savings.app.models.transaction import (
+    FilterResult,
+    RawTransaction,
+    ValidatedTransaction,
+)
+from service.micro_savings.app.transaction_engine.filter_processor.parallel_service import (
+    ParallelFilter,
+)
 from service.micro_savings.app.transaction_engine.filter_processor.qpk_service import (
     apply_qpk,
+    apply_qpk_compiled,
+    iter_qpk,
     sum_remanents_for_k_period,
 )
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    compile_periods,
+)
+from service.micro_savings.app.utils.utils import encode_cursor
+from service.tests.micro_savings.asgi_utils import AppClient
 
 
 def make_tx(date, amount=300, ceiling=400, remanent=100):
@@ -86,3 +103,238 @@ class TestKRule:
         total_k2 = sum_remanents_for_k_period(valid, k[1])
         assert total_k1 == 50  # counted in K1
         assert total_k2 == 50  # also counted in K2
+
+
+FILTER_URL = "/blackrock/challenge/v1/transactions:filter"
+
+
+def make_filter_payload():
+    return {
+        "wage": 50000,
+        "k": [{"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"}],
+        "transactions": [
+            {"date": "2023-01-05 10:00:00", "amount": -10},  # invalid: negative
+            {"date": "2023-02-05 10:00:00", "amount": 250},
+            {"date": "2022-03-05 10:00:00", "amount": 120},  # invalid: outside K
+            {"date": "2023-04-05 10:00:00", "amount": 847},
+            {"date": "2023-05-05 10:00:00", "amount": 410},
+        ],
+    }
+
+
+class TestIterQPK:
+    def test_matches_apply_qpk(self):
+        raw = [RawTransaction(**tx) for tx in make_filter_payload()["transactions"]]
+        valid, invalid = apply_qpk(raw, [], [], [K_FULL_YEAR])
+        records = list(iter_qpk(raw, [], [], [K_FULL_YEAR]))
+        assert [r for ok, r in records if ok] == valid
+        assert [r for ok, r in records if not ok] == invalid
+
+
+class TestFilterOutputModes:
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_default_mode_has_no_cursor(self):
+        status, body = self.client.post_json(FILTER_URL, make_filter_payload())
+        assert status == 200
+        assert set(body) == {"valid", "invalid"}
+        assert len(body["valid"]) == 3
+
+    def test_pages_cover_full_result(self):
+        _, full = self.client.post_json(FILTER_URL, make_filter_payload())
+        valid, invalid, cursor, pages = [], [], None, 0
+        while True:
+            query = "limit=2" + (f"&cursor={cursor}" if cursor else "")
+            status, page = self.client.post_json(
+                FILTER_URL, make_filter_payload(), query_string=query
+            )
+            assert status == 200
+            valid += page["valid"]
+            invalid += page["invalid"]
+            pages += 1
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+        assert pages == 3
+        assert valid == full["valid"]
+        assert invalid == full["invalid"]
+
+    def test_bad_cursor_is_400(self):
+        status, _ = self.client.post_json(
+            FILTER_URL, make_filter_payload(), query_string="cursor=%%%"
+        )
+        assert status == 400
+
+    def test_cursor_from_another_body_is_400(self):
+        query = "limit=2"
+        _, page = self.client.post_json(
+            FILTER_URL, make_filter_payload(), query_string=query
+        )
+        other = make_filter_payload()
+        other["transactions"][1]["amount"] = 260
+        status, body = self.client.post_json(
+            FILTER_URL, other, query_string=f"{query}&cursor={page['nextCursor']}"
+        )
+        assert status == 400
+        assert "different request" in body["detail"]
+
+        unbound = encode_cursor(2)
+        status, _ = self.client.post_json(
+            FILTER_URL, make_filter_payload(), query_string=f"{query}&cursor={unbound}"
+        )
+        assert status == 400
+
+    def test_stream_emits_ndjson_records(self):
+        status, headers, body = self.client.request(
+            "POST",
+            FILTER_URL,
+            {"content-type": "application/json"},
+            (json.dumps(make_filter_payload()).encode(),),
+            "stream=true",
+        )
+        assert status == 200
+        assert headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        assert len(lines) == 5
+        assert sum("valid" in line for line in lines) == 3
+        assert lines[0]["invalid"]["message"] == "Negative amounts are not allowed"
+
+
+class TestLenientIngestion:
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def malformed_payload(self, lenient):
+        payload = make_filter_payload()
+        payload["transactions"] += [
+            {"date": "2023-02-30 10:00:00", "amount": 120},
+            {"date": "2023-05-05 10:00:00", "amount": "lots"},
+            {"date": "yesterday", "amount": 10},
+            "not a row",
+        ]
+        return {**payload, "lenient": lenient}
+
+    def test_strict_mode_rejects_whole_batch(self):
+        status, _ = self.client.post_json(FILTER_URL, self.malformed_payload(False))
+        assert status == 422
+
+    def test_lenient_mode_reports_rows_and_processes_rest(self):
+        _, strict = self.client.post_json(FILTER_URL, make_filter_payload())
+        status, body = self.client.post_json(FILTER_URL, self.malformed_payload(True))
+        assert status == 200
+        assert body["valid"] == strict["valid"]
+        assert body["invalid"][4:] == strict["invalid"]
+        assert [row["message"] for row in body["invalid"][:4]] == [
+            "Date '2023-02-30 10:00:00' must be in format YYYY-MM-DD HH:MM:SS",
+            "Amount 'lots' must be a number",
+            "Date 'yesterday' must be in format YYYY-MM-DD HH:MM:SS",
+            "Transaction must be an object with date and amount",
+        ]
+
+    def test_lenient_rows_lead_the_stream(self):
+        status, _, body = self.client.request(
+            "POST",
+            FILTER_URL,
+            {"content-type": "application/json"},
+            (json.dumps(self.malformed_payload(True)).encode(),),
+            "stream=true",
+        )
+        assert status == 200
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        assert len(lines) == 9
+        assert lines[2]["invalid"]["date"] == "yesterday"
+
+    def test_rejected_cannot_be_sent_by_client(self):
+        payload = {**make_filter_payload(), "rejected": [{"date": "x", "message": "y"}]}
+        _, body = self.client.post_json(FILTER_URL, payload)
+        assert all(row["date"] != "x" for row in body["invalid"])
+
+
+class TestParallelFilter:
+    @classmethod
+    def setup_class(cls):
+        cls.parallel = ParallelFilter(workers=2, chunk_size=3, min_transactions=1)
+        cls.parallel.start()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.parallel.shutdown()
+
+    def test_matches_sequential_pipeline(self):
+        raw = [
+            RawTransaction(date=f"2023-{month:02d}-{day:02d} 10:00:00", amount=amount)
+            for month, day, amount in [
+                (1, 5, 250),
+                (2, 5, -10),
+                (3, 7, 847.5),
+                (3, 7, 120),  # duplicate timestamp
+                (7, 15, 410),
+                (7, 20, 999_999),
+                (10, 1, 12.34),
+                (11, 30, 301),
+                (12, 31, 75),
+            ]
+        ]
+        periods = compile_periods(
+            [
+                QPeriod(
+                    fixed=0, start="2023-07-01 00:00:00", end="2023-07-31 23:59:59"
+                ),
+                QPeriod(
+                    fixed=5, start="2023-07-10 00:00:00", end="2023-08-31 23:59:59"
+                ),
+            ],
+            [
+                PPeriod(
+                    extra=25, start="2023-07-01 00:00:00", end="2023-12-31 23:59:59"
+                ),
+                PPeriod(
+                    extra=10, start="2023-10-01 00:00:00", end="2023-10-31 23:59:59"
+                ),
+            ],
+            [
+                KPeriod(start="2023-01-01 00:00:00", end="2023-10-31 23:59:59"),
+                KPeriod(start="2023-03-01 00:00:00", end="2023-11-30 23:59:59"),
+            ],
+        )
+        valid, invalid = apply_qpk_compiled(raw, periods, 50)
+
+        body = json.loads(self.parallel.filter_json(raw, periods, 50))
+
+        assert body == json.loads(
+            FilterResult(valid=valid, invalid=invalid).model_dump_json()
+        )
+        assert self.parallel.stats()["chunks"] >= 2
+
+    def test_endpoint_serves_the_same_document(self):
+        payload = {
+            **make_filter_payload(),
+            "lenient": True,
+            "p": [
+                {
+                    "extra": 5,
+                    "start": "2023-04-01 00:00:00",
+                    "end": "2023-05-31 23:59:59",
+                }
+            ],
+        }
+        payload["transactions"] = payload["transactions"] + ["not a row"]
+        with AppClient(get_app()) as client:
+            _, sequential = client.post_json(FILTER_URL, payload)
+            client.app.state.parallel_filter = self.parallel
+            status, parallel = client.post_json(FILTER_URL, payload)
+
+        assert status == 200
+        assert parallel == sequential
+        assert parallel["invalid"][0]["message"].startswith("Transaction must be")
@@ -0,0 +1,233 @@
+import json
+import threading
+import time
+
+import pytest
+
+from service.micro_savings.app.api.admission import AdmissionController
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.transaction_engine.job_processor.job_service import (
+    JobManager,
+    JobQueueFull,
+)
+from service.micro_savings.app.utils.settings import settings
+from service.tests.micro_savings.asgi_utils import AppClient
+
+BASE = "/blackrock/challenge/v1"
+
+BODY = {
+    "age": 29,
+    "wage": 50000,
+    "q": [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}],
+    "p": [{"extra": 25, "start": "2023-10-01 08:00:00", "end": "2023-12-31 19:59:59"}],
+    "k": [{"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"}],
+    "transactions": [
+        {"date": "2023-02-28 15:49:20", "amount": 375},
+        {"date": "2023-07-01 21:59:00", "amount": 620},
+        {"date": "2023-10-12 20:15:30", "amount": 250},
+        {"date": "2023-12-17 08:09:45", "amount": 480},
+    ],
+}
+
+
+def wait_for(jobs: JobManager, job_id: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    job = jobs.get(job_id)
+    while job.status in ("queued", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    return job
+
+
+class TestJobManager:
+    def test_stages_reported_in_order(self):
+        jobs = JobManager(workers=1)
+
+        def run(enter_stage):
+            enter_stage("load")
+            enter_stage("project")
+            return 42
+
+        job = jobs.submit("test", ["load", "filter", "project"], run)
+        job = wait_for(jobs, job.id)
+        jobs.shutdown()
+
+        assert job.status == "succeeded"
+        assert job.result == 42
+        assert job.progress() == 1.0
+        assert [s["status"] for s in job.stage_states()] == ["done", "skipped", "done"]
+
+    def test_failure_reported(self):
+        jobs = JobManager(workers=1)
+
+        def run(enter_stage):
+            enter_stage("load")
+            raise ValueError("boom")
+
+        job = wait_for(jobs, jobs.submit("test", ["load", "project"], run).id)
+        jobs.shutdown()
+
+        assert job.status == "failed"
+        assert job.error == "ValueError: boom"
+        assert [s["status"] for s in job.stage_states()] == ["failed", "pending"]
+        assert job.progress() == 0.0
+
+    def test_cancel_running_and_queued(self):
+        jobs = JobManager(workers=1)
+        release = threading.Event()
+        ran = []
+
+        def slow(enter_stage):
+            enter_stage("load")
+            release.wait(5)
+            enter_stage("project")  # raises JobCancelled
+            ran.append("slow")
+
+        def quick(enter_stage):
+            ran.append("quick")
+
+        running = jobs.submit("test", ["load", "project"], slow)
+        queued = jobs.submit("test", ["load"], quick)
+        while running.status != "running":
+            time.sleep(0.005)
+
+        jobs.cancel(queued.id)
+        jobs.cancel(running.id)
+        release.set()
+        jobs.shutdown()
+        running._future.result(5)
+
+        assert queued.status == running.status == "cancelled"
+        assert ran == []
+        with pytest.raises(KeyError):
+            jobs.get(running.id)
+        assert jobs.stats()["finished"]["cancelled"] == 2
+
+    def test_queue_bound(self):
+        jobs = JobManager(workers=1, max_queued=1)
+        release = threading.Event()
+        first = jobs.submit("test", [], lambda enter_stage: release.wait(5))
+        while first.status != "running":
+            time.sleep(0.005)
+        jobs.submit("test", [], lambda enter_stage: None)
+
+        with pytest.raises(JobQueueFull) as exc:
+            jobs.submit("test", [], lambda enter_stage: None)
+        release.set()
+        jobs.shutdown()
+
+        assert exc.value.retry_after >= 1
+        assert jobs.stats()["rejected"] == 1
+
+    def test_results_expire_after_ttl(self):
+        jobs = JobManager(workers=1, ttl=0.05)
+        job = wait_for(jobs, jobs.submit("test", [], lambda enter_stage: 1).id)
+        time.sleep(0.06)
+        with pytest.raises(KeyError):
+            jobs.get(job.id)
+        assert jobs.stats()["expired"] == 1
+        jobs.shutdown()
+
+    def test_oldest_finished_evicted_past_cap(self):
+        jobs = JobManager(workers=1, max_finished=2)
+        ids = [
+            wait_for(jobs, jobs.submit("test", [], lambda enter_stage: 1).id).id
+            for _ in range(3)
+        ]
+        with pytest.raises(KeyError):
+            jobs.get(ids[0])
+        assert [jobs.get(job_id).result for job_id in ids[1:]] == [1, 1]
+        assert jobs.stats()["evicted"] == 1
+        jobs.shutdown()
+
+
+class TestJobEndpoints:
+    @pytest.mark.parametrize("scheme", ["nps", "index"])
+    def test_result_matches_synchronous_endpoint(self, scheme):
+        with AppClient(get_app()) as client:
+            _, expected = client.post_json(f"{BASE}/returns:{scheme}", BODY)
+            status, job = client.post_json(f"{BASE}/jobs/returns:{scheme}", BODY)
+            wait_for(client.app.state.jobs, job["id"])
+            _, polled = client.get_json(f"{BASE}/jobs/{job['id']}")
+            result_status, result = client.get_json(f"{BASE}/jobs/{job['id']}/result")
+
+        assert status == 202
+        assert job["kind"] == f"returns:{scheme}"
+        assert polled["status"] == "succeeded"
+        assert polled["progress"] == 1.0
+        assert [s["name"] for s in polled["stages"]] == [
+            "load",
+            "filter",
+            "aggregate",
+            "project",
+        ]
+        assert polled["expiresInSeconds"] > 0
+        assert result_status == 200
+        assert result == expected
+
+    def test_location_header_and_cancel(self):
+        with AppClient(get_app()) as client:
+            status, headers, _ = client.request(
+                "POST",
+                f"{BASE}/jobs/returns:nps",
+                {"content-type": "application/json"},
+                (json.dumps(BODY).encode(),),
+            )
+            location = headers["location"]
+            job_id = location.rsplit("/", 1)[1]
+            delete_status, _, _ = client.request("DELETE", f"{BASE}/jobs/{job_id}")
+            missing, _ = client.get_json(f"{BASE}/jobs/{job_id}")
+            missing_result, _ = client.get_json(f"{BASE}/jobs/{job_id}/result")
+
+        assert status == 202
+        assert location.endswith(f"{BASE}/jobs/{job_id}")
+        assert delete_status == 204
+        assert missing == missing_result == 404
+
+    def test_unfinished_result_is_conflict(self):
+        with AppClient(get_app()) as client:
+            jobs = client.app.state.jobs
+            release = threading.Event()
+            job = jobs.submit("returns:nps", ["load"], lambda s: release.wait(5))
+            status, body = client.get_json(f"{BASE}/jobs/{job.id}/result")
+            release.set()
+
+        assert status == 409
+        assert "is queued" in body["detail"] or "is running" in body["detail"]
+
+    def test_submission_passes_admission(self):
+        with AppClient(get_app()) as client:
+            controller = client.app.state.admission = AdmissionController(
+                max_cost=1, max_queue=0
+            )
+            controller.in_flight, controller.in_flight_cost = 1, 1
+            status, headers, _ = client.request(
+                "POST",
+                f"{BASE}/jobs/returns:nps",
+                {"content-type": "application/json"},
+                (json.dumps(BODY).encode(),),
+            )
+            submitted = client.app.state.jobs.stats()["submitted"]
+
+        assert status == 429
+        assert int(headers["retry-after"]) >= 1
+        assert submitted == 0
+
+    def test_unknown_period_set_fails_submission(self):
+        body = {**BODY, "periodSetId": "missing", "q": [], "p": []}
+        del body["k"]
+        with AppClient(get_app()) as client:
+            status, _ = client.post_json(f"{BASE}/jobs/returns:nps", body)
+        assert status == 404
+
+    def test_off_by_default_with_several_workers(self, monkeypatch):
+        monkeypatch.setattr(settings, "workers", 2)
+        with AppClient(get_app()) as client:
+            assert client.app.state.jobs is None
+            status, body = client.post_json(f"{BASE}/jobs/returns:nps", BODY)
+        assert status == 404
+        assert body["detail"] == "Job API is disabled."
+
+        monkeypatch.setattr(settings, "JOBS_ENABLED", True)
+        with AppClient(get_app()) as client:
+            assert client.app.state.jobs is not None
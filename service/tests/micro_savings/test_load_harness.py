@@ -0,0 +1,70 @@
+import json
+
+from service.tests.micro_savings.load_harness import (
+    compare,
+    main,
+    parse_mix,
+    percentile,
+)
+
+
+class TestPercentile:
+    def test_interpolates(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+
+    def test_extremes(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 100) == 100.0
+
+    def test_empty(self):
+        assert percentile([], 99) == 0.0
+
+
+class TestParseMix:
+    def test_weights(self):
+        assert parse_mix("filter=3, nps=1,index") == {
+            "filter": 3,
+            "nps": 1,
+            "index": 1,
+        }
+
+
+class TestInProcessRun:
+    def test_synthetic_mix_report(self, tmp_path):
+        output = tmp_path / "report.json"
+        main(
+            [
+                "-n", "12", "-c", "3", "--warmup", "1",
+                "--mix", "filter=1,nps=1,health=1",
+                "--transactions", "20",
+                "--output", str(output),
+            ]
+        )  # fmt: skip
+        report = json.loads(output.read_text())
+        assert report["overall"]["requests"] == 12
+        assert report["overall"]["errors"] == 0
+        assert set(report["routes"]) <= {"filter", "nps", "health"}
+        for key in ("p50", "p95", "p99"):
+            assert report["overall"]["latency_ms"][key] > 0
+        assert "rss_growth_mb" in report["memory"]
+        assert report["gc"]["mode"] == "default"
+        assert len(report["gc"]["collections"]) == 3
+        assert any(line.strip().startswith("gc") for line in compare(report, report))
+
+    def test_recorded_payloads(self, tmp_path):
+        recorded = tmp_path / "recorded.jsonl"
+        recorded.write_text(
+            json.dumps(
+                {
+                    "path": "/transactions:parse",
+                    "body": [{"date": "2023-01-01 10:00:00", "amount": 250}],
+                }
+            )
+            + "\n"
+            + json.dumps({"method": "GET", "path": "/health"})
+            + "\n"
+        )
+        report = main(["-n", "6", "-c", "2", "--recorded", str(recorded)])
+        assert report["overall"]["errors"] == 0
+        assert set(report["routes"]) <= {"transactions:parse", "health"}
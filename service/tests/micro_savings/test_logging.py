@@ -0,0 +1,155 @@
+import io
+import json
+import sys
+import threading
+
+import pytest
+from fastapi import FastAPI
+from loguru import logger
+
+from service.micro_savings.app.api.middleware.access_log import (
+    AccessLogMiddleware,
+    AccessLogStats,
+)
+from service.micro_savings.app.utils.logging import (
+    BatchedSink,
+    format_json,
+    setup_logging,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+
+class BlockingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, s):
+        self.release.wait(timeout=5)
+        return super().write(s)
+
+
+def make_app(**kwargs):
+    app = FastAPI()
+    app.state.access_log = AccessLogStats()
+
+    @app.get("/ok")
+    def ok():
+        return {}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(AccessLogMiddleware, **kwargs)
+    return app
+
+
+class TestFormatJson:
+    def test_bound_fields_and_exception(self):
+        records = []
+        handler = logger.add(lambda m: records.append(m.record), level="INFO")
+        try:
+            logger.bind(status=200).info("hello")
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                logger.exception("failed")
+        finally:
+            logger.remove(handler)
+
+        line = json.loads(format_json(records[0]))
+        assert line["message"] == "hello"
+        assert line["level"] == "INFO"
+        assert line["status"] == 200
+        assert "ZeroDivisionError" in json.loads(format_json(records[1]))["exception"]
+
+
+class TestBatchedSink:
+    def test_records_written_in_batches(self):
+        stream = io.StringIO()
+        sink = BatchedSink(stream, formatter=format_json, batch_size=100)
+        handler = logger.add(sink, level="INFO")
+        try:
+            for i in range(500):
+                logger.info("record {}", i)
+            sink.flush()
+        finally:
+            logger.remove(handler)
+            sink.close()
+
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line)["message"] for line in lines[:2]] == [
+            "record 0",
+            "record 1",
+        ]
+        stats = sink.stats()
+        assert stats["written"] == 500 and len(lines) == 500
+        assert stats["batches"] < 500
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        stream = BlockingStream()
+        sink = BatchedSink(stream, queue_size=2, batch_size=1)
+        handler = logger.add(sink, level="INFO")
+        try:
+            for i in range(20):
+                logger.info("record {}", i)
+            assert sink.stats()["dropped"] > 0
+        finally:
+            stream.release.set()
+            logger.remove(handler)
+            sink.close()
+        assert sink.stats()["written"] == sink.stats()["queued"]
+
+
+class TestSetupLogging:
+    @pytest.mark.parametrize("json_format", [False, True])
+    def test_level_applies_to_stdout(self, monkeypatch, json_format):
+        stream = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", stream)
+        try:
+            setup_logging(level="WARNING", json_format=json_format)
+            logger.info("hidden")
+            logger.warning("shown")
+        finally:
+            monkeypatch.undo()
+            setup_logging()
+
+        assert "shown" in stream.getvalue()
+        assert "hidden" not in stream.getvalue()
+
+
+class TestAccessLogMiddleware:
+    def setup_method(self):
+        self.records = []
+        self.handler = logger.add(lambda m: self.records.append(m.record), level="INFO")
+
+    def teardown_method(self):
+        logger.remove(self.handler)
+
+    def access_records(self):
+        return [r["extra"] for r in self.records if "durationMs" in r["extra"]]
+
+    def test_sample_rate_zero_logs_only_errors(self):
+        app = make_app(sample_rate=0.0)
+        with AppClient(app) as client:
+            for _ in range(5):
+                client.get_json("/ok")
+            with pytest.raises(RuntimeError):
+                client.request("GET", "/boom")
+
+        assert [r["status"] for r in self.access_records()] == [500]
+        stats = app.state.access_log.stats()
+        assert stats["requests"] == 6
+        assert stats["sampledOut"] == 5
+
+    def test_slow_threshold_and_structured_fields(self):
+        app = make_app(sample_rate=0.0, slow_ms=0.0)
+        with AppClient(app) as client:
+            client.get_json("/ok")
+
+        (record,) = self.access_records()
+        assert record["method"] == "GET"
+        assert record["path"] == "/ok"
+        assert record["status"] == 200
+        assert app.state.access_log.stats()["meanEmitMicros"] > 0
@@ -0,0 +1,102 @@
+import tracemalloc
+
+from fastapi import FastAPI
+
+from service.micro_savings.app.api.endpoints import memory
+from service.micro_savings.app.api.middleware.memory import (
+    MemoryAccountingMiddleware,
+    MemoryStats,
+    SnapshotStore,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+_kept = []
+
+
+def make_app():
+    app = FastAPI()
+    app.state.memory_stats = MemoryStats()
+    app.state.memory_snapshots = SnapshotStore(max_size=2)
+
+    @app.get("/alloc/{n}")
+    def alloc(n: int):
+        blob = [bytes(1024) for _ in range(n)]
+        return {"kb": len(blob)}
+
+    @app.get("/leak")
+    def leak():
+        _kept.append([bytes(1024) for _ in range(256)])
+        return {}
+
+    app.include_router(memory.router)
+    app.add_middleware(MemoryAccountingMiddleware)
+    return app
+
+
+class TestMemoryStats:
+    def test_summary_means_and_max(self):
+        stats = MemoryStats()
+        stats.record("GET /a", peak=100, retained=10, blocks=2, exclusive=True)
+        stats.record("GET /a", peak=300, retained=0, blocks=0, exclusive=False)
+        s = stats.summary()["GET /a"]
+        assert s["requests"] == 2
+        assert s["exclusiveRequests"] == 1
+        assert s["peakBytesMax"] == 300
+        assert s["peakBytesMean"] == 200
+        assert s["retainedBytesMean"] == 5
+        assert s["lastPeakBytes"] == 300
+
+
+class TestMemoryAccounting:
+    def setup_method(self):
+        tracemalloc.start()
+
+    def teardown_method(self):
+        tracemalloc.stop()
+        _kept.clear()
+
+    def test_peak_recorded_per_route(self):
+        with AppClient(make_app()) as client:
+            client.get_json("/alloc/2048")
+            client.get_json("/alloc/16")
+            status, body = client.get_json("/memory")
+
+        assert status == 200
+        route = body["endpoints"]["GET /alloc/{n}"]
+        assert route["requests"] == 2
+        assert route["exclusiveRequests"] == 2
+        assert route["peakBytesMax"] >= 2048 * 1024
+
+    def test_unmatched_paths_share_one_key(self):
+        with AppClient(make_app()) as client:
+            for i in range(3):
+                client.get_json(f"/missing/{i}")
+            _, body = client.get_json("/memory")
+
+        assert body["endpoints"]["unmatched"]["requests"] == 3
+        assert not any("/missing" in key for key in body["endpoints"])
+
+    def test_snapshot_diff_points_at_leak(self):
+        with AppClient(make_app()) as client:
+            status, snapshot = client.post_json("/memory/snapshots", {})
+            assert status == 201
+            client.get_json("/leak")
+            status, diff = client.get_json(f"/memory/snapshots/{snapshot['id']}/diff")
+
+        assert status == 200
+        assert diff["sizeDiffBytes"] > 200 * 1024
+        assert "test_memory.py" in diff["top"][0]["site"]
+
+    def test_evicted_snapshot_is_404(self):
+        with AppClient(make_app()) as client:
+            status, _ = client.get_json("/memory/snapshots/missing/diff")
+        assert status == 404
+
+
+class TestMemoryTrackingDisabled:
+    def test_endpoints_404(self):
+        app = make_app()
+        app.state.memory_stats = None
+        with AppClient(app) as client:
+            status, _ = client.get_json("/memory")
+        assert status == 404
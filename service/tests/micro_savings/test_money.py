@@ -0,0 +1,50 @@
+from service.micro_savings.app.models.periods import KPeriod
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
+    compute_index_returns,
+)
+from service.micro_savings.app.utils.money import (
+    ceiling_paise,
+    from_paise,
+    to_paise,
+)
+
+
+class TestPaise:
+    def test_to_paise_rounds_float_noise(self):
+        assert to_paise(0.29) == 29  # 0.29 * 100 == 28.999999999999996
+        assert to_paise(847.35) == 84735
+
+    def test_ceiling_paise(self):
+        assert ceiling_paise(25000) == 30000
+        assert ceiling_paise(30000) == 30000
+        assert ceiling_paise(10001) == 20000
+        assert ceiling_paise(0) == 0
+
+    def test_round_trip(self):
+        assert from_paise(to_paise(52.65)) == 52.65
+
+
+class TestExactTotals:
+    def test_many_small_remanents_sum_exactly(self):
+        # 3 000 remanents of ₹0.10 — a float running sum drifts off 300.0
+        transactions = [
+            RawTransaction(
+                date=f"2023-01-{day:02d} {hour:02d}:{minute:02d}:00", amount=99.9
+            )
+            for day in range(1, 31)
+            for hour in range(10)
+            for minute in range(10)
+        ]
+        result = compute_index_returns(
+            transactions=transactions,
+            k_periods=[KPeriod(start="2023-01-01 00:00:00", end="2023-12-31 23:59:59")],
+            q_periods=[],
+            p_periods=[],
+            age=30,
+            wage=50000,
+            inflation=5,
+        )
+        assert result.savingsByDates[0].amount == 300.0
+        assert result.totalTransactionAmount == 299_700.0
+        assert result.totalCeiling == 300_000.0
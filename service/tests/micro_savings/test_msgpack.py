@@ -0,0 +1,194 @@
+import json
+
+import pytest
+
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.api.negotiation import decode_msgpack, read_rows
+from service.micro_savings.app.models.filter import FilterRequest
+from service.micro_savings.app.models.transaction import CheckedRows
+from service.micro_savings.app.utils.date_utils import from_epoch, to_epoch
+from service.micro_savings.app.utils.settings import settings
+from service.tests.micro_savings.asgi_utils import AppClient
+
+msgpack = pytest.importorskip("msgpack")
+
+BASE = "/blackrock/challenge/v1"
+MSGPACK = "application/msgpack"
+
+PERIODS = {
+    "q": [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}],
+    "p": [{"extra": 25, "start": "2023-10-01 08:00:00", "end": "2023-12-31 19:59:59"}],
+    "k": [{"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"}],
+}
+TRANSACTIONS = [
+    {"date": "2023-02-28 15:49:20", "amount": 375},
+    {"date": "2023-07-01 21:59:00", "amount": 620},
+    {"date": "2023-10-12 20:15:30", "amount": 250.5},
+    {"date": "2023-12-17 08:09:45", "amount": 480},
+    {"date": "2023-12-17 08:09:45", "amount": 480},  # duplicate
+]
+ROWS = [[to_epoch(tx["date"]), tx["amount"]] for tx in TRANSACTIONS]
+
+
+def dates_as_timestamps(value):
+    """A JSON response with every date / start / end turned into a timestamp."""
+    if isinstance(value, list):
+        return [dates_as_timestamps(item) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: (
+                to_epoch(item)
+                if key in ("date", "start", "end")
+                else dates_as_timestamps(item)
+            )
+            for key, item in value.items()
+        }
+    return value
+
+
+class TestFromEpoch:
+    def test_round_trip(self):
+        for date in (
+            "1970-01-02 00:00:01",
+            "1969-12-31 23:59:59",
+            "2024-02-29 12:00:00",
+        ):
+            assert from_epoch(to_epoch(date)) == date
+
+    def test_out_of_range(self):
+        with pytest.raises(ValueError):
+            from_epoch(to_epoch("1000-01-01 00:00:00") - 1)
+
+
+class TestDecode:
+    def test_rows_become_checked_rows(self):
+        body = msgpack.packb(
+            {"wage": 1, "k": [{"start": 0, "end": 86399}], "transactions": ROWS[:2]}
+        )
+        document = decode_msgpack(body, FilterRequest)
+
+        assert document["k"] == [
+            {"start": "1970-01-01 00:00:00", "end": "1970-01-01 23:59:59"}
+        ]
+        assert isinstance(document["transactions"], CheckedRows)
+        assert [tuple(row) for row in document["transactions"]] == [
+            (tx["date"], float(tx["amount"])) for tx in TRANSACTIONS[:2]
+        ]
+
+    def test_row_shapes(self):
+        rows = read_rows(
+            [ROWS[0], {"date": TRANSACTIONS[1]["date"], "amount": 620}, [1, "x"], 7],
+            lenient=True,
+        )
+        assert [row.date for row in rows] == [tx["date"] for tx in TRANSACTIONS[:2]]
+        assert [r.message for r in rows.rejected] == [
+            "Amount 'x' must be a number",
+            "Transaction must be [timestamp, amount]",
+        ]
+
+
+class TestNegotiation:
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def post(self, path, document, accept=None):
+        headers = {"content-type": MSGPACK}
+        if accept:
+            headers["accept"] = accept
+        status, headers, body = self.client.request(
+            "POST", f"{BASE}{path}", headers, (msgpack.packb(document),)
+        )
+        return status, headers.get("content-type"), body
+
+    @pytest.mark.parametrize(
+        "path, options",
+        [
+            ("/transactions:filter", {"wage": 50_000}),
+            ("/returns:nps", {"age": 29, "wage": 50_000, "inflation": 5.5}),
+            ("/returns:index", {"age": 29, "wage": 50_000}),
+        ],
+    )
+    def test_matches_json(self, path, options):
+        _, expected = self.client.post_json(
+            f"{BASE}{path}", {**options, **PERIODS, "transactions": TRANSACTIONS}
+        )
+        document = {**options, **PERIODS, "transactions": ROWS}
+
+        status, content_type, body = self.post(path, document)
+        assert (status, content_type) == (200, "application/json")
+        assert json.loads(body) == expected
+
+        status, content_type, body = self.post(path, document, MSGPACK)
+        assert (status, content_type) == (200, MSGPACK)
+        assert msgpack.unpackb(body) == dates_as_timestamps(expected)
+
+    def test_json_request_msgpack_response(self):
+        status, headers, body = self.client.request(
+            "POST",
+            f"{BASE}/returns:nps",
+            {"content-type": "application/json", "accept": MSGPACK},
+            (
+                json.dumps(
+                    {"age": 29, "wage": 1, **PERIODS, "transactions": []}
+                ).encode(),
+            ),
+        )
+        assert status == 200
+        assert msgpack.unpackb(body)["totalCeiling"] == 0
+
+    def test_json_preferred_by_quality(self):
+        status, content_type, _ = self.post(
+            "/transactions:filter",
+            {"wage": 1, **PERIODS, "transactions": ROWS},
+            f"application/json, {MSGPACK};q=0.5",
+        )
+        assert (status, content_type) == (200, "application/json")
+
+    def test_malformed_row_is_422(self):
+        status, _, body = self.post(
+            "/returns:nps",
+            {"age": 29, "wage": 1, **PERIODS, "transactions": [ROWS[0], [ROWS[1][0]]]},
+        )
+        assert status == 422
+        assert json.loads(body)["detail"][0]["loc"] == ["body", "transactions", 1]
+
+    def test_lenient_reports_rows_first(self):
+        status, _, body = self.post(
+            "/transactions:filter",
+            {
+                "wage": 1,
+                "lenient": True,
+                **PERIODS,
+                "transactions": [*ROWS, [ROWS[0][0], None]],
+            },
+        )
+        assert status == 200
+        assert json.loads(body)["invalid"][0] == {
+            "date": TRANSACTIONS[0]["date"],
+            "amount": None,
+            "message": "Amount 'None' must be a number",
+        }
+
+    def test_undecodable_body_is_422(self):
+        status, _, _ = self.client.request(
+            "POST", f"{BASE}/transactions:filter", {"content-type": MSGPACK}, (b"\xc1",)
+        )
+        assert status == 422
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "MSGPACK_ENABLED", False)
+        document = {"age": 29, "wage": 1, **PERIODS, "transactions": ROWS}
+        assert self.post("/returns:nps", document)[0] == 415
+
+        status, headers, _ = self.client.request(
+            "POST",
+            f"{BASE}/returns:nps",
+            {"content-type": "application/json", "accept": MSGPACK},
+            (json.dumps({**document, "transactions": TRANSACTIONS}).encode(),),
+        )
+        assert (status, headers.get("content-type")) == (200, "application/json")
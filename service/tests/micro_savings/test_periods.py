@@ -0,0 +1,274 @@
+import random
+
+import pytest
+
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.models.periods import (
+    QPeriod,
+    PPeriod,
+    KPeriod,
+    PeriodSet,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+    SharedPeriods,
+    compile_periods,
+    share_periods,
+)
+from service.micro_savings.app.utils.date_utils import (
+    format_dt,
+    is_in_period,
+    parse_dt,
+    to_epoch,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+JULY = ("2023-07-01 00:00:00", "2023-07-31 23:59:59")
+YEAR = ("2023-01-01 00:00:00", "2023-12-31 23:59:59")
+
+
+class TestToEpoch:
+    def test_matches_parse_dt(self):
+        assert to_epoch("1970-01-02 00:00:01") == 86401
+        assert to_epoch("2023-7-01 00:00:00") == to_epoch("2023-07-01 00:00:00")
+        for date in ("2_23-01-01 00:00:00", "2023-+1-01 00:00:00"):
+            with pytest.raises(ValueError):
+                to_epoch(date)
+
+
+class TestCompiledLookups:
+    def test_latest_q_start_wins(self):
+        periods = compile_periods(
+            [QPeriod(fixed=30, start=YEAR[0], end=YEAR[1]),
+             QPeriod(fixed=10, start=JULY[0], end=JULY[1])],
+            [],
+            [],
+        )  # fmt: skip
+        assert periods.q_fixed(to_epoch("2023-07-15 12:00:00")) == 10
+        assert periods.q_fixed(to_epoch("2023-08-01 00:00:00")) == 30
+        assert periods.q_fixed(to_epoch("2024-01-01 00:00:00")) is None
+
+    def test_q_tie_first_listed_wins(self):
+        periods = compile_periods(
+            [QPeriod(fixed=1, start=JULY[0], end=JULY[1]),
+             QPeriod(fixed=2, start=JULY[0], end=YEAR[1])],
+            [],
+            [],
+        )  # fmt: skip
+        assert periods.q_fixed(to_epoch("2023-07-15 12:00:00")) == 1
+
+    def test_p_extras_in_list_order(self):
+        periods = compile_periods(
+            [],
+            [PPeriod(extra=25, start=JULY[0], end=JULY[1]),
+             PPeriod(extra=10, start=YEAR[0], end=YEAR[1])],
+            [],
+        )  # fmt: skip
+        assert periods.p_extras(to_epoch("2023-07-15 12:00:00")) == (25, 10)
+        assert periods.p_extras(to_epoch("2023-09-15 12:00:00")) == (10,)
+
+    def test_boundaries_are_inclusive(self):
+        periods = compile_periods([], [], [KPeriod(start=JULY[0], end=JULY[1])])
+        assert periods.k_indices(to_epoch(JULY[0])) == (0,)
+        assert periods.k_indices(to_epoch(JULY[1])) == (0,)
+        assert periods.k_indices(to_epoch(JULY[1]) + 1) == ()
+        assert periods.k_indices(to_epoch(JULY[0]) - 1) == ()
+
+    def test_reversed_period_matches_nothing(self):
+        periods = compile_periods([], [], [KPeriod(start=JULY[1], end=JULY[0])])
+        assert periods.k_indices(to_epoch("2023-07-15 12:00:00")) == ()
+
+    def test_matches_naive_scan(self):
+        rng = random.Random(3)
+        base = parse_dt("2023-01-01 00:00:00")
+
+        def rand_dt():
+            return format_dt(
+                base.replace(month=rng.randint(1, 12), day=rng.randint(1, 28))
+            )
+
+        def rand_range():
+            a, b = sorted([rand_dt(), rand_dt()], key=parse_dt)
+            return a, b
+
+        q = [
+            QPeriod(fixed=i, start=a, end=b)
+            for i, (a, b) in enumerate(rand_range() for _ in range(8))
+        ]
+        p = [
+            PPeriod(extra=i, start=a, end=b)
+            for i, (a, b) in enumerate(rand_range() for _ in range(8))
+        ]
+        k = [KPeriod(start=a, end=b) for a, b in (rand_range() for _ in range(8))]
+        periods = compile_periods(q, p, k)
+
+        for _ in range(300):
+            date = rand_dt()
+            ts = to_epoch(date)
+            matching_q = [x for x in q if is_in_period(date, x.start, x.end)]
+            expected_q = (
+                max(matching_q, key=lambda x: parse_dt(x.start)).fixed
+                if matching_q
+                else None
+            )
+            assert periods.q_fixed(ts) == expected_q
+            assert periods.p_extras(ts) == tuple(
+                x.extra for x in p if is_in_period(date, x.start, x.end)
+            )
+            assert periods.k_indices(ts) == tuple(
+                i for i, x in enumerate(k) if is_in_period(date, x.start, x.end)
+            )  # fmt: skip
+
+
+class TestSharedPeriods:
+    def test_matches_compiled_lookups(self):
+        rng = random.Random(5)
+        base = to_epoch("2023-01-01 00:00:00")
+        year = 365 * 86_400
+
+        def period_bounds():
+            a, b = sorted(rng.randrange(1, 13) for _ in range(2))
+            return f"2023-{a:02d}-01 00:00:00", f"2023-{b:02d}-28 23:59:59"
+
+        q = [
+            QPeriod(fixed=i * 1.5, start=s, end=e)
+            for i, (s, e) in enumerate(period_bounds() for _ in range(6))
+        ]
+        p = [
+            PPeriod(extra=i + 0.25, start=s, end=e)
+            for i, (s, e) in enumerate(period_bounds() for _ in range(6))
+        ]
+        k = [KPeriod(start=s, end=e) for s, e in (period_bounds() for _ in range(6))]
+        periods = compile_periods(q, p, k)
+
+        block = share_periods(periods)
+        shared = SharedPeriods(block.name)
+        try:
+            for ts in [base - 1, *(base + rng.randrange(year) for _ in range(500))]:
+                assert shared.q_fixed_paise(ts) == periods.q_fixed_paise(ts)
+                assert shared.p_extras_paise(ts) == periods.p_extras_paise(ts)
+                assert shared.k_indices(ts) == periods.k_indices(ts)
+        finally:
+            shared.close()
+            block.close()
+            block.unlink()
+
+
+class TestPeriodRegistry:
+    def make_set(self, fixed=0):
+        return PeriodSet(
+            q=[QPeriod(fixed=fixed, start=JULY[0], end=JULY[1])],
+            k=[KPeriod(start=YEAR[0], end=YEAR[1])],
+        )
+
+    def test_same_content_same_id(self):
+        registry = PeriodRegistry()
+        assert registry.register(self.make_set()) == registry.register(self.make_set())
+        assert len(registry) == 1
+
+    def test_unknown_id_raises_key_error(self):
+        with pytest.raises(KeyError):
+            PeriodRegistry().get("missing")
+
+    def test_least_recently_used_is_evicted(self):
+        registry = PeriodRegistry(max_size=2)
+        first = registry.register(self.make_set(1))
+        second = registry.register(self.make_set(2))
+        registry.get(first)  # touch → second is now the oldest
+        registry.register(self.make_set(3))
+        registry.get(first)
+        with pytest.raises(KeyError):
+            registry.get(second)
+
+    def test_reversed_range_rejected(self):
+        with pytest.raises(ValueError):
+            PeriodSet(k=[KPeriod(start=YEAR[1], end=YEAR[0])])
+
+
+PREFIX = "/blackrock/challenge/v1"
+PERIODS = {
+    "q": [{"fixed": 0, "start": JULY[0], "end": JULY[1]}],
+    "p": [{"extra": 25, "start": "2023-10-01 00:00:00", "end": YEAR[1]}],
+    "k": [
+        {"start": YEAR[0], "end": YEAR[1]},
+        {"start": "2023-06-01 00:00:00", "end": YEAR[1]},
+    ],
+}
+TRANSACTIONS = [
+    {"date": "2023-02-28 15:49:20", "amount": 375},
+    {"date": "2023-07-01 21:59:00", "amount": 620},
+    {"date": "2023-10-12 20:15:30", "amount": 250},
+    {"date": "2023-12-17 08:09:45", "amount": 480},
+]
+
+
+class TestPeriodSetEndpoints:
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def register(self):
+        status, body = self.client.post_json(f"{PREFIX}/periods", PERIODS)
+        assert status == 201
+        assert (body["q"], body["p"], body["k"]) == (1, 1, 2)
+        return body["id"]
+
+    def test_round_trip(self):
+        set_id = self.register()
+        status, body = self.client.get_json(f"{PREFIX}/periods/{set_id}")
+        assert status == 200
+        assert body["k"] == PERIODS["k"]
+
+    def test_filter_by_id_matches_inline(self):
+        set_id = self.register()
+        url = f"{PREFIX}/transactions:filter"
+        inline = self.client.post_json(
+            url, {"wage": 50000, **PERIODS, "transactions": TRANSACTIONS}
+        )
+        by_id = self.client.post_json(
+            url, {"wage": 50000, "periodSetId": set_id, "transactions": TRANSACTIONS}
+        )
+        assert by_id == inline
+        assert inline[0] == 200
+
+    def test_returns_by_id_matches_inline(self):
+        set_id = self.register()
+        url = f"{PREFIX}/returns:nps"
+        base = {
+            "age": 29,
+            "wage": 50000,
+            "inflation": 5.5,
+            "transactions": TRANSACTIONS,
+        }
+        inline = self.client.post_json(url, {**base, **PERIODS})
+        by_id = self.client.post_json(url, {**base, "periodSetId": set_id})
+        assert by_id == inline
+        assert len(inline[1]["savingsByDates"]) == 2
+
+    def test_unknown_id_is_404(self):
+        status, _ = self.client.post_json(
+            f"{PREFIX}/transactions:filter",
+            {"wage": 50000, "periodSetId": "nope", "transactions": TRANSACTIONS},
+        )
+        assert status == 404
+
+    def test_id_and_inline_periods_is_422(self):
+        status, _ = self.client.post_json(
+            f"{PREFIX}/transactions:filter",
+            {
+                "wage": 50000,
+                "periodSetId": "x",
+                "k": PERIODS["k"],
+                "transactions": TRANSACTIONS,
+            },
+        )
+        assert status == 422
+
+    def test_delete(self):
+        set_id = self.register()
+        assert self.client.request("DELETE", f"{PREFIX}/periods/{set_id}")[0] == 204
+        assert self.client.get_json(f"{PREFIX}/periods/{set_id}")[0] == 404
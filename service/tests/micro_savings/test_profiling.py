@@ -0,0 +1,113 @@
+import cProfile
+import pstats
+import tracemalloc
+
+from fastapi import FastAPI
+
+from service.micro_savings.app.api.endpoints import profiling
+from service.micro_savings.app.api.middleware.profiling import (
+    ProfileStore,
+    ProfilingMiddleware,
+    _layer,
+    summarize_stats,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+
+def make_app(store):
+    app = FastAPI()
+    app.state.profile_store = store
+
+    @app.get("/work")
+    async def work():
+        return {"total": sum(i * i for i in range(2000))}
+
+    app.include_router(profiling.router)
+    app.add_middleware(ProfilingMiddleware, top_n=10)
+    return app
+
+
+class TestLayer:
+    def test_engine_before_app(self):
+        path = "/srv/service/micro_savings/app/transaction_engine/x.py"
+        assert _layer(path) == "engine"
+
+    def test_framework_and_builtin(self):
+        assert _layer("/venv/site-packages/starlette/routing.py") == "framework"
+        assert _layer("~") == "builtin"
+        assert _layer("/usr/lib/python3.12/random.py") == "other"
+
+
+class TestSummarizeStats:
+    def test_top_n_sorted_by_self_time(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        sorted(range(10_000), key=lambda v: -v)
+        profiler.disable()
+
+        summary = summarize_stats(pstats.Stats(profiler), top_n=3)
+        self_ms = [row["selfMs"] for row in summary["hotFunctions"]]
+        assert len(self_ms) <= 3
+        assert self_ms == sorted(self_ms, reverse=True)
+        assert summary["totalCalls"] > 0
+        assert summary["selfMsByLayer"]
+
+
+class TestProfileStore:
+    def test_evicts_oldest_and_lists_newest_first(self):
+        store = ProfileStore(max_size=2)
+        for i in range(3):
+            store.add({"id": str(i), "hotFunctions": [], "selfMsByLayer": {}})
+        assert [r["id"] for r in store.list()] == ["2", "1"]
+        assert "hotFunctions" not in store.list()[0]
+        try:
+            store.get("0")
+            assert False, "evicted report should be gone"
+        except KeyError:
+            pass
+
+
+class TestProfilingMiddleware:
+    def test_opt_in_header_produces_report(self):
+        with AppClient(make_app(ProfileStore())) as client:
+            status, headers, _ = client.request("GET", "/work", {"x-profile": "1"})
+            assert status == 200
+            assert "app;dur=" in headers["server-timing"]
+
+            status, report = client.get_json(f"/profiles/{headers['x-profile-id']}")
+            assert status == 200
+            assert report["path"] == "/work"
+            assert report["status"] == 200
+            assert report["wallMs"] >= 0
+            assert 0 < len(report["hotFunctions"]) <= 10
+
+    def test_query_flag_opts_in(self):
+        with AppClient(make_app(ProfileStore())) as client:
+            _, headers, _ = client.request("GET", "/work", query_string="profile=true")
+            assert "x-profile-id" in headers
+
+    def test_busy_profiler_hook_stops_tracing(self, monkeypatch):
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+        monkeypatch.setattr(cProfile.Profile, "enable", enable)
+        store = ProfileStore()
+        with AppClient(make_app(store)) as client:
+            status, _, _ = client.request("GET", "/work", {"x-profile": "1"})
+        assert status == 200
+        assert store.list() == []
+        assert not tracemalloc.is_tracing()
+
+    def test_not_profiled_without_opt_in(self):
+        store = ProfileStore()
+        with AppClient(make_app(store)) as client:
+            _, headers, _ = client.request("GET", "/work")
+            assert "x-profile-id" not in headers
+        assert store.list() == []
+
+    def test_disabled_store_is_404(self):
+        with AppClient(make_app(None)) as client:
+            _, headers, _ = client.request("GET", "/work", {"x-profile": "1"})
+            assert "x-profile-id" not in headers
+            status, _ = client.get_json("/profiles")
+            assert status == 404
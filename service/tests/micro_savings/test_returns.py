@@ -1,5 +1,10 @@
+import math
+
 from service.micro_savings.app.models.periods import KPeriod
-from service.micro_savings.app.models.transaction import FilteredTransaction
+from service.micro_savings.app.models.transaction import (
+    FilteredTransaction,
+    RawTransaction,
+)
 from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
     compute_future_value,
     adjust_for_inflation,
@@ -8,6 +13,7 @@ from service.micro_savings.app.transaction_engine.returns_processor.returns_serv
     NPS_RATE,
     INDEX_RATE,
 )
+from service.micro_savings.app.utils.date_utils import parse_dt
 
 
 def make_tx(date, amount=300, ceiling=400, remanent=100):
@@ -76,3 +82,57 @@ class TestIndexReturns:
         nps = compute_nps_returns(txns, [K], age=29, wage=50000, inflation=5.5)
         index = compute_index_returns(txns, [K], age=29, wage=50000, inflation=5.5)
         assert index.savingsByDates[0].profit > nps.savingsByDates[0].profit
+
+
+class TestTimeWeightedReturns:
+    @staticmethod
+    def _run(transactions, time_weighted):
+        return compute_index_returns(
+            transactions,
+            k_periods=[K],
+            q_periods=[],
+            p_periods=[],
+            age=30,
+            wage=50000,
+            inflation=5.5,
+            time_weighted=time_weighted,
+        )
+
+    def test_latest_day_matches_fixed_horizon(self):
+        txns = [RawTransaction(date="2023-12-31 10:00:00", amount=250)]
+        fixed = self._run(txns, time_weighted=False)
+        weighted = self._run(txns, time_weighted=True)
+        assert (
+            abs(weighted.savingsByDates[0].profit - fixed.savingsByDates[0].profit)
+            < 0.01
+        )
+
+    def test_older_remanents_compound_longer(self):
+        txns = [
+            RawTransaction(date="2023-01-01 10:00:00", amount=250),
+            RawTransaction(date="2023-12-31 10:00:00", amount=250),
+        ]
+        fixed = self._run(txns, time_weighted=False)
+        weighted = self._run(txns, time_weighted=True)
+        assert weighted.savingsByDates[0].amount == fixed.savingsByDates[0].amount
+        assert weighted.savingsByDates[0].profit > fixed.savingsByDates[0].profit
+
+    def test_matches_per_transaction_compounding(self):
+        txns = [
+            RawTransaction(date="2023-03-10 08:00:00", amount=250),
+            RawTransaction(date="2023-03-10 18:00:00", amount=120),
+            RawTransaction(date="2023-09-01 12:00:00", amount=847),
+            RawTransaction(date="2023-12-31 10:00:00", amount=410),
+        ]
+        weighted = self._run(txns, time_weighted=True)
+
+        last_day = parse_dt("2023-12-31 00:00:00")
+        real_rate = (1 + INDEX_RATE) / 1.055
+        expected = 0.0
+        for tx in txns:
+            remanent = math.ceil(tx.amount / 100) * 100 - tx.amount
+            days = (last_day - parse_dt(tx.date[:10] + " 00:00:00")).days
+            expected += remanent * real_rate ** (30 + days / 365.25)
+
+        principal = weighted.savingsByDates[0].amount
+        assert abs(weighted.savingsByDates[0].profit - (expected - principal)) < 0.01
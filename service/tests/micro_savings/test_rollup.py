@@ -0,0 +1,74 @@
+import random
+
+from service.micro_savings.app.transaction_engine.rollup_processor.rollup_service import (
+    RemanentRollup,
+)
+from service.micro_savings.app.utils.date_utils import to_epoch
+
+
+def brute_force(rows, start, end):
+    inside = [rem for ts, rem in rows if start <= ts <= end]
+    return len(inside), sum(inside)
+
+
+class TestRemanentRollup:
+    def test_matches_row_sums_for_random_windows(self):
+        rng = random.Random(7)
+        lo, hi = to_epoch("2019-11-15 00:00:00"), to_epoch("2024-03-10 00:00:00")
+        rows = [(rng.randrange(lo, hi), rng.randrange(0, 50_000)) for _ in range(5_000)]
+        rollup = RemanentRollup.from_rows(*zip(*rows))
+
+        windows = [
+            tuple(sorted(rng.randrange(lo, hi) for _ in "ab")) for _ in range(50)
+        ]
+        windows += [
+            (to_epoch("2020-01-01 00:00:00"), to_epoch("2023-12-31 23:59:59")),
+            (to_epoch("2020-02-29 12:00:00"), to_epoch("2020-02-29 12:30:00")),
+            (to_epoch("2021-03-01 00:00:00"), to_epoch("2021-02-01 00:00:00")),
+        ]
+        assert rollup.window_totals(windows) == [
+            brute_force(rows, start, end) for start, end in windows
+        ]
+
+    def test_add_after_query_updates_months_and_edges(self):
+        rollup = RemanentRollup()
+        rollup.add(to_epoch("2023-07-01 21:59:00"), 100)
+        year = (to_epoch("2023-01-01 00:00:00"), to_epoch("2023-12-31 23:59:59"))
+        evening = (to_epoch("2023-07-01 18:00:00"), to_epoch("2023-07-01 23:00:00"))
+        assert rollup.window_totals([year, evening]) == [(1, 100), (1, 100)]
+
+        rollup.add(to_epoch("2023-07-01 22:30:00"), 50)
+        rollup.add(to_epoch("2023-09-15 10:00:00"), 25)
+        assert rollup.window_totals([year, evening]) == [(3, 175), (2, 150)]
+        assert rollup.window_total(*year) == (3, 175)
+
+    def test_month_edges_and_wide_windows(self):
+        rows = [
+            (to_epoch(date), remanent)
+            for remanent, date in enumerate(
+                [
+                    "1999-12-31 23:59:59",
+                    "2000-01-01 00:00:00",
+                    "2000-01-31 12:00:00",
+                    "2000-02-01 00:00:00",
+                    "2000-02-29 23:59:59",
+                    "2000-03-01 00:00:00",
+                    "2150-06-15 08:00:00",
+                ],
+                start=1,
+            )
+        ]
+        rollup = RemanentRollup.from_rows(*zip(*rows))
+        windows = [
+            (to_epoch("2000-01-01 00:00:00"), to_epoch("2000-02-29 23:59:59")),
+            (to_epoch("2000-01-02 00:00:00"), to_epoch("2000-02-29 23:59:59")),
+            (to_epoch("2000-01-01 00:00:00"), to_epoch("2000-02-28 23:59:59")),
+            (to_epoch("2000-01-15 00:00:00"), to_epoch("2000-02-10 23:59:59")),
+            (to_epoch("2000-02-01 00:00:00"), to_epoch("2000-02-01 23:59:59")),
+            # thousands of years of empty months and days
+            (to_epoch("1000-01-01 00:00:00"), to_epoch("9999-12-31 23:59:59")),
+            (to_epoch("2000-03-01 00:00:01"), to_epoch("9999-12-31 23:59:59")),
+        ]
+        assert rollup.window_totals(windows) == [
+            brute_force(rows, start, end) for start, end in windows
+        ]
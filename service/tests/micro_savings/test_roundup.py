@@ -0,0 +1,138 @@
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.models.periods import KPeriod, PPeriod, QPeriod
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.ceiling_processor.ceiling_service import (
+    compute_ceiling,
+)
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    compile_periods,
+)
+from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
+    compute_index_returns,
+)
+from service.micro_savings.app.transaction_engine.roundup_processor.roundup_service import (
+    compare_round_ups,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+BASE = "/blackrock/challenge/v1"
+
+TRANSACTIONS = [
+    RawTransaction(date="2023-02-28 15:49:20", amount=375),
+    RawTransaction(date="2023-07-01 21:59:00", amount=620),
+    RawTransaction(date="2023-10-12 20:15:30", amount=250),
+    RawTransaction(date="2023-12-17 08:09:45", amount=480),
+    RawTransaction(date="2023-12-17 08:09:45", amount=999),  # duplicate date
+    RawTransaction(date="2023-05-05 10:00:00", amount=-10),  # negative
+]
+Q = [QPeriod(fixed=0, start="2023-07-01 00:00:00", end="2023-07-31 23:59:59")]
+P = [PPeriod(extra=25, start="2023-10-01 08:00:00", end="2023-12-31 19:59:59")]
+K = [
+    KPeriod(start="2023-03-01 00:00:00", end="2023-11-30 23:59:59"),
+    KPeriod(start="2023-01-01 00:00:00", end="2023-12-31 23:59:59"),
+]
+
+
+class TestComputeCeiling:
+    def test_granularities(self):
+        assert compute_ceiling(847) == 900
+        assert compute_ceiling(847, 10) == 850
+        assert compute_ceiling(847, 50) == 850
+        assert compute_ceiling(847, 500) == 1000
+        assert compute_ceiling(850, 50) == 850
+
+
+class TestCompareRoundUps:
+    def test_matches_returns_pipeline_per_granularity(self):
+        steps = [10, 50, 100, 500]
+        result = compare_round_ups(TRANSACTIONS, compile_periods(Q, P, K), steps)
+
+        assert [o.roundUp for o in result.options] == steps
+        for option in result.options:
+            expected = compute_index_returns(
+                transactions=TRANSACTIONS,
+                k_periods=K,
+                q_periods=Q,
+                p_periods=P,
+                age=30,
+                wage=50000,
+                inflation=5,
+                round_up=option.roundUp,
+            )
+            assert result.totalTransactionAmount == expected.totalTransactionAmount
+            assert option.totalCeiling == expected.totalCeiling
+            assert [s.amount for s in option.savingsByDates] == [
+                s.amount for s in expected.savingsByDates
+            ]
+
+    def test_hundred_rupee_example(self):
+        result = compare_round_ups(TRANSACTIONS, compile_periods(Q, P, K), [100])
+        # Mar–Nov: 0 (Jul, Q) + 50+25 (Oct, P); full year adds 25 (Feb) + 20+25 (Dec, P)
+        assert [s.amount for s in result.options[0].savingsByDates] == [75.0, 145.0]
+
+
+class TestRoundUpEndpoints:
+    payload = {
+        "q": [q.model_dump() for q in Q],
+        "p": [p.model_dump() for p in P],
+        "k": [k.model_dump() for k in K],
+        "transactions": [t.model_dump() for t in TRANSACTIONS[:4]],
+    }
+
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_compare_defaults_to_every_granularity(self):
+        status, body = self.client.post_json(
+            f"{BASE}/transactions:roundups", self.payload
+        )
+        assert status == 200
+        assert [o["roundUp"] for o in body["options"]] == [10, 50, 100, 500]
+
+    def test_compare_dedupes_and_sorts(self):
+        status, body = self.client.post_json(
+            f"{BASE}/transactions:roundups",
+            {**self.payload, "roundUps": [500, 10, 500]},
+        )
+        assert status == 200
+        assert [o["roundUp"] for o in body["options"]] == [10, 500]
+
+    def test_invalid_granularity_is_422(self):
+        status, _ = self.client.post_json(
+            f"{BASE}/transactions:roundups", {**self.payload, "roundUps": [25]}
+        )
+        assert status == 422
+        status, _ = self.client.post_json(
+            f"{BASE}/transactions:filter", {**self.payload, "wage": 50000, "roundUp": 7}
+        )
+        assert status == 422
+
+    def test_returns_honours_round_up(self):
+        payload = {**self.payload, "age": 30, "wage": 50000, "inflation": 5}
+        _, default = self.client.post_json(f"{BASE}/returns:index", payload)
+        _, fifty = self.client.post_json(
+            f"{BASE}/returns:index", {**payload, "roundUp": 50}
+        )
+        assert default["totalCeiling"] == 1900.0
+        assert fifty["totalCeiling"] == 1800.0
+
+    def test_parse_query_param(self):
+        status, body = self.client.post_json(
+            f"{BASE}/transactions:parse",
+            [{"date": "2023-10-12 20:15:30", "amount": 847}],
+            query_string="roundUp=50",
+        )
+        assert status == 200
+        assert body[0]["ceiling"] == 850
+        assert body[0]["remanent"] == 3
+        status, _ = self.client.post_json(
+            f"{BASE}/transactions:parse",
+            [{"date": "2023-10-12 20:15:30", "amount": 847}],
+            query_string="roundUp=3",
+        )
+        assert status == 422
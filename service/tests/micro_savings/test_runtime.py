@@ -0,0 +1,195 @@
+import asyncio
+import gc
+import time
+
+import pytest
+from fastapi import FastAPI
+
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.api.middleware.gc import GCDeferralMiddleware
+from service.micro_savings.app.utils.runtime import (
+    GCPauseMonitor,
+    GCTuner,
+    RuntimeSampler,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+
+async def take_sample(sampler: RuntimeSampler) -> dict:
+    return sampler.sample()
+
+
+class TestGCPauseMonitor:
+    def test_collections_timed_and_drained(self):
+        monitor = GCPauseMonitor()
+        monitor.install()
+        try:
+            gc.collect()
+            drained = monitor.drain()
+        finally:
+            monitor.uninstall()
+
+        assert drained["collections"][2] >= 1
+        assert drained["pauseMsTotal"][2] >= drained["pauseMsMax"][2] >= 0
+        assert monitor.drain()["collections"] == [0, 0, 0]
+        assert monitor._callback not in gc.callbacks
+
+
+class TestGCTuner:
+    def test_tuned_freezes_and_restores(self):
+        original = gc.get_threshold()
+        tuner = GCTuner("tuned", thresholds=(12_345, 15, 15))
+        tuner.apply()
+        try:
+            assert gc.get_threshold() == (12_345, 15, 15)
+            assert gc.get_freeze_count() > 0
+            assert tuner.stats()["frozenObjects"] == gc.get_freeze_count()
+        finally:
+            tuner.restore()
+        assert gc.get_threshold() == original
+        assert gc.get_freeze_count() == 0
+
+    def test_deferred_collects_once_idle(self):
+        tuner = GCTuner("deferred", thresholds=(10, 10, 10))
+        tuner.apply()
+        try:
+            tuner.request_started()
+            tuner.request_started()
+            assert not gc.isenabled()
+            kept = [[] for _ in range(100)]
+            tuner.request_finished()
+            assert not gc.isenabled()  # one request still in flight
+            assert tuner.idle_collections == 0
+            tuner.request_finished()
+            assert gc.isenabled()
+            assert tuner.idle_collections == 1
+            assert tuner.stats()["pauses"]["collections"] != [0, 0, 0]
+        finally:
+            tuner.restore()
+        assert len(kept) == 100
+
+    def test_overdue_request_collects_first(self):
+        tuner = GCTuner("deferred", thresholds=(10, 10, 10), max_deferred=10)
+        tuner.apply()
+        try:
+            tuner.request_started()
+            kept = [[] for _ in range(100)]
+            tuner.request_finished()
+            gc.disable()  # hold off the automatic collection between the two
+            kept += [[] for _ in range(100)]
+            tuner.request_started()
+            tuner.request_finished()
+            assert tuner.forced_collections == 1
+        finally:
+            tuner.restore()
+
+    def test_overdue_under_constant_load_reaches_old_generations(self):
+        generations = []
+
+        def record(phase, info):
+            if phase == "start":
+                generations.append(info["generation"])
+
+        tuner = GCTuner("deferred", thresholds=(10, 2, 2), max_deferred=10)
+        tuner.apply()
+        gc.callbacks.append(record)
+        try:
+            tuner.request_started()  # stays in flight: the server is never idle
+            kept = []
+            for _ in range(20):
+                kept += [[] for _ in range(100)]
+                tuner.request_started()
+            assert tuner.forced_collections == 20
+            assert 2 in generations
+        finally:
+            gc.callbacks.remove(record)
+            tuner.restore()
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            GCTuner("aggressive")
+
+    def test_middleware_defers_around_requests(self):
+        app = FastAPI()
+        app.state.gc_tuner = GCTuner("deferred")
+        seen = []
+
+        @app.get("/ok")
+        async def ok():
+            seen.append(gc.isenabled())
+            return {}
+
+        app.add_middleware(GCDeferralMiddleware)
+        with AppClient(app) as client:
+            status, _ = client.get_json("/ok")
+
+        assert status == 200
+        assert seen == [False]
+        assert gc.isenabled()
+        assert app.state.gc_tuner.deferred_requests == 1
+
+
+class TestRuntimeSampler:
+    def test_ring_buffer_keeps_latest_samples(self):
+        async def scenario():
+            sampler = RuntimeSampler(interval=0.01, capacity=3)
+            sampler.start()
+            await asyncio.sleep(0.15)
+            await sampler.stop()
+            return sampler
+
+        sampler = asyncio.run(scenario())
+        samples = sampler.samples()
+        assert len(samples) == 3
+        assert samples[0]["time"] < samples[-1]["time"]
+        assert samples[-1]["rssBytes"] > 0
+        assert samples[-1]["threadPoolSize"] > 0
+        assert len(samples[-1]["gcCounts"]) == 3
+
+    def test_blocked_loop_shows_as_lag(self):
+        async def scenario():
+            sampler = RuntimeSampler(interval=0.01)
+            sampler.start()
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)  # blocks the event loop
+            await asyncio.sleep(0.03)
+            await sampler.stop()
+            return sampler.history()
+
+        history = asyncio.run(scenario())
+        assert history["summary"]["loopLagMsMax"] >= 50
+
+    def test_window_filters_old_samples(self):
+        sampler = RuntimeSampler(interval=1.0)
+        sample = asyncio.run(take_sample(sampler))
+        sampler.record(sample)
+        time.sleep(0.05)
+        sampler.record(sample)
+
+        assert len(sampler.samples()) == 2
+        assert len(sampler.samples(window=0.03)) == 1
+
+
+class TestPerformanceHistory:
+    def test_window_adds_history(self):
+        with AppClient(get_app()) as client:
+            sampler = client.app.state.runtime_sampler
+            sampler.record(asyncio.run(take_sample(sampler)))
+
+            status, plain = client.get_json("/blackrock/challenge/v1/performance")
+            status_window, metrics = client.get_json(
+                "/blackrock/challenge/v1/performance", query_string="window=60"
+            )
+            status_bad, _ = client.get_json(
+                "/blackrock/challenge/v1/performance", query_string="window=-1"
+            )
+
+        assert status == status_window == 200
+        assert status_bad == 422
+        assert "history" not in plain
+        history = metrics["history"]
+        assert history["windowSeconds"] == 60
+        assert history["summary"]["samples"] == len(history["samples"]) >= 1
+        assert history["summary"]["rssBytesMax"] > 0
+        assert metrics["gc"]["mode"] == "default"
+        assert len(metrics["gc"]["pauses"]["pauseMsMax"]) == 3
@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+
+import pytest
+
+from service.micro_savings.app.models.periods import KPeriod, PeriodSet, QPeriod
+from service.micro_savings.app.transaction_engine.period_processor.period_service import (
+    PeriodRegistry,
+    PeriodSetTooLarge,
+)
+from service.micro_savings.app.utils.shared_cache import SharedCache
+
+JULY = ("2023-07-01 00:00:00", "2023-07-31 23:59:59")
+YEAR = ("2023-01-01 00:00:00", "2023-12-31 23:59:59")
+
+
+def make_set(fixed=0):
+    return PeriodSet(
+        q=[QPeriod(fixed=fixed, start=JULY[0], end=JULY[1])],
+        k=[KPeriod(start=YEAR[0], end=YEAR[1])],
+    )
+
+
+def _register_in_child(path, fixed):
+    cache = SharedCache(path, slots=16, ways=4)
+    PeriodRegistry(shared=cache).register(make_set(fixed))
+    cache.close()
+
+
+class TestSharedCache:
+    def test_value_visible_to_other_instance(self, tmp_path):
+        path = str(tmp_path / "cache")
+        a, b = SharedCache(path, slots=16, ways=4), SharedCache(path, slots=16, ways=4)
+        a.put("key", b"value")
+        value, handle = b.get("key")
+
+        assert value == b"value"
+        assert b.is_current(handle)
+        assert b.get("other") is None
+        assert len(a) == len(b) == 1
+        a.close()
+        b.close()
+
+    def test_remove_and_rewrite_invalidate_handles(self, tmp_path):
+        path = str(tmp_path / "cache")
+        a, b = SharedCache(path, slots=16, ways=4), SharedCache(path, slots=16, ways=4)
+        handle = a.put("key", b"one")
+        assert a.put("key", b"one") == handle  # unchanged value: not rewritten
+        _, seen = b.get("key")
+
+        a.put("key", b"two")
+        assert not b.is_current(seen)
+        assert b.get("key")[0] == b"two"
+        assert b.remove("key")
+        assert b.get("key") is None
+        assert not b.remove("key")
+        assert len(a) == 0
+        a.close()
+        b.close()
+
+    def test_least_recently_used_of_set_is_evicted(self, tmp_path):
+        cache = SharedCache(str(tmp_path / "cache"), slots=2, ways=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")  # touch → b is now the oldest
+        cache.put("c", b"3")
+
+        assert cache.get("b") is None
+        assert cache.get("a")[0] == b"1"
+        assert cache.stats()["worker"]["evictions"] == 1
+        cache.close()
+
+    def test_oversized_value_not_cached(self, tmp_path):
+        cache = SharedCache(str(tmp_path / "cache"), slots=4, slot_size=8, ways=4)
+        assert cache.put("key", b"x" * 9) is None
+        assert cache.get("key") is None
+        assert cache.stats()["worker"]["oversized"] == 1
+        cache.close()
+
+    def test_geometry_must_divide_into_sets(self, tmp_path):
+        with pytest.raises(ValueError):
+            SharedCache(str(tmp_path / "cache"), slots=10, ways=4)
+
+    def test_counters_per_worker_row(self, tmp_path):
+        path = str(tmp_path / "cache")
+        a, b = SharedCache(path, slots=16, ways=4), SharedCache(path, slots=16, ways=4)
+        a.put("key", b"value")
+        b.get("key")
+        b.get("missing")
+        rows = a.workers()
+
+        assert [row["pid"] for row in rows] == [os.getpid(), os.getpid()]
+        assert [(row["stores"], row["hits"], row["misses"]) for row in rows] == [
+            (1, 0, 0),
+            (0, 1, 1),
+        ]
+        assert b.stats()["worker"]["hitRate"] == 0.5
+        b.close()
+        assert len(a.workers()) == 1  # closing releases the row
+        a.close()
+
+
+class TestSharedPeriodRegistry:
+    def make_registries(self, tmp_path, max_size=256):
+        path = str(tmp_path / "cache")
+        return [
+            PeriodRegistry(max_size, shared=SharedCache(path, slots=16, ways=4))
+            for _ in range(2)
+        ]
+
+    def test_registered_on_one_resolves_on_other(self, tmp_path):
+        a, b = self.make_registries(tmp_path)
+        set_id = a.register(make_set())
+        period_set, compiled = b.get(set_id)
+
+        assert period_set == make_set()
+        assert compiled.k_periods == a.get(set_id)[1].k_periods
+        assert len(b) == 1
+
+    def test_removed_on_one_is_gone_on_other(self, tmp_path):
+        a, b = self.make_registries(tmp_path)
+        set_id = a.register(make_set())
+        b.get(set_id)  # compiled copy cached locally in b
+        a.remove(set_id)
+
+        with pytest.raises(KeyError):
+            b.get(set_id)
+        with pytest.raises(KeyError):
+            b.remove(set_id)
+        assert len(b) == 0
+
+    def test_local_eviction_falls_back_to_shared(self, tmp_path):
+        a, _ = self.make_registries(tmp_path, max_size=1)
+        first = a.register(make_set(1))
+        a.register(make_set(2))
+
+        assert a.get(first)[0] == make_set(1)
+        assert a.shared.stats()["worker"]["hits"] == 1
+
+    def test_set_too_large_for_a_slot_is_rejected(self, tmp_path):
+        path = str(tmp_path / "cache")
+        a, b = [
+            PeriodRegistry(shared=SharedCache(path, slots=16, ways=4, slot_size=512))
+            for _ in range(2)
+        ]
+        large = PeriodSet(
+            q=[QPeriod(fixed=fixed, start=JULY[0], end=JULY[1]) for fixed in range(20)],
+            k=[KPeriod(start=YEAR[0], end=YEAR[1])],
+        )
+        with pytest.raises(PeriodSetTooLarge) as raised:
+            a.register(large)
+
+        assert raised.value.limit == 512
+        assert len(a) == 0  # not kept on one worker only
+        assert b.get(a.register(make_set()))[0] == make_set()
+
+    def test_registered_in_another_process(self, tmp_path):
+        path = str(tmp_path / "cache")
+        registry = PeriodRegistry(shared=SharedCache(path, slots=16, ways=4))
+        child = multiprocessing.get_context("spawn").Process(
+            target=_register_in_child, args=(path, 7)
+        )
+        child.start()
+        child.join(30)
+
+        assert child.exitcode == 0
+        assert registry.get(PeriodRegistry().register(make_set(7)))[0] == make_set(7)
@@ -0,0 +1,186 @@
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.models.periods import KPeriod
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.store_processor.store_service import (
+    TransactionStore,
+    merge_windows,
+)
+from service.micro_savings.app.utils.date_utils import to_epoch
+from service.tests.micro_savings.asgi_utils import AppClient
+
+BASE = "/blackrock/challenge/v1"
+
+TRANSACTIONS = [
+    {"date": "2023-02-28 15:49:20", "amount": 375},
+    {"date": "2023-07-01 21:59:00", "amount": 620},
+    {"date": "2023-10-12 20:15:30", "amount": 250},
+    {"date": "2024-12-17 08:09:45", "amount": 480},
+]
+K = [
+    {"start": "2023-03-01 00:00:00", "end": "2023-11-30 23:59:59"},
+    {"start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
+]
+
+
+class TestMergeWindows:
+    def test_overlapping_and_touching_windows_merge(self):
+        ranges = merge_windows(
+            [
+                KPeriod(start="2023-03-01 00:00:00", end="2023-11-30 23:59:59"),
+                KPeriod(start="2023-01-01 00:00:00", end="2023-02-28 23:59:59"),
+                KPeriod(start="2025-01-01 00:00:00", end="2025-01-31 23:59:59"),
+            ]
+        )
+        assert ranges == [
+            (to_epoch("2023-01-01 00:00:00"), to_epoch("2023-11-30 23:59:59")),
+            (to_epoch("2025-01-01 00:00:00"), to_epoch("2025-01-31 23:59:59")),
+        ]
+
+
+class TestTransactionStore:
+    def setup_method(self):
+        self.store = TransactionStore(":memory:", pool_size=1, batch_size=2)
+
+    def teardown_method(self):
+        self.store.close()
+
+    def test_batched_insert_records_duplicate_timestamps(self):
+        txs = [RawTransaction(**tx) for tx in TRANSACTIONS]
+        assert self.store.add("u1", txs) == 4
+        duplicate = RawTransaction(date=TRANSACTIONS[0]["date"], amount=999)
+        assert self.store.add("u1", [duplicate, duplicate]) == 0
+        assert self.store.add("u2", [duplicate]) == 1
+
+        rows = self.store.scan("u1")
+        assert [tx.amount for tx in rows[:4]] == [375, 999, 999, 620]
+        assert self.store.count("u1") == 6
+        assert self.store.count_k_windows("u1", [KPeriod(**k) for k in K]) == 2
+        assert self.store.delete("u1") == 6
+
+    def test_scan_k_windows_reads_each_transaction_once(self):
+        self.store.add("u1", [RawTransaction(**tx) for tx in TRANSACTIONS])
+        rows = self.store.scan_k_windows("u1", [KPeriod(**k) for k in K])
+        assert [tx.date for tx in rows] == [
+            "2023-07-01 21:59:00",
+            "2023-10-12 20:15:30",
+        ]
+
+    def test_paise_round_trip_and_delete(self):
+        self.store.add("u1", [RawTransaction(date="2023-01-01 00:00:00", amount=0.29)])
+        assert self.store.scan("u1")[0].amount == 0.29
+        assert self.store.delete("u1") == 1
+        assert self.store.count("u1") == 0
+
+
+class TestStoreEndpoints:
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+        cls.client.app.state.db_connection = TransactionStore(":memory:", pool_size=1)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_stored_user_matches_inline_k_transactions(self):
+        status, body = self.client.post_json(
+            f"{BASE}/users/alice/transactions", TRANSACTIONS
+        )
+        assert status == 201
+        assert body == {"userId": "alice", "inserted": 4, "duplicates": 0, "total": 4}
+
+        common = {"age": 30, "wage": 50000, "inflation": 5, "k": K}
+        _, stored = self.client.post_json(
+            f"{BASE}/returns:nps", {**common, "userId": "alice"}
+        )
+        _, inline = self.client.post_json(
+            f"{BASE}/returns:nps", {**common, "transactions": TRANSACTIONS[1:3]}
+        )
+        assert stored == inline
+
+        status, body = self.client.post_json(
+            f"{BASE}/transactions:filter", {"wage": 50000, "k": K, "userId": "alice"}
+        )
+        assert status == 200
+        assert len(body["valid"]) == 2 and body["invalid"] == []
+
+    def test_stored_duplicates_match_inline_filter(self):
+        transactions = [
+            *TRANSACTIONS[:2],
+            {"date": TRANSACTIONS[1]["date"], "amount": 100},
+            *TRANSACTIONS[2:],
+        ]
+        self.client.post_json(f"{BASE}/users/carol/transactions", transactions[:2])
+        _, body = self.client.post_json(
+            f"{BASE}/users/carol/transactions", transactions[2:]
+        )
+        assert body["duplicates"] == 1 and body["total"] == 5
+
+        common = {"wage": 50000, "k": K}
+        _, stored = self.client.post_json(
+            f"{BASE}/transactions:filter", {**common, "userId": "carol"}
+        )
+        _, inline = self.client.post_json(
+            f"{BASE}/transactions:filter",
+            {**common, "transactions": transactions[1:4]},
+        )
+        assert stored == inline
+        assert [tx["message"] for tx in stored["invalid"]] == [
+            "Duplicate transaction"
+        ] * 2
+
+    def test_admission_cost_counts_stored_rows(self):
+        self.client.post_json(f"{BASE}/users/dave/transactions", TRANSACTIONS)
+        admission = self.client.app.state.admission
+        costs = []
+        acquire = admission.acquire
+
+        async def record(cost):
+            costs.append(cost)
+            return await acquire(cost)
+
+        admission.acquire = record
+        try:
+            self.client.post_json(
+                f"{BASE}/transactions:filter", {"wage": 1, "k": K, "userId": "dave"}
+            )
+        finally:
+            del admission.acquire
+        assert costs == [2 * len(K)]  # 2 stored rows in K × 2 periods
+
+    def test_range_listing(self):
+        self.client.post_json(f"{BASE}/users/bob/transactions", TRANSACTIONS)
+        status, body = self.client.get_json(
+            f"{BASE}/users/bob/transactions",
+            query_string="start=2023-07-01+00:00:00&end=2023-12-31+23:59:59",
+        )
+        assert status == 200
+        assert [tx["amount"] for tx in body] == [620, 250]
+
+        status, _ = self.client.get_json(
+            f"{BASE}/users/bob/transactions", query_string="start=yesterday"
+        )
+        assert status == 422
+
+    def test_both_or_neither_source_is_422(self):
+        status, _ = self.client.post_json(
+            f"{BASE}/transactions:filter",
+            {"wage": 1, "k": K, "userId": "a", "transactions": TRANSACTIONS},
+        )
+        assert status == 422
+        status, _ = self.client.post_json(
+            f"{BASE}/transactions:filter", {"wage": 1, "k": K}
+        )
+        assert status == 422
+
+
+class TestStoreDisabled:
+    def test_404(self):
+        with AppClient(get_app()) as client:
+            status, _ = client.get_json(f"{BASE}/users/alice/transactions")
+            assert status == 404
+            status, _ = client.post_json(
+                f"{BASE}/returns:index",
+                {"age": 30, "wage": 1, "inflation": 5, "k": K, "userId": "alice"},
+            )
+            assert status == 404
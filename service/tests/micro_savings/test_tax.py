@@ -1,7 +1,14 @@
+import pytest
+
+from service.micro_savings.app.api.application import get_app
 from service.micro_savings.app.transaction_engine.tax_processor.tax_service import (
+    TAX_TABLES,
+    compile_tax_table,
     compute_tax,
     compute_nps_tax_benefit,
+    nps_tax_benefits,
 )
+from service.tests.micro_savings.asgi_utils import AppClient
 
 
 class TestComputeTax:
@@ -55,3 +62,128 @@ class TestNPSTaxBenefit:
         benefit_small = compute_nps_tax_benefit(200_000, monthly_wage=200_000)
         benefit_large = compute_nps_tax_benefit(1_000_000, monthly_wage=200_000)
         assert benefit_small == benefit_large  # Both capped at 2L deduction
+
+
+def _walk_slabs(income, slabs):
+    tax, prev_limit = 0.0, 0
+    for limit, rate in slabs:
+        if income <= prev_limit:
+            break
+        tax += (min(income, limit) - prev_limit) * rate
+        prev_limit = limit
+    return round(tax, 2)
+
+
+class TestTaxTables:
+    def test_compiled_lookup_matches_slab_walk(self):
+        for table in TAX_TABLES.values():
+            for income in range(0, 3_000_001, 12_345):
+                expected = (
+                    0.0
+                    if income <= table.rebate_limit
+                    else _walk_slabs(income, table.slabs())
+                )
+                assert table.tax(income) == expected, (table.name, income)
+
+    def test_old_regime_rebate_and_slabs(self):
+        assert compute_tax(500_000, "old-2023-24") == 0.0  # 87A rebate
+        # 5% of 2.5L + 20% of 1L = 12,500 + 20,000
+        assert compute_tax(600_000, "old-2023-24") == 32_500.0
+
+    def test_new_regime_2025_26_rebate(self):
+        assert compute_tax(1_200_000, "new-2025-26") == 0.0
+        # 5% of 4L + 10% of 4L + 15% of 1L = 20,000 + 40,000 + 15,000
+        assert compute_tax(1_300_000, "new-2025-26") == 75_000.0
+
+    def test_unknown_table(self):
+        with pytest.raises(KeyError):
+            compute_tax(1_000_000, "new-1999-00")
+
+    def test_unsorted_slabs_rejected(self):
+        with pytest.raises(ValueError):
+            compile_tax_table("bad", "new", "x", [(500, 0.1), (100, 0.2)])
+
+    def test_batch_matches_single_evaluations(self):
+        invested = [0, 10_000, 50_000, 200_000, 1_000_000]
+        wages = [50_000, 100_000, 100_000, 150_000, 200_000]
+        tables = list(TAX_TABLES.values())
+        benefits = nps_tax_benefits(invested, wages, tables)
+        assert list(benefits) == list(TAX_TABLES)
+        for table in tables:
+            assert benefits[table.name] == [
+                compute_nps_tax_benefit(amount, wage, table.name)
+                for amount, wage in zip(invested, wages)
+            ]
+
+
+class TestTaxEndpoints:
+    def test_list_tables(self):
+        with AppClient(get_app()) as client:
+            status, tables = client.get_json("/blackrock/challenge/v1/tax/tables")
+        assert status == 200
+        by_name = {table["name"]: table for table in tables}
+        assert set(by_name) == set(TAX_TABLES)
+        assert by_name["old-2024-25"]["regime"] == "old"
+        assert by_name["new-2023-24"]["slabs"][-1] == {"upTo": None, "rate": 0.3}
+
+    def test_benefits_for_many_investors(self):
+        payload = {
+            "investors": [
+                {"invested": 50_000, "wage": 100_000},
+                {"invested": 10_000, "wage": 50_000},
+            ],
+            "taxTables": ["new-2023-24", "old-2023-24"],
+        }
+        with AppClient(get_app()) as client:
+            status, body = client.post_json(
+                "/blackrock/challenge/v1/tax:benefits", payload
+            )
+        assert status == 200
+        assert body["taxTables"] == ["new-2023-24", "old-2023-24"]
+        first = body["investors"][0]
+        assert first["benefits"]["new-2023-24"] == compute_nps_tax_benefit(
+            50_000, 100_000
+        )
+        # 20,000 deducted inside the old regime's 30% slab beats the new 20% one
+        assert first["bestTaxTable"] == "old-2023-24"
+
+    def test_unknown_table_is_422(self):
+        payload = {"investors": [], "taxTables": ["new-1999-00"]}
+        with AppClient(get_app()) as client:
+            status, _ = client.post_json(
+                "/blackrock/challenge/v1/tax:benefits", payload
+            )
+        assert status == 422
+
+    def test_returns_compare_tax_tables(self):
+        payload = {
+            "age": 30,
+            "wage": 100_000,
+            "k": [{"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"}],
+            "transactions": [
+                {"date": f"2023-03-{day:02d} 10:00:00", "amount": 250}
+                for day in range(1, 29)
+            ],
+        }
+        with AppClient(get_app()) as client:
+            status, plain = client.post_json(
+                "/blackrock/challenge/v1/returns:nps", payload
+            )
+            status_compared, compared = client.post_json(
+                "/blackrock/challenge/v1/returns:nps",
+                {
+                    **payload,
+                    "taxTable": "old-2023-24",
+                    "compareTaxTables": ["new-2023-24"],
+                },
+            )
+        assert status == status_compared == 200
+        assert "taxBenefits" not in plain["savingsByDates"][0]
+        window = compared["savingsByDates"][0]
+        assert window["taxBenefits"] == {
+            "old-2023-24": window["taxBenefit"],
+            "new-2023-24": plain["savingsByDates"][0]["taxBenefit"],
+        }
+        assert window["taxBenefit"] == compute_nps_tax_benefit(
+            window["amount"], 100_000, "old-2023-24"
+        )
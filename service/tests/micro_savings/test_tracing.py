@@ -0,0 +1,157 @@
+import json
+
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.utils.tracing import (
+    Tracer,
+    current_span,
+    format_traceparent,
+    parse_traceparent,
+    span,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class TestTraceparent:
+    def test_round_trip(self):
+        header = format_traceparent(TRACE_ID, PARENT_ID)
+        assert parse_traceparent(header) == (TRACE_ID, PARENT_ID, True)
+
+    def test_unsampled_flag(self):
+        header = format_traceparent(TRACE_ID, PARENT_ID, sampled=False)
+        assert parse_traceparent(header)[2] is False
+
+    def test_malformed_or_zero_ids_rejected(self):
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+        assert parse_traceparent(None) is None
+
+
+class TestSpans:
+    def test_noop_outside_trace(self):
+        with span("engine.stage") as s:
+            s.set("ignored", True)
+            assert current_span() is None
+
+    def test_nested_spans_link_to_parent(self):
+        tracer = Tracer(sample_rate=1.0)
+        root = tracer.start_trace("root")
+        with root:
+            with span("outer") as outer:
+                with span("inner", size=3):
+                    pass
+        tracer.finish(root)
+
+        spans = {s["name"]: s for s in tracer.get_trace(root.trace.trace_id)}
+        assert spans["outer"]["parentId"] == root.span_id
+        assert spans["inner"]["parentId"] == outer.span_id
+        assert spans["inner"]["attributes"] == {"size": 3}
+
+
+class TestTracer:
+    def test_sampling_decisions(self):
+        tracer = Tracer(sample_rate=0.0)
+        assert tracer.start_trace("r") is None
+        sampled = format_traceparent(TRACE_ID, PARENT_ID)
+        root = tracer.start_trace("r", sampled)
+        assert root.trace.trace_id == TRACE_ID
+        assert root.parent_id == PARENT_ID
+
+        always = Tracer(sample_rate=1.0)
+        unsampled = format_traceparent(TRACE_ID, PARENT_ID, sampled=False)
+        assert always.start_trace("r", unsampled) is None
+
+    def test_ring_buffer_keeps_newest_traces(self):
+        tracer = Tracer(sample_rate=1.0, buffer_size=2)
+        ids = []
+        for _ in range(3):
+            root = tracer.start_trace("r")
+            tracer.finish(root)
+            ids.append(root.trace.trace_id)
+        assert [t["traceId"] for t in tracer.recent()] == [ids[2], ids[1]]
+
+    def test_forced_traces_are_rate_limited(self):
+        tracer = Tracer(sample_rate=0.0, forced_per_second=2.0)
+        sampled = format_traceparent(TRACE_ID, PARENT_ID)
+        roots = [tracer.start_trace("r", sampled) for _ in range(5)]
+        assert [root is not None for root in roots] == [True, True] + [False] * 3
+        assert tracer.stats()["forcedThrottled"] == 3
+
+        always = Tracer(sample_rate=1.0, forced_per_second=0)
+        assert always.start_trace("r", sampled).trace.trace_id == TRACE_ID
+
+    def test_spans_capped_per_trace(self):
+        tracer = Tracer(sample_rate=1.0, max_spans=3)
+        sampled = format_traceparent(TRACE_ID, PARENT_ID)
+        for children in (1, 4):
+            root = tracer.start_trace("r", sampled)
+            with root:
+                for _ in range(children):
+                    with span("child"):
+                        pass
+            tracer.finish(root)
+
+        assert len(tracer.get_trace(TRACE_ID)) == 3
+        assert tracer.recent()[0]["droppedSpans"] == 4
+        assert tracer.stats()["droppedSpans"] == 4
+
+    def test_file_export_in_batches(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        tracer = Tracer(sample_rate=1.0, export_path=str(path), export_batch_size=3)
+
+        root = tracer.start_trace("r")
+        with root, span("child"):
+            pass
+        assert tracer.finish(root) is None  # 2 spans < batch of 3
+
+        batch = tracer.finish(tracer.start_trace("r"))
+        assert len(batch) == 3
+        tracer.write_batch(batch)
+        tracer.flush()  # nothing pending
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [s["name"] for s in lines] == ["r", "child", "r"]
+
+
+class TestTracingMiddleware:
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_propagated_trace_records_engine_stages(self):
+        payload = {
+            "wage": 50000,
+            "k": [{"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"}],
+            "transactions": [{"date": "2023-02-05 10:00:00", "amount": 250}],
+        }
+        status, headers, _ = self.client.request(
+            "POST",
+            "/blackrock/challenge/v1/transactions:filter",
+            {
+                "content-type": "application/json",
+                "traceparent": format_traceparent(TRACE_ID, PARENT_ID),
+            },
+            (json.dumps(payload).encode(),),
+        )
+        assert status == 200
+        trace_id, root_id, _ = parse_traceparent(headers["traceparent"])
+        assert trace_id == TRACE_ID
+
+        status, spans = self.client.get_json(
+            f"/blackrock/challenge/v1/traces/{TRACE_ID}"
+        )
+        assert status == 200
+        by_name = {s["name"]: s for s in spans}
+        assert by_name["http.request"]["parentId"] == PARENT_ID
+        assert by_name["http.request"]["attributes"]["status"] == 200
+        for name in ("http.read_body", "qpk.validate", "qpk.rules", "http.serialize"):
+            assert by_name[name]["parentId"] == root_id
+
+    def test_unknown_trace_is_404(self):
+        status, _ = self.client.get_json("/blackrock/challenge/v1/traces/missing")
+        assert status == 404
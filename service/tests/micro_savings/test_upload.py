@@ -0,0 +1,260 @@
+import json
+
+import pytest
+
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.api.uploads import MultipartParser, parse_content_type
+from service.micro_savings.app.transaction_engine.csv_processor.csv_service import (
+    CsvTransactionReader,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+BASE = "/blackrock/challenge/v1"
+BOUNDARY = "----upload-boundary-7MA4YWxk"
+
+PERIODS = {
+    "q": [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}],
+    "p": [{"extra": 25, "start": "2023-10-01 08:00:00", "end": "2023-12-31 19:59:59"}],
+    "k": [{"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"}],
+}
+TRANSACTIONS = [
+    {"date": "2023-02-28 15:49:20", "amount": 375},
+    {"date": "2023-07-01 21:59:00", "amount": 620},
+    {"date": "2023-10-12 20:15:30", "amount": 250.5},
+    {"date": "2023-12-17 08:09:45", "amount": 480},
+    {"date": "2023-12-17 08:09:45", "amount": 480},  # duplicate
+]
+CSV = b"id,Date,Amount,memo\r\n" + b"".join(
+    f'{i},{tx["date"]},{tx["amount"]},"line one\nline two"\r\n'.encode()
+    for i, tx in enumerate(TRANSACTIONS)
+)
+
+
+def multipart(*parts):
+    body = b""
+    for name, content in parts:
+        body += (
+            (
+                f"--{BOUNDARY}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            ).encode()
+            + content
+            + b"\r\n"
+        )
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def pieces(body, size=7):
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class TestCsvTransactionReader:
+    def test_rows_split_across_chunks(self):
+        reader = CsvTransactionReader()
+        for piece in pieces(b"\xef\xbb\xbf" + CSV, 5):
+            reader.feed(piece)
+        reader.close()
+
+        assert [(tx.date, tx.amount) for tx in reader.transactions] == [
+            (tx["date"], float(tx["amount"])) for tx in TRANSACTIONS
+        ]
+        assert reader.lines == 1 + 2 * len(TRANSACTIONS)  # quoted newlines
+
+    def test_final_row_without_newline(self):
+        reader = CsvTransactionReader()
+        reader.feed(b"date,amount\n2023-02-28 15:49:20,37")
+        reader.feed(b"5")
+        reader.close()
+        assert reader.transactions[0].amount == 375.0
+
+    def test_malformed_row_reports_line(self):
+        reader = CsvTransactionReader()
+        with pytest.raises(ValueError, match="Line 3: Amount 'abc' must be a number"):
+            reader.feed(
+                b"date,amount\n2023-02-28 15:49:20,375\n2023-03-01 00:00:00,abc\n"
+            )
+
+    def test_lenient_keeps_rejects(self):
+        reader = CsvTransactionReader(lenient=True)
+        reader.feed(b"date,amount\n2023-13-01 00:00:00,10\n2023-03-01 00:00:00,nan\n")
+        reader.close()
+        assert reader.transactions == []
+        assert [r.message.split()[0] for r in reader.rejected] == ["Date", "Amount"]
+
+    def test_header_required(self):
+        reader = CsvTransactionReader()
+        with pytest.raises(ValueError, match="header"):
+            reader.feed(b"2023-02-28 15:49:20,375\n")
+        with pytest.raises(ValueError, match="header"):
+            CsvTransactionReader().close()
+
+    def test_stray_quote_fails_once_record_exceeds_bound(self):
+        reader = CsvTransactionReader(max_record=1000)
+        reader.feed(b'date,amount\n2023-02-28 15:49:20,3"75\n')
+        row = b"2023-02-28 15:49:20,375\n"
+        with pytest.raises(ValueError, match="Line 2: record is longer than 1000"):
+            for _ in range(100):
+                reader.feed(row)
+        assert reader.rows == 0
+        assert len(reader._pending) <= 1000 + len(row)
+
+    def test_quote_state_kept_across_chunks(self):
+        body = b"date,amount,memo\n" + b'2023-02-28 15:49:20,375,"a\n\nb"\n' * 3
+        for size in range(1, len(body) + 1):
+            reader = CsvTransactionReader()
+            for piece in pieces(body, size):
+                reader.feed(piece)
+            reader.close()
+            assert len(reader.transactions) == 3, size
+
+
+class TestMultipartParser:
+    def test_events_independent_of_chunking(self):
+        body = multipart(("request", b'{"wage": 1}'), ("transactions", CSV))
+        for size in (1, 3, 64, len(body)):
+            parser = MultipartParser(BOUNDARY)
+            events = [
+                event for piece in pieces(body, size) for event in parser.feed(piece)
+            ]
+            parser.close()
+
+            names = [value for event, value in events if event == "part"]
+            content = {}
+            current = None
+            for event, value in events:
+                if event == "part":
+                    current = value
+                elif event == "data":
+                    content[current] = content.get(current, b"") + value
+            assert names == ["request", "transactions"]
+            assert content == {"request": b'{"wage": 1}', "transactions": CSV}
+
+    def test_truncated_body(self):
+        parser = MultipartParser(BOUNDARY)
+        parser.feed(multipart(("transactions", CSV))[:-10])
+        with pytest.raises(ValueError):
+            parser.close()
+
+    def test_content_type(self):
+        assert parse_content_type(f'multipart/form-data; boundary="{BOUNDARY}"') == (
+            "multipart/form-data",
+            {"boundary": BOUNDARY},
+        )
+
+
+class TestUploadEndpoints:
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def upload(self, path, options, csv=CSV, query_string=""):
+        body = multipart(
+            ("request", json.dumps(options).encode()), ("transactions", csv)
+        )
+        status, _, body = self.client.request(
+            "POST",
+            f"{BASE}{path}",
+            {
+                "content-type": f"multipart/form-data; boundary={BOUNDARY}",
+                "content-length": str(len(body)),
+            },
+            pieces(body, 1000),
+            query_string,
+        )
+        return status, json.loads(body)
+
+    def test_parse_matches_json(self):
+        _, expected = self.client.post_json(f"{BASE}/transactions:parse", TRANSACTIONS)
+        status, _, body = self.client.request(
+            "POST",
+            f"{BASE}/csv/transactions:parse",
+            {"content-type": "text/csv", "content-length": str(len(CSV))},
+            pieces(CSV, 11),
+            "roundUp=100",
+        )
+        assert status == 200
+        assert json.loads(body) == expected
+
+    def test_filter_matches_json(self):
+        options = {"wage": 50_000, **PERIODS}
+        _, expected = self.client.post_json(
+            f"{BASE}/transactions:filter", {**options, "transactions": TRANSACTIONS}
+        )
+        status, body = self.upload("/csv/transactions:filter", options)
+        assert status == 200
+        assert body == expected
+
+    def test_filter_lenient_reports_rows_first(self):
+        csv = CSV + b"9,2023-13-01 00:00:00,10,x\r\n"
+        status, body = self.upload(
+            "/csv/transactions:filter",
+            {"wage": 50_000, "lenient": True, **PERIODS},
+            csv,
+        )
+        assert status == 200
+        assert body["invalid"][0]["message"].startswith("Date '2023-13-01 00:00:00'")
+
+    @pytest.mark.parametrize("scheme", ["nps", "index"])
+    def test_returns_match_json(self, scheme):
+        options = {"age": 29, "wage": 50_000, "inflation": 5.5, **PERIODS}
+        _, expected = self.client.post_json(
+            f"{BASE}/returns:{scheme}", {**options, "transactions": TRANSACTIONS}
+        )
+        status, body = self.upload(f"/csv/returns:{scheme}", options)
+        assert status == 200
+        assert body == expected
+
+    def test_malformed_row_is_422_with_line(self):
+        status, body = self.upload(
+            "/csv/returns:nps",
+            {"age": 29, "wage": 50_000, **PERIODS},
+            b"date,amount\n2023-01-01 00:00:00,1\n2023-01-02,2\n",
+        )
+        assert status == 422
+        assert body["detail"].startswith("Line 3: Date '2023-01-02'")
+
+    def test_invalid_options_are_422(self):
+        status, body = self.upload("/csv/returns:nps", {"age": 29, **PERIODS})
+        assert status == 422
+        assert body["detail"][0]["loc"] == ["body", "request", "wage"]
+
+        status, body = self.upload(
+            "/csv/transactions:filter", {"wage": 1, "userId": "u1", **PERIODS}
+        )
+        assert status == 422
+
+    def test_options_must_precede_csv(self):
+        upload = multipart(("transactions", CSV), ("request", b'{"wage": 1}'))
+        status, _, body = self.client.request(
+            "POST",
+            f"{BASE}/csv/transactions:filter",
+            {
+                "content-type": f"multipart/form-data; boundary={BOUNDARY}",
+                "content-length": str(len(upload)),
+            },
+            (upload,),
+        )
+        assert status == 422
+        assert "must come before" in json.loads(body)["detail"]
+
+    def test_plain_csv_needs_options_part(self):
+        status, _, _ = self.client.request(
+            "POST",
+            f"{BASE}/csv/returns:nps",
+            {"content-type": "text/csv", "content-length": str(len(CSV))},
+            (CSV,),
+        )
+        assert status == 415
+
+    def test_upload_without_content_length_is_411(self):
+        status, _, _ = self.client.request(
+            "POST",
+            f"{BASE}/csv/transactions:parse",
+            {"content-type": "text/csv"},
+            (CSV,),
+        )
+        assert status == 411
@@ -0,0 +1,92 @@
+import asyncio
+
+from fastapi import FastAPI
+
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.api.endpoints import monitoring
+from service.micro_savings.app.api.warmup import (
+    _PERIODS,
+    WarmUp,
+    synthetic_transactions,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+
+class TestSyntheticTransactions:
+    def test_deterministic_with_duplicate(self):
+        txns = synthetic_transactions(50)
+        assert txns == synthetic_transactions(50)
+        assert len(txns) == 51
+        assert txns[-1] == txns[0]
+        assert all(0 < tx["amount"] < 5_000 for tx in txns)
+        assert all(tx["date"].startswith("2023-") for tx in txns)
+
+
+class TestWarmUp:
+    def test_every_route_warmed_before_ready(self):
+        with AppClient(get_app()) as client:
+            status, body = client.get_json("/blackrock/challenge/v1/health")
+            ready_status, ready = client.get_json(
+                "/blackrock/challenge/v1/health/ready"
+            )
+            state = client.app.state
+
+            assert status == ready_status == 200
+            assert ready == {"status": "ready"}
+            assert body["ready"] is True
+            warmup = body["warmup"]
+            assert warmup["status"] == "ready"
+            assert warmup["failures"] == []
+            assert warmup["requests"] == 2 * len(warmup["routes"])
+            assert {"filter_stream", "nps", "whatif_edit", "tax_benefits"} <= set(
+                warmup["routes"]
+            )
+
+            # Warm-up traffic leaves no trace in state or metrics
+            assert len(state.period_registry) == 0
+            assert state.admission.stats()["admitted"] == 0
+            assert state.access_log.stats()["requests"] == 2  # the two probes above
+            assert state.tracer.recent() == []
+
+    def test_client_period_set_survives_warm_up(self):
+        with AppClient(get_app()) as client:
+            status, registered = client.post_json(
+                "/blackrock/challenge/v1/periods", _PERIODS
+            )
+            assert status == 201
+
+            warmup = WarmUp(rounds=1, transactions=20)
+            asyncio.run(warmup.run(client.app))
+            assert warmup.summary()["failures"] == []
+
+            status, _ = client.get_json(
+                f"/blackrock/challenge/v1/periods/{registered['id']}"
+            )
+            assert status == 200
+
+
+class TestReadiness:
+    def make_app(self, warmup=None):
+        app = FastAPI()
+        app.state.warmup = warmup
+        app.include_router(monitoring.router)
+        return app
+
+    def test_not_ready_until_warm_up_finishes(self):
+        with AppClient(self.make_app()) as client:
+            client.app.state.warmup = WarmUp()  # never run
+            status, body = client.get_json("/health")
+            ready_status, ready = client.get_json("/health/ready")
+
+        assert status == 200  # live
+        assert body["ready"] is False
+        assert body["warmup"]["status"] == "pending"
+        assert ready_status == 503
+        assert ready == {"status": "warming up"}
+
+    def test_ready_without_warm_up(self):
+        with AppClient(self.make_app()) as client:
+            status, body = client.get_json("/health/ready")
+            _, health = client.get_json("/health")
+        assert status == 200
+        assert health == {"status": "ok", "ready": True, "warmup": None}
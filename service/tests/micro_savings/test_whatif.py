@@ -0,0 +1,192 @@
+import random
+
+import pytest
+
+from service.micro_savings.app.api.application import get_app
+from service.micro_savings.app.api.endpoints.whatif import whatif
+from service.micro_savings.app.models.periods import KPeriod, PPeriod, QPeriod
+from service.micro_savings.app.models.transaction import RawTransaction
+from service.micro_savings.app.transaction_engine.returns_processor.returns_service import (
+    compute_index_returns,
+    compute_nps_returns,
+)
+from service.micro_savings.app.transaction_engine.whatif_processor.whatif_service import (
+    ReturnsBaseline,
+)
+from service.tests.micro_savings.asgi_utils import AppClient
+
+BASE = "/blackrock/challenge/v1"
+
+rng = random.Random(3)
+TRANSACTIONS = [
+    RawTransaction(
+        date=f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} "
+        f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+        amount=rng.randint(1, 2000) + rng.choice([0, 0.5]),
+    )
+    for _ in range(2_000)
+]
+Q = [QPeriod(fixed=0, start="2023-07-01 00:00:00", end="2023-07-31 23:59:59")]
+P = [PPeriod(extra=25, start="2023-10-01 08:00:00", end="2023-12-31 19:59:59")]
+K = [
+    KPeriod(start="2023-03-01 00:00:00", end="2023-11-30 23:59:59"),
+    KPeriod(start="2023-01-01 00:00:00", end="2023-12-31 23:59:59"),
+]
+PROFILE = dict(age=29, wage=50000, inflation=5.5)
+
+
+def full(q, p, scheme="nps", **kwargs):
+    compute = compute_nps_returns if scheme == "nps" else compute_index_returns
+    return compute(TRANSACTIONS, K, q, p, **PROFILE, **kwargs)
+
+
+class TestReturnsBaseline:
+    def test_baseline_matches_full_computation(self):
+        baseline = ReturnsBaseline(TRANSACTIONS, Q, P, K, **PROFILE, scheme="nps")
+        assert baseline.result() == full(Q, P)
+
+    @pytest.mark.parametrize(
+        "kind, index, period",
+        [
+            (
+                "q",
+                0,
+                QPeriod(
+                    fixed=12, start="2023-07-10 00:00:00", end="2023-08-05 00:00:00"
+                ),
+            ),
+            (
+                "q",
+                None,
+                QPeriod(
+                    fixed=5, start="2023-02-01 00:00:00", end="2023-02-07 00:00:00"
+                ),
+            ),
+            ("q", 0, None),
+            (
+                "p",
+                0,
+                PPeriod(
+                    extra=40, start="2023-11-01 00:00:00", end="2024-01-31 00:00:00"
+                ),
+            ),
+            (
+                "p",
+                None,
+                PPeriod(
+                    extra=7.5, start="2023-03-01 00:00:00", end="2023-03-02 00:00:00"
+                ),
+            ),
+        ],
+    )
+    def test_edit_matches_full_recomputation(self, kind, index, period):
+        baseline = ReturnsBaseline(TRANSACTIONS, Q, P, K, **PROFILE, scheme="index")
+        q, p = list(Q), list(P)
+        edited = q if kind == "q" else p
+        if period is None:
+            del edited[index]
+        elif index is None:
+            edited.append(period)
+        else:
+            edited[index] = period
+
+        result, affected = baseline.what_if(kind, index, period)
+        assert result == full(q, p, scheme="index")
+        assert 0 < affected < len(baseline.timestamps)
+        assert baseline.result() == full(Q, P, scheme="index")  # not committed
+
+    def test_committed_edits_chain(self):
+        baseline = ReturnsBaseline(TRANSACTIONS, Q, P, K, **PROFILE, scheme="nps")
+        q2 = QPeriod(fixed=3, start="2023-05-01 00:00:00", end="2023-05-31 23:59:59")
+        p2 = PPeriod(extra=10, start="2023-06-01 00:00:00", end="2023-09-30 23:59:59")
+        baseline.what_if("q", 0, q2, commit=True)
+        result, _ = baseline.what_if("p", None, p2, commit=True)
+        assert result == full([q2], P + [p2])
+        assert baseline.result() == result
+
+    def test_time_weighted_edit(self):
+        baseline = ReturnsBaseline(
+            TRANSACTIONS, Q, P, K, **PROFILE, scheme="nps", time_weighted=True
+        )
+        result, _ = baseline.what_if("q", 0, None)
+        expected = full([], P, time_weighted=True)
+        for got, want in zip(result.savingsByDates, expected.savingsByDates):
+            assert got.amount == want.amount
+            assert got.profit == pytest.approx(want.profit, abs=0.02)
+
+    def test_bad_index(self):
+        baseline = ReturnsBaseline(TRANSACTIONS, Q, P, K, **PROFILE, scheme="nps")
+        with pytest.raises(IndexError):
+            baseline.what_if("p", 3, None)
+
+
+class TestWhatIfEndpoints:
+    payload = {
+        "scheme": "nps",
+        **PROFILE,
+        "q": [q.model_dump() for q in Q],
+        "p": [p.model_dump() for p in P],
+        "k": [k.model_dump() for k in K],
+        "transactions": [t.model_dump() for t in TRANSACTIONS[:200]],
+    }
+
+    @classmethod
+    def setup_class(cls):
+        cls.client = AppClient(get_app()).__enter__()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_baseline_then_edit(self):
+        status, baseline = self.client.post_json(
+            f"{BASE}/whatif/baselines", self.payload
+        )
+        assert status == 201
+        returns = {k: v for k, v in self.payload.items() if k != "scheme"}
+        _, expected = self.client.post_json(f"{BASE}/returns:nps", returns)
+        assert baseline["result"] == expected
+
+        url = f"{BASE}/whatif/baselines/{baseline['id']}/edits"
+        status, body = self.client.post_json(url, {"p": {"index": 0}, "commit": True})
+        assert status == 200
+        assert body["committed"] is True
+        _, expected = self.client.post_json(f"{BASE}/returns:nps", {**returns, "p": []})
+        assert body["result"] == expected
+
+        _, current = self.client.get_json(f"{BASE}/whatif/baselines/{baseline['id']}")
+        assert current["result"] == expected
+
+    def test_errors(self):
+        _, baseline = self.client.post_json(f"{BASE}/whatif/baselines", self.payload)
+        url = f"{BASE}/whatif/baselines/{baseline['id']}/edits"
+        assert self.client.post_json(url, {"q": {"index": 5}})[0] == 422
+        assert self.client.post_json(url, {"p": {"index": -1}})[0] == 422
+        assert self.client.post_json(url, {"q": {}})[0] == 422
+        assert (
+            self.client.post_json(url, {"q": {"index": 0}, "p": {"index": 0}})[0] == 422
+        )
+        status, _, _ = self.client.request(
+            "DELETE", f"{BASE}/whatif/baselines/{baseline['id']}"
+        )
+        assert status == 204
+        assert self.client.post_json(url, {"q": {"index": 0}})[0] == 404
+
+    def test_period_set_removed_mid_request(self, monkeypatch):
+        _, expected = self.client.post_json(f"{BASE}/whatif/baselines", self.payload)
+        periods = {key: self.payload[key] for key in ("q", "p", "k")}
+        _, registered = self.client.post_json(f"{BASE}/periods", periods)
+        registry = self.client.app.state.period_registry
+        resolve_transactions = whatif.resolve_transactions
+
+        def evict_then_resolve(*args):
+            registry.remove(registered["id"])
+            return resolve_transactions(*args)
+
+        monkeypatch.setattr(whatif, "resolve_transactions", evict_then_resolve)
+        inline = {k: v for k, v in self.payload.items() if k not in periods}
+        status, baseline = self.client.post_json(
+            f"{BASE}/whatif/baselines", {**inline, "periodSetId": registered["id"]}
+        )
+        assert status == 201
+        assert baseline["result"] == expected["result"]